@@ -0,0 +1,103 @@
+# alembic/versions/20250410_add_fulltext_search.py
+"""
+Ricerca full-text sui Privacy Patterns
+
+Aggiunge la colonna tsvector pesata search_vector (titolo A, descrizione B,
+problema/soluzione C, resto D), il trigger che la mantiene aggiornata e
+l'indice GIN. Su SQLite crea invece la tabella virtuale FTS5 con i trigger
+di sincronizzazione.
+
+Revision ID: 20250410_add_fulltext_search
+Revises: add_faq_table
+Create Date: 2025-04-10
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20250410_add_fulltext_search'
+down_revision = 'add_faq_table'
+branch_labels = None
+depends_on = None
+
+FTS_COLUMNS = "title, description, problem, solution, context, consequences"
+NEW_VALUES = "new.title, new.description, new.problem, new.solution, new.context, new.consequences"
+OLD_VALUES = "old.title, old.description, old.problem, old.solution, old.context, old.consequences"
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("ALTER TABLE privacy_patterns ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute("""
+            CREATE OR REPLACE FUNCTION privacy_patterns_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B') ||
+                    setweight(to_tsvector('simple', coalesce(NEW.problem, '')), 'C') ||
+                    setweight(to_tsvector('simple', coalesce(NEW.solution, '')), 'C') ||
+                    setweight(to_tsvector('simple', coalesce(NEW.context, '')), 'D') ||
+                    setweight(to_tsvector('simple', coalesce(NEW.consequences, '')), 'D');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("DROP TRIGGER IF EXISTS privacy_patterns_search_vector_trigger ON privacy_patterns")
+        op.execute("""
+            CREATE TRIGGER privacy_patterns_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF title, description, context, problem, solution, consequences
+            ON privacy_patterns
+            FOR EACH ROW EXECUTE FUNCTION privacy_patterns_search_vector_update()
+        """)
+        # Popola le righe esistenti facendo scattare il trigger
+        op.execute("UPDATE privacy_patterns SET title = title")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_privacy_patterns_search_vector "
+            "ON privacy_patterns USING gin(search_vector)"
+        )
+
+    elif dialect == 'sqlite':
+        op.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS privacy_patterns_fts USING fts5(
+                {FTS_COLUMNS},
+                content='privacy_patterns',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS privacy_patterns_fts_ai AFTER INSERT ON privacy_patterns BEGIN
+                INSERT INTO privacy_patterns_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {NEW_VALUES});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS privacy_patterns_fts_ad AFTER DELETE ON privacy_patterns BEGIN
+                INSERT INTO privacy_patterns_fts(privacy_patterns_fts, rowid, {FTS_COLUMNS})
+                VALUES ('delete', old.id, {OLD_VALUES});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS privacy_patterns_fts_au AFTER UPDATE ON privacy_patterns BEGIN
+                INSERT INTO privacy_patterns_fts(privacy_patterns_fts, rowid, {FTS_COLUMNS})
+                VALUES ('delete', old.id, {OLD_VALUES});
+                INSERT INTO privacy_patterns_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {NEW_VALUES});
+            END
+        """)
+        op.execute("INSERT INTO privacy_patterns_fts(privacy_patterns_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS idx_privacy_patterns_search_vector")
+        op.execute("DROP TRIGGER IF EXISTS privacy_patterns_search_vector_trigger ON privacy_patterns")
+        op.execute("DROP FUNCTION IF EXISTS privacy_patterns_search_vector_update()")
+        op.execute("ALTER TABLE privacy_patterns DROP COLUMN IF EXISTS search_vector")
+
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS privacy_patterns_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS privacy_patterns_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS privacy_patterns_fts_ai")
+        op.execute("DROP TABLE IF EXISTS privacy_patterns_fts")
@@ -47,6 +47,18 @@ class Settings(BaseSettings):
     
     # Elasticsearch
     ELASTICSEARCH_URL: str = os.getenv("ELASTICSEARCH_URL", "http://elasticsearch:9200")
+
+    # Ricerca: "memory" (indice in-process) o "database" (full-text del DB)
+    SEARCH_ENGINE: str = os.getenv("SEARCH_ENGINE", "memory")
+    # Cache dei risultati di ricerca: voci massime (0 = disattivata) e TTL in secondi (0 = nessuno)
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "300"))
+    # Cache applicativa: voci massime per i namespace senza limiti propri e
+    # secondi tra due scansioni delle voci scadute
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+    CACHE_SWEEP_INTERVAL: int = int(os.getenv("CACHE_SWEEP_INTERVAL", "60"))
+    # Snapshot dell'indice di ricerca condiviso dai worker (vuoto = disattivato)
+    SEARCH_INDEX_SNAPSHOT: str = os.getenv("SEARCH_INDEX_SNAPSHOT", "./data/search_index.snap")
     
     # Email
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.example.com")
@@ -3,7 +3,7 @@ from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from src.services.faq_service import FAQService
+from src.services.faq_service import faq_service
 
 class FAQController:
     """
@@ -13,7 +13,7 @@ class FAQController:
     
     def __init__(self):
         """Inizializza il controller con il servizio FAQ."""
-        self.faq_service = FAQService()
+        self.faq_service = faq_service
     
     def get_all_faqs(self) -> List[Dict[str, Any]]:
         """
@@ -58,4 +58,20 @@ class GDPRController(BaseController[GDPRArticle]):
         Returns:
             Articolo come dizionario o None se non trovato
         """
-        return GDPRService.get_article_by_number(db, article_number)
\ No newline at end of file
+        return GDPRService.get_article_by_number(db, article_number)
+    
+    @staticmethod
+    def search_articles(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Cerca articoli GDPR per testo, delegando al service.
+        
+        Args:
+            db: Sessione database
+            query: Termine di ricerca
+            skip: Numero di risultati da saltare
+            limit: Numero massimo di risultati
+            
+        Returns:
+            Lista di articoli come dizionari, dal più pertinente
+        """
+        return GDPRService.search_articles(db, query, skip, limit)
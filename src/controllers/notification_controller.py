@@ -24,7 +24,9 @@ class NotificationController:
         user_id: int,
         skip: int = 0,
         limit: int = 50,
-        unread_only: bool = False
+        unread_only: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> Dict[str, Any]:
         """
         Recupera le notifiche di un utente.
@@ -35,6 +37,8 @@ class NotificationController:
             skip (int): Numero di record da saltare
             limit (int): Numero massimo di record da restituire
             unread_only (bool): Se restituire solo notifiche non lette
+            cursor (str, optional): Cursore della pagina precedente, alternativo a skip
+            include_total (bool): Se False non conta le notifiche della lista
             
         Returns:
             Dict[str, Any]: Dizionario con notifiche e metadati
@@ -44,7 +48,9 @@ class NotificationController:
             user_id=user_id,
             skip=skip,
             limit=limit,
-            unread_only=unread_only
+            unread_only=unread_only,
+            cursor=cursor,
+            include_total=include_total
         )
     
     def mark_notification_read(
@@ -1,6 +1,6 @@
 # src/controllers/pattern_controller.py
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from sqlalchemy.orm import Query, Session, selectinload
 from sqlalchemy import or_, func
 from fastapi import HTTPException, status
 
@@ -12,7 +12,14 @@ from src.models.vulnerability import Vulnerability
 from src.models.user_model import User
 from src.models.implementation_example import ImplementationExample
 from src.schemas.privacy_pattern import PatternCreate, PatternUpdate
-from src.utils.cache import cached, invalidate_pattern_cache
+from src.utils.cache import cached, invalidate_pattern_cache, STATS_TAG
+from src.utils.pagination import paginate_keyset
+from src.services.search_service import search_service, taxonomy_conditions
+from src.services.search_index import TaxonomyFilter
+from src.services.search_cache import search_signature
+
+# Righe lette per blocco dal cursore dell'esportazione
+EXPORT_BATCH_SIZE = 500
 
 class PatternController:
     """
@@ -38,6 +45,41 @@ class PatternController:
             return pattern.to_dict()
         return None
     
+    @staticmethod
+    def get_patterns_by_ids(db: Session, pattern_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Recupera più pattern con le relative relazioni in blocco.
+        
+        Carica i pattern con una sola query e le relazioni GDPR, PbD, ISO e
+        vulnerabilità con una query ciascuna, indipendentemente dal numero
+        di ID richiesti.
+        
+        Args:
+            db (Session): Sessione database
+            pattern_ids (List[int]): ID dei pattern, nell'ordine desiderato
+            
+        Returns:
+            List[Dict[str, Any]]: Pattern come dizionari, nello stesso ordine
+            degli ID (gli ID inesistenti vengono ignorati)
+        """
+        if not pattern_ids:
+            return []
+        
+        patterns = db.query(PrivacyPattern).options(
+            # Evita il caricamento a cascata dei pattern collegati agli articoli
+            selectinload(PrivacyPattern.gdpr_articles).lazyload(GDPRArticle.patterns),
+            selectinload(PrivacyPattern.pbd_principles),
+            selectinload(PrivacyPattern.iso_phases),
+            selectinload(PrivacyPattern.vulnerabilities)
+        ).filter(PrivacyPattern.id.in_(set(pattern_ids))).all()
+        
+        patterns_by_id = {pattern.id: pattern for pattern in patterns}
+        return [
+            patterns_by_id[pattern_id].to_dict()
+            for pattern_id in pattern_ids
+            if pattern_id in patterns_by_id
+        ]
+    
     @staticmethod
     def get_patterns(
         db: Session, 
@@ -45,50 +87,183 @@ class PatternController:
         limit: int = 100,
         strategy: Optional[str] = None,
         mvc_component: Optional[str] = None,
-        gdpr_id: Optional[int] = None,
-        pbd_id: Optional[int] = None,
-        iso_id: Optional[int] = None,
-        vulnerability_id: Optional[int] = None,
-        search_term: Optional[str] = None
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
+        search_term: Optional[str] = None,
+        taxonomy_match: str = "all",
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> Dict[str, Any]:
         """
         Recupera una lista di pattern con filtri opzionali.
         
+        Senza termine di ricerca, e con l'indice in memoria pronto, i filtri
+        sono risolti dall'indice bitmap e vengono caricati solo i pattern
+        della pagina richiesta.
+        
+        I pattern sono ordinati per ID. Il cursore restituito in next_cursor
+        permette di leggere la pagina successiva senza OFFSET; con
+        include_total=False la query SQL non esegue il COUNT.
+        
         Args:
             db (Session): Sessione database
             skip (int): Numero di record da saltare
             limit (int): Numero massimo di record da restituire
             strategy (str, optional): Filtra per strategia
             mvc_component (str, optional): Filtra per componente MVC
-            gdpr_id (int, optional): Filtra per articolo GDPR
-            pbd_id (int, optional): Filtra per principio PbD
-            iso_id (int, optional): Filtra per fase ISO
-            vulnerability_id (int, optional): Filtra per vulnerabilità
+            gdpr_id (int | List[int], optional): Filtra per articoli GDPR
+            pbd_id (int | List[int], optional): Filtra per principi PbD
+            iso_id (int | List[int], optional): Filtra per fasi ISO
+            vulnerability_id (int | List[int], optional): Filtra per vulnerabilità
             search_term (str, optional): Termine di ricerca
+            taxonomy_match (str): "all" (AND) o "any" (OR) tra più ID della
+                stessa tassonomia
+            cursor (str, optional): Cursore della pagina precedente, alternativo a skip
+            include_total (bool): Se False non calcola total e pages
             
         Returns:
-            Dict[str, Any]: Dizionario con patterns, total, page, size, pages
+            Dict[str, Any]: Dizionario con patterns, total, page, pages, next_cursor
+        """
+        page = skip // limit + 1
+        
+        if not search_term and search_service.index.is_ready:
+            result = search_service.index.search(
+                strategy=strategy,
+                mvc_component=mvc_component,
+                gdpr_id=gdpr_id,
+                pbd_id=pbd_id,
+                iso_id=iso_id,
+                vulnerability_id=vulnerability_id,
+                from_pos=skip,
+                size=limit,
+                taxonomy_match=taxonomy_match,
+                cursor=cursor
+            )
+            total_patterns = result["total"]
+            return {
+                "patterns": PatternController.get_patterns_by_ids(db, [r["id"] for r in result["results"]]),
+                "total": total_patterns,
+                "page": page,
+                "pages": (total_patterns + limit - 1) // limit if limit > 0 else 0,
+                "next_cursor": result["next_cursor"]
+            }
+        
+        # Le liste SQL ripetute sono servite dalla cache dei risultati (solo ID e totale)
+        signature = search_signature(
+            strategy=strategy,
+            mvc_component=mvc_component,
+            gdpr_id=gdpr_id,
+            pbd_id=pbd_id,
+            iso_id=iso_id,
+            vulnerability_id=vulnerability_id,
+            taxonomy_match=taxonomy_match,
+            listing="patterns",
+            search=search_term.lower() if search_term else None,
+            skip=skip if not cursor else 0,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total
+        )
+        cached_page = search_service.cached_result(signature)
+        version = search_service.result_version()
+        
+        if cached_page is not None:
+            total_patterns = cached_page["total"]
+            next_cursor = cached_page["next_cursor"]
+            pattern_dicts = PatternController.get_patterns_by_ids(
+                db, [r["id"] for r in cached_page["results"]]
+            )
+        else:
+            total_patterns, pattern_dicts, next_cursor = PatternController._query_patterns(
+                db, limit, strategy, mvc_component, gdpr_id, pbd_id, iso_id, vulnerability_id,
+                search_term, taxonomy_match, cursor, skip, include_total
+            )
+            search_service.store_result(signature, {
+                "total": total_patterns,
+                "results": [{"id": pattern["id"]} for pattern in pattern_dicts],
+                "next_cursor": next_cursor
+            }, version)
+        
+        # Calcola informazioni di paginazione
+        pages = None
+        if total_patterns is not None:
+            pages = (total_patterns + limit - 1) // limit if limit > 0 else 0
+        
+        return {
+            "patterns": pattern_dicts,
+            "total": total_patterns,
+            "page": page,
+            "pages": pages,
+            "next_cursor": next_cursor
+        }
+    
+    @staticmethod
+    def _query_patterns(
+        db: Session,
+        limit: int,
+        strategy: Optional[str],
+        mvc_component: Optional[str],
+        gdpr_id: TaxonomyFilter,
+        pbd_id: TaxonomyFilter,
+        iso_id: TaxonomyFilter,
+        vulnerability_id: TaxonomyFilter,
+        search_term: Optional[str],
+        taxonomy_match: str,
+        cursor: Optional[str],
+        skip: int,
+        include_total: bool
+    ) -> Tuple[Optional[int], List[Dict[str, Any]], Optional[str]]:
+        """
+        Esegue sul database la query filtrata di get_patterns.
+        
+        Returns:
+            Tuple: Totale (None se non richiesto), pattern come dizionari e
+            cursore della pagina successiva
+        """
+        query = PatternController._filter_query(
+            db.query(PrivacyPattern), strategy, mvc_component, gdpr_id, pbd_id, iso_id,
+            vulnerability_id, search_term, taxonomy_match
+        )
+        
+        # Conteggio totale per la paginazione, solo se richiesto
+        total_patterns = query.count() if include_total else None
+        
+        # Applica paginazione keyset (o a offset se non c'è un cursore)
+        patterns, next_cursor = paginate_keyset(
+            query, [(PrivacyPattern.id, False)], limit, cursor=cursor, offset=skip
+        )
+        
+        # Converti i pattern in dizionari per evitare errori di serializzazione Pydantic
+        return total_patterns, [pattern.to_dict() for pattern in patterns], next_cursor
+    
+    @staticmethod
+    def _filter_query(
+        query: Query,
+        strategy: Optional[str],
+        mvc_component: Optional[str],
+        gdpr_id: TaxonomyFilter,
+        pbd_id: TaxonomyFilter,
+        iso_id: TaxonomyFilter,
+        vulnerability_id: TaxonomyFilter,
+        search_term: Optional[str],
+        taxonomy_match: str
+    ) -> Query:
         """
-        query = db.query(PrivacyPattern)
+        Applica a una query sui pattern i filtri di get_patterns.
         
-        # Applica filtri se presenti
+        Returns:
+            Query: Query filtrata
+        """
         if strategy:
             query = query.filter(PrivacyPattern.strategy == strategy)
         
         if mvc_component:
             query = query.filter(PrivacyPattern.mvc_component == mvc_component)
         
-        if gdpr_id:
-            query = query.join(PrivacyPattern.gdpr_articles).filter(GDPRArticle.id == gdpr_id)
-        
-        if pbd_id:
-            query = query.join(PrivacyPattern.pbd_principles).filter(PbDPrinciple.id == pbd_id)
-        
-        if iso_id:
-            query = query.join(PrivacyPattern.iso_phases).filter(ISOPhase.id == iso_id)
-        
-        if vulnerability_id:
-            query = query.join(PrivacyPattern.vulnerabilities).filter(Vulnerability.id == vulnerability_id)
+        for condition in taxonomy_conditions(gdpr_id, pbd_id, iso_id, vulnerability_id, taxonomy_match):
+            query = query.filter(condition)
         
         if search_term:
             search = f"%{search_term}%"
@@ -102,26 +277,59 @@ class PatternController:
                 )
             )
         
-        # Conteggio totale per la paginazione
-        total_query = query
-        total_patterns = total_query.count()
-        
-        # Applica paginazione
-        patterns = query.offset(skip).limit(limit).all()
-        
-        # Converti i pattern in dizionari per evitare errori di serializzazione Pydantic
-        pattern_dicts = [pattern.to_dict() for pattern in patterns]
+        return query
+    
+    @staticmethod
+    def iter_patterns(
+        db: Session,
+        strategy: Optional[str] = None,
+        mvc_component: Optional[str] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
+        search_term: Optional[str] = None,
+        taxonomy_match: str = "all",
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Scorre tutti i pattern che soddisfano i filtri di get_patterns.
         
-        # Calcola informazioni di paginazione
-        page = skip // limit + 1
-        pages = (total_patterns + limit - 1) // limit if limit > 0 else 0
+        I pattern sono letti da un cursore lato server a blocchi di
+        batch_size righe, con le relazioni caricate una query per blocco:
+        la memoria usata non dipende dal numero di pattern e il primo
+        pattern è disponibile appena letto il primo blocco.
         
-        return {
-            "patterns": pattern_dicts,
-            "total": total_patterns,
-            "page": page,
-            "pages": pages
-        }
+        Args:
+            db (Session): Sessione database
+            strategy (str, optional): Filtra per strategia
+            mvc_component (str, optional): Filtra per componente MVC
+            gdpr_id (int | List[int], optional): Filtra per articoli GDPR
+            pbd_id (int | List[int], optional): Filtra per principi PbD
+            iso_id (int | List[int], optional): Filtra per fasi ISO
+            vulnerability_id (int | List[int], optional): Filtra per vulnerabilità
+            search_term (str, optional): Termine di ricerca
+            taxonomy_match (str): "all" (AND) o "any" (OR) tra più ID della
+                stessa tassonomia
+            batch_size (int): Righe lette dal cursore per blocco
+            
+        Yields:
+            Dict[str, Any]: Pattern come dizionari, ordinati per ID
+        """
+        # yield_per attiva anche stream_results: le righe restano sul cursore
+        # del database finché non vengono lette
+        query = PatternController._filter_query(
+            db.query(PrivacyPattern), strategy, mvc_component, gdpr_id, pbd_id, iso_id,
+            vulnerability_id, search_term, taxonomy_match
+        ).options(
+            selectinload(PrivacyPattern.gdpr_articles).lazyload(GDPRArticle.patterns),
+            selectinload(PrivacyPattern.pbd_principles),
+            selectinload(PrivacyPattern.iso_phases),
+            selectinload(PrivacyPattern.vulnerabilities)
+        ).order_by(PrivacyPattern.id).yield_per(batch_size)
+        
+        for pattern in query:
+            yield pattern.to_dict()
     
     @staticmethod
     def create_pattern(db: Session, pattern: PatternCreate, current_user: User) -> PrivacyPattern:
@@ -182,6 +390,12 @@ class PatternController:
         db.commit()
         db.refresh(db_pattern)
         
+        # Aggiorna l'indice di ricerca
+        search_service.index_pattern(db_pattern)
+        
+        # Invalida cache
+        invalidate_pattern_cache(db_pattern.id)
+        
         return db_pattern
     
     @staticmethod
@@ -262,6 +476,9 @@ class PatternController:
         db.commit()
         db.refresh(db_pattern)
         
+        # Aggiorna l'indice di ricerca
+        search_service.index_pattern(db_pattern)
+        
         # Invalida cache
         invalidate_pattern_cache(pattern_id)
         
@@ -303,13 +520,16 @@ class PatternController:
         db.delete(db_pattern)
         db.commit()
         
+        # Rimuovi dall'indice di ricerca
+        search_service.remove_pattern_from_index(pattern_id)
+        
         # Invalida cache
         invalidate_pattern_cache(pattern_id)
         
         return True
     
     @staticmethod
-    @cached(ttl=300)  # Cache per 5 minuti
+    @cached(ttl=300, namespace="stats", key=(), tags=(STATS_TAG,))  # Cache per 5 minuti
     def get_pattern_stats(db: Session) -> Dict[str, Any]:
         """
         Recupera statistiche sui pattern.
@@ -359,18 +579,33 @@ class PatternController:
         return patterns
 
     @staticmethod
-    def get_related_patterns(db: Session, pattern: PrivacyPattern, limit: int = 5) -> List[PrivacyPattern]:
+    def get_related_patterns(db: Session, pattern_id: int, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Trova pattern correlati a un pattern specifico.
         
+        Usa i vicini precalcolati dell'indice dei pattern correlati
+        (similarità del coseno su TF-IDF del testo e tassonomie). Finché
+        l'indice non è pronto ricade sui pattern che condividono articoli
+        GDPR o strategia, senza ordinamento per rilevanza.
+        
         Args:
             db (Session): Sessione database
-            pattern (PrivacyPattern): Pattern di riferimento
+            pattern_id (int): ID del pattern di riferimento
             limit (int): Numero massimo di pattern da restituire
             
         Returns:
-            List[PrivacyPattern]: Lista di pattern correlati
+            List[Dict[str, Any]]: Pattern correlati come dizionari, dal più simile
         """
+        if search_service.related.is_ready:
+            related_ids = [
+                related_id for related_id, _ in search_service.related.related(pattern_id, limit)
+            ]
+            return PatternController.get_patterns_by_ids(db=db, pattern_ids=related_ids)
+        
+        pattern = db.query(PrivacyPattern).filter(PrivacyPattern.id == pattern_id).first()
+        if not pattern:
+            return []
+        
         # Raccogli gli ID degli articoli GDPR correlati
         gdpr_ids = [article.id for article in pattern.gdpr_articles]
         
@@ -392,7 +627,7 @@ class PatternController:
         # Unisci i risultati e limita
         related_patterns = query.union(query_strategy).limit(limit).all()
         
-        return related_patterns
+        return [related.to_dict() for related in related_patterns]
 
     @staticmethod
     def get_trending_patterns(db: Session, limit: int = 5) -> List[PrivacyPattern]:
@@ -4,7 +4,9 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 import logging
 
-from src.services.search_service import SearchService
+from src.services.search_service import search_service
+from src.services.reindex_job import reindex_job
+from src.services.search_index import TaxonomyFilter
 from src.models.privacy_pattern import PrivacyPattern
 
 logger = logging.getLogger(__name__)
@@ -12,12 +14,13 @@ logger = logging.getLogger(__name__)
 class SearchController:
     """
     Controller per la gestione delle ricerche.
-    Aggiornato per utilizzare la ricerca basata su SQL invece di Elasticsearch.
+    Aggiornato per utilizzare l'indice in memoria invece di Elasticsearch.
     """
     
     def __init__(self):
-        """Inizializza il controller con il servizio di ricerca."""
-        self.search_service = SearchService()
+        """Inizializza il controller con il servizio di ricerca condiviso."""
+        self.search_service = search_service
+        self.reindex_job = reindex_job
     
     def search_patterns(
         self, 
@@ -25,12 +28,18 @@ class SearchController:
         query: Optional[str] = None,
         strategy: Optional[str] = None,
         mvc_component: Optional[str] = None,
-        gdpr_id: Optional[int] = None,
-        pbd_id: Optional[int] = None,
-        iso_id: Optional[int] = None,
-        vulnerability_id: Optional[int] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
         from_pos: int = 0,
-        size: int = 10
+        size: int = 10,
+        facets: bool = False,
+        taxonomy_match: str = "all",
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fuzzy: bool = False,
+        highlight: bool = False
     ) -> Dict[str, Any]:
         """
         Cerca privacy patterns.
@@ -40,17 +49,23 @@ class SearchController:
             query (str, optional): Query di ricerca
             strategy (str, optional): Filtra per strategia
             mvc_component (str, optional): Filtra per componente MVC
-            gdpr_id (int, optional): Filtra per articolo GDPR
-            pbd_id (int, optional): Filtra per principio PbD
-            iso_id (int, optional): Filtra per fase ISO
-            vulnerability_id (int, optional): Filtra per vulnerabilità
+            gdpr_id (int | List[int], optional): Filtra per articoli GDPR
+            pbd_id (int | List[int], optional): Filtra per principi PbD
+            iso_id (int | List[int], optional): Filtra per fasi ISO
+            vulnerability_id (int | List[int], optional): Filtra per vulnerabilità
             from_pos (int): Posizione di partenza per i risultati
             size (int): Numero di risultati da restituire
+            facets (bool): Se includere i conteggi per facetta
+            taxonomy_match (str): "all" (AND) o "any" (OR) tra più ID della
+                stessa tassonomia
+            cursor (str, optional): Cursore della pagina precedente, alternativo a from_pos
+            include_total (bool): Se False la ricerca su database non esegue il COUNT
+            fuzzy (bool): Se True tollera errori di battitura nei termini
+            highlight (bool): Se True include gli snippet evidenziati dei risultati
             
         Returns:
             Dict[str, Any]: Risultati della ricerca
         """
-        # Utilizziamo direttamente il servizio SQL
         return self.search_service.search_patterns(
             db=db,
             query=query,
@@ -61,7 +76,55 @@ class SearchController:
             iso_id=iso_id,
             vulnerability_id=vulnerability_id,
             from_pos=from_pos,
-            size=size
+            size=size,
+            facets=facets,
+            taxonomy_match=taxonomy_match,
+            cursor=cursor,
+            include_total=include_total,
+            fuzzy=fuzzy,
+            highlight=highlight
+        )
+    
+    def search_batch(self, db: Session, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Esegue più ricerche di pattern in una sola chiamata.
+        
+        Args:
+            db (Session): Sessione database
+            requests (List[Dict[str, Any]]): Parametri di ciascuna ricerca
+            
+        Returns:
+            List[Dict[str, Any]]: Risultati nello stesso ordine delle richieste
+        """
+        return self.search_service.search_batch(db=db, requests=requests)
+    
+    def search_all(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 10,
+        per_type: int = 5,
+        types: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Ricerca globale su pattern, articoli GDPR e FAQ.
+        
+        Args:
+            db (Session): Sessione database
+            query (str): Query di ricerca
+            limit (int): Numero massimo di risultati complessivi
+            per_type (int): Numero massimo di risultati per tipo
+            types (List[str], optional): Tipi da includere
+            
+        Returns:
+            Dict[str, Any]: Totali per tipo e risultati ordinati per punteggio
+        """
+        return self.search_service.search_all(
+            db=db,
+            query=query,
+            limit=limit,
+            per_type=per_type,
+            types=types
         )
     
     def get_autocomplete_suggestions(
@@ -87,15 +150,56 @@ class SearchController:
             limit=limit
         )
     
-    # Questi metodi sono mantenuti per compatibilità
     def index_pattern(self, pattern: PrivacyPattern) -> bool:
-        """Stub per compatibilità."""
-        return True
+        """
+        Indicizza o aggiorna un pattern nell'indice di ricerca.
+        
+        Args:
+            pattern (PrivacyPattern): Pattern da indicizzare
+            
+        Returns:
+            bool: True se l'indicizzazione è riuscita
+        """
+        return self.search_service.index_pattern(pattern)
     
     def remove_pattern_from_index(self, pattern_id: int) -> bool:
-        """Stub per compatibilità."""
-        return True
+        """
+        Rimuove un pattern dall'indice di ricerca.
+        
+        Args:
+            pattern_id (int): ID del pattern da rimuovere
+            
+        Returns:
+            bool: True se l'operazione è riuscita
+        """
+        return self.search_service.remove_pattern_from_index(pattern_id)
     
     def reindex_all_patterns(self, db: Session) -> bool:
-        """Stub per compatibilità."""
-        return True
\ No newline at end of file
+        """
+        Ricostruisce l'indice di ricerca a partire dal database.
+        
+        Args:
+            db (Session): Sessione database
+            
+        Returns:
+            bool: True se la ricostruzione è riuscita
+        """
+        return self.search_service.reindex_all_patterns(db)
+    
+    def start_reindex(self) -> bool:
+        """
+        Avvia la ricostruzione degli indici di ricerca in background.
+        
+        Returns:
+            bool: False se una ricostruzione era già in corso
+        """
+        return self.reindex_job.start()
+    
+    def get_reindex_status(self) -> Dict[str, Any]:
+        """
+        Stato dell'ultima ricostruzione degli indici avviata.
+        
+        Returns:
+            Dict[str, Any]: Stato, fase, avanzamento, velocità e tempo stimato
+        """
+        return self.reindex_job.status()
\ No newline at end of file
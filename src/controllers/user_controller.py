@@ -9,6 +9,7 @@ import time
 from src.models.user_model import User, UserRole
 from src.models.privacy_pattern import PrivacyPattern
 from src.utils.password import get_password_hash, verify_password
+from src.utils.pagination import paginate_keyset
 from src.schemas.user import UserCreate, UserUpdate
 from src.config import settings
 
@@ -68,11 +69,16 @@ class UserController:
         limit: int = 100,
         role: Optional[UserRole] = None,
         search: Optional[str] = None,
-        active_only: bool = True
+        active_only: bool = True,
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> Dict[str, Any]:
         """
         Recupera una lista di utenti con filtri opzionali.
         
+        Gli utenti sono ordinati per (username, id); next_cursor permette di
+        leggere la pagina successiva senza OFFSET.
+        
         Args:
             db (Session): Sessione database
             skip (int): Numero di record da saltare
@@ -80,9 +86,11 @@ class UserController:
             role (UserRole, optional): Filtra per ruolo
             search (str, optional): Filtra per username o email
             active_only (bool): Filtra solo utenti attivi
+            cursor (str, optional): Cursore della pagina precedente, alternativo a skip
+            include_total (bool): Se False non esegue il COUNT
             
         Returns:
-            Dict[str, Any]: Dizionario con users, total, page, size, pages
+            Dict[str, Any]: Dizionario con users, total, page, size, pages, next_cursor
         """
         query = db.query(User)
         
@@ -101,22 +109,25 @@ class UserController:
                 (User.full_name.ilike(search_term))
             )
         
-        # Conteggio totale per la paginazione
-        total = query.count()
+        # Conteggio totale per la paginazione, solo se richiesto
+        total = query.count() if include_total else None
         
-        # Applica paginazione
-        users = query.order_by(User.username).offset(skip).limit(limit).all()
+        # Applica paginazione keyset (o a offset se non c'è un cursore)
+        users, next_cursor = paginate_keyset(
+            query, [(User.username, False), (User.id, False)], limit, cursor=cursor, offset=skip
+        )
         
         # Calcola informazioni di paginazione
         page = skip // limit + 1
-        pages = (total + limit - 1) // limit  # Ceiling division
+        pages = (total + limit - 1) // limit if total is not None else None  # Ceiling division
         
         return {
             "users": users,
             "total": total,
             "page": page,
             "size": limit,
-            "pages": pages
+            "pages": pages,
+            "next_cursor": next_cursor
         }
     
     @staticmethod
@@ -0,0 +1,202 @@
+# src/db/fulltext.py
+"""
+Strutture di ricerca full-text lato database per i Privacy Patterns.
+
+Su PostgreSQL usa una colonna tsvector pesata (aggiornata da trigger) con
+indice GIN; su SQLite una tabella virtuale FTS5 sincronizzata da trigger.
+"""
+import logging
+import re
+import weakref
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Configurazione text search: i contenuti sono misti italiano/inglese
+TS_CONFIG = "simple"
+
+# Tabella virtuale FTS5 usata su SQLite
+FTS_TABLE = "privacy_patterns_fts"
+
+# Colonne indicizzate, nell'ordine della tabella FTS5
+FTS_COLUMNS = ["title", "description", "problem", "solution", "context", "consequences"]
+
+# Pesi BM25 per colonna su SQLite, proporzionali ai pesi A/B/C/D di ts_rank_cd
+FTS_WEIGHTS = [10.0, 4.0, 2.0, 2.0, 1.0, 1.0]
+
+POSTGRES_DDL: List[str] = [
+    "ALTER TABLE privacy_patterns ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION privacy_patterns_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.problem, '')), 'C') ||
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.solution, '')), 'C') ||
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.context, '')), 'D') ||
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.consequences, '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS privacy_patterns_search_vector_trigger ON privacy_patterns",
+    """
+    CREATE TRIGGER privacy_patterns_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, context, problem, solution, consequences
+    ON privacy_patterns
+    FOR EACH ROW EXECUTE FUNCTION privacy_patterns_search_vector_update()
+    """,
+    # Popola le righe esistenti facendo scattare il trigger
+    "UPDATE privacy_patterns SET title = title WHERE search_vector IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_privacy_patterns_search_vector ON privacy_patterns USING gin(search_vector)",
+]
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+
+SQLITE_DDL: List[str] = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_columns},
+        content='privacy_patterns',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON privacy_patterns BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON privacy_patterns BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON privacy_patterns BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+# Disponibilità delle strutture full-text per engine
+_backend_cache: "weakref.WeakKeyDictionary[Engine, Optional[str]]" = weakref.WeakKeyDictionary()
+
+
+def setup_fulltext_search(engine: Engine) -> bool:
+    """
+    Crea (se mancanti) le strutture full-text per il dialetto del database.
+
+    L'operazione è idempotente e viene eseguita dopo create_all.
+
+    Args:
+        engine: Engine SQLAlchemy
+
+    Returns:
+        bool: True se le strutture sono state create o erano già presenti
+    """
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        statements = POSTGRES_DDL
+    elif dialect == "sqlite":
+        statements = SQLITE_DDL
+    else:
+        logger.info(f"Ricerca full-text non supportata per il dialetto {dialect}")
+        return False
+
+    try:
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+        _backend_cache.pop(engine, None)
+        logger.info(f"Strutture di ricerca full-text pronte ({dialect})")
+        return True
+    except Exception as e:
+        logger.error(f"Errore nella creazione delle strutture full-text: {str(e)}")
+        return False
+
+
+def fulltext_backend(bind) -> Optional[str]:
+    """
+    Restituisce il backend full-text disponibile per una connessione.
+
+    Args:
+        bind: Engine o Connection SQLAlchemy
+
+    Returns:
+        "postgresql", "sqlite" o None se le strutture non esistono
+    """
+    dialect = getattr(getattr(bind, "dialect", None), "name", None)
+    if dialect not in ("postgresql", "sqlite"):
+        return None
+
+    engine = getattr(bind, "engine", bind)
+    if engine in _backend_cache:
+        return _backend_cache[engine]
+
+    try:
+        inspector = inspect(bind)
+        if dialect == "postgresql":
+            columns = {column["name"] for column in inspector.get_columns("privacy_patterns")}
+            available = "search_vector" in columns
+        else:
+            available = inspector.has_table(FTS_TABLE)
+    except Exception as e:
+        logger.warning(f"Impossibile verificare le strutture full-text: {str(e)}")
+        return None
+
+    _backend_cache[engine] = dialect if available else None
+    return _backend_cache[engine]
+
+
+_QUERY_TOKENS = re.compile(r'-?"[^"]*"|\S+')
+
+
+def to_fts5_query(query: str) -> Optional[str]:
+    """
+    Converte una query in stile websearch in un'espressione MATCH di FTS5.
+
+    Supporta frasi tra virgolette, l'operatore OR e l'esclusione con "-",
+    come websearch_to_tsquery di PostgreSQL. Ogni termine viene quotato per
+    evitare che la sintassi FTS5 venga interpretata dall'input dell'utente.
+
+    Args:
+        query: Query dell'utente
+
+    Returns:
+        Espressione MATCH o None se la query non contiene termini
+    """
+    positive: List[str] = []
+    negative: List[str] = []
+
+    for raw in _QUERY_TOKENS.findall(query):
+        if raw == "OR":
+            if positive and positive[-1] != "OR":
+                positive.append("OR")
+            continue
+
+        exclude = raw.startswith("-")
+        words = re.findall(r"\w+", raw.lstrip("-"))
+        if not words:
+            continue
+
+        phrase = '"' + " ".join(words) + '"'
+        (negative if exclude else positive).append(phrase)
+
+    while positive and positive[-1] == "OR":
+        positive.pop()
+    if not positive:
+        return None
+
+    expression = " ".join(positive)
+    for phrase in negative:
+        expression = f"({expression}) NOT {phrase}"
+    return expression
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from src.models.base import Base
 from src.models.user_model import User, UserRole
 from src.db.session import engine, SessionLocal
+from src.db.fulltext import setup_fulltext_search
 from src.utils.password import get_password_hash
 
 logging.basicConfig(level=logging.INFO)
@@ -32,7 +33,10 @@ def init_db() -> None:
     logger.info("Creazione tabelle nel database...")
     Base.metadata.create_all(bind=engine)
     logger.info("Tabelle create con successo!")
-    
+
+    # Strutture di ricerca full-text (tsvector su PostgreSQL, FTS5 su SQLite)
+    setup_fulltext_search(engine)
+
     # Crea una sessione
     db = SessionLocal()
     
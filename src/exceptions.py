@@ -98,4 +98,24 @@ class AuthorizationException(DomainException):
         
         super().__init__(message, error_code="AUTHORIZATION_DENIED")
         self.user = user
-        self.action = action
\ No newline at end of file
+        self.action = action
+
+class InvalidCursorException(HTTPException):
+    """
+    Eccezione sollevata quando un cursore di paginazione non è valido.
+    
+    Il cursore è un token opaco restituito dalle liste paginate: se è stato
+    alterato o appartiene a un altro ordinamento non può essere decodificato.
+    """
+    def __init__(self, details: str = None):
+        """
+        Inizializza l'eccezione per cursore non valido.
+        
+        Args:
+            details (str, optional): Dettagli sull'errore di decodifica
+        """
+        message = "Cursore di paginazione non valido"
+        if details:
+            message += f": {details}"
+        
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
@@ -44,6 +44,8 @@ from sqlalchemy.orm import Session
 from src.auth.dependencies import get_db
 from sqlalchemy.sql import text
 from src.db.session import SessionLocal
+from src.services.search_service import search_service
+from src.services.reindex_job import reindex_job
 
 logger = logging.getLogger(__name__)
 
@@ -270,6 +272,25 @@ async def startup_checks():
         logger.error(f"Startup check failed: {str(e)}")
         logger.exception("Dettaglio dell'errore:")
 
+@app.on_event("startup")
+async def build_search_index():
+    """
+    Carica dallo snapshot (o costruisce) l'indice di ricerca in memoria dei pattern.
+    
+    Gli indici ancora mancanti (correlati, ricerca globale e
+    autocompletamento dopo uno snapshot) sono costruiti in background,
+    senza bloccare le richieste.
+    """
+    try:
+        with SessionLocal() as db:
+            if search_service.load_or_build_index(db):
+                logger.info(f"Indice di ricerca pronto: {len(search_service.index)} pattern")
+        missing = search_service.missing_indexes()
+        if missing and reindex_job.start(missing):
+            logger.info(f"Costruzione in background degli indici di ricerca: {', '.join(missing)}")
+    except Exception as e:
+        logger.error(f"Impossibile costruire l'indice di ricerca: {str(e)}")
+
 @app.on_event("startup")
 async def log_routes():
     """Log tutte le rotte all'avvio per debugging."""
@@ -13,6 +13,9 @@ from src.models.user_model import User, UserRole
 # OAuth2 schema per l'estrazione del token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Come oauth2_scheme, ma restituisce None se il token manca (endpoint pubblici)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
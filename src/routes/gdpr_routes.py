@@ -139,8 +139,8 @@ def get_articles_by_category(
 def search_articles(
     response: Response,
     query: str = Query(..., description="Termine di ricerca per gli articoli GDPR"),
-    skip: int = 0, 
-    limit: int = 100, 
+    skip: int = Query(0, ge=0, description="Numero di risultati da saltare"),
+    limit: int = Query(100, ge=1, le=100, description="Numero massimo di risultati da restituire"),
     db: Session = Depends(get_db)
 ):
     """Cerca articoli GDPR in base a una query testuale"""
@@ -19,6 +19,7 @@ import logging
 import traceback
 
 from src.db.session import get_db
+from src.utils.cache import cache
 
 router = APIRouter()
 
@@ -122,6 +123,16 @@ async def liveness_probe():
     """Verifica semplice che il sistema sia in esecuzione."""
     return {"status": "alive"}
 
+@router.get(
+    "/monitoring/cache",
+    summary="Statistiche della cache",
+    description="Voci, memoria stimata, hit rate, espulsioni e scadenze per namespace della cache",
+    response_description="Statistiche per namespace"
+)
+async def cache_stats():
+    """Statistiche di utilizzo della cache applicativa per namespace."""
+    return {"namespaces": cache.stats()}
+
 @router.get("/monitoring/ping")
 async def ping():
     """Endpoint ultra-semplice per verificare che il router funzioni."""
@@ -25,26 +25,32 @@ async def get_notifications(
     skip: int = Query(0, ge=0, description="Numero di record da saltare"),
     limit: int = Query(10, ge=1, le=100, description="Numero massimo di record da restituire"),
     unread_only: bool = Query(False, description="Filtra solo notifiche non lette"),
+    cursor: Optional[str] = Query(None, description="Cursore della pagina successiva (alternativo a skip)"),
+    include_total: bool = Query(True, description="Calcola il totale delle notifiche"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Recupera le notifiche dell'utente corrente.
     
-    Restituisce una lista paginata di notifiche.
+    Restituisce una lista paginata di notifiche. Per lo scorrimento
+    continuo usare next_cursor come cursor della richiesta successiva.
     """
     result = notification_controller.get_user_notifications(
         db=db,
         user_id=current_user.id,
         skip=skip,
         limit=limit,
-        unread_only=unread_only
+        unread_only=unread_only,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return NotificationList(
         notifications=result["notifications"],
         total=result["total"],
-        unread_count=result["unread_count"]
+        unread_count=result["unread_count"],
+        next_cursor=result["next_cursor"]
     )
 
 @router.post("/{notification_id}/read")
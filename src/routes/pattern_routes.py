@@ -1,13 +1,14 @@
 # src/routes/pattern_routes.py
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, Query, HTTPException, status, Path, Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from src.db.session import get_db
 from src.controllers.pattern_controller import PatternController
 from src.controllers.search_controller import SearchController
 from src.models.user_model import User
+from src.utils.export import EXPORT_FORMATS, export_lines
 from src.middleware.auth_middleware import get_current_user, get_current_editor_user, get_current_admin_user
 from src.schemas.privacy_pattern import (
     PatternCreate, 
@@ -75,11 +76,14 @@ async def get_patterns(
     limit: int = Query(10, ge=1, le=100, description="Numero massimo di record da restituire"),
     strategy: Optional[str] = Query(None, description="Filtra per strategia"),
     mvc_component: Optional[str] = Query(None, description="Filtra per componente MVC"),
-    gdpr_id: Optional[int] = Query(None, description="Filtra per articolo GDPR"),
-    pbd_id: Optional[int] = Query(None, description="Filtra per principio PbD"),
-    iso_id: Optional[int] = Query(None, description="Filtra per fase ISO"),
-    vulnerability_id: Optional[int] = Query(None, description="Filtra per vulnerabilità"),
+    gdpr_id: Optional[List[int]] = Query(None, description="Filtra per articoli GDPR (ripetibile)"),
+    pbd_id: Optional[List[int]] = Query(None, description="Filtra per principi PbD (ripetibile)"),
+    iso_id: Optional[List[int]] = Query(None, description="Filtra per fasi ISO (ripetibile)"),
+    vulnerability_id: Optional[List[int]] = Query(None, description="Filtra per vulnerabilità (ripetibile)"),
+    taxonomy_match: str = Query("all", pattern="^(all|any)$", description="Più ID della stessa tassonomia: tutti (all) o almeno uno (any)"),
     search: Optional[str] = Query(None, description="Termine di ricerca"),
+    cursor: Optional[str] = Query(None, description="Cursore della pagina successiva (alternativo a skip)"),
+    include_total: bool = Query(True, description="Calcola totale e numero di pagine"),
     db: Session = Depends(get_db)
 ):
     """
@@ -90,11 +94,14 @@ async def get_patterns(
     - **limit**: Numero massimo di risultati da restituire
     - **strategy**: Filtra per strategia di privacy
     - **mvc_component**: Filtra per componente MVC
-    - **gdpr_id**: Filtra per ID articolo GDPR
-    - **pbd_id**: Filtra per ID principio Privacy by Design
-    - **iso_id**: Filtra per ID fase ISO
-    - **vulnerability_id**: Filtra per ID vulnerabilità
+    - **gdpr_id**: Filtra per ID articolo GDPR (ripetibile, es. gdpr_id=5&gdpr_id=6)
+    - **pbd_id**: Filtra per ID principio Privacy by Design (ripetibile)
+    - **iso_id**: Filtra per ID fase ISO (ripetibile)
+    - **vulnerability_id**: Filtra per ID vulnerabilità (ripetibile)
+    - **taxonomy_match**: "all" se il pattern deve avere tutti gli ID indicati, "any" se ne basta uno
     - **search**: Termine di ricerca testuale
+    - **cursor**: Valore di next_cursor della pagina precedente; ha costo costante anche in profondità
+    - **include_total**: Se false il totale non viene calcolato (utile per lo scorrimento continuo)
     
     Restituisce una lista paginata di pattern che corrispondono ai criteri di ricerca.
     """
@@ -109,7 +116,10 @@ async def get_patterns(
             pbd_id=pbd_id,
             iso_id=iso_id,
             vulnerability_id=vulnerability_id,
-            search_term=search
+            search_term=search,
+            taxonomy_match=taxonomy_match,
+            cursor=cursor,
+            include_total=include_total
         )
         
         # I pattern ora sono già dizionari, quindi possiamo direttamente creare PatternList
@@ -118,8 +128,12 @@ async def get_patterns(
             total=result["total"],
             page=result["page"],
             size=limit,
-            pages=result["pages"]
+            pages=result["pages"],
+            next_cursor=result["next_cursor"]
         )
+    except HTTPException:
+        # Errori già mappati su uno stato HTTP (es. cursore non valido)
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -158,6 +172,54 @@ async def get_pattern_stats(db: Session = Depends(get_db)):
             }
         )
 
+@router.get(
+    "/export",
+    summary="Esporta i privacy patterns",
+    description="Esporta in streaming, in formato NDJSON o CSV, tutti i pattern che soddisfano i filtri",
+    response_description="File NDJSON o CSV con un pattern per riga",
+    response_class=StreamingResponse
+)
+def export_patterns(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Formato: ndjson o csv"),
+    strategy: Optional[str] = Query(None, description="Filtra per strategia"),
+    mvc_component: Optional[str] = Query(None, description="Filtra per componente MVC"),
+    gdpr_id: Optional[List[int]] = Query(None, description="Filtra per articoli GDPR (ripetibile)"),
+    pbd_id: Optional[List[int]] = Query(None, description="Filtra per principi PbD (ripetibile)"),
+    iso_id: Optional[List[int]] = Query(None, description="Filtra per fasi ISO (ripetibile)"),
+    vulnerability_id: Optional[List[int]] = Query(None, description="Filtra per vulnerabilità (ripetibile)"),
+    taxonomy_match: str = Query("all", pattern="^(all|any)$", description="Più ID della stessa tassonomia: tutti (all) o almeno uno (any)"),
+    search: Optional[str] = Query(None, description="Termine di ricerca"),
+    db: Session = Depends(get_db)
+):
+    """
+    Esporta tutti i privacy pattern che soddisfano i filtri.
+    
+    Accetta gli stessi filtri di GET /patterns/, senza paginazione. I pattern
+    sono letti da un cursore lato server e inviati man mano, ordinati per ID:
+    la memoria usata non dipende dal numero di pattern esportati.
+    
+    - **format**: "ndjson" (un oggetto JSON per riga) o "csv"
+    """
+    patterns = PatternController.iter_patterns(
+        db=db,
+        strategy=strategy,
+        mvc_component=mvc_component,
+        gdpr_id=gdpr_id,
+        pbd_id=pbd_id,
+        iso_id=iso_id,
+        vulnerability_id=vulnerability_id,
+        search_term=search,
+        taxonomy_match=taxonomy_match
+    )
+    export_format = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export_lines(patterns, format),
+        media_type=export_format["media_type"],
+        headers={
+            "Content-Disposition": f'attachment; filename="privacy_patterns.{export_format["extension"]}"'
+        }
+    )
+
 @router.get(
     "/{pattern_id}",
     response_model=PatternResponse,
@@ -409,11 +471,16 @@ async def get_patterns_by_category(
         )
 
 @router.get(
-    "/related/{pattern_id}", 
+    "/{pattern_id}/related", 
     response_model=List[PatternResponse],
     summary="Recupera pattern correlati",
-    description="Restituisce pattern correlati al pattern specificato in base a tag, categorie e relazioni GDPR comuni",
-    response_description="Lista di pattern correlati"
+    description="Restituisce i pattern più simili al pattern specificato per contenuto testuale e relazioni tassonomiche",
+    response_description="Lista di pattern correlati, dal più simile"
+)
+@router.get(
+    "/related/{pattern_id}", 
+    response_model=List[PatternResponse],
+    include_in_schema=False
 )
 async def get_related_patterns(
     pattern_id: int = Path(..., title="Pattern ID", description="ID univoco del pattern di riferimento"),
@@ -427,7 +494,9 @@ async def get_related_patterns(
     - **pattern_id**: ID del pattern di riferimento
     - **limit**: Numero massimo di pattern correlati da restituire
     
-    La correlazione è basata su tag, categorie e relazioni GDPR comuni.
+    La similarità combina i termini del testo (TF-IDF) con strategia,
+    componente MVC e collegamenti tassonomici; i vicini di ogni pattern
+    sono precalcolati e aggiornati a ogni modifica.
     """
     try:
         pattern = PatternController.get_pattern(db=db, pattern_id=pattern_id)
@@ -444,7 +513,7 @@ async def get_related_patterns(
         
         related = PatternController.get_related_patterns(
             db=db,
-            pattern=pattern,
+            pattern_id=pattern_id,
             limit=limit
         )
         
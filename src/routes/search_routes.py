@@ -5,7 +5,11 @@ from sqlalchemy.orm import Session
 import logging
 from src.db.session import get_db
 from src.controllers.search_controller import SearchController
-from src.schemas.privacy_pattern import PatternSearch, PatternList
+from src.middleware.auth_middleware import get_current_admin_user, get_current_user, optional_oauth2_scheme
+from src.models.user_model import User
+from src.schemas.privacy_pattern import PatternSearch, PatternList, BatchSearchRequest
+from src.services.unified_index import ENTITY_TYPES
+from src.utils.profiling import SearchProfile, profile_stage, profiling
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,31 @@ router = APIRouter(
 # Istanzia il controller di ricerca
 search_controller = SearchController()
 
+async def explain_requested(
+    explain: bool = Query(False, description="Includi il profilo dell'esecuzione (solo amministratori)"),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> bool:
+    """
+    Verifica che explain=true sia richiesto da un amministratore.
+    
+    La ricerca resta pubblica: il token viene verificato solo se il
+    profilo è richiesto.
+    
+    Raises:
+        HTTPException: 401 senza token valido, 403 se l'utente non è un amministratore
+    """
+    if not explain:
+        return False
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Autenticazione richiesta per explain",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await get_current_admin_user(await get_current_user(token=token, db=db))
+    return True
+
 @router.get("/patterns", response_model=PatternList)
 async def search_patterns(
     q: Optional[str] = Query(None, description="Query di ricerca"),
@@ -26,53 +55,176 @@ async def search_patterns(
     limit: int = Query(10, ge=1, le=100, description="Numero massimo di record da restituire"),
     strategy: Optional[str] = Query(None, description="Filtra per strategia"),
     mvc_component: Optional[str] = Query(None, description="Filtra per componente MVC"),
-    gdpr_id: Optional[int] = Query(None, description="Filtra per articolo GDPR"),
-    pbd_id: Optional[int] = Query(None, description="Filtra per principio PbD"),
-    iso_id: Optional[int] = Query(None, description="Filtra per fase ISO"),
-    vulnerability_id: Optional[int] = Query(None, description="Filtra per vulnerabilità"),
+    gdpr_id: Optional[List[int]] = Query(None, description="Filtra per articoli GDPR (ripetibile)"),
+    pbd_id: Optional[List[int]] = Query(None, description="Filtra per principi PbD (ripetibile)"),
+    iso_id: Optional[List[int]] = Query(None, description="Filtra per fasi ISO (ripetibile)"),
+    vulnerability_id: Optional[List[int]] = Query(None, description="Filtra per vulnerabilità (ripetibile)"),
+    taxonomy_match: str = Query("all", pattern="^(all|any)$", description="Più ID della stessa tassonomia: tutti (all) o almeno uno (any)"),
+    facets: bool = Query(False, description="Includi i conteggi per facetta"),
+    cursor: Optional[str] = Query(None, description="Cursore della pagina successiva (alternativo a skip)"),
+    include_total: bool = Query(True, description="Calcola totale e numero di pagine"),
+    fuzzy: bool = Query(False, description="Tollera errori di battitura nei termini"),
+    highlight: bool = Query(False, description="Includi gli snippet con i termini evidenziati"),
+    explain: bool = Depends(explain_requested),
     db: Session = Depends(get_db)
 ):
     """
     Cerca privacy patterns con ricerca full-text.
     
-    Utilizza query SQL per le ricerche e i filtri.
+    Utilizza l'indice in memoria con ranking BM25 (o SQL se non disponibile).
+    Con facets=true restituisce anche i conteggi per strategia, componente
+    MVC, articolo GDPR, principio PbD, fase ISO e vulnerabilità.
+    
+    Per lo scorrimento continuo passare next_cursor come cursor: il cursore
+    vale solo per la stessa query e gli stessi filtri.
+    
+    Con fuzzy=true i termini trovano anche varianti con uno o due caratteri
+    di differenza (es. "minimisation"); questi risultati seguono sempre
+    quelli con corrispondenza esatta.
+    
+    Con highlight=true ogni pattern include "highlights": per ciascun campo
+    che contiene i termini cercati, un frammento con le occorrenze racchiuse
+    in <mark>...</mark> (il resto del testo è con escape HTML).
+    
+    Con explain=true (solo amministratori) la risposta include "explain":
+    durata di ogni fase (analisi della query, filtri, punteggio, query SQL,
+    caricamento dei pattern, validazione della risposta), le query SQL
+    eseguite con la loro durata, i candidati rimasti dopo ogni passo e le
+    componenti BM25 del punteggio di ciascun risultato. La cache dei
+    risultati non viene usata.
     """
     from_pos = skip
     size = limit
+    profile = SearchProfile() if explain else None
     
-    result = search_controller.search_patterns(
-        db=db,
-        query=q,
-        strategy=strategy,
-        mvc_component=mvc_component,
-        gdpr_id=gdpr_id,
-        pbd_id=pbd_id,
-        iso_id=iso_id,
-        vulnerability_id=vulnerability_id,
-        from_pos=from_pos,
-        size=size
-    )
+    with profiling(profile):
+        with profile_stage("search"):
+            result = search_controller.search_patterns(
+                db=db,
+                query=q,
+                strategy=strategy,
+                mvc_component=mvc_component,
+                gdpr_id=gdpr_id,
+                pbd_id=pbd_id,
+                iso_id=iso_id,
+                vulnerability_id=vulnerability_id,
+                from_pos=from_pos,
+                size=size,
+                facets=facets,
+                taxonomy_match=taxonomy_match,
+                cursor=cursor,
+                include_total=include_total,
+                fuzzy=fuzzy,
+                highlight=highlight
+            )
+        
+        # Calcola informazioni di paginazione
+        page = skip // limit + 1 if limit > 0 else 1
+        pages = None
+        if result["total"] is not None:
+            pages = (result["total"] + limit - 1) // limit if limit > 0 else 1  # Ceiling division
+        
+        # Recuperare i pattern completi dal database
+        pattern_ids = [p["id"] for p in result["results"]]
+        
+        from src.controllers.pattern_controller import PatternController
+        with profile_stage("hydration"):
+            patterns = PatternController.get_patterns_by_ids(db=db, pattern_ids=pattern_ids)
+        
+        if highlight:
+            highlights = {p["id"]: p.get("highlights") for p in result["results"]}
+            for pattern in patterns:
+                pattern["highlights"] = highlights.get(pattern["id"])
+        
+        with profile_stage("validation"):
+            response = PatternList(
+                patterns=patterns,
+                total=result["total"],
+                page=page,
+                size=size,
+                pages=pages,
+                next_cursor=result.get("next_cursor"),
+                facets=result.get("facets")
+            )
     
-    # Calcola informazioni di paginazione
-    page = skip // limit + 1 if limit > 0 else 1
-    pages = (result["total"] + limit - 1) // limit if limit > 0 else 1  # Ceiling division
+    if profile:
+        response.explain = profile.as_dict()
+    return response
+
+@router.post("/batch")
+async def search_batch(
+    request: BatchSearchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Esegue più ricerche di pattern in una sola richiesta.
     
-    # Recuperare i pattern completi dal database
-    pattern_ids = [p["id"] for p in result["results"]]
+    Ogni elemento di queries accetta gli stessi filtri di /search/patterns.
+    Le ricerche sono eseguite insieme sull'indice in memoria, condividendo
+    analisi del testo e punteggi dei termini comuni. Per ciascuna ricerca
+    restituisce totale e riepiloghi dei pattern trovati (ID, titolo,
+    descrizione, strategia, componente MVC e punteggio), nello stesso
+    ordine delle richieste.
+    """
+    results = search_controller.search_batch(
+        db=db,
+        requests=[
+            {
+                "query": item.query,
+                "strategy": item.strategy,
+                "mvc_component": item.mvc_component,
+                "gdpr_id": item.gdpr_ids,
+                "pbd_id": item.pbd_ids,
+                "iso_id": item.iso_ids,
+                "vulnerability_id": item.vulnerability_ids,
+                "taxonomy_match": item.taxonomy_match,
+                "from_pos": item.skip,
+                "size": item.limit,
+                "fuzzy": item.fuzzy,
+            }
+            for item in request.queries
+        ]
+    )
     
-    from src.controllers.pattern_controller import PatternController
-    patterns = []
+    return {
+        "results": [
+            {
+                "total": result["total"],
+                "patterns": result["results"],
+                "next_cursor": result.get("next_cursor")
+            }
+            for result in results
+        ]
+    }
+
+@router.get("/all")
+async def search_all(
+    q: str = Query(..., min_length=1, description="Query di ricerca"),
+    limit: int = Query(10, ge=1, le=50, description="Numero massimo di risultati complessivi"),
+    per_type: int = Query(5, ge=1, le=50, description="Numero massimo di risultati per tipo"),
+    types: Optional[List[str]] = Query(None, description="Tipi da includere: pattern, gdpr, faq (ripetibile)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Ricerca globale su privacy patterns, articoli GDPR e FAQ.
     
-    if pattern_ids:
-        patterns = [PatternController.get_pattern(db=db, pattern_id=pid) for pid in pattern_ids]
-        patterns = [p for p in patterns if p is not None]  # Filtra eventuali None
+    Un unico indice in memoria contiene le tre entità: la query viene
+    valutata una sola volta con ranking BM25 e i risultati sono uniti per
+    punteggio, con al più per_type risultati di ciascun tipo.
+    """
+    unknown = sorted(set(types or ()) - set(ENTITY_TYPES))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipi non validi: {', '.join(unknown)}"
+        )
     
-    return PatternList(
-        patterns=patterns,
-        total=result["total"],
-        page=page,
-        size=size,
-        pages=pages
+    return search_controller.search_all(
+        db=db,
+        query=q,
+        limit=limit,
+        per_type=per_type,
+        types=types
     )
 
 @router.get("/autocomplete")
@@ -83,6 +235,9 @@ async def autocomplete(
 ):
     """
     Fornisce suggerimenti di autocompletamento basati sulla query.
+    
+    I suggerimenti (pattern, strategie e articoli GDPR) provengono da un
+    indice per prefisso in memoria e sono ordinati per popolarità.
     """
     suggestions = search_controller.get_autocomplete_suggestions(
         db=db,
@@ -92,11 +247,37 @@ async def autocomplete(
     
     return {"suggestions": suggestions}
 
-# Mantenuto per compatibilità con l'interfaccia esistente
-@router.post("/reindex")
-async def reindex_patterns(db: Session = Depends(get_db)):
+@router.post("/reindex", status_code=status.HTTP_202_ACCEPTED)
+async def reindex_patterns(current_user: User = Depends(get_current_admin_user)):
+    """
+    Avvia la ricostruzione degli indici di ricerca in background.
+    
+    I pattern vengono letti dal database a blocchi e i nuovi indici sono
+    costruiti accanto a quelli in uso, che continuano a servire le
+    ricerche fino alla sostituzione. L'avanzamento è consultabile con
+    GET /search/reindex/status.
+    
+    Richiede permesso di amministratore.
+    """
+    if not search_controller.start_reindex():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ricostruzione dell'indice di ricerca già in corso"
+        )
+    
+    return {
+        "message": "Ricostruzione dell'indice di ricerca avviata",
+        "status": search_controller.get_reindex_status()
+    }
+
+@router.get("/reindex/status")
+async def reindex_status(current_user: User = Depends(get_current_admin_user)):
     """
-    Endpoint stub che simula la reindicizzazione.
-    Mantenuto per compatibilità con l'interfaccia esistente.
+    Stato della ricostruzione degli indici di ricerca.
+    
+    Restituisce lo stato (idle, running, completed, failed), la fase
+    corrente con documenti elaborati e totali, la velocità in documenti
+    al secondo e il tempo stimato alla fine in secondi. Richiede permesso
+    di amministratore.
     """
-    return {"message": "Operazione completata con successo"}
\ No newline at end of file
+    return search_controller.get_reindex_status()
\ No newline at end of file
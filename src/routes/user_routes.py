@@ -24,6 +24,8 @@ async def get_users(
     role: Optional[UserRole] = Query(None, description="Filtra per ruolo"),
     search: Optional[str] = Query(None, description="Cerca per username, email o nome"),
     active_only: bool = Query(True, description="Filtra solo utenti attivi"),
+    cursor: Optional[str] = Query(None, description="Cursore della pagina successiva (alternativo a skip)"),
+    include_total: bool = Query(True, description="Calcola totale e numero di pagine"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
@@ -38,7 +40,9 @@ async def get_users(
         limit=limit,
         role=role,
         search=search,
-        active_only=active_only
+        active_only=active_only,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return UserList(
@@ -46,7 +50,8 @@ async def get_users(
         total=result["total"],
         page=result["page"],
         size=limit,
-        pages=result["pages"]
+        pages=result["pages"],
+        next_cursor=result["next_cursor"]
     )
 
 @router.get("/me", response_model=UserResponse)
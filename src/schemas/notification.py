@@ -31,5 +31,6 @@ class NotificationResponse(NotificationBase):
 class NotificationList(BaseModel):
     """Schema per la lista di notifiche."""
     notifications: List[NotificationResponse]
-    total: int
-    unread_count: int
\ No newline at end of file
+    total: Optional[int] = None
+    unread_count: int
+    next_cursor: Optional[str] = Field(None, description="Cursore della pagina successiva")
\ No newline at end of file
@@ -90,6 +90,7 @@ class PatternResponse(BaseModel):
     pbd_principles: Optional[List[Dict[str, Any]]] = []
     iso_phases: Optional[List[Dict[str, Any]]] = []
     vulnerabilities: Optional[List[Dict[str, Any]]] = []
+    highlights: Optional[Dict[str, str]] = Field(None, description="Snippet evidenziati per campo (solo ricerca con highlight)")
 
     class Config:
         orm_mode = True
@@ -99,10 +100,13 @@ class PatternResponse(BaseModel):
 class PatternList(BaseModel):
     """Schema per la lista di Privacy Pattern."""
     patterns: List[PatternResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(None, description="Cursore della pagina successiva")
+    facets: Optional[Dict[str, Dict[str, int]]] = Field(None, description="Conteggi per facetta ({facetta: {valore: conteggio}})")
+    explain: Optional[Dict[str, Any]] = Field(None, description="Profilo dell'esecuzione (solo con explain=true)")
 
 # Schema per la ricerca
 class PatternSearch(BaseModel):
@@ -115,4 +119,25 @@ class PatternSearch(BaseModel):
     iso_ids: Optional[List[int]] = None
     vulnerability_ids: Optional[List[int]] = None
     page: int = 1
-    size: int = 10
\ No newline at end of file
+    size: int = 10
+
+# Numero massimo di ricerche in una richiesta multipla
+MAX_BATCH_QUERIES = 50
+
+class BatchSearchQuery(BaseModel):
+    """Singola ricerca di una richiesta multipla."""
+    query: Optional[str] = None
+    strategy: Optional[str] = None
+    mvc_component: Optional[str] = None
+    gdpr_ids: Optional[List[int]] = None
+    pbd_ids: Optional[List[int]] = None
+    iso_ids: Optional[List[int]] = None
+    vulnerability_ids: Optional[List[int]] = None
+    taxonomy_match: str = Field("all", pattern="^(all|any)$")
+    skip: int = Field(0, ge=0)
+    limit: int = Field(10, ge=1, le=100)
+    fuzzy: bool = False
+
+class BatchSearchRequest(BaseModel):
+    """Schema per l'esecuzione di più ricerche in una sola richiesta."""
+    queries: List[BatchSearchQuery] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES)
@@ -51,10 +51,11 @@ class UserResponse(UserBase):
 class UserList(BaseModel):
     """Schema per la lista di utenti."""
     users: List[UserResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(None, description="Cursore della pagina successiva")
 
 # Schema per il profilo utente
 class UserProfile(UserResponse):
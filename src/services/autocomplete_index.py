@@ -0,0 +1,340 @@
+# src/services/autocomplete_index.py
+"""
+Indice in memoria per l'autocompletamento della ricerca.
+
+Indicizza per prefisso i token dei titoli dei pattern, i nomi delle
+strategie e gli articoli GDPR, restituendo i suggerimenti più popolari
+(view_count) senza interrogare il database.
+"""
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple
+
+from src.utils.analysis import TOKEN_PATTERN
+from src.utils.search import PrefixTrie, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Ordine dei tipi di suggerimento a parità di popolarità
+TYPE_ORDER = {"strategy": 0, "pattern": 1, "gdpr": 2}
+
+# Termini con cui si cercano gli articoli GDPR oltre al numero
+ARTICLE_TERMS = {"art", "articolo", "article"}
+
+
+def excerpt(text: Optional[str], length: int = 50) -> str:
+    """
+    Tronca un testo per la visualizzazione nei suggerimenti.
+
+    Args:
+        text: Testo da troncare
+        length: Lunghezza massima prima dei puntini
+
+    Returns:
+        Testo eventualmente troncato con "..."
+    """
+    if not text:
+        return ""
+    return text[:length] + "..." if len(text) > length else text
+
+
+def query_tokens(query: Optional[str]) -> List[str]:
+    """
+    Token di una query parziale, da usare come prefissi.
+
+    Come tokenize, ma l'ultimo token è mantenuto anche se di un solo
+    carattere: è la parola che l'utente sta digitando, e la prima lettera
+    basta a restringere i suggerimenti.
+
+    Args:
+        query: Testo digitato dall'utente
+
+    Returns:
+        Token distinti in minuscolo, nell'ordine in cui compaiono
+    """
+    tokens = tokenize(query)
+    raw = TOKEN_PATTERN.findall(query.lower()) if query else []
+    if raw and len(raw[-1]) == 1:
+        tokens.append(raw[-1])
+    return list(dict.fromkeys(tokens))
+
+
+class AutocompleteIndex:
+    """
+    Indice per prefisso dei suggerimenti di autocompletamento.
+
+    Ogni suggerimento è identificato da una coppia (tipo, chiave): i pattern
+    hanno come popolarità il proprio view_count, strategie e articoli GDPR
+    la somma del view_count dei pattern collegati. L'indice viene costruito
+    con rebuild e aggiornato a ogni scrittura di un pattern.
+    """
+
+    def __init__(self, top_size: int = 20):
+        """
+        Inizializza un indice vuoto e non ancora pronto.
+
+        Args:
+            top_size: Numero di suggerimenti memorizzati per prefisso
+        """
+        self.top_size = top_size
+        self._lock = threading.RLock()
+        self._ready = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._trie = PrefixTrie(self.top_size)
+        self._terms: Dict[Tuple[str, Hashable], Set[str]] = {}
+        self._popularity: Dict[Tuple[str, Hashable], float] = {}
+        self._labels: Dict[Tuple[str, Hashable], str] = {}
+        self._patterns: Dict[int, Dict[str, Any]] = {}
+        self._articles: Dict[int, Tuple[str, str]] = {}
+        self._strategy_patterns: Dict[str, Set[int]] = defaultdict(set)
+        self._gdpr_patterns: Dict[int, Set[int]] = defaultdict(set)
+        # Somma dei view_count dei pattern collegati, aggiornata a ogni scrittura
+        self._strategy_views: Dict[str, float] = defaultdict(float)
+        self._gdpr_views: Dict[int, float] = defaultdict(float)
+
+    @property
+    def is_ready(self) -> bool:
+        """True se l'indice è stato costruito ed è utilizzabile."""
+        return self._ready
+
+    def rebuild(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        articles: Mapping[int, Tuple[str, str]]
+    ) -> None:
+        """
+        Ricostruisce l'indice da zero.
+
+        Args:
+            documents: Documenti prodotti da pattern_document
+            articles: Articoli GDPR come {id: (numero, titolo)}
+        """
+        fresh = AutocompleteIndex(self.top_size)
+        fresh._articles.update(articles)
+        for doc in documents:
+            fresh._add_unlocked(doc, refresh=False)
+        # Strategie e articoli vengono inseriti una sola volta, a totali calcolati
+        for strategy in list(fresh._strategy_patterns):
+            fresh._refresh_strategy(strategy)
+        for article_id in fresh._articles:
+            fresh._refresh_article(article_id)
+
+        fresh._ready = True
+        self.replace(fresh)
+
+    def replace(self, other: "AutocompleteIndex") -> None:
+        """
+        Sostituisce il contenuto dell'indice con quello di un indice costruito a parte.
+
+        Args:
+            other: Indice da cui prendere lo stato (non va più usato)
+        """
+        with self._lock:
+            self._trie = other._trie
+            self._terms = other._terms
+            self._popularity = other._popularity
+            self._labels = other._labels
+            self._patterns = other._patterns
+            self._articles = other._articles
+            self._strategy_patterns = other._strategy_patterns
+            self._gdpr_patterns = other._gdpr_patterns
+            self._strategy_views = other._strategy_views
+            self._gdpr_views = other._gdpr_views
+            self._ready = other._ready
+
+    def add_pattern(self, pattern: Any) -> None:
+        """
+        Indicizza o aggiorna un pattern e gli articoli GDPR collegati.
+
+        Args:
+            pattern: Istanza di PrivacyPattern con relazioni caricate
+        """
+        from src.services.search_index import pattern_document
+
+        with self._lock:
+            for article in getattr(pattern, "gdpr_articles", None) or []:
+                self._set_article(article.id, article.number, article.title)
+            self._add_unlocked(pattern_document(pattern))
+
+    def add_document(self, doc: Dict[str, Any]) -> None:
+        """
+        Indicizza o aggiorna un documento già estratto.
+
+        Args:
+            doc: Documento prodotto da pattern_document
+        """
+        with self._lock:
+            self._add_unlocked(doc)
+
+    def remove_pattern(self, pattern_id: int) -> bool:
+        """
+        Rimuove un pattern dai suggerimenti.
+
+        Args:
+            pattern_id: ID del pattern
+
+        Returns:
+            bool: True se il pattern era indicizzato
+        """
+        with self._lock:
+            return self._remove_unlocked(pattern_id)
+
+    def _set_entry(self, entry: Tuple[str, Hashable], label: str, terms: Set[str], popularity: float) -> None:
+        # Reinserire i termini invalida i top-k memorizzati lungo i percorsi
+        for term in self._terms.pop(entry, ()):
+            self._trie.remove(term, entry)
+        for term in terms:
+            self._trie.insert(term, entry)
+        self._terms[entry] = terms
+        self._labels[entry] = label
+        self._popularity[entry] = popularity
+
+    def _drop_entry(self, entry: Tuple[str, Hashable]) -> None:
+        for term in self._terms.pop(entry, ()):
+            self._trie.remove(term, entry)
+        self._labels.pop(entry, None)
+        self._popularity.pop(entry, None)
+
+    def _set_article(self, article_id: int, number: str, title: str) -> None:
+        self._articles[article_id] = (number, title)
+        self._refresh_article(article_id)
+
+    def _refresh_article(self, article_id: int) -> None:
+        if article_id not in self._articles:
+            return
+        number, title = self._articles[article_id]
+        terms = ARTICLE_TERMS | set(tokenize(str(number))) | set(tokenize(title))
+        self._set_entry(("gdpr", article_id), f"Art. {number}", terms, self._gdpr_views.get(article_id, 0.0))
+
+    def _refresh_strategy(self, strategy: str) -> None:
+        members = self._strategy_patterns.get(strategy)
+        if not members:
+            self._strategy_patterns.pop(strategy, None)
+            self._strategy_views.pop(strategy, None)
+            self._drop_entry(("strategy", strategy))
+            return
+        self._set_entry(("strategy", strategy), strategy, set(tokenize(strategy)), self._strategy_views[strategy])
+
+    def _add_unlocked(self, doc: Dict[str, Any], refresh: bool = True) -> None:
+        pattern_id = doc["id"]
+        self._remove_unlocked(pattern_id)
+
+        self._patterns[pattern_id] = doc
+        self._set_entry(
+            ("pattern", pattern_id),
+            doc["title"] or "",
+            set(tokenize(doc["title"])),
+            float(doc["view_count"])
+        )
+
+        views = float(doc["view_count"])
+        if doc["strategy"]:
+            self._strategy_patterns[doc["strategy"]].add(pattern_id)
+            self._strategy_views[doc["strategy"]] += views
+            if refresh:
+                self._refresh_strategy(doc["strategy"])
+        for article_id in doc["gdpr_ids"]:
+            self._gdpr_patterns[article_id].add(pattern_id)
+            self._gdpr_views[article_id] += views
+            if refresh:
+                self._refresh_article(article_id)
+
+    def _remove_unlocked(self, pattern_id: int) -> bool:
+        doc = self._patterns.pop(pattern_id, None)
+        if doc is None:
+            return False
+
+        self._drop_entry(("pattern", pattern_id))
+        views = float(doc["view_count"])
+        if doc["strategy"]:
+            self._strategy_patterns[doc["strategy"]].discard(pattern_id)
+            self._strategy_views[doc["strategy"]] -= views
+            self._refresh_strategy(doc["strategy"])
+        for article_id in doc["gdpr_ids"]:
+            self._gdpr_patterns[article_id].discard(pattern_id)
+            self._gdpr_views[article_id] -= views
+            self._refresh_article(article_id)
+        return True
+
+    def _rank_key(self, entry: Tuple[str, Hashable]) -> Tuple[float, int, str]:
+        return (-self._popularity[entry], TYPE_ORDER[entry[0]], self._labels[entry].lower())
+
+    def _format(self, entry: Tuple[str, Hashable]) -> Dict[str, Any]:
+        kind, key = entry
+        score = self._popularity[entry]
+
+        if kind == "pattern":
+            doc = self._patterns[key]
+            return {
+                "type": "pattern",
+                "id": key,
+                "text": doc["title"],
+                "title": doc["title"],
+                "strategy": doc["strategy"],
+                "description": excerpt(doc["description"]),
+                "score": score
+            }
+
+        if kind == "strategy":
+            count = len(self._strategy_patterns.get(key, ()))
+            return {
+                "type": "strategy",
+                "id": f"strategy:{key}",
+                "text": key,
+                "title": key,
+                "strategy": key,
+                "description": f"{count} pattern",
+                "score": score
+            }
+
+        number, title = self._articles[key]
+        return {
+            "type": "gdpr",
+            "id": f"gdpr:{key}",
+            "text": f"Art. {number}",
+            "title": f"Art. {number} - {title}",
+            "strategy": None,
+            "description": excerpt(title),
+            "score": score
+        }
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Restituisce i suggerimenti più popolari per una query parziale.
+
+        Ogni token della query deve essere prefisso di almeno un termine
+        del suggerimento; l'ultimo token vale anche se di una sola lettera.
+
+        Args:
+            query: Testo digitato dall'utente
+            limit: Numero massimo di suggerimenti
+
+        Returns:
+            List[Dict[str, Any]]: Suggerimenti ordinati per popolarità
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            if len(tokens) == 1:
+                entries = self._trie.top(tokens[0], self._rank_key, limit)
+            else:
+                # Interseca partendo dal token più lungo, di solito il più selettivo
+                tokens.sort(key=len, reverse=True)
+                matches = self._trie.entries(tokens[0])
+                for token in tokens[1:]:
+                    if not matches:
+                        break
+                    matches &= self._trie.entries(token)
+                entries = heapq.nsmallest(limit, matches, key=self._rank_key)
+
+            return [self._format(entry) for entry in entries]
+
+
+# Indice condiviso dal processo
+autocomplete_index = AutocompleteIndex()
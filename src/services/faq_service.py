@@ -1,20 +1,39 @@
 # src/services/faq_service.py
 """
 Servizio FAQ per sostituire il chatbot.
+
+Le FAQ sono indicizzate alla costruzione del servizio in un indice
+invertito BM25 (domande con peso maggiore delle risposte): le domande
+degli utenti sono ordinate per punteggio e i risultati per insieme di
+termini sono memorizzati in una cache LRU.
 """
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+from src.utils.search import InvertedIndex
+
 logger = logging.getLogger(__name__)
 
+# Peso dei campi delle FAQ nel punteggio
+FAQ_BOOSTS: Dict[str, float] = {"question": 3.0, "answer": 1.0}
+
+# Numero di query distinte memorizzate
+FAQ_CACHE_SIZE = 1024
+
 class FAQService:
     """
     Servizio che fornisce una lista statica di FAQ come alternativa al chatbot.
     """
     
-    def __init__(self):
-        """Inizializza il servizio FAQ."""
-        self.faqs = [
+    def __init__(self, faqs: Optional[List[Dict[str, Any]]] = None):
+        """
+        Inizializza il servizio FAQ e ne costruisce l'indice.
+        
+        Args:
+            faqs (List[Dict[str, Any]], optional): FAQ da usare al posto di quelle predefinite
+        """
+        self.faqs = list(faqs) if faqs is not None else [
             {
                 "id": 1,
                 "question": "Cos'è un Privacy Pattern?",
@@ -66,6 +85,31 @@ class FAQService:
                 "answer": "Gli esempi di implementazione forniscono codice e diagrammi come riferimento. Puoi adattarli al tuo contesto specifico, considerandoli come punti di partenza piuttosto che soluzioni complete."
             }
         ]
+        self._faqs_by_id = {faq["id"]: faq for faq in self.faqs}
+        self._index = InvertedIndex()
+        for faq in self.faqs:
+            self._index.add_document(
+                faq["id"],
+                {"question": faq["question"], "answer": faq["answer"]},
+                FAQ_BOOSTS
+            )
+        self._rank = lru_cache(maxsize=FAQ_CACHE_SIZE)(self._rank_terms)
+    
+    def _rank_terms(self, terms: Tuple[str, ...]) -> Tuple[int, ...]:
+        """
+        Ordina le FAQ per punteggio BM25 rispetto ai termini dati.
+        
+        Basta un termine in comune perché una FAQ sia candidata; le FAQ con
+        più termini (e termini più rari) ottengono punteggi più alti.
+        
+        Args:
+            terms: Termini analizzati, ordinati e senza duplicati
+            
+        Returns:
+            Tuple[int, ...]: ID delle FAQ in ordine di punteggio decrescente
+        """
+        scores = self._index.search([dict.fromkeys(terms, 1.0)])
+        return tuple(sorted(scores, key=lambda faq_id: (-scores[faq_id], faq_id)))
     
     def get_all_faqs(self) -> List[Dict[str, Any]]:
         """
@@ -86,10 +130,7 @@ class FAQService:
         Returns:
             Optional[Dict[str, Any]]: FAQ trovata o None
         """
-        for faq in self.faqs:
-            if faq["id"] == faq_id:
-                return faq
-        return None
+        return self._faqs_by_id.get(faq_id)
     
     def search_faqs(self, query: str) -> List[Dict[str, Any]]:
         """
@@ -99,20 +140,15 @@ class FAQService:
             query (str): Termine di ricerca
             
         Returns:
-            List[Dict[str, Any]]: FAQ corrispondenti alla query
+            List[Dict[str, Any]]: FAQ corrispondenti alla query, dalla più pertinente
         """
         if not query:
             return self.faqs[:5]  # Restituisci le prime 5 FAQ
         
-        query = query.lower()
-        results = []
-        
-        for faq in self.faqs:
-            if (query in faq["question"].lower() or 
-                query in faq["answer"].lower()):
-                results.append(faq)
-        
-        return results
+        terms = tuple(sorted(set(self._index.analyzer(query))))
+        if not terms:
+            return []
+        return [self._faqs_by_id[faq_id] for faq_id in self._rank(terms)]
         
     def get_response_for_query(self, query: str) -> Dict[str, Any]:
         """
@@ -148,4 +184,8 @@ class FAQService:
                 "response": "Mi dispiace, non ho una risposta specifica per questa domanda. Prova a riformulare la tua richiesta o consulta le nostre FAQ per argomenti correlati.",
                 "source": "fallback",
                 "relevant_faqs": self.get_all_faqs()[:3]
-            }
\ No newline at end of file
+            }
+
+
+# Istanza condivisa del servizio FAQ
+faq_service = FAQService()
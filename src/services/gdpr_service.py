@@ -1,17 +1,19 @@
 """Servizio centralizzato per le operazioni relative agli articoli GDPR."""
 from typing import List, Dict, Any, Optional
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 from src.models.gdpr_model import GDPRArticle
-from src.utils.cache import Cache
+from src.services.search_service import search_service
+from src.utils.cache import cached, GDPR_TAG
 
 # Configurazione del logger
 logger = logging.getLogger(__name__)
 
-# Istanza di cache centralizzata
-cache = Cache()
+# Limite dei risultati per pagina della ricerca, come per gli altri elenchi
+MAX_SEARCH_LIMIT = 100
 
 class GDPRService:
     """
@@ -20,7 +22,7 @@ class GDPRService:
     """
     
     @staticmethod
-    @cache.cached(ttl=300)  # Cache per 5 minuti
+    @cached(ttl=300, namespace="gdpr", key=("skip", "limit"), tags=(GDPR_TAG,))  # Cache per 5 minuti
     def get_articles(db: Session, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Recupera articoli GDPR con gestione degli errori e caching.
@@ -45,7 +47,7 @@ class GDPRService:
             return []
     
     @staticmethod
-    @cache.cached(ttl=300)
+    @cached(ttl=300, namespace="gdpr", key=("article_id",), tags=(GDPR_TAG,))
     def get_article(db: Session, article_id: int) -> Optional[Dict[str, Any]]:
         """
         Recupera un articolo specifico per ID con gestione degli errori.
@@ -65,7 +67,7 @@ class GDPRService:
             return None
             
     @staticmethod
-    @cache.cached(ttl=300)
+    @cached(ttl=300, namespace="gdpr", key=("article_number",), tags=(GDPR_TAG,))
     def get_article_by_number(db: Session, article_number: str) -> Optional[Dict[str, Any]]:
         """
         Recupera un articolo specifico per numero con gestione degli errori.
@@ -82,4 +84,55 @@ class GDPRService:
             return article.to_dict() if article else None
         except Exception as e:
             logger.error(f"Error retrieving article by number {article_number}: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    @staticmethod
+    def search_articles(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Cerca articoli GDPR tramite l'indice di ricerca unificato.
+        
+        Finché l'indice non è stato costruito (all'avvio o dal job di
+        ricostruzione) la ricerca ricade su un confronto testuale nel
+        database, senza ordinamento per rilevanza.
+        
+        Args:
+            db: Sessione database
+            query: Testo da cercare in numero, titolo, sommario e contenuto
+            skip: Numero di risultati da saltare
+            limit: Numero massimo di risultati (al più MAX_SEARCH_LIMIT)
+            
+        Returns:
+            Articoli come dizionari, dal più pertinente
+        """
+        skip = max(skip, 0)
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        try:
+            if not search_service.unified.is_ready:
+                like_term = f"%{query}%"
+                articles = db.query(GDPRArticle).filter(
+                    or_(
+                        GDPRArticle.number.ilike(like_term),
+                        GDPRArticle.title.ilike(like_term),
+                        GDPRArticle.content.ilike(like_term)
+                    )
+                ).order_by(GDPRArticle.number).offset(skip).limit(limit).all()
+                return [article.to_dict() for article in articles]
+            
+            # I risultati non possono superare le voci dell'indice
+            window = min(skip + limit, len(search_service.unified))
+            if window <= skip:
+                return []
+            result = search_service.search_all(
+                db, query, limit=window, per_type=window, types=["gdpr"]
+            )
+            article_ids = [item["id"] for item in result["results"][skip:]]
+            if not article_ids:
+                return []
+            articles = {
+                article.id: article
+                for article in db.query(GDPRArticle).filter(GDPRArticle.id.in_(article_ids))
+            }
+            return [articles[article_id].to_dict() for article_id in article_ids if article_id in articles]
+        except SQLAlchemyError as e:
+            logger.error(f"Database error searching articles: {str(e)}")
+            return []
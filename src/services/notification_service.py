@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from src.models.user_model import User
 from src.models.notification import Notification, NotificationType
 from src.services.email_service import EmailService
+from src.utils.pagination import paginate_keyset
 
 logger = logging.getLogger(__name__)
 
@@ -85,20 +86,28 @@ class NotificationService:
         user_id: int,
         skip: int = 0,
         limit: int = 50,
-        unread_only: bool = False
+        unread_only: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> Dict[str, Any]:
         """
         Recupera le notifiche di un utente.
         
+        Le notifiche sono ordinate dalla più recente; next_cursor codifica
+        (created_at, id) dell'ultima e permette di leggere la pagina
+        successiva senza OFFSET.
+        
         Args:
             db (Session): Sessione database
             user_id (int): ID dell'utente
             skip (int): Numero di record da saltare
             limit (int): Numero massimo di record da restituire
             unread_only (bool): Se restituire solo notifiche non lette
+            cursor (str, optional): Cursore della pagina precedente, alternativo a skip
+            include_total (bool): Se False non conta le notifiche della lista
             
         Returns:
-            Dict[str, Any]: Dizionario con notifiche e contatori
+            Dict[str, Any]: Dizionario con notifiche, contatori e next_cursor
         """
         # Query base
         query = db.query(Notification).filter(Notification.user_id == user_id)
@@ -107,11 +116,17 @@ class NotificationService:
         if unread_only:
             query = query.filter(Notification.is_read == False)
         
-        # Conteggio totale per paginazione
-        total = query.count()
+        # Conteggio totale per paginazione, solo se richiesto
+        total = query.count() if include_total else None
         
-        # Recupera notifiche con paginazione
-        notifications = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+        # Recupera notifiche con paginazione keyset (o a offset senza cursore)
+        notifications, next_cursor = paginate_keyset(
+            query,
+            [(Notification.created_at, True), (Notification.id, True)],
+            limit,
+            cursor=cursor,
+            offset=skip
+        )
         
         # Conteggio notifiche non lette
         unread_count = db.query(Notification).filter(
@@ -122,7 +137,8 @@ class NotificationService:
         return {
             "notifications": notifications,
             "total": total,
-            "unread_count": unread_count
+            "unread_count": unread_count,
+            "next_cursor": next_cursor
         }
     
     def mark_as_read(self, db: Session, notification_id: int, user_id: int) -> bool:
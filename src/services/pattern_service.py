@@ -14,7 +14,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from src.models.privacy_pattern import PrivacyPattern
 from src.exceptions import DataIntegrityException, ServiceUnavailableException
 from src.services.elasticsearch_service import ElasticsearchService
-from src.utils.cache import cached
+from src.utils.cache import cached, invalidate_pattern_cache
 
 logger = logging.getLogger(__name__)
 
@@ -41,17 +41,32 @@ class PatternService:
         self.db = db_session
         self.es_service = elasticsearch_service
     
-    @cached(ttl=300)  # Cache per 5 minuti
+    @cached(ttl=300, namespace="patterns", key=("pattern_id",), tags=("pattern:{pattern_id}",))  # Cache per 5 minuti
     def get_pattern_by_id(self, pattern_id: int) -> Optional[PrivacyPattern]:
         """
         Recupera un pattern specifico tramite ID.
         
+        Il pattern restituito è condiviso dalla cache tra le richieste, quindi
+        viene staccato dalla sessione: per modificarlo usare update_pattern.
+        
         Args:
             pattern_id (int): ID del pattern
         
         Returns:
             Optional[PrivacyPattern]: Pattern trovato o None
         
+        Raises:
+            DataIntegrityException: Se ci sono problemi con il recupero
+        """
+        pattern = self._load_pattern(pattern_id)
+        if pattern is not None:
+            self.db.expunge(pattern)
+        return pattern
+    
+    def _load_pattern(self, pattern_id: int) -> Optional[PrivacyPattern]:
+        """
+        Carica un pattern dalla sessione corrente, senza cache.
+        
         Raises:
             DataIntegrityException: Se ci sono problemi con il recupero
         """
@@ -95,6 +110,7 @@ class PatternService:
             self.db.add(pattern)
             self.db.commit()
             self.db.refresh(pattern)
+            invalidate_pattern_cache(pattern.id)
             
             # Indica su Elasticsearch se disponibile
             if self.es_service and self.es_service.is_available:
@@ -131,7 +147,7 @@ class PatternService:
         """
         try:
             # Recupera il pattern esistente
-            pattern = self.get_pattern_by_id(pattern_id)
+            pattern = self._load_pattern(pattern_id)
             
             if not pattern:
                 raise DataIntegrityException(
@@ -149,6 +165,7 @@ class PatternService:
             # Salva le modifiche
             self.db.commit()
             self.db.refresh(pattern)
+            invalidate_pattern_cache(pattern_id)
             
             # Re-indicizza su Elasticsearch se disponibile
             if self.es_service and self.es_service.is_available:
@@ -179,7 +196,7 @@ class PatternService:
         """
         try:
             # Recupera il pattern
-            pattern = self.get_pattern_by_id(pattern_id)
+            pattern = self._load_pattern(pattern_id)
             
             if not pattern:
                 logger.warning(f"Pattern con ID {pattern_id} non trovato")
@@ -188,6 +205,7 @@ class PatternService:
             # Elimina da database
             self.db.delete(pattern)
             self.db.commit()
+            invalidate_pattern_cache(pattern_id)
             
             # Rimuovi da Elasticsearch se disponibile
             if self.es_service and self.es_service.is_available:
@@ -0,0 +1,213 @@
+# src/services/reindex_job.py
+"""
+Ricostruzione degli indici di ricerca in background.
+
+Il job legge i pattern dal database in un thread separato, con una propria
+sessione, mentre gli indici in uso continuano a servire le ricerche; lo
+stato di avanzamento (fase, documenti elaborati, velocità e tempo stimato)
+è consultabile durante l'esecuzione.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from src.db.session import SessionLocal
+from src.services.search_service import REINDEX_PHASES, SearchService, search_service
+
+logger = logging.getLogger(__name__)
+
+
+class ReindexProgress:
+    """
+    Avanzamento di una ricostruzione degli indici.
+
+    Viene aggiornato dal thread del job e letto dalle richieste di stato.
+    Il tempo stimato assume che ogni fase abbia la stessa durata per
+    documento della fase corrente.
+    """
+
+    def __init__(self, phases: Sequence[str] = REINDEX_PHASES, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            phases: Fasi previste della ricostruzione
+            clock: Orologio monotono in secondi
+        """
+        self.phases = tuple(phases)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.status = "idle"
+        self.phase: Optional[str] = None
+        self.processed = 0
+        self.total = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._started: Optional[float] = None
+        self._phase_started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def begin(self) -> None:
+        """Segna l'avvio della ricostruzione."""
+        with self._lock:
+            self.status = "running"
+            self.started_at = datetime.now(timezone.utc)
+            self._started = self._phase_started = self._clock()
+
+    def start_phase(self, phase: str, total: int) -> None:
+        """
+        Inizia una nuova fase.
+
+        Args:
+            phase: Nome della fase (una di phases)
+            total: Documenti da elaborare nella fase
+        """
+        with self._lock:
+            self.phase = phase
+            self.processed = 0
+            self.total = total
+            self._phase_started = self._clock()
+
+    def advance(self, count: int = 1) -> None:
+        """Registra documenti elaborati nella fase corrente."""
+        with self._lock:
+            self.processed += count
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """
+        Segna la fine della ricostruzione.
+
+        Args:
+            error: Messaggio di errore se la ricostruzione è fallita
+        """
+        with self._lock:
+            self.status = "failed" if error else "completed"
+            self.error = error
+            self.finished_at = datetime.now(timezone.utc)
+            self._finished = self._clock()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Stato corrente in forma serializzabile.
+
+        Returns:
+            Dict[str, Any]: Stato, fase, documenti elaborati e totali della
+            fase, documenti al secondo, secondi trascorsi e stimati alla fine
+        """
+        with self._lock:
+            now = self._finished if self._finished is not None else self._clock()
+            elapsed = now - self._started if self._started is not None else 0.0
+            phase_elapsed = now - self._phase_started if self._phase_started is not None else 0.0
+            rate = self.processed / phase_elapsed if phase_elapsed > 0 else 0.0
+
+            eta = None
+            if self.status == "running" and self.phase in self.phases and self.total:
+                done = (self.phases.index(self.phase) + min(self.processed / self.total, 1.0)) / len(self.phases)
+                if done > 0:
+                    eta = round(elapsed * (1.0 - done) / done, 1)
+            elif self.status == "completed":
+                eta = 0.0
+
+            return {
+                "status": self.status,
+                "phase": self.phase,
+                "processed": self.processed,
+                "total": self.total,
+                "docs_per_second": round(rate, 1),
+                "elapsed_seconds": round(elapsed, 1),
+                "eta_seconds": eta,
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "error": self.error,
+            }
+
+
+class ReindexJob:
+    """
+    Job di ricostruzione degli indici eseguito in un thread in background.
+
+    Può essere in esecuzione una sola ricostruzione alla volta; al termine,
+    se configurato, viene riscritto lo snapshot dell'indice dei pattern.
+    """
+
+    def __init__(self, service: SearchService, session_factory: Callable[[], Session] = SessionLocal):
+        """
+        Args:
+            service: Servizio di ricerca di cui ricostruire gli indici
+            session_factory: Crea la sessione database usata dal job
+        """
+        self._service = service
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.progress = ReindexProgress()
+
+    @property
+    def is_running(self) -> bool:
+        """True se una ricostruzione è in corso."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, indexes: Sequence[str] = REINDEX_PHASES) -> bool:
+        """
+        Avvia una ricostruzione in background.
+
+        Args:
+            indexes: Indici da ricostruire, tra REINDEX_PHASES (tutti se omesso)
+
+        Returns:
+            bool: False se una ricostruzione era già in corso
+        """
+        with self._lock:
+            if self.is_running:
+                return False
+            progress = ReindexProgress(phases=indexes)
+            progress.begin()
+            self.progress = progress
+            self._thread = threading.Thread(
+                target=self._run, args=(progress,), name="search-reindex", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attende la fine della ricostruzione in corso.
+
+        Args:
+            timeout: Secondi massimi di attesa
+
+        Returns:
+            bool: True se nessuna ricostruzione è più in corso
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.is_running
+
+    def status(self) -> Dict[str, Any]:
+        """Stato dell'ultima ricostruzione avviata."""
+        return self.progress.as_dict()
+
+    def _run(self, progress: ReindexProgress) -> None:
+        try:
+            with self._session_factory() as db:
+                # L'impronta è letta prima dei dati: uno snapshot non può
+                # risultare più recente degli indici salvati
+                fingerprint = self._service.data_fingerprint(db) if "patterns" in progress.phases else None
+                if not self._service.build_indexes(db, progress.phases, progress):
+                    progress.finish("Errore nella ricostruzione dell'indice di ricerca")
+                    return
+            if fingerprint is not None:
+                self._service.save_snapshot(fingerprint)
+            progress.finish()
+            logger.info(f"Ricostruzione degli indici completata: {progress.as_dict()}")
+        except Exception as e:
+            logger.error(f"Errore nel job di ricostruzione degli indici: {str(e)}")
+            progress.finish(str(e))
+
+
+# Job condiviso dal processo
+reindex_job = ReindexJob(search_service)
@@ -0,0 +1,362 @@
+# src/services/related_index.py
+"""
+Indice dei pattern correlati per similarità di contenuto.
+
+Ogni pattern è un vettore sparso che concatena i pesi TF-IDF dei termini
+del testo (con la stessa analisi dell'indice di ricerca) e un blocco
+one-hot con strategia, componente MVC e collegamenti tassonomici. Per ogni
+pattern sono precalcolati i TOP_K vicini per similarità del coseno, così
+la pagina di dettaglio legge solo una lista già ordinata.
+"""
+import logging
+import math
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.services.search_index import FIELD_BOOSTS, TAXONOMY_FIELDS, pattern_document
+from src.utils.analysis import analyze
+
+logger = logging.getLogger(__name__)
+
+# Numero di vicini precalcolati per pattern
+TOP_K = 20
+
+# Peso dei due blocchi nella similarità: il coseno complessivo è
+# TEXT_WEIGHT * coseno del testo + TAXONOMY_WEIGHT * coseno delle tassonomie
+TEXT_WEIGHT = 0.7
+TAXONOMY_WEIGHT = 0.3
+
+# Vettore sparso: (colonne, pesi)
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+_EMPTY_IDS = np.zeros(0, dtype=np.int64)
+_EMPTY_SCORES = np.zeros(0, dtype=np.float64)
+
+
+def _term_counts(doc: Dict[str, Any]) -> Dict[str, float]:
+    # Frequenze dei termini pesate con i boost dei campi dell'indice di ricerca
+    counts: Dict[str, float] = {}
+    for field, boost in FIELD_BOOSTS.items():
+        for term in analyze(doc["fields"].get(field)):
+            counts[term] = counts.get(term, 0.0) + boost
+    return counts
+
+
+def _taxonomy_features(doc: Dict[str, Any]) -> List[str]:
+    # I termini analizzati non contengono ":", quindi non collidono con queste chiavi
+    features = [f"strategy:{doc['strategy']}", f"mvc_component:{doc['mvc_component']}"]
+    for key in TAXONOMY_FIELDS:
+        features.extend(f"{key}:{value}" for value in sorted(doc[key]))
+    return features
+
+
+class RelatedPatternsIndex:
+    """
+    Vicini più simili di ogni pattern, precalcolati.
+
+    La matrice dei vettori è memorizzata per colonne (posting list di
+    array NumPy): la similarità di un pattern con tutti gli altri si ottiene
+    sommando i prodotti sulle sole colonne non nulle del suo vettore.
+
+    La ricostruzione calcola IDF e vicini di tutti i pattern. Gli
+    aggiornamenti incrementali ricalcolano il vettore del pattern modificato
+    con le frequenze correnti e aggiornano solo le liste dei pattern che
+    condividono almeno un termine o un collegamento; i pesi degli altri
+    pattern restano quelli dell'ultima ricostruzione.
+    """
+
+    def __init__(self, top_k: int = TOP_K):
+        """
+        Inizializza un indice vuoto e non ancora pronto.
+
+        Args:
+            top_k: Numero di vicini memorizzati per pattern
+        """
+        self.top_k = top_k
+        self._lock = threading.RLock()
+        self._ready = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._columns: Dict[str, int] = {}
+        self._df: Dict[str, int] = {}
+        self._doc_terms: Dict[int, FrozenSet[str]] = {}
+        self._vectors: Dict[int, SparseVector] = {}
+        self._postings: Dict[int, Dict[int, float]] = {}
+        self._posting_arrays: Dict[int, SparseVector] = {}
+        self._neighbors: Dict[int, List[Tuple[int, float]]] = {}
+        # Punteggio minimo per entrare nella lista di ciascun ID (0 se non piena)
+        self._floors = np.zeros(0, dtype=np.float64)
+
+    @property
+    def is_ready(self) -> bool:
+        """True se l'indice è stato costruito ed è utilizzabile."""
+        return self._ready
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def rebuild(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ricostruisce vettori e vicini a partire da tutti i documenti.
+
+        Il nuovo stato viene calcolato a parte e sostituisce quello corrente
+        solo a costruzione completata.
+
+        Args:
+            documents: Documenti prodotti da pattern_document
+
+        Returns:
+            int: Numero di pattern indicizzati
+        """
+        fresh = RelatedPatternsIndex(self.top_k)
+        raw = {doc["id"]: (_term_counts(doc), _taxonomy_features(doc)) for doc in documents}
+        for counts, _ in raw.values():
+            for term in counts:
+                fresh._df[term] = fresh._df.get(term, 0) + 1
+        for doc_id, (counts, taxonomy) in raw.items():
+            fresh._store(doc_id, counts, taxonomy, len(raw))
+        for doc_id, vector in fresh._vectors.items():
+            fresh._set_neighbors(doc_id, fresh._nearest(doc_id, vector))
+
+        fresh._ready = True
+        self.replace(fresh)
+
+        logger.info(f"Indice dei pattern correlati ricostruito: {len(raw)} pattern")
+        return len(raw)
+
+    def replace(self, other: "RelatedPatternsIndex") -> None:
+        """
+        Sostituisce il contenuto dell'indice con quello di un indice costruito a parte.
+
+        Args:
+            other: Indice da cui prendere lo stato (non va più usato)
+        """
+        with self._lock:
+            self._columns = other._columns
+            self._df = other._df
+            self._doc_terms = other._doc_terms
+            self._vectors = other._vectors
+            self._postings = other._postings
+            self._posting_arrays = other._posting_arrays
+            self._neighbors = other._neighbors
+            self._floors = other._floors
+            self._ready = other._ready
+
+    def add_pattern(self, pattern: Any) -> None:
+        """
+        Indicizza o aggiorna un singolo pattern.
+
+        Args:
+            pattern: Istanza di PrivacyPattern con relazioni caricate
+        """
+        self.add_document(pattern_document(pattern))
+
+    def add_document(self, doc: Dict[str, Any]) -> None:
+        """
+        Indicizza o aggiorna un documento e le liste dei pattern vicini.
+
+        Args:
+            doc: Documento prodotto da pattern_document
+        """
+        doc_id = doc["id"]
+        counts, taxonomy = _term_counts(doc), _taxonomy_features(doc)
+
+        with self._lock:
+            stale = self._remove_unlocked(doc_id)
+            for term in counts:
+                self._df[term] = self._df.get(term, 0) + 1
+            vector = self._store(doc_id, counts, taxonomy, len(self._vectors) + 1)
+
+            ids, scores = self._similarities(vector)
+            self._set_neighbors(doc_id, self._select(doc_id, ids, scores))
+
+            # La similarità è simmetrica: il nuovo punteggio entra nelle liste
+            # degli altri pattern se supera il loro k-esimo vicino
+            entering = (ids != doc_id) & (scores > self._floors[ids])
+            for other, score in zip(ids[entering].tolist(), scores[entering].tolist()):
+                if other in stale:
+                    continue
+                neighbors = self._neighbors[other]
+                neighbors.append((doc_id, score))
+                neighbors.sort(key=lambda item: (-item[1], item[0]))
+                self._set_neighbors(other, neighbors[:self.top_k])
+
+            # Chi aveva il pattern tra i vicini potrebbe ora averne uno migliore
+            for other in stale:
+                if other in self._vectors:
+                    self._set_neighbors(other, self._nearest(other, self._vectors[other]))
+
+    def remove_pattern(self, pattern_id: int) -> bool:
+        """
+        Rimuove un pattern e lo sostituisce nelle liste dei vicini.
+
+        Args:
+            pattern_id: ID del pattern
+
+        Returns:
+            bool: True se il pattern era indicizzato
+        """
+        with self._lock:
+            if pattern_id not in self._vectors:
+                return False
+            for other in self._remove_unlocked(pattern_id):
+                self._set_neighbors(other, self._nearest(other, self._vectors[other]))
+            return True
+
+    def clear(self) -> None:
+        """Svuota l'indice e lo marca come non pronto."""
+        with self._lock:
+            self._reset()
+            self._ready = False
+
+    def related(self, pattern_id: int, limit: int = 5) -> List[Tuple[int, float]]:
+        """
+        Pattern più simili a quello dato.
+
+        Args:
+            pattern_id: ID del pattern di riferimento
+            limit: Numero massimo di pattern (al più top_k)
+
+        Returns:
+            List[Tuple[int, float]]: (ID, similarità) in ordine decrescente
+        """
+        with self._lock:
+            return list(self._neighbors.get(pattern_id, ())[:limit])
+
+    def _set_neighbors(self, doc_id: int, neighbors: List[Tuple[int, float]]) -> None:
+        self._neighbors[doc_id] = neighbors
+        if doc_id >= len(self._floors):
+            self._floors = np.concatenate([self._floors, np.zeros(max(doc_id + 1, 2 * len(self._floors)) - len(self._floors))])
+        self._floors[doc_id] = neighbors[-1][1] if len(neighbors) >= self.top_k else 0.0
+
+    def _column(self, feature: str) -> int:
+        column = self._columns.get(feature)
+        if column is None:
+            column = self._columns[feature] = len(self._columns)
+        return column
+
+    def _store(self, doc_id: int, counts: Dict[str, float], taxonomy: List[str], n_docs: int) -> SparseVector:
+        """
+        Calcola il vettore normalizzato di un pattern e lo aggiunge alle colonne.
+
+        Ogni blocco è normalizzato separatamente e scalato con la radice del
+        proprio peso, così il prodotto scalare è la somma pesata dei coseni.
+        """
+        blocks = (
+            ({
+                term: (1.0 + math.log(count)) * (math.log((1 + n_docs) / (1 + self._df[term])) + 1.0)
+                for term, count in counts.items()
+            }, TEXT_WEIGHT),
+            (dict.fromkeys(taxonomy, 1.0), TAXONOMY_WEIGHT),
+        )
+        weights: Dict[int, float] = {}
+        for block, block_weight in blocks:
+            norm = math.sqrt(sum(value * value for value in block.values()))
+            if not norm:
+                continue
+            scale = math.sqrt(block_weight) / norm
+            for feature, value in block.items():
+                weights[self._column(feature)] = value * scale
+
+        vector = (
+            np.fromiter(weights.keys(), dtype=np.int64, count=len(weights)),
+            np.fromiter(weights.values(), dtype=np.float64, count=len(weights)),
+        )
+        for column, weight in weights.items():
+            self._postings.setdefault(column, {})[doc_id] = weight
+            self._posting_arrays.pop(column, None)
+        self._vectors[doc_id] = vector
+        self._doc_terms[doc_id] = frozenset(counts)
+        return vector
+
+    def _remove_unlocked(self, doc_id: int) -> Set[int]:
+        """
+        Rimuove un pattern dalle colonne.
+
+        Returns:
+            Set[int]: Pattern che lo avevano tra i vicini
+        """
+        vector = self._vectors.pop(doc_id, None)
+        if vector is None:
+            return set()
+
+        # Solo i pattern con similarità non inferiore al proprio k-esimo
+        # vicino possono averlo in lista (tolleranza per l'ordine delle somme)
+        ids, scores = self._similarities(vector)
+        candidates = ids[(ids != doc_id) & (scores >= self._floors[ids] - 1e-9)]
+        stale = {
+            other for other in candidates.tolist()
+            if any(n == doc_id for n, _ in self._neighbors.get(other, ()))
+        }
+
+        for column in vector[0].tolist():
+            postings = self._postings.get(column)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[column]
+            self._posting_arrays.pop(column, None)
+        for term in self._doc_terms.pop(doc_id, ()):
+            self._df[term] -= 1
+            if not self._df[term]:
+                del self._df[term]
+        self._neighbors.pop(doc_id, None)
+        if doc_id < len(self._floors):
+            # Nessun pattern rimosso riceve nuovi vicini
+            self._floors[doc_id] = np.inf
+        return stale
+
+    def _posting_array(self, column: int) -> Optional[SparseVector]:
+        arrays = self._posting_arrays.get(column)
+        if arrays is None:
+            postings = self._postings.get(column)
+            if not postings:
+                return None
+            arrays = self._posting_arrays[column] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+            )
+        return arrays
+
+    def _similarities(self, vector: SparseVector) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Prodotti scalari di un vettore con tutti i pattern indicizzati.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: ID dei pattern con almeno una
+            colonna in comune e relativi punteggi
+        """
+        id_parts, score_parts = [], []
+        for column, weight in zip(vector[0].tolist(), vector[1].tolist()):
+            arrays = self._posting_array(column)
+            if arrays is not None:
+                id_parts.append(arrays[0])
+                score_parts.append(arrays[1] * weight)
+        if not id_parts:
+            return _EMPTY_IDS, _EMPTY_SCORES
+
+        # Accumulo denso per ID: i pesi sono positivi, quindi ogni ID toccato ha punteggio > 0
+        totals = np.bincount(np.concatenate(id_parts), weights=np.concatenate(score_parts))
+        ids = np.flatnonzero(totals)
+        return ids, totals[ids]
+
+    def _nearest(self, doc_id: int, vector: SparseVector) -> List[Tuple[int, float]]:
+        ids, scores = self._similarities(vector)
+        return self._select(doc_id, ids, scores)
+
+    def _select(self, doc_id: int, ids: np.ndarray, scores: np.ndarray) -> List[Tuple[int, float]]:
+        # Primi top_k per punteggio decrescente e, a parità, per ID
+        mask = (ids != doc_id) & (scores > 1e-12)
+        ids, scores = ids[mask], scores[mask]
+        if len(ids) > self.top_k:
+            top = np.argpartition(-scores, self.top_k - 1)[:self.top_k]
+            ids, scores = ids[top], scores[top]
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+# Indice condiviso dal processo
+related_index = RelatedPatternsIndex()
@@ -0,0 +1,147 @@
+# src/services/search_cache.py
+"""
+Cache dei risultati di ricerca dei Privacy Patterns.
+
+Le ricerche identiche (stessa query, stessi filtri, stessa pagina) sono
+servite dal namespace "search" della cache applicativa, con chiave
+derivata dalla firma normalizzata. Le voci hanno il tag PATTERN_LIST_TAG e
+vengono invalidate a ogni scrittura sui pattern, quindi non restituiscono
+mai risultati più vecchi dell'ultima modifica fatta tramite l'applicazione.
+"""
+import hashlib
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.services.search_index import filter_values, TaxonomyFilter
+from src.utils.analysis import analyze
+from src.utils.cache import cache
+from src.utils.synonyms import key_terms, query_expander
+
+
+def normalize_query(query: Optional[str], ordered: bool = False) -> str:
+    """
+    Normalizza il testo di una query per la firma della cache.
+
+    Con l'indice in memoria le clausole sono combinate in AND e il
+    punteggio non dipende dal loro ordine, quindi si usano le clausole
+    prodotte dall'espansione dei sinonimi, deduplicate e ordinate.
+    L'espansione riconosce le espressioni solo con i termini nell'ordine
+    originale ("right to be forgotten" ma non "forgotten right"): partire
+    dalle clausole espanse evita di confondere query con espansioni
+    diverse. La sintassi full-text del database (frasi, OR, esclusioni)
+    dipende invece dall'ordine: in quel caso si uniformano solo maiuscole
+    e spazi.
+
+    Args:
+        query: Testo della query
+        ordered: Se True mantiene l'ordine dei termini
+
+    Returns:
+        str: Query normalizzata
+    """
+    if not query:
+        return ""
+    if ordered:
+        return " ".join(query.lower().split())
+    terms = analyze(query)
+    # Una query senza termini validi non equivale all'assenza di query
+    if not terms:
+        return query
+    clauses = []
+    for clause in query_expander.expand(terms):
+        # Un termine senza espansioni è rappresentato da sé stesso
+        clauses.append("|".join(sorted(
+            "+".join(key_terms(key)) + ("" if weight == 1.0 else f"^{weight:g}")
+            for key, weight in clause.items()
+        )))
+    return " ".join(sorted(clauses))
+
+
+def search_signature(
+    query: Optional[str] = None,
+    strategy: Optional[str] = None,
+    mvc_component: Optional[str] = None,
+    gdpr_id: TaxonomyFilter = None,
+    pbd_id: TaxonomyFilter = None,
+    iso_id: TaxonomyFilter = None,
+    vulnerability_id: TaxonomyFilter = None,
+    taxonomy_match: str = "all",
+    ordered_query: bool = False,
+    **page: Hashable
+) -> Tuple[Hashable, ...]:
+    """
+    Calcola la firma canonica di una ricerca.
+
+    Gli ID tassonomici sono deduplicati e ordinati, i filtri assenti sono
+    omessi e i parametri di pagina sono ordinati per nome, così richieste
+    equivalenti producono la stessa chiave.
+
+    Args:
+        query: Testo della query
+        strategy: Filtro per strategia
+        mvc_component: Filtro per componente MVC
+        gdpr_id: Filtro per articoli GDPR
+        pbd_id: Filtro per principi PbD
+        iso_id: Filtro per fasi ISO
+        vulnerability_id: Filtro per vulnerabilità
+        taxonomy_match: "all" o "any"
+        ordered_query: Se True l'ordine dei termini della query è significativo
+        **page: Parametri di paginazione e di formato (from_pos, size, ...)
+
+    Returns:
+        Tuple[Hashable, ...]: Firma della ricerca
+    """
+    taxonomy = tuple(
+        (name, tuple(sorted(set(values))))
+        for name, values in (
+            ("gdpr", filter_values(gdpr_id)),
+            ("pbd", filter_values(pbd_id)),
+            ("iso", filter_values(iso_id)),
+            ("vulnerability", filter_values(vulnerability_id)),
+        )
+        if values
+    )
+    # Con un solo ID per tassonomia "all" e "any" coincidono
+    match = taxonomy_match if any(len(values) > 1 for _, values in taxonomy) else "all"
+    return (
+        normalize_query(query, ordered_query),
+        strategy or None,
+        mvc_component or None,
+        taxonomy,
+        match,
+        tuple(sorted(page.items())),
+    )
+
+
+def signature_key(signature: Tuple[Hashable, ...]) -> str:
+    """
+    Chiave di cache compatta per una firma di ricerca.
+
+    Args:
+        signature: Firma prodotta da search_signature
+
+    Returns:
+        str: Chiave del namespace "search"
+    """
+    return "search:" + hashlib.blake2b(repr(signature).encode(), digest_size=16).hexdigest()
+
+
+def copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copia i livelli modificabili di un risultato, così i chiamanti non alterano la cache.
+
+    Args:
+        result: Risultato di una ricerca
+
+    Returns:
+        Dict[str, Any]: Copia del risultato
+    """
+    copied = dict(result)
+    copied["results"] = [dict(item) for item in result.get("results", [])]
+    if result.get("facets"):
+        copied["facets"] = {name: dict(counts) for name, counts in result["facets"].items()}
+    return copied
+
+
+# Namespace della cache applicativa con i risultati delle ricerche e delle
+# liste di pattern (limiti in NAMESPACE_LIMITS, voci con PATTERN_LIST_TAG)
+search_cache = cache.namespace("search")
@@ -0,0 +1,662 @@
+# src/services/search_index.py
+"""
+Indice di ricerca in memoria per i Privacy Patterns.
+
+Mantiene un indice invertito BM25 costruito dalle righe di PrivacyPattern,
+un indice bitmap per i filtri tassonomici e i metadati dei risultati, così
+che le ricerche non richiedano scansioni complete della tabella.
+"""
+import hashlib
+import heapq
+import json
+import logging
+import threading
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Union
+
+from src.exceptions import InvalidCursorException
+from src.utils.bitmap import BitmapIndex, iter_bits, to_bitmap
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.utils.profiling import current_profile, profile_stage
+from src.utils.search import InvertedIndex, highlight_snippet, max_edits
+from src.utils.snapshot import Snapshot, SnapshotError, SnapshotMapping, SnapshotWriter
+from src.utils.synonyms import ClauseKey, key_terms, query_expander
+
+logger = logging.getLogger(__name__)
+
+# Peso dei campi testuali nel calcolo del punteggio
+FIELD_BOOSTS: Dict[str, float] = {
+    "title": 3.0,
+    "description": 2.0,
+    "problem": 1.0,
+    "solution": 1.0,
+    "context": 1.0,
+    "consequences": 1.0,
+}
+
+# Relazioni tassonomiche filtrabili: nome del filtro -> attributo del pattern
+TAXONOMY_FIELDS: Dict[str, str] = {
+    "gdpr_ids": "gdpr_articles",
+    "pbd_ids": "pbd_principles",
+    "iso_ids": "iso_phases",
+    "vulnerability_ids": "vulnerabilities",
+}
+
+# Peso delle varianti fuzzy di un termine per distanza di edit
+FUZZY_WEIGHTS: Dict[int, float] = {1: 0.5, 2: 0.25}
+
+# Frazione del peggior punteggio esatto sotto cui restano i risultati solo fuzzy
+FUZZY_CEILING = 0.99
+
+# Lunghezza massima degli snippet evidenziati per campo
+HIGHLIGHT_FRAGMENT_SIZE = 160
+
+# Valore di un filtro tassonomico: singolo ID o lista di ID
+TaxonomyFilter = Optional[Union[int, List[int]]]
+
+# Versione dei documenti salvati negli snapshot: va incrementata se cambia pattern_document
+SNAPSHOT_DOCUMENT_VERSION = 1
+
+# Facette restituite con i risultati: nome della facetta -> campo del documento
+FACET_FIELDS: Dict[str, str] = {
+    "strategy": "strategy",
+    "mvc_component": "mvc_component",
+    "gdpr": "gdpr_ids",
+    "pbd": "pbd_ids",
+    "iso": "iso_ids",
+    "vulnerability": "vulnerability_ids",
+}
+
+
+def pattern_document(pattern: Any, links: Optional[Mapping[str, Iterable[int]]] = None) -> Dict[str, Any]:
+    """
+    Estrae da un pattern i dati necessari all'indice.
+
+    Args:
+        pattern: Istanza di PrivacyPattern (o oggetto con gli stessi attributi)
+        links: ID delle entità collegate per relazione; se assente vengono
+            letti dalle relazioni del pattern
+
+    Returns:
+        Dict[str, Any]: Documento da indicizzare
+    """
+    doc = {
+        "id": pattern.id,
+        "title": pattern.title,
+        "description": pattern.description,
+        "strategy": pattern.strategy,
+        "mvc_component": pattern.mvc_component,
+        "created_at": pattern.created_at.isoformat() if pattern.created_at else None,
+        "updated_at": pattern.updated_at.isoformat() if pattern.updated_at else None,
+        "view_count": getattr(pattern, "view_count", 0) or 0,
+        "fields": {field: getattr(pattern, field, None) for field in FIELD_BOOSTS},
+    }
+
+    for key, relation in TAXONOMY_FIELDS.items():
+        if links is not None:
+            doc[key] = frozenset(links.get(key, ()))
+        else:
+            doc[key] = frozenset(item.id for item in (getattr(pattern, relation, None) or []))
+
+    return doc
+
+
+def filter_values(value: TaxonomyFilter) -> List[int]:
+    """
+    Normalizza il valore di un filtro tassonomico in una lista di ID.
+
+    Args:
+        value: Singolo ID, lista di ID o None
+
+    Returns:
+        List[int]: ID richiesti (lista vuota se il filtro non è attivo)
+    """
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [v for v in value if v]
+    return [value] if value else []
+
+
+def _stored_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Documento serializzabile in JSON (le tassonomie come liste ordinate)
+    return {key: sorted(value) if key in TAXONOMY_FIELDS else value for key, value in doc.items()}
+
+
+def _loaded_document(stored: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: frozenset(value) if key in TAXONOMY_FIELDS else value for key, value in stored.items()}
+
+
+def _bitmap_values(doc: Dict[str, Any]) -> Dict[str, Iterable[Any]]:
+    values = {field: doc[field] for field in TAXONOMY_FIELDS}
+    values["strategy"] = (doc["strategy"],)
+    values["mvc_component"] = (doc["mvc_component"],)
+    return values
+
+
+class PatternSearchIndex:
+    """
+    Indice full-text in memoria dei Privacy Patterns.
+
+    L'indice viene popolato con una ricostruzione completa (rebuild) e
+    mantenuto aggiornato a ogni scrittura tramite add_pattern/remove_pattern.
+    Finché non è stato costruito almeno una volta non è considerato pronto
+    e il servizio di ricerca usa il database.
+
+    I filtri per strategia, componente MVC e tassonomie usano un bitset per
+    valore: le combinazioni di filtri sono intersezioni (o unioni) di interi
+    e i conteggi delle facette sono popcount.
+    """
+
+    def __init__(self):
+        """Inizializza un indice vuoto e non ancora pronto."""
+        self._text = InvertedIndex()
+        self._filters = BitmapIndex()
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._ready = False
+        self._lock = threading.RLock()
+
+    @property
+    def is_ready(self) -> bool:
+        """True se l'indice è stato costruito ed è utilizzabile."""
+        return self._ready
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def rebuild(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ricostruisce l'indice a partire da un insieme completo di documenti.
+
+        Il nuovo indice viene costruito a parte e sostituisce quello corrente
+        solo a costruzione completata, senza bloccare le ricerche in corso.
+
+        Args:
+            documents: Documenti prodotti da pattern_document
+
+        Returns:
+            int: Numero di documenti indicizzati
+        """
+        text = InvertedIndex()
+        filters = BitmapIndex()
+        docs: Dict[int, Dict[str, Any]] = {}
+
+        for doc in documents:
+            text.add_document(doc["id"], doc["fields"], FIELD_BOOSTS)
+            filters.add(doc["id"], _bitmap_values(doc))
+            docs[doc["id"]] = doc
+
+        with self._lock:
+            self._text = text
+            self._filters = filters
+            self._docs = docs
+            self._ready = True
+
+        logger.info(f"Indice di ricerca ricostruito: {len(docs)} pattern")
+        return len(docs)
+
+    def replace(self, other: "PatternSearchIndex") -> None:
+        """
+        Sostituisce il contenuto dell'indice con quello di un indice costruito a parte.
+
+        Args:
+            other: Indice da cui prendere lo stato (non va più usato)
+        """
+        with self._lock:
+            self._text = other._text
+            self._filters = other._filters
+            self._docs = other._docs
+            self._ready = other._ready
+
+    def add_pattern(self, pattern: Any) -> None:
+        """
+        Indicizza o aggiorna un singolo pattern.
+
+        Args:
+            pattern: Istanza di PrivacyPattern con relazioni caricate
+        """
+        self.add_document(pattern_document(pattern))
+
+    def add_document(self, doc: Dict[str, Any]) -> None:
+        """
+        Indicizza o aggiorna un documento già estratto.
+
+        Args:
+            doc: Documento prodotto da pattern_document
+        """
+        with self._lock:
+            self._text.add_document(doc["id"], doc["fields"], FIELD_BOOSTS)
+            self._filters.add(doc["id"], _bitmap_values(doc))
+            self._docs[doc["id"]] = doc
+
+    def remove_pattern(self, pattern_id: int) -> bool:
+        """
+        Rimuove un pattern dall'indice.
+
+        Args:
+            pattern_id: ID del pattern
+
+        Returns:
+            bool: True se il pattern era indicizzato
+        """
+        with self._lock:
+            self._text.remove_document(pattern_id)
+            self._filters.remove(pattern_id)
+            return self._docs.pop(pattern_id, None) is not None
+
+    def clear(self) -> None:
+        """Svuota l'indice e lo marca come non pronto."""
+        with self._lock:
+            self._text = InvertedIndex()
+            self._filters = BitmapIndex()
+            self._docs = {}
+            self._ready = False
+
+    def schema(self) -> str:
+        """
+        Impronta della configurazione dell'indice.
+
+        Combina versione dei documenti, pesi dei campi, tassonomie,
+        parametri BM25 e analizzatore: uno snapshot con un'impronta diversa
+        è stato costruito da un'altra versione del codice.
+        """
+        config = {
+            "document": SNAPSHOT_DOCUMENT_VERSION,
+            "boosts": FIELD_BOOSTS,
+            "taxonomy": sorted(TAXONOMY_FIELDS),
+            "bm25": [self._text.k1, self._text.b],
+            "analyzer": self._text.analyzer.signature,
+        }
+        return hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def save_snapshot(self, path: str, fingerprint: str) -> int:
+        """
+        Salva l'indice in uno snapshot su disco.
+
+        Args:
+            path: Percorso del file
+            fingerprint: Impronta dei dati indicizzati (vedi load_snapshot)
+
+        Returns:
+            int: Dimensione del file in byte
+        """
+        writer = SnapshotWriter()
+        with self._lock:
+            doc_ids = sorted(self._docs)
+            self._text.write_snapshot(writer, "text")
+            filters = self._filters.write_snapshot(writer, "filters")
+            writer.add_array("docs.ids", doc_ids, "<i8")
+            writer.add_records("docs", (_stored_document(self._docs[doc_id]) for doc_id in doc_ids))
+        size = writer.write(path, {
+            "schema": self.schema(),
+            "fingerprint": fingerprint,
+            "filters": filters,
+        })
+        logger.info(f"Snapshot dell'indice di ricerca salvato in {path}: {len(doc_ids)} pattern, {size} byte")
+        return size
+
+    def load_snapshot(self, path: str, fingerprint: str) -> bool:
+        """
+        Carica l'indice da uno snapshot mappato in memoria.
+
+        Lo snapshot è usato solo se è stato scritto dalla stessa versione
+        del formato e dell'indice (schema) e per gli stessi dati
+        (fingerprint); altrimenti va ricostruito dal database. Posting list
+        e documenti sono letti dal file su richiesta.
+
+        Args:
+            path: Percorso del file
+            fingerprint: Impronta attuale dei dati indicizzati
+
+        Returns:
+            bool: True se l'indice è stato caricato ed è pronto
+        """
+        try:
+            snapshot = Snapshot.open(path, {"schema": self.schema(), "fingerprint": fingerprint})
+            text = InvertedIndex.from_snapshot(snapshot, "text", self._text.k1, self._text.b, self._text.analyzer)
+            filters = BitmapIndex.from_snapshot(snapshot, "filters", snapshot.metadata["filters"])
+            records = snapshot.records("docs")
+            docs = SnapshotMapping(snapshot.array("docs.ids"), lambda position: _loaded_document(records[position]))
+        except (SnapshotError, KeyError) as e:
+            logger.info(f"Snapshot dell'indice di ricerca non utilizzabile ({path}): {str(e)}")
+            return False
+
+        with self._lock:
+            self._text = text
+            self._filters = filters
+            self._docs = docs
+            self._ready = True
+
+        logger.info(f"Indice di ricerca caricato dallo snapshot {path}: {len(docs)} pattern")
+        return True
+
+    def _filter_bitmap(
+        self,
+        strategy: Optional[str],
+        mvc_component: Optional[str],
+        taxonomy: Mapping[str, TaxonomyFilter],
+        taxonomy_match: str = "all"
+    ) -> Optional[int]:
+        """
+        Calcola il bitset dei pattern che soddisfano i filtri non testuali.
+
+        Filtri diversi sono sempre combinati in AND; più valori dello stesso
+        filtro tassonomico in AND ("all") o in OR ("any").
+
+        Returns:
+            Bitset degli ID ammessi, o None se non ci sono filtri
+        """
+        active = {key: filter_values(value) for key, value in taxonomy.items()}
+        active = {key: values for key, values in active.items() if values}
+        if not strategy and not mvc_component and not active:
+            return None
+
+        bits = self._filters.all
+        if strategy:
+            bits &= self._filters.get("strategy", strategy)
+        if mvc_component:
+            bits &= self._filters.get("mvc_component", mvc_component)
+        for key, values in active.items():
+            if not bits:
+                break
+            bits &= self._filters.match(key, values, match_all=taxonomy_match != "any")
+        return bits
+
+    def _facet_counts(self, bits: int) -> Dict[str, Dict[str, int]]:
+        """
+        Conta i valori di ciascuna facetta sul risultato filtrato.
+
+        Ogni conteggio è il popcount dell'intersezione tra il bitset del
+        risultato e quello del valore.
+
+        Args:
+            bits: Bitset degli ID del risultato filtrato
+
+        Returns:
+            Dict[str, Dict[str, int]]: {facetta: {valore: conteggio}}
+        """
+        facets = {}
+        for facet, field in FACET_FIELDS.items():
+            counts = self._filters.counts(field, bits)
+            facets[facet] = {
+                str(value): count
+                for value, count in sorted(counts.items(), key=lambda item: -item[1])
+            }
+        return facets
+
+    def _fuzzy_clauses(self, clauses: List[Dict[ClauseKey, float]]) -> List[Dict[ClauseKey, float]]:
+        # Aggiunge a ogni clausola le varianti del vocabolario entro max_edits
+        # dei termini originali della query (non dei sinonimi)
+        expanded = []
+        for clause in clauses:
+            clause = dict(clause)
+            for term, weight in list(clause.items()):
+                if isinstance(term, tuple) or weight < 1.0:
+                    continue
+                for variant, distance in self._text.similar_terms(term, max_edits(term)).items():
+                    clause.setdefault(variant, FUZZY_WEIGHTS[distance])
+            expanded.append(clause)
+        return expanded
+
+    def _add_fuzzy_matches(
+        self,
+        clauses: List[Dict[ClauseKey, float]],
+        expanded: List[Dict[ClauseKey, float]],
+        candidates: Optional[Set[int]],
+        exact: Dict[int, float],
+        term_scores: Optional[Mapping[str, Mapping[int, float]]] = None
+    ) -> Dict[int, float]:
+        if expanded == clauses:
+            return exact
+
+        fuzzy = {
+            doc_id: score
+            for doc_id, score in self._text.search(expanded, candidates, term_scores).items()
+            if doc_id not in exact
+        }
+        if not fuzzy:
+            return exact
+        # I risultati solo fuzzy restano sotto il peggiore risultato esatto
+        if exact:
+            ceiling = min(exact.values()) * FUZZY_CEILING
+            top = max(fuzzy.values())
+            if top > ceiling:
+                fuzzy = {doc_id: score * ceiling / top for doc_id, score in fuzzy.items()}
+        return {**fuzzy, **exact}
+
+    def _highlights(self, doc: Dict[str, Any], terms: Set[str]) -> Dict[str, str]:
+        """
+        Snippet evidenziati dei campi che contengono i termini della query.
+
+        Le posizioni dei termini sono quelle salvate in indicizzazione: il
+        testo viene solo tagliato, senza essere rianalizzato.
+
+        Args:
+            doc: Documento indicizzato
+            terms: Termini della query (incluse le varianti fuzzy)
+
+        Returns:
+            Dict[str, str]: {campo: snippet} nell'ordine di FIELD_BOOSTS
+        """
+        offsets = self._text.term_offsets(doc["id"], terms)
+        return {
+            field: highlight_snippet(doc["fields"][field], offsets[field], HIGHLIGHT_FRAGMENT_SIZE)
+            for field in FIELD_BOOSTS
+            if field in offsets
+        }
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        strategy: Optional[str] = None,
+        mvc_component: Optional[str] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
+        from_pos: int = 0,
+        size: int = 10,
+        facets: bool = False,
+        taxonomy_match: str = "all",
+        cursor: Optional[str] = None,
+        fuzzy: bool = False,
+        highlight: bool = False,
+        synonyms: bool = True,
+        term_scores: Optional[Mapping[str, Mapping[int, float]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Cerca pattern nell'indice con ranking BM25.
+
+        Tutti i termini della query devono essere presenti nel pattern;
+        i risultati sono ordinati per punteggio decrescente. Senza query
+        testuale i pattern filtrati sono restituiti in ordine di ID.
+
+        Con fuzzy=True ogni termine corrisponde anche ai termini del
+        vocabolario entro una piccola distanza di edit (vedi max_edits); i
+        pattern trovati solo grazie a queste varianti seguono sempre quelli
+        che contengono tutti i termini esatti.
+
+        Un termine (o una sequenza di termini, es. "right to be forgotten")
+        presente nella tabella dei sinonimi è soddisfatto anche dalle sue
+        espansioni ("erasure"), che contribuiscono al punteggio con un peso
+        ridotto.
+
+        Args:
+            query: Query testuale
+            strategy: Filtra per strategia
+            mvc_component: Filtra per componente MVC
+            gdpr_id: Filtra per articolo GDPR (uno o più ID)
+            pbd_id: Filtra per principio PbD (uno o più ID)
+            iso_id: Filtra per fase ISO (uno o più ID)
+            vulnerability_id: Filtra per vulnerabilità (uno o più ID)
+            from_pos: Posizione di partenza
+            size: Numero di risultati
+            facets: Se True, aggiunge i conteggi per facetta dell'intero
+                risultato filtrato
+            taxonomy_match: "all" se il pattern deve avere tutti gli ID
+                richiesti per una tassonomia, "any" se ne basta uno
+            cursor: Cursore restituito dalla pagina precedente; se presente
+                from_pos viene ignorato
+            fuzzy: Se True tollera errori di battitura nei termini
+            highlight: Se True ogni risultato di una ricerca testuale include
+                "highlights", gli snippet dei campi con i termini evidenziati
+            synonyms: Se True i termini della query sono espansi con i
+                sinonimi e i concetti correlati di src.utils.synonyms, con
+                peso ridotto
+            term_scores: Contributi BM25 dei termini già calcolati (usato da
+                search_batch per condividerli tra le query)
+
+        Returns:
+            Dict[str, Any]: Risultati nel formato {"total", "results",
+            "next_cursor"} ed eventualmente "facets"
+        """
+        profile = current_profile()
+        with profile_stage("analyze"):
+            terms = self._text.analyzer(query)
+        after = None
+        if cursor:
+            after = decode_cursor(cursor, 2 if terms else 1)
+            if not isinstance(after[-1], int) or after[-1] < 0 or \
+                    not all(isinstance(v, (int, float)) for v in after):
+                raise InvalidCursorException("chiave di ordinamento non compatibile")
+            from_pos = 0
+
+        with self._lock:
+            if profile:
+                profile.count("indexed", len(self._docs))
+            with profile_stage("filter"):
+                bits = self._filter_bitmap(
+                    strategy,
+                    mvc_component,
+                    {
+                        "gdpr_ids": gdpr_id,
+                        "pbd_ids": pbd_id,
+                        "iso_ids": iso_id,
+                        "vulnerability_ids": vulnerability_id,
+                    },
+                    taxonomy_match
+                )
+            if profile and bits is not None:
+                profile.count("filters", bits.bit_count())
+
+            if query and not terms:
+                empty = {"total": 0, "results": [], "next_cursor": None}
+                if facets:
+                    empty["facets"] = self._facet_counts(0)
+                return empty
+
+            if terms:
+                candidates = set(iter_bits(bits)) if bits is not None else None
+                clauses = query_expander.expand(terms) if synonyms else [{term: 1.0} for term in dict.fromkeys(terms)]
+                with profile_stage("score"):
+                    scores = self._text.search(clauses, candidates, term_scores)
+                if profile:
+                    profile.count("text_match", len(scores))
+                if fuzzy:
+                    with profile_stage("fuzzy"):
+                        expanded = self._fuzzy_clauses(clauses)
+                        scores = self._add_fuzzy_matches(clauses, expanded, candidates, scores, term_scores)
+                        clauses = expanded
+                    if profile:
+                        profile.count("fuzzy_match", len(scores))
+                with profile_stage("rank"):
+                    items = scores.items()
+                    if after is not None:
+                        # Solo i risultati che seguono (punteggio, ID) del cursore
+                        last_score, last_id = after
+                        items = [
+                            (doc_id, score) for doc_id, score in items
+                            if score < last_score or (score == last_score and doc_id > last_id)
+                        ]
+                    # Ordina per punteggio decrescente e, a parità, per ID
+                    ranked = heapq.nsmallest(
+                        from_pos + size + 1,
+                        items,
+                        key=lambda item: (-item[1], item[0])
+                    )
+                total = len(scores)
+                if facets:
+                    bits = to_bitmap(scores)
+            else:
+                if bits is None:
+                    bits = self._filters.all
+                total = bits.bit_count()
+                page_bits = bits
+                if after is not None:
+                    # Azzera i bit fino all'ultimo ID restituito
+                    page_bits = bits >> (after[0] + 1) << (after[0] + 1)
+                # I bit sono già in ordine di ID: si leggono solo quelli della pagina
+                ranked = [(doc_id, 0.0) for doc_id in islice(iter_bits(page_bits), from_pos + size + 1)]
+
+            page = ranked[from_pos:from_pos + size]
+            if profile:
+                profile.count("page", len(page))
+            next_cursor = None
+            if len(ranked) > from_pos + size and page:
+                last_id, last_score = page[-1]
+                next_cursor = encode_cursor([last_score, last_id] if terms else [last_id])
+
+            highlight_terms = {
+                term for clause in clauses for key in clause for term in key_terms(key)
+            } if highlight and terms else None
+            results = []
+            with profile_stage("results"):
+                for doc_id, score in page:
+                    doc = self._docs[doc_id]
+                    result = {
+                        "id": doc["id"],
+                        "title": doc["title"],
+                        "description": doc["description"],
+                        "strategy": doc["strategy"],
+                        "mvc_component": doc["mvc_component"],
+                        "created_at": doc["created_at"],
+                        "updated_at": doc["updated_at"],
+                        "score": round(score, 4)
+                    }
+                    if highlight_terms:
+                        result["highlights"] = self._highlights(doc, highlight_terms)
+                    results.append(result)
+                    if profile and terms:
+                        profile.add_hit(doc_id, result["score"], self._text.explain(doc_id, clauses))
+
+            response = {
+                "total": total,
+                "results": results,
+                "next_cursor": next_cursor
+            }
+            if facets:
+                with profile_stage("facets"):
+                    response["facets"] = self._facet_counts(bits)
+            return response
+
+    def search_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Esegue più ricerche sulla stessa versione dell'indice.
+
+        I testi sono analizzati una volta e i contributi BM25 dei termini
+        presenti in più query (anche come sinonimi) sono calcolati una sola
+        volta per tutto il lotto, invece che a ogni ricerca.
+
+        Args:
+            requests: Parametri di ciascuna ricerca, con gli stessi nomi
+                degli argomenti di search
+
+        Returns:
+            List[Dict[str, Any]]: Risultati di search, nello stesso ordine
+        """
+        occurrences: Dict[str, int] = {}
+        for request in requests:
+            terms = self._text.analyzer(request.get("query"))
+            if request.get("synonyms", True):
+                terms = [term for clause in query_expander.expand(terms) for key in clause for term in key_terms(key)]
+            for term in set(terms):
+                occurrences[term] = occurrences.get(term, 0) + 1
+        shared = [term for term, count in occurrences.items() if count > 1]
+
+        with self._lock:
+            term_scores = self._text.term_scores(shared) if shared else None
+            return [self.search(**request, term_scores=term_scores) for request in requests]
+
+
+# Indice condiviso dal processo
+pattern_index = PatternSearchIndex()
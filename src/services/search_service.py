@@ -1,25 +1,118 @@
 # src/services/search_service.py - Versione modificata
 """
-Servizio di ricerca basato su SQL come sostituto di Elasticsearch.
+Servizio di ricerca come sostituto di Elasticsearch.
+
+Usa un indice invertito in memoria con ranking BM25 oppure, con
+SEARCH_ENGINE="database", la ricerca full-text del database (tsvector su
+PostgreSQL, FTS5 su SQLite). Le query LIKE restano l'ultimo fallback.
 """
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func, text
+import threading
+from collections import defaultdict
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, noload
+from sqlalchemy import or_, and_, func, text, select, literal_column, table, column, cast, Double
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.models.privacy_pattern import PrivacyPattern
+from src.config import settings
+from src.db.fulltext import FTS_TABLE, FTS_WEIGHTS, TS_CONFIG, fulltext_backend, to_fts5_query
+from src.exceptions import InvalidCursorException, ServiceUnavailableException
+from src.utils.analysis import Analyzer, LightStemmer, StopwordFilter
+from src.utils.pagination import paginate_keyset
+from src.utils.cache import PATTERN_LIST_TAG
+from src.utils.profiling import current_profile, profile_stage
+
+from src.models.privacy_pattern import (
+    PrivacyPattern,
+    pattern_gdpr_association,
+    pattern_pbd_association,
+    pattern_iso_association,
+    pattern_vulnerability_association
+)
 from src.models.gdpr_model import GDPRArticle
 from src.models.pbd_principle import PbDPrinciple
 from src.models.iso_phase import ISOPhase
 from src.models.vulnerability import Vulnerability
+from src.services.search_index import (
+    PatternSearchIndex, pattern_index, pattern_document, filter_values, TaxonomyFilter
+)
+from src.services.autocomplete_index import AutocompleteIndex, autocomplete_index, excerpt
+from src.services.related_index import RelatedPatternsIndex, related_index
+from src.services.unified_index import UnifiedSearchIndex, unified_index, pattern_entry, gdpr_entry, faq_entry
+from src.services.faq_service import faq_service
+from src.services.search_cache import copy_result, search_cache, search_signature, signature_key
+
+if TYPE_CHECKING:
+    from src.services.reindex_job import ReindexProgress
 
 logger = logging.getLogger(__name__)
 
+# Analizzatore per il fallback LIKE: come quello dell'indice ma senza rimuovere
+# gli accenti, che nel database sono conservati
+LIKE_ANALYZER = Analyzer([StopwordFilter(("it", "en")), LightStemmer(("it", "en"))])
+
+# Pattern letti dal database per blocco durante la ricostruzione degli indici
+REINDEX_CHUNK_SIZE = 500
+
+# Indici costruiti da una ricostruzione completa, nell'ordine di esecuzione
+REINDEX_PHASES = ("patterns", "related", "unified", "autocomplete")
+
+# Tabelle di associazione lette durante la ricostruzione dell'indice
+LINK_TABLES = {
+    "gdpr_ids": (pattern_gdpr_association, "gdpr_id"),
+    "pbd_ids": (pattern_pbd_association, "pbd_id"),
+    "iso_ids": (pattern_iso_association, "iso_id"),
+    "vulnerability_ids": (pattern_vulnerability_association, "vulnerability_id"),
+}
+
+
+def taxonomy_conditions(
+    gdpr_id: TaxonomyFilter = None,
+    pbd_id: TaxonomyFilter = None,
+    iso_id: TaxonomyFilter = None,
+    vulnerability_id: TaxonomyFilter = None,
+    taxonomy_match: str = "all"
+) -> List[Any]:
+    """
+    Costruisce le condizioni SQL per i filtri tassonomici.
+    
+    Usa sottoquery EXISTS sulle tabelle di associazione, così i filtri
+    non moltiplicano le righe e non serve DISTINCT.
+    
+    Args:
+        gdpr_id: ID (o lista di ID) degli articoli GDPR
+        pbd_id: ID (o lista di ID) dei principi PbD
+        iso_id: ID (o lista di ID) delle fasi ISO
+        vulnerability_id: ID (o lista di ID) delle vulnerabilità
+        taxonomy_match: "all" per richiedere tutti gli ID di una tassonomia,
+            "any" per richiederne almeno uno
+        
+    Returns:
+        List[Any]: Condizioni da applicare in AND
+    """
+    conditions = []
+    for relation, model, value in (
+        (PrivacyPattern.gdpr_articles, GDPRArticle, gdpr_id),
+        (PrivacyPattern.pbd_principles, PbDPrinciple, pbd_id),
+        (PrivacyPattern.iso_phases, ISOPhase, iso_id),
+        (PrivacyPattern.vulnerabilities, Vulnerability, vulnerability_id),
+    ):
+        values = filter_values(value)
+        if not values:
+            continue
+        if taxonomy_match == "any":
+            conditions.append(relation.any(model.id.in_(values)))
+        else:
+            conditions.extend(relation.any(model.id == v) for v in values)
+    return conditions
+
+
 class SearchService:
     """
     Servizio per la ricerca di Privacy Patterns.
-    Questa implementazione sostituisce Elasticsearch con ricerca SQL.
+    Questa implementazione sostituisce Elasticsearch con un indice in memoria
+    e usa la ricerca SQL come fallback.
     """
     
     def __init__(self):
@@ -28,7 +121,18 @@ class SearchService:
         Nota: mantenuto es=None per compatibilità con il codice esistente.
         """
         self.es = None  # Mantenuto per compatibilità, ma non usato
-        logger.info("Inizializzato servizio di ricerca basato su SQL (senza Elasticsearch)")
+        self.index = pattern_index
+        self.autocomplete = autocomplete_index
+        self.related = related_index
+        self.unified = unified_index
+        self.cache = search_cache
+        # Serializza le ricostruzioni degli indici
+        self._build_lock = threading.RLock()
+        # Serializza le scritture sugli indici con la sostituzione a fine ricostruzione
+        self._write_lock = threading.Lock()
+        # Scritture avvenute durante una ricostruzione: {pattern_id: documento o None se rimosso}
+        self._journal: Optional[Dict[int, Optional[Dict[str, Any]]]] = None
+        logger.info("Inizializzato servizio di ricerca con indice in memoria (senza Elasticsearch)")
     
     def search_patterns(
         self, 
@@ -36,17 +140,326 @@ class SearchService:
         query: Optional[str] = None,
         strategy: Optional[str] = None,
         mvc_component: Optional[str] = None,
-        gdpr_id: Optional[int] = None,
-        pbd_id: Optional[int] = None,
-        iso_id: Optional[int] = None,
-        vulnerability_id: Optional[int] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
+        from_pos: int = 0,
+        size: int = 10,
+        facets: bool = False,
+        taxonomy_match: str = "all",
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fuzzy: bool = False,
+        highlight: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Cerca pattern usando l'indice in memoria, o il database se l'indice
+        non è ancora disponibile o se SEARCH_ENGINE è "database".
+        
+        Con facets=True i conteggi per strategia, componente MVC e tassonomie
+        del risultato filtrato vengono calcolati dall'indice in memoria e
+        restituiti nella chiave "facets"; sul database non sono disponibili.
+        
+        I filtri tassonomici accettano uno o più ID, combinati in AND
+        (taxonomy_match="all") o in OR (taxonomy_match="any").
+        
+        Ogni risposta include "next_cursor": passandolo come cursor si
+        ottiene la pagina successiva senza OFFSET. Con include_total=False
+        le ricerche sul database non eseguono il COUNT e "total" è None.
+        
+        I risultati sono memorizzati per firma normalizzata della richiesta
+        e la cache viene svuotata a ogni modifica dei pattern indicizzati.
+        
+        fuzzy=True tollera errori di battitura espandendo i termini sul
+        vocabolario dell'indice in memoria; sul database viene ignorato.
+        
+        highlight=True aggiunge a ogni risultato "highlights", gli snippet
+        dei campi che contengono i termini della query, ricavati dalle
+        posizioni salvate nell'indice in memoria; sul database viene ignorato.
+        
+        Con un profilo attivo (vedi src.utils.profiling) la cache non viene
+        usata, così il profilo descrive l'esecuzione effettiva della ricerca.
+        """
+        use_index = self._use_index()
+        profile = current_profile()
+        if profile:
+            profile.annotate(cache="bypassed")
+            return self._search_patterns_uncached(
+                db=db,
+                use_index=use_index,
+                query=query,
+                strategy=strategy,
+                mvc_component=mvc_component,
+                gdpr_id=gdpr_id,
+                pbd_id=pbd_id,
+                iso_id=iso_id,
+                vulnerability_id=vulnerability_id,
+                from_pos=from_pos,
+                size=size,
+                facets=facets,
+                taxonomy_match=taxonomy_match,
+                cursor=cursor,
+                include_total=include_total,
+                fuzzy=fuzzy,
+                highlight=highlight
+            )
+        
+        signature = self._signature(
+            use_index,
+            query=query,
+            strategy=strategy,
+            mvc_component=mvc_component,
+            gdpr_id=gdpr_id,
+            pbd_id=pbd_id,
+            iso_id=iso_id,
+            vulnerability_id=vulnerability_id,
+            taxonomy_match=taxonomy_match,
+            from_pos=from_pos,
+            size=size,
+            facets=facets,
+            cursor=cursor,
+            include_total=include_total,
+            fuzzy=fuzzy,
+            highlight=highlight
+        )
+        cached_result = self.cached_result(signature)
+        if cached_result is not None:
+            return cached_result
+        
+        version = self.result_version()
+        result = self._search_patterns_uncached(
+            db=db,
+            use_index=use_index,
+            query=query,
+            strategy=strategy,
+            mvc_component=mvc_component,
+            gdpr_id=gdpr_id,
+            pbd_id=pbd_id,
+            iso_id=iso_id,
+            vulnerability_id=vulnerability_id,
+            from_pos=from_pos,
+            size=size,
+            facets=facets,
+            taxonomy_match=taxonomy_match,
+            cursor=cursor,
+            include_total=include_total,
+            fuzzy=fuzzy,
+            highlight=highlight
+        )
+        # Gli esiti di errore non vengono memorizzati
+        if "error" not in result:
+            self.store_result(signature, result, version)
+        return result
+    
+    def search_batch(self, db: Session, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Esegue più ricerche di pattern in una sola chiamata.
+        
+        Le ricerche già in cache sono servite dalla cache; le altre vengono
+        eseguite insieme sull'indice in memoria, che condivide analisi dei
+        testi e punteggi dei termini comuni. Senza indice ogni ricerca passa
+        dal database come search_patterns.
+        
+        Args:
+            db (Session): Sessione database
+            requests (List[Dict[str, Any]]): Parametri di ciascuna ricerca, con
+                i nomi degli argomenti di search_patterns
+            
+        Returns:
+            List[Dict[str, Any]]: Risultati nello stesso ordine delle richieste
+        """
+        use_index = self._use_index()
+        if not use_index:
+            return [self.search_patterns(db, **request) for request in requests]
+        
+        results: List[Optional[Dict[str, Any]]] = []
+        pending: List[int] = []
+        signatures = [self._signature(True, **request) for request in requests]
+        for position, signature in enumerate(signatures):
+            results.append(self.cached_result(signature))
+            if results[-1] is None:
+                pending.append(position)
+        
+        if pending:
+            version = self.result_version()
+            try:
+                computed = self.index.search_batch([
+                    {key: value for key, value in requests[position].items() if key != "include_total"}
+                    for position in pending
+                ])
+            except InvalidCursorException:
+                raise
+            except Exception as e:
+                logger.warning(f"Ricerca multipla su indice fallita, eseguo le ricerche singolarmente: {str(e)}")
+                return [self.search_patterns(db, **request) for request in requests]
+            for position, result in zip(pending, computed):
+                self.store_result(signatures[position], result, version)
+                results[position] = result
+        return results
+    
+    def cached_result(self, signature: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Restituisce una copia del risultato memorizzato per una firma di ricerca.
+        
+        Args:
+            signature (Tuple[Any, ...]): Firma prodotta da search_signature
+            
+        Returns:
+            Optional[Dict[str, Any]]: Risultato, o None se assente o scaduto
+        """
+        result = self.cache.get(signature_key(signature))
+        return copy_result(result) if result is not None else None
+    
+    def result_version(self) -> Tuple[int, ...]:
+        """Versione dei risultati memorizzati, da leggere prima di calcolare un risultato."""
+        return self.cache.version((PATTERN_LIST_TAG,))
+    
+    def store_result(self, signature: Tuple[Any, ...], result: Dict[str, Any], version: Tuple[int, ...]) -> bool:
+        """
+        Memorizza un risultato se nessuna scrittura sui pattern è avvenuta nel frattempo.
+        
+        Args:
+            signature (Tuple[Any, ...]): Firma prodotta da search_signature
+            result (Dict[str, Any]): Risultato della ricerca
+            version (Tuple[int, ...]): Versione letta con result_version prima
+                di calcolare il risultato
+            
+        Returns:
+            bool: True se il risultato è stato memorizzato
+        """
+        return self.cache.set(
+            signature_key(signature),
+            copy_result(result),
+            ttl=settings.SEARCH_CACHE_TTL or None,
+            tags=(PATTERN_LIST_TAG,),
+            version=version
+        )
+    
+    def invalidate_results(self) -> None:
+        """Invalida i risultati di ricerca memorizzati dopo una modifica ai pattern."""
+        self.cache.invalidate_tags([PATTERN_LIST_TAG])
+    
+    def _use_index(self) -> bool:
+        # L'indice in memoria è usato se pronto, salvo configurazione diversa
+        return settings.SEARCH_ENGINE != "database" and self.index.is_ready
+    
+    def _signature(
+        self,
+        use_index: bool,
+        query: Optional[str] = None,
+        strategy: Optional[str] = None,
+        mvc_component: Optional[str] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
+        taxonomy_match: str = "all",
+        from_pos: int = 0,
+        size: int = 10,
+        facets: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fuzzy: bool = False,
+        highlight: bool = False
+    ) -> Tuple[Any, ...]:
+        """
+        Firma di cache di una ricerca di pattern.
+        
+        Le opzioni che il database ignora (fuzzy, highlight) non distinguono
+        le ricerche eseguite senza indice.
+        """
+        return search_signature(
+            query=query,
+            strategy=strategy,
+            mvc_component=mvc_component,
+            gdpr_id=gdpr_id,
+            pbd_id=pbd_id,
+            iso_id=iso_id,
+            vulnerability_id=vulnerability_id,
+            taxonomy_match=taxonomy_match,
+            ordered_query=not use_index,
+            from_pos=from_pos if not cursor else 0,
+            size=size,
+            facets=facets,
+            cursor=cursor,
+            include_total=include_total,
+            fuzzy=fuzzy and use_index,
+            highlight=highlight and use_index
+        )
+    
+    def _search_patterns_uncached(
+        self,
+        db: Session,
+        use_index: bool,
+        query: Optional[str] = None,
+        strategy: Optional[str] = None,
+        mvc_component: Optional[str] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
         from_pos: int = 0,
-        size: int = 10
+        size: int = 10,
+        facets: bool = False,
+        taxonomy_match: str = "all",
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fuzzy: bool = False,
+        highlight: bool = False
     ) -> Dict[str, Any]:
         """
-        Implementazione di ricerca basata su SQL.
+        Esegue la ricerca senza passare dalla cache dei risultati.
         """
-        # Implementare qui la logica di ricerca con SQLAlchemy
+        profile = current_profile()
+        if use_index:
+            try:
+                if profile:
+                    profile.annotate(engine="index")
+                return self.index.search(
+                    query=query,
+                    strategy=strategy,
+                    mvc_component=mvc_component,
+                    gdpr_id=gdpr_id,
+                    pbd_id=pbd_id,
+                    iso_id=iso_id,
+                    vulnerability_id=vulnerability_id,
+                    from_pos=from_pos,
+                    size=size,
+                    facets=facets,
+                    taxonomy_match=taxonomy_match,
+                    cursor=cursor,
+                    fuzzy=fuzzy,
+                    highlight=highlight
+                )
+            except InvalidCursorException:
+                raise
+            except Exception as e:
+                logger.warning(f"Ricerca su indice fallita, uso il database: {str(e)}")
+        
+        if query:
+            if profile:
+                profile.annotate(engine="fulltext")
+            result = self._db_fulltext_search(
+                db=db,
+                query=query,
+                strategy=strategy,
+                mvc_component=mvc_component,
+                gdpr_id=gdpr_id,
+                pbd_id=pbd_id,
+                iso_id=iso_id,
+                vulnerability_id=vulnerability_id,
+                from_pos=from_pos,
+                size=size,
+                taxonomy_match=taxonomy_match,
+                cursor=cursor,
+                include_total=include_total
+            )
+            if result is not None:
+                return result
+        
+        if profile:
+            profile.annotate(engine="like")
         return self._db_search_fallback(
             db=db, 
             query=query, 
@@ -57,24 +470,150 @@ class SearchService:
             iso_id=iso_id, 
             vulnerability_id=vulnerability_id, 
             from_pos=from_pos, 
-            size=size
+            size=size,
+            taxonomy_match=taxonomy_match,
+            cursor=cursor,
+            include_total=include_total
         )
     
+    def _db_fulltext_search(
+        self,
+        db: Session,
+        query: str,
+        strategy: Optional[str] = None,
+        mvc_component: Optional[str] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
+        from_pos: int = 0,
+        size: int = 10,
+        taxonomy_match: str = "all",
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Ricerca pattern con gli indici full-text del database.
+        
+        Su PostgreSQL usa websearch_to_tsquery sulla colonna search_vector
+        (indice GIN) con ranking ts_rank_cd; su SQLite la tabella FTS5 con
+        ranking bm25. I filtri tassonomici sono sottoquery EXISTS, così non
+        servono join né DISTINCT. Il cursore codifica (rank, id) dell'ultimo
+        risultato.
+        
+        Returns:
+            Risultati nel formato {"total", "results", "next_cursor"}, o None se la ricerca
+            full-text non è utilizzabile e va usato il fallback LIKE
+        """
+        try:
+            backend = fulltext_backend(db.get_bind())
+            
+            if backend == "postgresql":
+                ts_query = func.websearch_to_tsquery(TS_CONFIG, query)
+                vector = literal_column("privacy_patterns.search_vector")
+                # ts_rank_cd restituisce un real: il cast evita che il rank
+                # memorizzato nel cursore (double) non sia più uguale a quello
+                # ricalcolato, saltando i pari merito a cavallo delle pagine
+                rank = cast(func.ts_rank_cd(vector, ts_query), Double)
+                base_query = db.query(PrivacyPattern, rank.label("rank")).filter(
+                    vector.op("@@")(ts_query)
+                )
+            elif backend == "sqlite":
+                with profile_stage("analyze"):
+                    match = to_fts5_query(query)
+                if match is None:
+                    return {"total": 0, "results": [], "next_cursor": None}
+                weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+                # bm25() restituisce valori negativi: più basso è migliore
+                rank = literal_column(f"-bm25({FTS_TABLE}, {weights})")
+                fts = table(FTS_TABLE, column("rowid"))
+                base_query = db.query(PrivacyPattern, rank.label("rank")).join(
+                    fts, fts.c.rowid == PrivacyPattern.id
+                ).filter(
+                    literal_column(FTS_TABLE).op("MATCH")(match)
+                )
+            else:
+                return None
+            
+            if strategy:
+                base_query = base_query.filter(PrivacyPattern.strategy == strategy)
+            if mvc_component:
+                base_query = base_query.filter(PrivacyPattern.mvc_component == mvc_component)
+            for condition in taxonomy_conditions(gdpr_id, pbd_id, iso_id, vulnerability_id, taxonomy_match):
+                base_query = base_query.filter(condition)
+            
+            profile = current_profile()
+            total = None
+            if include_total:
+                with profile_stage("count"):
+                    total = base_query.count()
+                if profile:
+                    profile.count("text_match", total)
+            
+            with profile_stage("fetch"):
+                rows, next_cursor = paginate_keyset(
+                    base_query.options(
+                        noload(PrivacyPattern.gdpr_articles),
+                        noload(PrivacyPattern.pbd_principles),
+                        noload(PrivacyPattern.iso_phases),
+                        noload(PrivacyPattern.vulnerabilities)
+                    ),
+                    [(rank, True), (PrivacyPattern.id, False)],
+                    size,
+                    cursor=cursor,
+                    offset=from_pos,
+                    key=lambda row: (float(row[1] or 0.0), row[0].id)
+                )
+            if profile:
+                profile.count("page", len(rows))
+            
+            results = []
+            for pattern, score in rows:
+                results.append({
+                    "id": pattern.id,
+                    "title": pattern.title,
+                    "description": pattern.description,
+                    "strategy": pattern.strategy,
+                    "mvc_component": pattern.mvc_component,
+                    "created_at": pattern.created_at.isoformat() if pattern.created_at else None,
+                    "updated_at": pattern.updated_at.isoformat() if pattern.updated_at else None,
+                    "score": round(float(score or 0.0), 4)
+                })
+                if profile:
+                    profile.add_hit(pattern.id, results[-1]["score"], {f"{backend}_rank": results[-1]["score"]})
+            
+            return {
+                "total": total,
+                "results": results,
+                "next_cursor": next_cursor
+            }
+            
+        except SQLAlchemyError as e:
+            logger.warning(f"Ricerca full-text fallita, uso le query LIKE: {str(e)}")
+            db.rollback()
+            return None
+    
     def _db_search_fallback(
         self,
         db: Session,
         query: Optional[str] = None,
         strategy: Optional[str] = None,
         mvc_component: Optional[str] = None,
-        gdpr_id: Optional[int] = None,
-        pbd_id: Optional[int] = None,
-        iso_id: Optional[int] = None,
-        vulnerability_id: Optional[int] = None,
+        gdpr_id: TaxonomyFilter = None,
+        pbd_id: TaxonomyFilter = None,
+        iso_id: TaxonomyFilter = None,
+        vulnerability_id: TaxonomyFilter = None,
         from_pos: int = 0,
-        size: int = 10
+        size: int = 10,
+        taxonomy_match: str = "all",
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> Dict[str, Any]:
         """
         Ricerca pattern nel database usando SQLAlchemy.
+        
+        Senza punteggio i risultati sono ordinati per ID, che fa anche da
+        chiave del cursore.
         """
         try:
             # Costruzione della query base
@@ -83,9 +622,12 @@ class SearchService:
             # Applicazione dei filtri
             query_filters = []
             
-            # Ricerca testuale
+            # Ricerca testuale sulle radici dei termini, senza stopword
             if query:
-                search_terms = query.lower().split()
+                with profile_stage("analyze"):
+                    search_terms = list(dict.fromkeys(LIKE_ANALYZER(query)))
+                if not search_terms:
+                    return {"total": 0, "results": [], "next_cursor": None}
                 for term in search_terms:
                     like_term = f"%{term}%"
                     query_filters.append(
@@ -106,34 +648,31 @@ class SearchService:
             if mvc_component:
                 query_filters.append(PrivacyPattern.mvc_component == mvc_component)
             
-            if gdpr_id:
-                base_query = base_query.join(PrivacyPattern.gdpr_articles)
-                query_filters.append(GDPRArticle.id == gdpr_id)
-            
-            if pbd_id:
-                base_query = base_query.join(PrivacyPattern.pbd_principles)
-                query_filters.append(PbDPrinciple.id == pbd_id)
-            
-            if iso_id:
-                base_query = base_query.join(PrivacyPattern.iso_phases)
-                query_filters.append(ISOPhase.id == iso_id)
-            
-            if vulnerability_id:
-                base_query = base_query.join(PrivacyPattern.vulnerabilities)
-                query_filters.append(Vulnerability.id == vulnerability_id)
+            # Filtri tassonomici come EXISTS: nessuna riga duplicata da deduplicare
+            query_filters.extend(
+                taxonomy_conditions(gdpr_id, pbd_id, iso_id, vulnerability_id, taxonomy_match)
+            )
             
             # Applica tutti i filtri
             if query_filters:
                 base_query = base_query.filter(and_(*query_filters))
             
-            # Assicurati che i risultati siano unici
-            base_query = base_query.distinct()
-            
             # Conteggio totale per paginazione
-            total = base_query.count()
+            profile = current_profile()
+            total = None
+            if include_total:
+                with profile_stage("count"):
+                    total = base_query.count()
+                if profile:
+                    profile.count("matched", total)
             
             # Applicazione paginazione
-            patterns = base_query.offset(from_pos).limit(size).all()
+            with profile_stage("fetch"):
+                patterns, next_cursor = paginate_keyset(
+                    base_query, [(PrivacyPattern.id, False)], size, cursor=cursor, offset=from_pos
+                )
+            if profile:
+                profile.count("page", len(patterns))
             
             # Conversione per mantenere la compatibilità con l'interfaccia precedente
             results = []
@@ -151,9 +690,12 @@ class SearchService:
             
             return {
                 "total": total,
-                "results": results
+                "results": results,
+                "next_cursor": next_cursor
             }
             
+        except InvalidCursorException:
+            raise
         except SQLAlchemyError as e:
             logger.error(f"Errore SQL durante la ricerca: {str(e)}")
             return {"total": 0, "results": [], "error": "db_error"}
@@ -161,6 +703,53 @@ class SearchService:
             logger.error(f"Errore generico durante la ricerca: {str(e)}")
             return {"total": 0, "results": [], "error": "general_error"}
     
+    def search_all(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 10,
+        per_type: int = 5,
+        types: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Ricerca globale su pattern, articoli GDPR e FAQ.
+        
+        Interroga una sola volta l'indice unificato e unisce i risultati per
+        punteggio, con al più per_type risultati per tipo. L'indice è
+        costruito all'avvio o dal job di ricostruzione, mai durante la
+        richiesta.
+        
+        Args:
+            db (Session): Sessione database
+            query (str): Query testuale
+            limit (int): Numero massimo di risultati complessivi
+            per_type (int): Numero massimo di risultati per tipo
+            types (List[str], optional): Tipi da includere (pattern, gdpr, faq)
+            
+        Returns:
+            Dict[str, Any]: {"total": {tipo: corrispondenze}, "results": [...]}
+            
+        Raises:
+            ServiceUnavailableException: Se l'indice non è ancora stato costruito
+        """
+        signature = search_signature(
+            query=query,
+            listing="all",
+            limit=limit,
+            per_type=per_type,
+            types=tuple(sorted(set(types))) if types else None
+        )
+        cached_result = self.cached_result(signature)
+        if cached_result is not None:
+            return cached_result
+        
+        if not self.unified.is_ready:
+            raise ServiceUnavailableException("Indice di ricerca globale in costruzione, riprovare tra poco")
+        version = self.result_version()
+        result = self.unified.search(query, limit=limit, per_type=per_type, types=types)
+        self.store_result(signature, result, version)
+        return result
+    
     def get_autocomplete_suggestions(
         self, 
         db: Session,
@@ -169,10 +758,31 @@ class SearchService:
     ) -> List[Dict[str, Any]]:
         """
         Ottiene suggerimenti di autocompletamento basati sul query utente.
+        
+        Usa l'indice per prefisso in memoria (pattern, strategie e articoli
+        GDPR ordinati per popolarità) e ricade sul database se non è ancora
+        stato costruito.
         """
         if not query or not db:
             return []
         
+        if self.autocomplete.is_ready:
+            try:
+                return self.autocomplete.suggest(query, limit)
+            except Exception as e:
+                logger.warning(f"Autocomplete su indice fallito, uso il database: {str(e)}")
+        
+        return self._db_autocomplete_fallback(db, query, limit)
+    
+    def _db_autocomplete_fallback(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Suggerimenti di autocompletamento tramite query LIKE sul database.
+        """
         try:
             # Query SQL con LIKE per imitare autocomplete
             like_term = f"%{query}%"
@@ -187,14 +797,13 @@ class SearchService:
             
             suggestions = []
             for pattern in patterns:
-                # Crea un excerpt della descrizione
-                description = pattern.description[:50] + "..." if pattern.description and len(pattern.description) > 50 else pattern.description or ""
-                
                 suggestions.append({
+                    "type": "pattern",
                     "id": pattern.id,
+                    "text": pattern.title,
                     "title": pattern.title,
                     "strategy": pattern.strategy,
-                    "description": description,
+                    "description": excerpt(pattern.description),
                     "score": 1.0  # Placeholder score
                 })
             
@@ -204,15 +813,320 @@ class SearchService:
             logger.error(f"Errore nell'autocomplete: {str(e)}")
             return []
     
-    # Metodi stub per compatibilità con il codice esistente
-    def index_pattern(self, pattern) -> bool:
-        """Stub per compatibilità."""
-        return True
+    def index_pattern(self, pattern: PrivacyPattern) -> bool:
+        """
+        Indicizza o aggiorna un pattern nell'indice di ricerca.
+        
+        Args:
+            pattern (PrivacyPattern): Pattern da indicizzare
+            
+        Returns:
+            bool: True se l'indicizzazione è riuscita
+        """
+        # La cache va svuotata anche se l'indicizzazione fallisce: il database è cambiato
+        self.invalidate_results()
+        try:
+            doc = pattern_document(pattern)
+            with self._write_lock:
+                self.index.add_document(doc)
+                self.related.add_document(doc)
+                self.unified.add(pattern_entry(doc))
+                self.autocomplete.add_pattern(pattern)
+                if self._journal is not None:
+                    self._journal[doc["id"]] = doc
+            return True
+        except Exception as e:
+            logger.error(f"Errore nell'indicizzazione del pattern {getattr(pattern, 'id', None)}: {str(e)}")
+            return False
     
     def remove_pattern_from_index(self, pattern_id: int) -> bool:
-        """Stub per compatibilità."""
+        """
+        Rimuove un pattern dall'indice di ricerca.
+        
+        Args:
+            pattern_id (int): ID del pattern da rimuovere
+            
+        Returns:
+            bool: True se l'operazione è riuscita
+        """
+        self.invalidate_results()
+        try:
+            with self._write_lock:
+                self.index.remove_pattern(pattern_id)
+                self.related.remove_pattern(pattern_id)
+                self.unified.remove("pattern", pattern_id)
+                self.autocomplete.remove_pattern(pattern_id)
+                if self._journal is not None:
+                    self._journal[pattern_id] = None
+            return True
+        except Exception as e:
+            logger.error(f"Errore nella rimozione del pattern {pattern_id} dall'indice: {str(e)}")
+            return False
+    
+    def reindex_all_patterns(self, db: Session, progress: Optional["ReindexProgress"] = None) -> bool:
+        """
+        Ricostruisce gli indici di ricerca, dei pattern correlati, della
+        ricerca globale e di autocompletamento con tutti i pattern del
+        database (e con articoli GDPR e FAQ per la ricerca globale).
+        
+        I pattern sono letti a blocchi di REINDEX_CHUNK_SIZE righe, una volta
+        per indice, senza tenere in memoria l'intero insieme dei documenti.
+        Ogni indice è costruito accanto a quello in uso, che continua a
+        rispondere alle ricerche, e lo sostituisce appena completato: in
+        ogni momento esiste al più una copia in più di un solo indice. Le
+        scritture avvenute durante la ricostruzione sono applicate anche ai
+        nuovi indici prima di ciascuna sostituzione. Le relazioni
+        tassonomiche sono lette direttamente dalle tabelle di associazione,
+        con un numero costante di query.
+        
+        Args:
+            db (Session): Sessione database
+            progress (ReindexProgress, optional): Avanzamento da aggiornare
+            
+        Returns:
+            bool: True se la ricostruzione è riuscita
+        """
+        return self.build_indexes(db, REINDEX_PHASES, progress)
+    
+    def build_indexes(
+        self,
+        db: Session,
+        indexes: Sequence[str],
+        progress: Optional["ReindexProgress"] = None
+    ) -> bool:
+        """
+        Ricostruisce dal database solo gli indici indicati.
+        
+        Le ricerche continuano a usare gli indici in uso durante la
+        costruzione, come in reindex_all_patterns.
+        
+        Args:
+            db (Session): Sessione database
+            indexes (Sequence[str]): Nomi degli indici, tra REINDEX_PHASES
+            progress (ReindexProgress, optional): Avanzamento da aggiornare
+            
+        Returns:
+            bool: True se la ricostruzione è riuscita
+        """
+        return self._rebuild_indexes(db, tuple(indexes), progress=progress)
+    
+    def missing_indexes(self) -> Tuple[str, ...]:
+        """
+        Indici non ancora costruiti, nell'ordine di REINDEX_PHASES.
+        
+        Succede all'avvio quando l'indice dei pattern è stato caricato da
+        snapshot: gli altri indici vanno costruiti in background (vedi
+        ReindexJob) e nel frattempo le richieste ricadono sul database.
+        """
+        indexes = {
+            "patterns": self.index,
+            "related": self.related,
+            "unified": self.unified,
+            "autocomplete": self.autocomplete,
+        }
+        return tuple(name for name in REINDEX_PHASES if not indexes[name].is_ready)
+    
+    def load_or_build_index(self, db: Session) -> bool:
+        """
+        Prepara l'indice di ricerca all'avvio del processo.
+        
+        Se SEARCH_INDEX_SNAPSHOT indica uno snapshot aggiornato (stesso
+        formato, stessa configurazione dell'indice e stessi dati) l'indice
+        dei pattern viene mappato dal file senza leggere il database, e le
+        pagine sono condivise tra i worker. Altrimenti tutti gli indici sono
+        ricostruiti e lo snapshot viene riscritto per i processi successivi.
+        Gli indici secondari (correlati, ricerca globale, autocompletamento)
+        di un indice caricato da snapshot restano da costruire: vedi
+        missing_indexes.
+        
+        Args:
+            db (Session): Sessione database
+            
+        Returns:
+            bool: True se l'indice dei pattern è pronto
+        """
+        path = settings.SEARCH_INDEX_SNAPSHOT
+        if not path or settings.SEARCH_ENGINE == "database":
+            return self.reindex_all_patterns(db)
+        
+        try:
+            fingerprint = self.data_fingerprint(db)
+        except SQLAlchemyError as e:
+            logger.error(f"Impossibile calcolare l'impronta dei dati indicizzati: {str(e)}")
+            return self.reindex_all_patterns(db)
+        
+        if self.index.load_snapshot(path, fingerprint):
+            self.invalidate_results()
+            return True
+        
+        if not self.reindex_all_patterns(db):
+            return False
+        self.save_snapshot(fingerprint)
         return True
     
-    def reindex_all_patterns(self, db: Session) -> bool:
-        """Stub per compatibilità."""
-        return True
\ No newline at end of file
+    def save_snapshot(self, fingerprint: str) -> bool:
+        """
+        Salva l'indice dei pattern nello snapshot SEARCH_INDEX_SNAPSHOT.
+        
+        Args:
+            fingerprint (str): Impronta dei dati da cui è stato costruito
+                l'indice (vedi data_fingerprint)
+            
+        Returns:
+            bool: True se lo snapshot è stato scritto
+        """
+        path = settings.SEARCH_INDEX_SNAPSHOT
+        if not path or not self.index.is_ready:
+            return False
+        try:
+            self.index.save_snapshot(path, fingerprint)
+            return True
+        except OSError as e:
+            logger.warning(f"Impossibile salvare lo snapshot dell'indice di ricerca in {path}: {str(e)}")
+            return False
+    
+    def data_fingerprint(self, db: Session) -> str:
+        """
+        Impronta dei dati indicizzati, per riconoscere uno snapshot obsoleto.
+        
+        Combina numero, ID massimo e ultima modifica dei pattern con
+        conteggio e somme delle tabelle di associazione, con una query
+        aggregata per tabella.
+        
+        Args:
+            db (Session): Sessione database
+            
+        Returns:
+            str: Impronta dei dati
+        """
+        parts = list(db.query(
+            func.count(PrivacyPattern.id),
+            func.max(PrivacyPattern.id),
+            func.max(PrivacyPattern.updated_at)
+        ).one())
+        for table, column in LINK_TABLES.values():
+            parts.extend(db.execute(select(
+                func.count(),
+                func.coalesce(func.sum(table.c.pattern_id), 0),
+                func.coalesce(func.sum(table.c[column]), 0)
+            )).one())
+        return "|".join(str(part) for part in parts)
+    
+    def _rebuild_indexes(
+        self,
+        db: Session,
+        indexes: Tuple[str, ...],
+        progress: Optional["ReindexProgress"] = None
+    ) -> bool:
+        # Ricostruisce dal database gli indici indicati (nomi di REINDEX_PHASES)
+        with self._build_lock:
+            with self._write_lock:
+                self._journal = {}
+            try:
+                return self._build_and_swap(db, indexes, progress)
+            except Exception as e:
+                logger.error(f"Errore nella ricostruzione dell'indice di ricerca: {str(e)}")
+                return False
+            finally:
+                with self._write_lock:
+                    self._journal = None
+    
+    def _build_and_swap(
+        self,
+        db: Session,
+        indexes: Tuple[str, ...],
+        progress: Optional["ReindexProgress"]
+    ) -> bool:
+        links: Dict[str, Dict[int, set]] = {}
+        for key, (table, column) in LINK_TABLES.items():
+            by_pattern = defaultdict(set)
+            rows = db.execute(select(table.c.pattern_id, table.c[column]))
+            for pattern_id, linked_id in rows:
+                by_pattern[pattern_id].add(linked_id)
+            links[key] = by_pattern
+        total = db.query(func.count(PrivacyPattern.id)).scalar() or 0
+        
+        # Ogni fase rilegge i pattern dal database a blocchi: i documenti non
+        # restano in memoria accanto agli indici in costruzione
+        for phase in indexes:
+            if progress is not None:
+                progress.start_phase(phase, total)
+            documents = self._tracked(self._stream_documents(db, links), progress)
+            if phase == "patterns":
+                live, fresh = self.index, PatternSearchIndex()
+                fresh.rebuild(documents)
+            elif phase == "related":
+                live, fresh = self.related, RelatedPatternsIndex()
+                fresh.rebuild(documents)
+            elif phase == "unified":
+                articles = db.query(
+                    GDPRArticle.id, GDPRArticle.number, GDPRArticle.title,
+                    GDPRArticle.summary, GDPRArticle.content
+                ).yield_per(REINDEX_CHUNK_SIZE)
+                live, fresh = self.unified, UnifiedSearchIndex()
+                fresh.rebuild(chain(
+                    (pattern_entry(doc) for doc in documents),
+                    (gdpr_entry(row) for row in articles),
+                    (faq_entry(faq) for faq in faq_service.get_all_faqs())
+                ))
+            elif phase == "autocomplete":
+                articles = {
+                    row.id: (row.number, row.title)
+                    for row in db.query(GDPRArticle.id, GDPRArticle.number, GDPRArticle.title)
+                }
+                live, fresh = self.autocomplete, AutocompleteIndex()
+                fresh.rebuild(documents, articles)
+            else:
+                raise ValueError(f"Indice di ricerca sconosciuto: {phase}")
+            # L'indice è sostituito appena costruito: la memoria resta
+            # raddoppiata solo per l'indice della fase in corso
+            self._swap(live, fresh)
+        return True
+    
+    def _swap(self, live: Any, fresh: Any) -> None:
+        # Le scritture avvenute durante la costruzione vengono applicate al
+        # nuovo indice mentre le nuove scritture sono bloccate; il giornale
+        # resta valido per gli indici delle fasi successive
+        with self._write_lock:
+            for pattern_id, doc in self._journal.items():
+                if isinstance(fresh, UnifiedSearchIndex):
+                    if doc is None:
+                        fresh.remove("pattern", pattern_id)
+                    else:
+                        fresh.add(pattern_entry(doc))
+                elif doc is None:
+                    fresh.remove_pattern(pattern_id)
+                else:
+                    fresh.add_document(doc)
+            live.replace(fresh)
+            self.invalidate_results()
+    
+    def _stream_documents(self, db: Session, links: Dict[str, Dict[int, set]]) -> Iterator[Dict[str, Any]]:
+        # Legge i pattern a blocchi di REINDEX_CHUNK_SIZE righe
+        patterns = db.query(PrivacyPattern).options(
+            noload(PrivacyPattern.gdpr_articles),
+            noload(PrivacyPattern.pbd_principles),
+            noload(PrivacyPattern.iso_phases),
+            noload(PrivacyPattern.vulnerabilities)
+        ).yield_per(REINDEX_CHUNK_SIZE)
+        for pattern in patterns:
+            doc = pattern_document(
+                pattern,
+                links={key: by_pattern.get(pattern.id, ()) for key, by_pattern in links.items()}
+            )
+            yield doc
+    
+    @staticmethod
+    def _tracked(
+        documents: Iterable[Dict[str, Any]],
+        progress: Optional["ReindexProgress"]
+    ) -> Iterator[Dict[str, Any]]:
+        # Conta i documenti elaborati nella fase corrente
+        for doc in documents:
+            yield doc
+            if progress is not None:
+                progress.advance()
+
+
+# Istanza condivisa del servizio di ricerca
+search_service = SearchService()
\ No newline at end of file
@@ -0,0 +1,253 @@
+# src/services/unified_index.py
+"""
+Indice di ricerca unificato per pattern, articoli GDPR e FAQ.
+
+Un solo indice invertito BM25 contiene tutte le entità, identificate da
+(tipo, ID): la ricerca globale interroga l'indice una volta e unisce i
+risultati per punteggio, con un numero massimo di risultati per tipo.
+"""
+import heapq
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from src.services.search_index import FIELD_BOOSTS
+from src.services.autocomplete_index import excerpt
+from src.services.faq_service import FAQ_BOOSTS
+from src.utils.search import InvertedIndex
+from src.utils.synonyms import query_expander
+
+logger = logging.getLogger(__name__)
+
+# Peso dei campi testuali per tipo di entità
+ENTITY_BOOSTS: Dict[str, Mapping[str, float]] = {
+    "pattern": FIELD_BOOSTS,
+    "gdpr": {"number": 3.0, "title": 3.0, "summary": 2.0, "content": 1.0},
+    "faq": FAQ_BOOSTS,
+}
+
+# Tipi di entità ricercabili, nell'ordine usato a parità di punteggio
+ENTITY_TYPES: Tuple[str, ...] = tuple(ENTITY_BOOSTS)
+
+# Lunghezza dell'estratto restituito con ogni risultato
+EXCERPT_LENGTH = 160
+
+# Chiave di un'entità nell'indice
+EntityKey = Tuple[str, int]
+
+
+def pattern_entry(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Voce dell'indice unificato per un pattern.
+
+    Args:
+        doc: Documento prodotto da pattern_document
+
+    Returns:
+        Dict[str, Any]: Voce da indicizzare
+    """
+    return {
+        "type": "pattern",
+        "id": doc["id"],
+        "title": doc["title"],
+        "excerpt": doc["description"],
+        "fields": doc["fields"],
+    }
+
+
+def gdpr_entry(article: Any) -> Dict[str, Any]:
+    """
+    Voce dell'indice unificato per un articolo GDPR.
+
+    Args:
+        article: GDPRArticle (o riga con id, number, title, summary, content)
+
+    Returns:
+        Dict[str, Any]: Voce da indicizzare
+    """
+    return {
+        "type": "gdpr",
+        "id": article.id,
+        "title": f"Art. {article.number} - {article.title}",
+        "excerpt": article.summary or article.content,
+        "fields": {field: getattr(article, field) for field in ENTITY_BOOSTS["gdpr"]},
+    }
+
+
+def faq_entry(faq: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Voce dell'indice unificato per una FAQ.
+
+    Args:
+        faq: FAQ come restituita da FAQService
+
+    Returns:
+        Dict[str, Any]: Voce da indicizzare
+    """
+    return {
+        "type": "faq",
+        "id": faq["id"],
+        "title": faq["question"],
+        "excerpt": faq["answer"],
+        "fields": {"question": faq["question"], "answer": faq["answer"]},
+    }
+
+
+class UnifiedSearchIndex:
+    """
+    Indice in memoria di tutte le entità ricercabili.
+
+    Viene popolato con rebuild e aggiornato per i pattern a ogni scrittura;
+    articoli GDPR e FAQ cambiano solo con una ricostruzione.
+    """
+
+    def __init__(self):
+        """Inizializza un indice vuoto e non ancora pronto."""
+        self._text = InvertedIndex()
+        self._entries: Dict[EntityKey, Dict[str, Any]] = {}
+        self._ready = False
+        self._lock = threading.RLock()
+
+    @property
+    def is_ready(self) -> bool:
+        """True se l'indice è stato costruito ed è utilizzabile."""
+        return self._ready
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ricostruisce l'indice con l'insieme completo delle voci.
+
+        Args:
+            entries: Voci prodotte da pattern_entry, gdpr_entry e faq_entry
+
+        Returns:
+            int: Numero di voci indicizzate
+        """
+        text = InvertedIndex()
+        indexed: Dict[EntityKey, Dict[str, Any]] = {}
+        for entry in entries:
+            key = (entry["type"], entry["id"])
+            text.add_document(key, entry["fields"], ENTITY_BOOSTS[entry["type"]])
+            indexed[key] = entry
+
+        with self._lock:
+            self._text = text
+            self._entries = indexed
+            self._ready = True
+
+        logger.info(f"Indice di ricerca unificato ricostruito: {len(indexed)} voci")
+        return len(indexed)
+
+    def replace(self, other: "UnifiedSearchIndex") -> None:
+        """
+        Sostituisce il contenuto dell'indice con quello di un indice costruito a parte.
+
+        Args:
+            other: Indice da cui prendere lo stato (non va più usato)
+        """
+        with self._lock:
+            self._text = other._text
+            self._entries = other._entries
+            self._ready = other._ready
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """
+        Indicizza o aggiorna una voce.
+
+        Args:
+            entry: Voce prodotta da pattern_entry, gdpr_entry o faq_entry
+        """
+        key = (entry["type"], entry["id"])
+        with self._lock:
+            self._text.add_document(key, entry["fields"], ENTITY_BOOSTS[entry["type"]])
+            self._entries[key] = entry
+
+    def remove(self, entity_type: str, entity_id: int) -> bool:
+        """
+        Rimuove una voce dall'indice.
+
+        Args:
+            entity_type: Tipo dell'entità
+            entity_id: ID dell'entità
+
+        Returns:
+            bool: True se la voce era indicizzata
+        """
+        key = (entity_type, entity_id)
+        with self._lock:
+            self._text.remove_document(key)
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Svuota l'indice e lo marca come non pronto."""
+        with self._lock:
+            self._text = InvertedIndex()
+            self._entries = {}
+            self._ready = False
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        per_type: int = 5,
+        types: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Cerca in tutte le entità con ranking BM25.
+
+        Tutti i termini della query devono essere presenti, o sostituiti da
+        un loro sinonimo (con peso ridotto, vedi src.utils.synonyms). Di ogni tipo si
+        tengono al più per_type risultati, poi i risultati dei diversi tipi
+        sono uniti per punteggio decrescente fino a limit.
+
+        Args:
+            query: Query testuale
+            limit: Numero massimo di risultati complessivi
+            per_type: Numero massimo di risultati per tipo
+            types: Tipi da includere (default: tutti)
+
+        Returns:
+            Dict[str, Any]: {"total": {tipo: corrispondenze}, "results": [...]}
+            con risultati {"type", "id", "title", "excerpt", "score"}
+        """
+        types = [t for t in ENTITY_TYPES if types is None or t in types]
+        totals = dict.fromkeys(types, 0)
+        terms = self._text.analyzer(query)
+        if not terms:
+            return {"total": totals, "results": []}
+
+        with self._lock:
+            scores = self._text.search(query_expander.expand(terms))
+
+            by_type: Dict[str, List[Tuple[EntityKey, float]]] = {t: [] for t in types}
+            for key, score in scores.items():
+                if key[0] in by_type:
+                    by_type[key[0]].append((key, score))
+
+            selected = []
+            for entity_type, items in by_type.items():
+                totals[entity_type] = len(items)
+                selected.extend(heapq.nsmallest(per_type, items, key=lambda item: (-item[1], item[0][1])))
+
+            order = {t: position for position, t in enumerate(ENTITY_TYPES)}
+            selected.sort(key=lambda item: (-item[1], order[item[0][0]], item[0][1]))
+
+            results = []
+            for key, score in selected[:limit]:
+                entry = self._entries[key]
+                results.append({
+                    "type": entry["type"],
+                    "id": entry["id"],
+                    "title": entry["title"],
+                    "excerpt": excerpt(entry["excerpt"], EXCERPT_LENGTH),
+                    "score": round(score, 4),
+                })
+
+        return {"total": totals, "results": results}
+
+
+# Indice condiviso dal processo
+unified_index = UnifiedSearchIndex()
@@ -0,0 +1,200 @@
+"""
+Analizzatori di testo per la ricerca.
+
+Un analizzatore suddivide il testo in token e applica in sequenza una
+catena di filtri (rimozione degli accenti, stopword, stemming leggero).
+La stessa catena va usata in indicizzazione e in interrogazione, così che
+"minimizzazione" e "minimizzare" producano lo stesso termine. Il risultato
+di ogni token è memorizzato in una cache LRU: il vocabolario reale è
+piccolo rispetto al numero di occorrenze.
+"""
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Token alfanumerici (inclusi caratteri accentati)
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Filtro applicato a un token: restituisce il token trasformato o None per scartarlo
+TokenFilter = Callable[[str], Optional[str]]
+
+# Parole funzionali escluse dall'indice, già senza accenti
+STOPWORDS: Dict[str, frozenset] = {
+    "it": frozenset("""
+        a ad al allo ai agli all alla alle anche che chi ci come con col da dal dallo dai dagli
+        dall dalla dalle de degli dei del dell della delle dello di e ed era essere gli ha hanno
+        ho il in lo la le li ma mi ne negli nei nel nell nella nelle nello no non o od per perche
+        piu po puo quale quali quando quanto quella quelle quelli quello questa queste questi
+        questo se si sia sono su sua sue sugli sui sul sull sulla sulle sullo suo suoi tra fra
+        un una uno vi gia cosi ogni
+    """.split()),
+    "en": frozenset("""
+        a an and are as at be been but by can do does for from had has have he her his how if
+        in into is it its me my no not of on or our she so such than that the their them
+        then there these they this those to too was we were what when where which while who
+        why will with would you your
+    """.split()),
+}
+
+# Suffissi rimossi dallo stemming leggero: (suffisso, sostituzione)
+SUFFIXES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "it": (
+        ("amenti", ""), ("amento", ""), ("imenti", ""), ("imento", ""),
+        ("azioni", ""), ("azione", ""), ("uzioni", ""), ("uzione", ""),
+        ("mente", ""), ("are", ""), ("ita", ""), ("ati", ""), ("ato", ""), ("ata", ""),
+        ("i", ""), ("e", ""), ("a", ""), ("o", ""),
+    ),
+    "en": (
+        ("ations", ""), ("ation", ""),
+        ("izing", "iz"), ("ising", "iz"), ("ized", "iz"), ("ised", "iz"), ("izes", "iz"), ("ises", "iz"),
+        ("ies", "i"), ("y", "i"), ("ing", ""), ("ed", ""), ("es", ""), ("ly", ""), ("s", ""),
+    ),
+}
+
+# Lunghezza minima della radice lasciata dallo stemming
+MIN_STEM_LENGTH = 3
+
+
+def fold_accents(token: str) -> str:
+    """
+    Rimuove i segni diacritici da un token ("identità" -> "identita").
+
+    Args:
+        token: Token in minuscolo
+
+    Returns:
+        str: Token senza accenti
+    """
+    if token.isascii():
+        return token
+    decomposed = unicodedata.normalize("NFKD", token)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class StopwordFilter:
+    """Filtro che scarta le parole funzionali delle lingue indicate."""
+
+    def __init__(self, languages: Iterable[str] = ("it", "en")):
+        """
+        Args:
+            languages: Codici delle lingue di cui scartare le stopword
+        """
+        self.words = frozenset().union(*(STOPWORDS[language] for language in languages))
+        self.signature = "stopwords:" + ",".join(sorted(self.words))
+
+    def __call__(self, token: str) -> Optional[str]:
+        return None if fold_accents(token) in self.words else token
+
+
+class LightStemmer:
+    """
+    Stemming leggero a suffissi per una o più lingue.
+
+    Rimuove il suffisso più lungo tra quelli delle lingue indicate,
+    lasciando una radice di almeno MIN_STEM_LENGTH caratteri. I token con
+    cifre non vengono modificati. Con più lingue i suffissi sono combinati,
+    così testi misti italiano/inglese ricevono lo stesso trattamento.
+    """
+
+    def __init__(self, languages: Iterable[str] = ("it", "en")):
+        """
+        Args:
+            languages: Codici delle lingue di cui usare i suffissi
+        """
+        rules = {}
+        for language in languages:
+            for suffix, replacement in SUFFIXES[language]:
+                rules.setdefault(suffix, replacement)
+        self.rules = sorted(rules.items(), key=lambda rule: -len(rule[0]))
+        self.signature = f"stemmer:{MIN_STEM_LENGTH}:" + ",".join(
+            f"{suffix}>{replacement}" for suffix, replacement in self.rules
+        )
+
+    def __call__(self, token: str) -> Optional[str]:
+        if any(char.isdigit() for char in token):
+            return token
+        for suffix, replacement in self.rules:
+            if not token.endswith(suffix) or len(token) - len(suffix) < MIN_STEM_LENGTH:
+                continue
+            # "-s" non è un plurale in "access", "status", "analysis"
+            if suffix == "s" and token.endswith(("ss", "us", "is")):
+                continue
+            return token[:-len(suffix)] + replacement
+        return token
+
+
+class Analyzer:
+    """
+    Catena di analisi del testo: tokenizzazione seguita da filtri per token.
+
+    Il risultato di ogni token è memorizzato in una cache LRU condivisa da
+    indicizzazione e interrogazione.
+    """
+
+    def __init__(self, filters: Sequence[TokenFilter] = (), cache_size: int = 100_000):
+        """
+        Args:
+            filters: Filtri applicati in ordine a ogni token
+            cache_size: Numero massimo di token memorizzati
+        """
+        self.filters = tuple(filters)
+        self.analyze_token = lru_cache(maxsize=cache_size)(self._analyze_token)
+
+    @property
+    def signature(self) -> str:
+        """
+        Impronta della catena di filtri.
+
+        Cambia se cambiano i filtri o le loro regole: un indice salvato con
+        un'impronta diversa va ricostruito.
+        """
+        parts = [
+            getattr(token_filter, "signature", None) or getattr(token_filter, "__qualname__", repr(token_filter))
+            for token_filter in self.filters
+        ]
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _analyze_token(self, token: str) -> Optional[str]:
+        for token_filter in self.filters:
+            token = token_filter(token)
+            if not token:
+                return None
+        return token
+
+    def tokens(self, text: Optional[str]) -> Iterator[Tuple[str, int, int]]:
+        """
+        Analizza un testo restituendo anche la posizione dei token.
+
+        Args:
+            text: Testo da analizzare
+
+        Yields:
+            Tuple[str, int, int]: (termine, inizio, fine) nel testo originale
+        """
+        if not text:
+            return
+        for match in TOKEN_PATTERN.finditer(text):
+            token = match.group().lower()
+            if len(token) < 2 and not token.isdigit():
+                continue
+            term = self.analyze_token(token)
+            if term:
+                yield term, match.start(), match.end()
+
+    def __call__(self, text: Optional[str]) -> List[str]:
+        """
+        Analizza un testo.
+
+        Args:
+            text: Testo da analizzare
+
+        Returns:
+            List[str]: Termini nell'ordine in cui compaiono
+        """
+        return [term for term, _, _ in self.tokens(text)]
+
+
+# Analizzatore per i contenuti misti italiano/inglese dell'applicazione
+analyze = Analyzer([fold_accents, StopwordFilter(("it", "en")), LightStemmer(("it", "en"))])
@@ -0,0 +1,224 @@
+"""
+Utility per indici bitmap in memoria.
+
+Ogni valore filtrabile è associato a un intero Python usato come bitset
+sugli ID dei documenti: le combinazioni di filtri diventano operazioni
+bit a bit e i conteggi si ottengono con bit_count.
+"""
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+from src.utils.snapshot import Snapshot, SnapshotMapping, SnapshotWriter
+
+# Posizioni dei bit impostati per ciascun valore di un byte
+_BYTE_BITS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)
+)
+
+
+def to_bitmap(ids: Iterable[int]) -> int:
+    """
+    Costruisce un bitset a partire da un insieme di ID.
+
+    Args:
+        ids: ID non negativi
+
+    Returns:
+        int: Bitset con un bit impostato per ciascun ID
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    data = bytearray(max(ids) // 8 + 1)
+    for doc_id in ids:
+        data[doc_id >> 3] |= 1 << (doc_id & 7)
+    return int.from_bytes(data, "little")
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """
+    Itera in ordine crescente gli ID presenti in un bitset.
+
+    Scorre i byte del bitset saltando quelli vuoti, con un costo
+    proporzionale alla dimensione del bitset e al numero di ID trovati.
+
+    Args:
+        bits: Bitset
+
+    Yields:
+        int: ID presenti nel bitset
+    """
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for index, byte in enumerate(data):
+        if byte:
+            base = index * 8
+            for offset in _BYTE_BITS[byte]:
+                yield base + offset
+
+
+class BitmapIndex:
+    """
+    Indice bitmap di documenti per campo e valore.
+
+    Per ogni campo mantiene un bitset per ciascun valore; un documento può
+    avere più valori per lo stesso campo (ad esempio gli articoli GDPR
+    collegati a un pattern). L'indice non è thread-safe: la sincronizzazione
+    è a carico di chi lo possiede.
+    """
+
+    def __init__(self):
+        """Inizializza un indice vuoto."""
+        self._bitmaps: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self._values: Dict[int, Dict[str, Tuple[Hashable, ...]]] = {}
+        self._all = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def all(self) -> int:
+        """Bitset di tutti i documenti indicizzati."""
+        return self._all
+
+    def add(self, doc_id: int, values: Mapping[str, Iterable[Hashable]]) -> None:
+        """
+        Indicizza (o reindicizza) un documento.
+
+        Args:
+            doc_id: ID non negativo del documento
+            values: Valori del documento per campo
+        """
+        self.remove(doc_id)
+        bit = 1 << doc_id
+        stored = {}
+        for field, field_values in values.items():
+            field_values = tuple(value for value in field_values if value is not None)
+            bitmaps = self._bitmaps[field]
+            for value in field_values:
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+            stored[field] = field_values
+        self._values[doc_id] = stored
+        self._all |= bit
+
+    def remove(self, doc_id: int) -> bool:
+        """
+        Rimuove un documento dall'indice.
+
+        Args:
+            doc_id: ID del documento
+
+        Returns:
+            bool: True se il documento era presente
+        """
+        stored = self._values.pop(doc_id, None)
+        if stored is None:
+            return False
+        mask = ~(1 << doc_id)
+        for field, field_values in stored.items():
+            bitmaps = self._bitmaps[field]
+            for value in field_values:
+                remaining = bitmaps.get(value, 0) & mask
+                if remaining:
+                    bitmaps[value] = remaining
+                else:
+                    bitmaps.pop(value, None)
+        self._all &= mask
+        return True
+
+    def get(self, field: str, value: Hashable) -> int:
+        """Bitset dei documenti con il valore dato per il campo."""
+        return self._bitmaps.get(field, {}).get(value, 0)
+
+    def match(self, field: str, values: Sequence[Hashable], match_all: bool = True) -> int:
+        """
+        Bitset dei documenti che hanno tutti (AND) o almeno uno (OR) dei valori.
+
+        Args:
+            field: Nome del campo
+            values: Valori richiesti
+            match_all: True per AND, False per OR
+
+        Returns:
+            int: Bitset dei documenti corrispondenti
+        """
+        if not values:
+            return self._all
+        bitmaps = [self.get(field, value) for value in values]
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result & bitmap if match_all else result | bitmap
+        return result
+
+    def counts(self, field: str, bits: Optional[int] = None) -> Dict[Hashable, int]:
+        """
+        Conta i documenti per valore di un campo, eventualmente entro un bitset.
+
+        Args:
+            field: Nome del campo
+            bits: Bitset dei documenti da considerare (default: tutti)
+
+        Returns:
+            Dict[Hashable, int]: {valore: numero di documenti}, senza valori a zero
+        """
+        counts = {}
+        for value, bitmap in self._bitmaps.get(field, {}).items():
+            count = (bitmap & bits).bit_count() if bits is not None else bitmap.bit_count()
+            if count:
+                counts[value] = count
+        return counts
+
+    def write_snapshot(self, writer: SnapshotWriter, prefix: str) -> Dict[str, list]:
+        """
+        Aggiunge l'indice a uno snapshot.
+
+        I bitset sono salvati come byte, i valori di ciascun documento come
+        record JSON. Valori e campi devono essere serializzabili in JSON.
+
+        Args:
+            writer: Snapshot in costruzione
+            prefix: Prefisso dei nomi delle sezioni
+
+        Returns:
+            Dict[str, list]: Metadati da passare a from_snapshot (coppie
+            campo/valore nell'ordine dei bitset salvati)
+        """
+        keys = [[field, value] for field, bitmaps in self._bitmaps.items() for value in bitmaps]
+        bitmaps = [self._bitmaps[field][value] for field, value in keys]
+        doc_ids = sorted(self._values)
+        writer.add_blobs(f"{prefix}.bitmaps", (
+            bits.to_bytes((bits.bit_length() + 7) // 8, "little") for bits in bitmaps + [self._all]
+        ))
+        writer.add_array(f"{prefix}.doc_ids", doc_ids, "<i8")
+        writer.add_records(f"{prefix}.values", (
+            {field: list(values) for field, values in self._values[doc_id].items()} for doc_id in doc_ids
+        ))
+        return {"keys": keys}
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot, prefix: str, metadata: Mapping[str, list]) -> "BitmapIndex":
+        """
+        Ricrea un indice salvato con write_snapshot.
+
+        I bitset sono ricostruiti subito (sono pochi interi); i valori dei
+        singoli documenti, usati solo per gli aggiornamenti, sono letti su
+        richiesta.
+
+        Args:
+            snapshot: Snapshot aperto
+            prefix: Prefisso usato con write_snapshot
+            metadata: Metadati restituiti da write_snapshot
+
+        Returns:
+            BitmapIndex: Indice ricostruito
+        """
+        blobs = snapshot.blobs(f"{prefix}.bitmaps")
+        values = snapshot.records(f"{prefix}.values")
+        index = cls()
+        for position, (field, value) in enumerate(metadata["keys"]):
+            index._bitmaps[field][value] = int.from_bytes(blobs[position], "little")
+        index._all = int.from_bytes(blobs[len(metadata["keys"])], "little")
+        index._values = SnapshotMapping(
+            snapshot.array(f"{prefix}.doc_ids"),
+            lambda position: {field: tuple(items) for field, items in values[position].items()}
+        )
+        return index
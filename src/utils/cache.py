@@ -1,86 +1,777 @@
-"""Utility per la gestione della cache con supporto per TTL."""
+"""
+Utility per la gestione della cache con supporto per TTL.
+
+La cache è divisa in namespace (patterns, gdpr, stats, ...), ciascuno con
+il proprio budget di voci e di memoria. Ogni namespace è una cache LRU:
+lettura, scrittura ed espulsione costano O(1). Ogni voce scade dopo il
+proprio TTL, contato dal momento della scrittura sia per set() sia per il
+decorator cached(); le voci scadute vengono rimosse alla lettura e, per
+quelle mai più lette, con una scansione periodica durante le scritture.
+Il decorator cached() esegue un solo calcolo per chiave alla volta, senza
+bloccare le chiamate con chiavi diverse. Le voci possono avere dei tag
+(pattern:42, pattern:list, taxonomy:gdpr, stats): una modifica invalida
+solo le voci e i calcoli in corso con i tag interessati.
+"""
+import asyncio
+from collections import OrderedDict
 from functools import wraps
+import hashlib
+import inspect
+import string
+import sys
 import time
-from typing import Dict, Any, Callable, Tuple, Optional
+from typing import Dict, Any, Awaitable, Callable, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
 import logging
 import threading
 
+from sqlalchemy.orm import InstanceState, Session
+
+from src.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Namespace usato quando non ne viene indicato uno
+DEFAULT_NAMESPACE = "default"
+
+# Limiti dei namespace noti; gli altri usano settings.CACHE_MAX_ENTRIES
+NAMESPACE_LIMITS: Dict[str, Dict[str, Any]] = {
+    "patterns": {"max_entries": 2000, "max_bytes": 32 * 1024 * 1024},
+    "gdpr": {"max_entries": 1000, "max_bytes": 16 * 1024 * 1024},
+    "stats": {"max_entries": 64, "max_bytes": 1024 * 1024},
+    "search": {"max_entries": settings.SEARCH_CACHE_SIZE, "max_bytes": 32 * 1024 * 1024},
+}
+
+# Tag delle voci: liste e ricerche di pattern, statistiche e articoli GDPR
+PATTERN_LIST_TAG = "pattern:list"
+STATS_TAG = "stats"
+GDPR_TAG = "taxonomy:gdpr"
+
+_MISSING = object()
+
+
+def pattern_tag(pattern_id: int) -> str:
+    """Tag delle voci che dipendono da un singolo pattern."""
+    return f"pattern:{pattern_id}"
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """
+    Stima la memoria occupata da un valore, contenuto compreso.
+
+    Visita dizionari, sequenze e gli attributi degli oggetti, contando una
+    sola volta gli oggetti condivisi. Delle entità SQLAlchemy sono contati
+    solo gli attributi caricati: lo stato interno (_sa_instance_state)
+    raggiunge sessione e registry, che non appartengono alla voce. È una
+    stima: serve a mantenere il budget in byte di un namespace, non a
+    misurare la memoria esatta.
+
+    Args:
+        value: Valore da misurare
+
+    Returns:
+        int: Dimensione stimata in byte
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, InstanceState):
+        return 0
+    size = sys.getsizeof(value, 64)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        attributes = vars(value)
+        size += sys.getsizeof(attributes, 64) + sum(
+            estimate_size(name, seen) + estimate_size(attribute, seen)
+            for name, attribute in attributes.items()
+            if not name.startswith("_sa_")
+        )
+    return size
+
+
+def _key_value(value: Any) -> Any:
+    # Forma canonica e stabile di un argomento: i contenitori sono
+    # confrontati per contenuto e senza dipendere dall'ordine di inserimento
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((repr(k), _key_value(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_value(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted(repr(_key_value(item)) for item in value)))
+    return value
+
+
+def key_builder(func: Callable, key: Optional[Sequence[str]] = None) -> Callable[..., str]:
+    """
+    Crea la funzione che calcola la chiave di cache per le chiamate a func.
+
+    Gli argomenti sono associati ai parametri della firma, con i valori
+    predefiniti, così chiamate equivalenti (posizionali, per nome o con i
+    default) producono la stessa chiave. Con key=None vengono usati tutti i
+    parametri tranne self/cls e gli argomenti di tipo Session, che
+    cambiano a ogni richiesta; altrimenti solo i parametri indicati. I
+    valori sono ridotti a un hash compatto preceduto dal nome qualificato
+    della funzione.
+
+    Args:
+        func: Funzione da cachare
+        key: Nomi dei parametri che identificano il risultato
+
+    Returns:
+        Callable[..., str]: Funzione (*args, **kwargs) -> chiave
+
+    Raises:
+        ValueError: Se key contiene parametri che func non ha
+    """
+    signature = inspect.signature(func)
+    prefix = f"{func.__module__}.{func.__qualname__}"
+    if key is not None:
+        unknown = [name for name in key if name not in signature.parameters]
+        if unknown:
+            raise ValueError(f"Parametri di cache sconosciuti per {prefix}: {', '.join(unknown)}")
+        names = tuple(key)
+    else:
+        names = tuple(name for name in signature.parameters if name not in ("self", "cls"))
+
+    def build(*args: Any, **kwargs: Any) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        values = tuple(
+            (name, _key_value(arguments[name]))
+            for name in names
+            if key is not None or not isinstance(arguments[name], Session)
+        )
+        if not values:
+            return prefix
+        digest = hashlib.blake2b(repr(values).encode(), digest_size=12).hexdigest()
+        return f"{prefix}:{digest}"
+
+    return build
+
+
+def tag_builder(func: Callable, tags: Sequence[str] = ()) -> Callable[..., Tuple[str, ...]]:
+    """
+    Crea la funzione che calcola i tag dei risultati di func.
+
+    I tag possono contenere segnaposto con i nomi dei parametri di func
+    (es. "pattern:{pattern_id}"), sostituiti con gli argomenti della
+    chiamata; i tag senza segnaposto sono costanti.
+
+    Args:
+        func: Funzione da cachare
+        tags: Tag o modelli di tag
+
+    Returns:
+        Callable[..., Tuple[str, ...]]: Funzione (*args, **kwargs) -> tag
+
+    Raises:
+        ValueError: Se un modello usa parametri che func non ha
+    """
+    signature = inspect.signature(func)
+    tags = tuple(tags)
+    templates = [tag for tag in tags if "{" in tag]
+    if not templates:
+        return lambda *args, **kwargs: tags
+    for template in templates:
+        fields = {field for _, field, _, _ in string.Formatter().parse(template) if field}
+        unknown = fields - set(signature.parameters)
+        if unknown:
+            raise ValueError(f"Parametri sconosciuti nel tag {template!r}: {', '.join(sorted(unknown))}")
+
+    def build(*args: Any, **kwargs: Any) -> Tuple[str, ...]:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple(tag.format(**bound.arguments) for tag in tags)
+
+    return build
+
+
+class _Entry:
+    """Voce della cache: valore, istante di scadenza, dimensione stimata e tag."""
+
+    __slots__ = ("value", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int, tags: Tuple[str, ...] = ()):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class LRUCache:
+    """
+    Cache LRU con TTL e budget di memoria per un singolo namespace.
+
+    Le voci sono in un OrderedDict in ordine di utilizzo: quando il numero
+    di voci o i byte stimati superano il budget vengono espulse le meno
+    usate di recente. Ogni voce può avere dei tag (es. "pattern:42",
+    "stats"); un indice tag -> chiavi permette di invalidare le voci di un
+    tag visitando solo quelle. Un valore calcolato mentre uno dei suoi tag
+    viene invalidato non è memorizzato (vedi version), senza scartare i
+    calcoli in corso con altri tag.
+    """
+
+    def __init__(
+        self,
+        name: str = DEFAULT_NAMESPACE,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Nome del namespace (per i log)
+            max_entries: Numero massimo di voci (0 = cache disattivata)
+            max_bytes: Byte massimi stimati (None = nessun limite)
+            sweep_interval: Secondi tra due scansioni delle voci scadute
+            clock: Orologio monotono in secondi
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tags: Dict[str, set] = {}
+        self._bytes = 0
+        self._generation = 0
+        # Invalidazioni dei tag letti da version(), per i calcoli in corso
+        self._tag_versions: Dict[str, int] = {}
+        self._next_sweep = clock() + sweep_interval
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def version(self, tags: Iterable[str] = ()) -> Tuple[int, ...]:
+        """
+        Versione del namespace per un valore con i tag indicati.
+
+        Va letta prima di calcolare il valore e passata a set(): cambia se
+        nel frattempo il namespace è stato svuotato o uno dei tag è stato
+        invalidato, non per le invalidazioni di altri tag.
+
+        Args:
+            tags: Tag del valore da calcolare
+
+        Returns:
+            Tuple[int, ...]: Versione da passare a set()
+        """
+        tags = tuple(dict.fromkeys(tags))
+        with self._lock:
+            for tag in tags:
+                self._tag_versions.setdefault(tag, 0)
+            return self._version(tags)
+
+    def _version(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return (self._generation,) + tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    @property
+    def nbytes(self) -> int:
+        """Byte stimati occupati dalle voci (0 se il namespace non ha budget in byte)."""
+        return self._bytes
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Recupera un valore non scaduto e lo segna come usato di recente.
+
+        Args:
+            key: Chiave della voce
+            default: Valore restituito se la voce manca o è scaduta
+
+        Returns:
+            Any: Valore memorizzato o default
+        """
+        return self._lookup(key, default, record=True)
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Come get(), ma senza contare la lettura nelle statistiche."""
+        return self._lookup(key, default, record=False)
+
+    def _lookup(self, key: str, default: Any, record: bool) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and self._clock() >= entry.expires_at:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            if record:
+                self.hits += 1
+            return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+        version: Optional[Tuple[int, ...]] = None
+    ) -> bool:
+        """
+        Memorizza un valore.
+
+        Args:
+            key: Chiave della voce
+            value: Valore da memorizzare
+            ttl: Secondi di validità dalla scrittura (None = senza scadenza)
+            tags: Tag con cui la voce potrà essere invalidata
+            version: Versione letta con version(tags) prima di calcolare il
+                valore; se nel frattempo è cambiata il valore è scartato
+
+        Returns:
+            bool: True se il valore è stato memorizzato
+        """
+        if self.max_entries <= 0:
+            return False
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Valore per {key} troppo grande per il namespace {self.name}")
+            return False
+        tags = tuple(dict.fromkeys(tags))
+
+        with self._lock:
+            if version is not None and version != self._version(tags):
+                return False
+            now = self._clock()
+            if now >= self._next_sweep:
+                self._purge_expired(now)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, now + ttl if ttl is not None else None, size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                evicted = next(iter(self._entries))
+                self._remove(evicted)
+                self.evictions += 1
+                logger.debug(f"Cache {self.name}: espulsa {evicted}")
+        return True
+
+    def delete(self, key: str) -> bool:
+        """
+        Elimina una voce.
+
+        Returns:
+            bool: True se la voce era presente
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self, pattern: Optional[str] = None) -> int:
+        """
+        Elimina tutte le voci, o solo quelle la cui chiave contiene pattern.
+
+        Returns:
+            int: Numero di voci eliminate
+        """
+        with self._lock:
+            self._generation += 1
+            self._tag_versions.clear()
+            if pattern is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._tags.clear()
+                self._bytes = 0
+                return removed
+            keys = [key for key in self._entries if pattern in key]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Elimina le voci che hanno almeno uno dei tag.
+
+        Il costo è proporzionale alle voci eliminate, non alla dimensione
+        della cache. Sono scartati solo i calcoli in corso che hanno uno dei
+        tag: un namespace che non usa i tag non ne risente.
+
+        Args:
+            tags: Tag da invalidare
+
+        Returns:
+            int: Numero di voci eliminate
+        """
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                if tag in self._tag_versions:
+                    self._tag_versions[tag] += 1
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def purge_expired(self) -> int:
+        """
+        Rimuove tutte le voci scadute.
+
+        Returns:
+            int: Numero di voci rimosse
+        """
+        with self._lock:
+            return self._purge_expired(self._clock())
+
+    def _purge_expired(self, now: float) -> int:
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.expires_at is not None and now >= entry.expires_at
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._next_sweep = now + self.sweep_interval
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Statistiche di utilizzo del namespace.
+
+        Returns:
+            Dict[str, Any]: Voci e byte occupati con i relativi limiti,
+            letture trovate e mancate, hit rate, espulsioni e scadenze
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class _Flight:
+    """Calcolo in corso per una chiave, atteso dalle chiamate concorrenti."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
 class Cache:
     """
     Implementazione di un sistema di caching in-memory con TTL.
+
+    Raggruppa le cache LRU dei namespace; un namespace non configurato
+    viene creato al primo utilizzo con i limiti predefiniti.
     """
-    def __init__(self):
-        self._cache: Dict[str, Tuple[Any, float]] = {}
-        self._lock = threading.RLock()
-        
-    def cached(self, ttl: int = 60):
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        max_entries: int = 1000,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            limits: Limiti per namespace ({"nome": {"max_entries": ..., "max_bytes": ...}})
+            max_entries: Voci massime dei namespace senza limiti espliciti
+            sweep_interval: Secondi tra due scansioni delle voci scadute
+            clock: Orologio monotono in secondi
+        """
+        self._limits = dict(limits or {})
+        self._max_entries = max_entries
+        self._sweep_interval = sweep_interval
+        self._clock = clock
+        self._namespaces: Dict[str, LRUCache] = {}
+        self._lock = threading.Lock()
+        # Calcoli in corso per chiave (single-flight), sincroni e asincroni
+        self._flights: Dict[Tuple[str, str], _Flight] = {}
+        self._async_flights: Dict[Tuple[str, str], "asyncio.Task"] = {}
+        self._flights_lock = threading.Lock()
+
+    def namespace(self, name: str = DEFAULT_NAMESPACE) -> LRUCache:
+        """
+        Restituisce la cache di un namespace, creandola se necessario.
+
+        Args:
+            name: Nome del namespace
+
+        Returns:
+            LRUCache: Cache del namespace
+        """
+        cache = self._namespaces.get(name)
+        if cache is None:
+            with self._lock:
+                cache = self._namespaces.get(name)
+                if cache is None:
+                    limits = self._limits.get(name, {})
+                    cache = LRUCache(
+                        name,
+                        max_entries=limits.get("max_entries", self._max_entries),
+                        max_bytes=limits.get("max_bytes"),
+                        sweep_interval=self._sweep_interval,
+                        clock=self._clock
+                    )
+                    self._namespaces[name] = cache
+        return cache
+
+    def namespaces(self) -> Iterator[LRUCache]:
+        """Cache dei namespace creati finora."""
+        return iter(list(self._namespaces.values()))
+
+    def cached(
+        self,
+        ttl: int = 60,
+        namespace: str = DEFAULT_NAMESPACE,
+        key: Optional[Sequence[str]] = None,
+        tags: Sequence[str] = ()
+    ):
         """
         Decorator per cachare i risultati delle funzioni.
-        
+
+        Le chiamate concorrenti con la stessa chiave che non trovano il
+        valore in cache attendono un unico calcolo (single-flight), mentre
+        chiavi diverse vengono calcolate in parallelo: i lock proteggono
+        solo l'accesso ai dizionari, mai l'esecuzione della funzione. Se il
+        calcolo fallisce l'eccezione viene rilanciata a tutte le chiamate in
+        attesa e nulla viene memorizzato.
+
+        Le funzioni coroutine ricevono un wrapper asincrono con la stessa
+        semantica, in cui le chiamate in attesa condividono un unico task.
+
         Args:
             ttl: Tempo di vita in secondi per la cache
+            namespace: Namespace in cui memorizzare i risultati
+            key: Nomi dei parametri che identificano il risultato (vedi
+                key_builder); None per usarli tutti tranne self e le sessioni
+            tags: Tag dei risultati (vedi tag_builder), es. "pattern:{pattern_id}"
         """
         def decorator(func: Callable):
+            build_key = key_builder(func, key)
+            build_tags = tag_builder(func, tags)
+
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    cache_key = build_key(*args, **kwargs)
+                    value = self.namespace(namespace).get(cache_key, _MISSING)
+                    if value is not _MISSING:
+                        logger.debug(f"Cache hit for {cache_key}")
+                        return value
+                    return await self._join_async(
+                        namespace, cache_key, ttl, build_tags(*args, **kwargs), lambda: func(*args, **kwargs)
+                    )
+
+                return async_wrapper
+
             @wraps(func)
             def wrapper(*args, **kwargs):
                 # Crea una chiave unica basata su funzione e parametri
-                key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-                
-                with self._lock:
-                    # Verifica se il valore è in cache e non è scaduto
-                    if key in self._cache:
-                        value, timestamp = self._cache[key]
-                        if time.time() - timestamp < ttl:
-                            logger.debug(f"Cache hit for {key}")
-                            return value
-                    
-                    # Esegui la funzione e salva il risultato in cache
-                    logger.debug(f"Cache miss for {key}")
-                    result = func(*args, **kwargs)
-                    self._cache[key] = (result, time.time())
-                    return result
-                
+                cache_key = build_key(*args, **kwargs)
+
+                # Verifica se il valore è in cache e non è scaduto
+                value = self.namespace(namespace).get(cache_key, _MISSING)
+                if value is not _MISSING:
+                    logger.debug(f"Cache hit for {cache_key}")
+                    return value
+                return self._join(
+                    namespace, cache_key, ttl, build_tags(*args, **kwargs), lambda: func(*args, **kwargs)
+                )
+
             return wrapper
         return decorator
-    
-    def get(self, key: str, default: Any = None) -> Any:
-        """Recupera un valore dalla cache."""
-        with self._lock:
-            if key in self._cache:
-                value, timestamp = self._cache[key]
-                return value
-            return default
-    
-    def set(self, key: str, value: Any, ttl: int = 60) -> None:
-        """Imposta un valore nella cache."""
-        with self._lock:
-            self._cache[key] = (value, time.time() + ttl)
-    
-    def delete(self, key: str) -> None:
+
+    def _join(
+        self, namespace: str, key: str, ttl: Optional[float], tags: Tuple[str, ...], compute: Callable[[], Any]
+    ) -> Any:
+        # Partecipa al calcolo in corso per la chiave o lo avvia
+        flight_key = (namespace, key)
+        with self._flights_lock:
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            cache = self.namespace(namespace)
+            # Un calcolo appena concluso può aver già memorizzato il valore
+            result = cache.peek(key, _MISSING)
+            if result is _MISSING:
+                logger.debug(f"Cache miss for {key}")
+                # Un'invalidazione durante il calcolo rende il risultato non memorizzabile
+                version = cache.version(tags)
+                result = compute()
+                cache.set(key, result, ttl, tags, version)
+            flight.result = result
+            return result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[flight_key]
+            flight.done.set()
+
+    async def _join_async(
+        self,
+        namespace: str,
+        key: str,
+        ttl: Optional[float],
+        tags: Tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        # Versione asincrona di _join: il calcolo è un task condiviso, protetto
+        # da shield così l'annullamento di un chiamante non lo interrompe
+        loop = asyncio.get_running_loop()
+        flight_key = (namespace, key)
+        with self._flights_lock:
+            task = self._async_flights.get(flight_key)
+            if task is None or task.get_loop() is not loop:
+                task = loop.create_task(self._compute_async(namespace, key, ttl, tags, compute))
+                self._async_flights[flight_key] = task
+                task.add_done_callback(lambda done: self._forget_async(flight_key, done))
+        return await asyncio.shield(task)
+
+    async def _compute_async(
+        self,
+        namespace: str,
+        key: str,
+        ttl: Optional[float],
+        tags: Tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        cache = self.namespace(namespace)
+        result = cache.peek(key, _MISSING)
+        if result is _MISSING:
+            logger.debug(f"Cache miss for {key}")
+            version = cache.version(tags)
+            result = await compute()
+            cache.set(key, result, ttl, tags, version)
+        return result
+
+    def _forget_async(self, flight_key: Tuple[str, str], task: "asyncio.Task") -> None:
+        with self._flights_lock:
+            if self._async_flights.get(flight_key) is task:
+                del self._async_flights[flight_key]
+        # Evita l'avviso di eccezione non letta se tutti i chiamanti sono stati annullati
+        if not task.cancelled():
+            task.exception()
+
+    def get(self, key: str, default: Any = None, namespace: str = DEFAULT_NAMESPACE) -> Any:
+        """Recupera un valore non scaduto dalla cache."""
+        return self.namespace(namespace).get(key, default)
+
+    def set(
+        self, key: str, value: Any, ttl: int = 60, namespace: str = DEFAULT_NAMESPACE, tags: Iterable[str] = ()
+    ) -> None:
+        """Imposta un valore nella cache, valido per ttl secondi e invalidabile tramite i tag."""
+        self.namespace(namespace).set(key, value, ttl, tags)
+
+    def delete(self, key: str, namespace: str = DEFAULT_NAMESPACE) -> None:
         """Elimina una chiave dalla cache."""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-    
-    def clear(self, pattern: Optional[str] = None):
-        """Pulisce la cache, opzionalmente solo le chiavi che corrispondono a un pattern."""
-        with self._lock:
-            if pattern:
-                self._cache = {k: v for k, v in self._cache.items() if pattern not in k}
-            else:
-                self._cache.clear()
+        self.namespace(namespace).delete(key)
+
+    def clear(self, pattern: Optional[str] = None, namespace: Optional[str] = None):
+        """
+        Pulisce la cache, opzionalmente solo le chiavi che corrispondono a un pattern.
+
+        Args:
+            pattern: Sottostringa delle chiavi da eliminare (None = tutte)
+            namespace: Namespace da pulire (None = tutti)
+        """
+        caches = [self.namespace(namespace)] if namespace is not None else self.namespaces()
+        for cache in caches:
+            cache.clear(pattern)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Elimina da tutti i namespace le voci che hanno almeno uno dei tag.
+
+        Returns:
+            int: Numero di voci eliminate
+        """
+        return sum(cache.invalidate_tags(tags) for cache in self.namespaces())
+
+    def purge_expired(self) -> int:
+        """Rimuove le voci scadute da tutti i namespace."""
+        return sum(cache.purge_expired() for cache in self.namespaces())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiche di utilizzo per namespace (vedi LRUCache.stats)."""
+        return {cache.name: cache.stats() for cache in self.namespaces()}
 
 # Crea un'istanza di cache globale
-cache = Cache()
+cache = Cache(NAMESPACE_LIMITS, settings.CACHE_MAX_ENTRIES, settings.CACHE_SWEEP_INTERVAL)
 
 # Esporta la funzione decorated per compatibilità
-def cached(ttl: int = 60):
+def cached(
+    ttl: int = 60,
+    namespace: str = DEFAULT_NAMESPACE,
+    key: Optional[Sequence[str]] = None,
+    tags: Sequence[str] = ()
+):
     """Decorator compatibile per il caching."""
-    return cache.cached(ttl)
+    return cache.cached(ttl, namespace, key, tags)
 
 # Per invalidare la cache dei pattern
-def invalidate_pattern_cache():
-    """Invalida la cache relativa ai pattern."""
-    cache.clear(pattern="pattern")
\ No newline at end of file
+def invalidate_pattern_cache(pattern_id: Optional[int] = None):
+    """
+    Invalida la cache relativa ai pattern dopo una modifica.
+
+    Elimina le liste e le ricerche di pattern, le statistiche, gli articoli
+    GDPR (che riportano ID e titolo dei pattern collegati, e un pattern può
+    essere collegato a un articolo che prima non lo citava) e, se indicato,
+    le sole voci del pattern modificato; senza pattern_id le voci di tutti
+    i pattern.
+
+    Args:
+        pattern_id: ID del pattern creato, modificato o eliminato
+    """
+    if pattern_id is None:
+        cache.clear(namespace="patterns")
+        cache.invalidate_tags(PATTERN_LIST_TAG, STATS_TAG, GDPR_TAG)
+    else:
+        cache.invalidate_tags(pattern_tag(pattern_id), PATTERN_LIST_TAG, STATS_TAG, GDPR_TAG)
@@ -0,0 +1,104 @@
+# src/utils/export.py
+"""
+Serializzazione in streaming dei pattern esportati.
+
+Ogni funzione trasforma un iteratore di pattern (come prodotti da
+PrivacyPattern.to_dict) in un iteratore di righe di testo, senza
+accumulare i pattern in memoria: la risposta può essere inviata al
+client man mano che le righe vengono lette dal database.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Formati di esportazione supportati: media type ed estensione del file
+EXPORT_FORMATS: Dict[str, Dict[str, str]] = {
+    "ndjson": {"media_type": "application/x-ndjson", "extension": "ndjson"},
+    "csv": {"media_type": "text/csv", "extension": "csv"},
+}
+
+# Colonne del CSV, nell'ordine di esportazione
+CSV_COLUMNS: List[str] = [
+    "id", "title", "description", "context", "problem", "solution", "consequences",
+    "strategy", "mvc_component", "created_at", "updated_at", "created_by_id", "view_count",
+    "gdpr_articles", "pbd_principles", "iso_phases", "vulnerabilities",
+]
+
+# Campo mostrato nel CSV per gli elementi delle relazioni
+_RELATION_LABELS = {
+    "gdpr_articles": "number",
+    "pbd_principles": "name",
+    "iso_phases": "name",
+    "vulnerabilities": "name",
+}
+
+
+def ndjson_lines(patterns: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Serializza i pattern in NDJSON, un oggetto JSON per riga.
+
+    Args:
+        patterns: Pattern come dizionari
+
+    Yields:
+        str: Una riga per pattern, terminata da "\\n"
+    """
+    for pattern in patterns:
+        yield json.dumps(pattern, ensure_ascii=False, default=str) + "\n"
+
+
+def csv_lines(patterns: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Serializza i pattern in CSV con intestazione.
+
+    Le relazioni sono riportate in una sola colonna, con gli elementi
+    separati da "; " (numero dell'articolo GDPR, nome negli altri casi).
+
+    Args:
+        patterns: Pattern come dizionari
+
+    Yields:
+        str: L'intestazione e poi una riga per pattern
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    for pattern in patterns:
+        row = []
+        for column in CSV_COLUMNS:
+            value = pattern.get(column)
+            if column in _RELATION_LABELS:
+                value = "; ".join(str(item.get(_RELATION_LABELS[column])) for item in value or [])
+            row.append("" if value is None else value)
+        writer.writerow(row)
+        yield flush()
+
+
+def export_lines(patterns: Iterable[Dict[str, Any]], export_format: str) -> Iterator[str]:
+    """
+    Serializza i pattern nel formato richiesto.
+
+    Args:
+        patterns: Pattern come dizionari
+        export_format: "ndjson" o "csv"
+
+    Yields:
+        str: Righe del file esportato
+
+    Raises:
+        ValueError: Se il formato non è supportato
+    """
+    if export_format == "ndjson":
+        return ndjson_lines(patterns)
+    if export_format == "csv":
+        return csv_lines(patterns)
+    raise ValueError(f"Formato di esportazione non supportato: {export_format}")
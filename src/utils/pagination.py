@@ -0,0 +1,193 @@
+"""
+Utility per la paginazione keyset (a cursore).
+
+Il cursore è un token opaco che codifica la chiave di ordinamento
+dell'ultimo elemento restituito: la pagina successiva si ottiene con un
+filtro "dopo questa chiave" invece che con OFFSET, con un costo che non
+cresce con la profondità della pagina.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+from src.exceptions import InvalidCursorException
+
+# Colonna di ordinamento e direzione (True = decrescente)
+SortKey = Tuple[Any, bool]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Codifica una chiave di ordinamento in un cursore opaco.
+
+    Args:
+        values: Valori della chiave di ordinamento dell'ultimo elemento
+
+    Returns:
+        str: Cursore in base64 URL-safe
+    """
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: Optional[int] = None) -> List[Any]:
+    """
+    Decodifica un cursore prodotto da encode_cursor.
+
+    Args:
+        cursor: Cursore ricevuto dal client
+        size: Numero di valori atteso, se noto
+
+    Returns:
+        List[Any]: Valori della chiave di ordinamento
+
+    Raises:
+        InvalidCursorException: Se il cursore non è valido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list):
+            raise ValueError("formato inatteso")
+        values = [_decode_value(value) for value in values]
+    except (ValueError, TypeError, UnicodeError, binascii.Error) as e:
+        raise InvalidCursorException(str(e))
+
+    if size is not None and len(values) != size:
+        raise InvalidCursorException("chiave di ordinamento non compatibile")
+    return values
+
+
+def _column_type(column: Any) -> Optional[type]:
+    # Tipo Python della colonna, se SQLAlchemy lo conosce (None ad esempio
+    # per le espressioni literal_column)
+    try:
+        return column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def check_cursor_values(order: Sequence[SortKey], values: Sequence[Any]) -> List[Any]:
+    """
+    Verifica che i valori di un cursore siano compatibili con l'ordinamento.
+
+    Ogni valore deve avere il tipo Python della sua colonna (gli interi
+    sono accettati per le colonne float); per le colonne di tipo ignoto
+    basta un valore scalare. Un cursore alterato produce così un errore di
+    cursore, e non un errore del database.
+
+    Args:
+        order: Colonne di ordinamento con direzione
+        values: Valori decodificati dal cursore
+
+    Returns:
+        List[Any]: Valori, con gli interi convertiti per le colonne float
+
+    Raises:
+        InvalidCursorException: Se un valore non è compatibile
+    """
+    checked = []
+    for (column, _), value in zip(order, values):
+        expected = _column_type(column)
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if expected is None:
+            valid = isinstance(value, (str, int, float, datetime)) and not isinstance(value, bool)
+        elif expected is int:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, expected)
+        if not valid:
+            raise InvalidCursorException("chiave di ordinamento non compatibile")
+        checked.append(value)
+    return checked
+
+
+def keyset_condition(order: Sequence[SortKey], values: Sequence[Any]) -> Any:
+    """
+    Costruisce la condizione "dopo la chiave data" per un ordinamento.
+
+    Per l'ordinamento (a, b) produce (a > va) OR (a = va AND b > vb),
+    con gli operatori invertiti per le colonne decrescenti.
+
+    Args:
+        order: Colonne di ordinamento con direzione
+        values: Valori della chiave dell'ultimo elemento
+
+    Returns:
+        Condizione SQLAlchemy
+    """
+    clauses = []
+    for index, (column, descending) in enumerate(order):
+        equal = [col == value for (col, _), value in zip(order[:index], values[:index])]
+        after = column < values[index] if descending else column > values[index]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def paginate_keyset(
+    query: Query,
+    order: Sequence[SortKey],
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    key: Optional[Callable[[Any], Sequence[Any]]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Applica ordinamento e paginazione keyset a una query.
+
+    Recupera un elemento in più del limite per sapere se esiste una pagina
+    successiva, senza eseguire alcun COUNT.
+
+    Args:
+        query: Query SQLAlchemy già filtrata
+        order: Colonne di ordinamento con direzione; l'ultima deve essere univoca
+        limit: Numero massimo di elementi
+        cursor: Cursore della pagina precedente
+        offset: Elementi da saltare, usato solo in assenza di cursore
+        key: Funzione che estrae la chiave di ordinamento da un elemento
+            (default: gli attributi con il nome delle colonne)
+
+    Returns:
+        Tuple[List[Any], Optional[str]]: Elementi della pagina e cursore
+        della pagina successiva (None se è l'ultima)
+    """
+    if cursor:
+        values = check_cursor_values(order, decode_cursor(cursor, len(order)))
+        query = query.filter(keyset_condition(order, values))
+        offset = 0
+
+    query = query.order_by(
+        *(column.desc() if descending else column.asc() for column, descending in order)
+    )
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    if key is None:
+        last = rows[-1]
+        sort_values = [getattr(last, column.key) for column, _ in order]
+    else:
+        sort_values = key(rows[-1])
+    return rows, encode_cursor(sort_values)
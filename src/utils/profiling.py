@@ -0,0 +1,201 @@
+# src/utils/profiling.py
+"""
+Profilazione delle singole richieste di ricerca.
+
+Un SearchProfile raccoglie i tempi delle fasi di una richiesta, le query
+SQL eseguite con la loro durata, il numero di candidati rimasti a ogni
+passo dei filtri e le componenti del punteggio dei risultati. Il profilo
+attivo è conservato in una ContextVar: il codice di ricerca lo consulta
+con current_profile() e, se non c'è, non registra nulla.
+"""
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Profilo della richiesta in corso (None se la profilazione non è attiva)
+_active_profile: ContextVar[Optional["SearchProfile"]] = ContextVar("search_profile", default=None)
+
+# Lunghezza massima dei parametri SQL riportati
+MAX_PARAMETERS_LENGTH = 200
+
+_listeners_lock = threading.Lock()
+_listeners_installed = False
+
+
+class SearchProfile:
+    """
+    Tempi, query SQL e conteggi di una richiesta di ricerca.
+
+    Le fasi possono essere annidate: ogni fase riporta la propria durata e
+    quella delle sottofasi, nell'ordine di esecuzione.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            clock: Orologio monotono in secondi
+        """
+        self._clock = clock
+        self._started = clock()
+        self._root: Dict[str, Any] = {"stages": []}
+        self._open: List[Dict[str, Any]] = [self._root]
+        self.info: Dict[str, Any] = {}
+        self.sql: List[Dict[str, Any]] = []
+        self.candidates: List[Dict[str, Any]] = []
+        self.hits: List[Dict[str, Any]] = []
+
+    @property
+    def current_stage(self) -> Optional[str]:
+        """Nome della fase più interna in corso."""
+        return self._open[-1].get("name")
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Misura la durata di una fase.
+
+        Args:
+            name: Nome della fase (es. "analyze", "score", "hydration")
+        """
+        entry: Dict[str, Any] = {"name": name, "ms": 0.0, "stages": []}
+        self._open[-1]["stages"].append(entry)
+        self._open.append(entry)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            entry["ms"] = round((self._clock() - started) * 1000, 3)
+            self._open.pop()
+
+    def annotate(self, **values: Any) -> None:
+        """Aggiunge informazioni generali sulla richiesta (es. motore usato)."""
+        self.info.update(values)
+
+    def count(self, step: str, candidates: int) -> None:
+        """
+        Registra i candidati rimasti dopo un passo della ricerca.
+
+        Args:
+            step: Nome del passo (es. "filters", "text_match")
+            candidates: Documenti ancora candidati
+        """
+        self.candidates.append({"step": step, "count": candidates})
+
+    def add_hit(self, doc_id: Any, score: float, components: Dict[str, Any]) -> None:
+        """
+        Registra le componenti del punteggio di un risultato.
+
+        Args:
+            doc_id: ID del risultato
+            score: Punteggio finale
+            components: Contributi al punteggio
+        """
+        self.hits.append({"id": doc_id, "score": score, "components": components})
+
+    def record_sql(self, statement: str, parameters: Any, duration: float) -> None:
+        """
+        Registra una query SQL eseguita durante la richiesta.
+
+        Args:
+            statement: Testo della query
+            parameters: Parametri della query
+            duration: Durata in secondi
+        """
+        parameters = str(parameters)
+        if len(parameters) > MAX_PARAMETERS_LENGTH:
+            parameters = parameters[:MAX_PARAMETERS_LENGTH] + "..."
+        self.sql.append({
+            "stage": self.current_stage,
+            "statement": statement,
+            "parameters": parameters,
+            "ms": round(duration * 1000, 3),
+        })
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Profilo in forma serializzabile.
+
+        Returns:
+            Dict[str, Any]: Durata totale, fasi, query SQL, candidati per
+            passo e componenti del punteggio dei risultati
+        """
+        return {
+            "total_ms": round((self._clock() - self._started) * 1000, 3),
+            **self.info,
+            "stages": self._root["stages"],
+            "sql": {
+                "count": len(self.sql),
+                "total_ms": round(sum(query["ms"] for query in self.sql), 3),
+                "statements": self.sql,
+            },
+            "candidates": self.candidates,
+            "hits": self.hits,
+        }
+
+
+def current_profile() -> Optional[SearchProfile]:
+    """Profilo della richiesta in corso, o None se non è richiesto."""
+    return _active_profile.get()
+
+
+def profile_stage(name: str) -> contextlib.AbstractContextManager:
+    """
+    Misura una fase nel profilo attivo; senza profilo non fa nulla.
+
+    Args:
+        name: Nome della fase
+    """
+    profile = _active_profile.get()
+    return profile.stage(name) if profile is not None else contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def profiling(profile: Optional[SearchProfile]) -> Iterator[Optional[SearchProfile]]:
+    """
+    Attiva un profilo per il blocco di codice.
+
+    Le query SQL eseguite nel blocco dallo stesso contesto vengono
+    registrate nel profilo. Con profile=None il blocco viene eseguito
+    senza profilazione.
+
+    Args:
+        profile: Profilo da attivare
+    """
+    if profile is None:
+        yield None
+        return
+    _install_sql_listeners()
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+def _install_sql_listeners() -> None:
+    # I listener sono registrati una sola volta e ignorano le query
+    # eseguite senza un profilo attivo
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_installed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_profile.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is not None and started is not None:
+        profile.record_sql(statement, parameters, time.perf_counter() - started)
@@ -0,0 +1,873 @@
+"""
+Utility per la ricerca full-text in memoria.
+
+Fornisce la tokenizzazione del testo, un indice invertito con ranking BM25,
+l'estrazione di snippet evidenziati e un trie per l'autocompletamento, usati
+dal servizio di ricerca al posto delle query LIKE sul database.
+"""
+import heapq
+import html
+import math
+import threading
+from typing import (
+    Any, Callable, Collection, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+)
+
+from src.utils.analysis import TOKEN_PATTERN, Analyzer, analyze
+from src.utils.snapshot import Snapshot, SnapshotMapping, SnapshotWriter
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Suddivide un testo in token normalizzati.
+
+    Args:
+        text: Testo da tokenizzare
+
+    Returns:
+        Lista di token in minuscolo, nell'ordine in cui compaiono
+    """
+    if not text:
+        return []
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 or token.isdigit()
+    ]
+
+
+def max_edits(term: str) -> int:
+    """
+    Distanza di edit ammessa per la ricerca fuzzy di un termine.
+
+    I termini brevi e i numeri non vengono espansi: con pochi caratteri
+    quasi ogni parola del vocabolario sarebbe "vicina".
+
+    Args:
+        term: Termine normalizzato
+
+    Returns:
+        int: 0 sotto i 4 caratteri, 1 fino a 7, 2 oltre
+    """
+    if len(term) < 4 or term.isdigit():
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def trigrams(term: str) -> Set[str]:
+    """
+    Trigrammi di un termine, con un delimitatore a inizio e fine.
+
+    Args:
+        term: Termine normalizzato
+
+    Returns:
+        Insieme dei trigrammi
+    """
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Distanza di Levenshtein tra due stringhe, con limite opzionale.
+
+    Con max_distance il calcolo si interrompe non appena la distanza
+    supera il limite, restituendo max_distance + 1.
+
+    Args:
+        a: Prima stringa
+        b: Seconda stringa
+        max_distance: Distanza massima di interesse
+
+    Returns:
+        int: Distanza (o max_distance + 1 se superiore al limite)
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class TrigramIndex:
+    """
+    Indice dei termini di un vocabolario per trigramma.
+
+    Genera i candidati per la ricerca fuzzy: un termine a distanza d da
+    quello cercato ne condivide almeno len(trigrammi) - 3d trigrammi, quindi
+    la distanza esatta viene calcolata solo su pochi termini del vocabolario
+    invece che su tutti i documenti. Non è thread-safe: la sincronizzazione
+    è a carico di chi lo possiede.
+    """
+
+    def __init__(self):
+        """Inizializza un indice vuoto."""
+        self._postings: Dict[str, Set[str]] = {}
+
+    def add(self, term: str) -> None:
+        """Aggiunge un termine al vocabolario."""
+        for gram in trigrams(term):
+            self._postings.setdefault(gram, set()).add(term)
+
+    def remove(self, term: str) -> None:
+        """Rimuove un termine dal vocabolario."""
+        for gram in trigrams(term):
+            terms = self._postings.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._postings[gram]
+
+    def similar(self, term: str, max_distance: int) -> Dict[str, int]:
+        """
+        Termini del vocabolario entro una distanza di edit, escluso il termine stesso.
+
+        Args:
+            term: Termine normalizzato
+            max_distance: Distanza di Levenshtein massima
+
+        Returns:
+            Dict[str, int]: {termine: distanza}
+        """
+        if max_distance <= 0:
+            return {}
+        grams = trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        threshold = len(grams) - 3 * max_distance
+        similar = {}
+        for candidate, count in shared.items():
+            if count < threshold or candidate == term:
+                continue
+            distance = levenshtein(term, candidate, max_distance)
+            if distance <= max_distance:
+                similar[candidate] = distance
+        return similar
+
+    def clear(self) -> None:
+        """Svuota l'indice."""
+        self._postings.clear()
+
+
+class InvertedIndex:
+    """
+    Indice invertito in memoria con ranking BM25.
+
+    Ogni documento è composto da più campi testuali con un peso (boost):
+    le occorrenze di un termine vengono sommate pesando il campo in cui
+    compaiono, secondo una variante semplificata di BM25F.
+
+    Le query sono espresse come lista di clausole in AND; ogni clausola è
+    un dizionario {termine: peso} i cui termini sono alternativi (OR). I
+    termini delle query vanno prodotti con lo stesso analizzatore usato per
+    i documenti (attributo analyzer).
+
+    Per ogni documento sono conservate anche le posizioni dei termini nel
+    testo originale di ciascun campo, usate per gli snippet evidenziati.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, analyzer: Optional[Analyzer] = None):
+        """
+        Inizializza un indice vuoto.
+
+        Args:
+            k1: Parametro di saturazione della frequenza dei termini
+            b: Parametro di normalizzazione sulla lunghezza dei documenti
+            analyzer: Analizzatore del testo (default: italiano/inglese con stemming)
+        """
+        self.k1 = k1
+        self.b = b
+        self.analyzer = analyzer or analyze
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        self._doc_terms: Dict[Hashable, Dict[str, float]] = {}
+        self._doc_lengths: Dict[Hashable, float] = {}
+        # Posizioni dei termini: {doc_id: {campo: {termine: (inizio, fine, inizio, fine, ...)}}}
+        self._offsets: Dict[Hashable, Dict[str, Dict[str, Tuple[int, ...]]]] = {}
+        self._total_length = 0.0
+        # Vocabolario per trigrammi, per l'espansione fuzzy dei termini
+        # (None finché non serve, per gli indici caricati da snapshot)
+        self._vocabulary: Optional[TrigramIndex] = TrigramIndex()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_lengths
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Numero di termini distinti presenti nell'indice."""
+        return len(self._postings)
+
+    def add_document(
+        self,
+        doc_id: Hashable,
+        fields: Mapping[str, Optional[str]],
+        boosts: Optional[Mapping[str, float]] = None
+    ) -> None:
+        """
+        Indicizza (o reindicizza) un documento.
+
+        Args:
+            doc_id: Identificativo del documento
+            fields: Contenuto testuale per campo
+            boosts: Peso di ciascun campo (default 1.0)
+        """
+        boosts = boosts or {}
+        term_freqs: Dict[str, float] = {}
+        offsets: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        length = 0.0
+
+        for field, text in fields.items():
+            boost = boosts.get(field, 1.0)
+            positions: Dict[str, List[int]] = {}
+            for token, start, end in self.analyzer.tokens(text):
+                term_freqs[token] = term_freqs.get(token, 0.0) + boost
+                length += boost
+                positions.setdefault(token, []).extend((start, end))
+            if positions:
+                offsets[field] = {term: tuple(spans) for term, spans in positions.items()}
+
+        with self._lock:
+            self._remove_unlocked(doc_id)
+            for term, freq in term_freqs.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    if self._vocabulary is not None:
+                        self._vocabulary.add(term)
+                postings[doc_id] = freq
+            self._doc_terms[doc_id] = term_freqs
+            self._doc_lengths[doc_id] = length
+            self._offsets[doc_id] = offsets
+            self._total_length += length
+
+    def remove_document(self, doc_id: Hashable) -> bool:
+        """
+        Rimuove un documento dall'indice.
+
+        Args:
+            doc_id: Identificativo del documento
+
+        Returns:
+            True se il documento era presente
+        """
+        with self._lock:
+            return self._remove_unlocked(doc_id)
+
+    def _remove_unlocked(self, doc_id: Hashable) -> bool:
+        term_freqs = self._doc_terms.pop(doc_id, None)
+        if term_freqs is None:
+            return False
+        self._offsets.pop(doc_id, None)
+
+        for term in term_freqs:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+                    if self._vocabulary is not None:
+                        self._vocabulary.remove(term)
+
+        self._total_length -= self._doc_lengths.pop(doc_id, 0.0)
+        return True
+
+    def document_frequency(self, term: str) -> int:
+        """Numero di documenti che contengono il termine."""
+        return len(self._postings.get(term, ()))
+
+    def idf(self, term: str) -> float:
+        """
+        Inverse document frequency BM25 (sempre positiva).
+
+        Args:
+            term: Termine normalizzato
+
+        Returns:
+            Valore IDF del termine
+        """
+        df = self.document_frequency(term)
+        n = len(self._doc_lengths)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def term_offsets(self, doc_id: Hashable, terms: Iterable[str]) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Posizioni dei termini dati nei campi di un documento.
+
+        Args:
+            doc_id: Identificativo del documento
+            terms: Termini normalizzati da cercare
+
+        Returns:
+            Dict[str, List[Tuple[int, int]]]: {campo: [(inizio, fine), ...]}
+            ordinati per posizione, solo per i campi che contengono i termini
+        """
+        terms = set(terms)
+        with self._lock:
+            fields = self._offsets.get(doc_id, {})
+            result = {}
+            for field, positions in fields.items():
+                spans: List[Tuple[int, int]] = []
+                for term in terms.intersection(positions):
+                    flat = positions[term]
+                    spans.extend(zip(flat[0::2], flat[1::2]))
+                if spans:
+                    result[field] = sorted(spans)
+            return result
+
+    def similar_terms(self, term: str, max_distance: int, limit: int = 10) -> Dict[str, int]:
+        """
+        Termini indicizzati simili a quello dato, per la ricerca fuzzy.
+
+        Args:
+            term: Termine normalizzato
+            max_distance: Distanza di Levenshtein massima
+            limit: Numero massimo di termini, preferendo i più vicini e frequenti
+
+        Returns:
+            Dict[str, int]: {termine: distanza}, escluso il termine stesso
+        """
+        with self._lock:
+            if self._vocabulary is None:
+                self._vocabulary = TrigramIndex()
+                for indexed in self._postings:
+                    self._vocabulary.add(indexed)
+            similar = self._vocabulary.similar(term, max_distance)
+            if len(similar) > limit:
+                best = heapq.nsmallest(
+                    limit, similar,
+                    key=lambda t: (similar[t], -self.document_frequency(t), t)
+                )
+                similar = {t: similar[t] for t in best}
+            return similar
+
+    def term_scores(self, terms: Iterable[str]) -> Dict[str, Dict[Hashable, float]]:
+        """
+        Calcola il contributo BM25 di ciascun termine per tutti i documenti
+        che lo contengono.
+
+        Serve a condividere il calcolo tra più query che usano gli stessi
+        termini (vedi il parametro term_scores di search); i valori restano
+        validi finché l'indice non viene modificato.
+
+        Args:
+            terms: Termini normalizzati
+
+        Returns:
+            Dict[str, Dict[Hashable, float]]: {termine: {doc_id: contributo}}
+        """
+        with self._lock:
+            n = len(self._doc_lengths)
+            avg_length = (self._total_length / n if n else 0.0) or 1.0
+            result = {}
+            for term in terms:
+                postings = self._postings.get(term, {})
+                idf = self.idf(term)
+                result[term] = {
+                    doc_id: idf * freq * (self.k1 + 1.0) / (
+                        freq + self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    )
+                    for doc_id, freq in postings.items()
+                }
+            return result
+
+    def explain(self, doc_id: Hashable, clauses: List[Mapping[str, float]]) -> Dict[str, Dict[str, float]]:
+        """
+        Scompone il punteggio BM25 di un documento per termine.
+
+        Args:
+            doc_id: Identificativo del documento
+            clauses: Clausole della query, come in search
+
+        Returns:
+            Dict[str, Dict[str, float]]: {termine: {"weight", "tf", "idf",
+            "length_norm", "score"}} per i termini che contribuiscono al
+            punteggio del documento
+        """
+        with self._lock:
+            n = len(self._doc_lengths)
+            length = self._doc_lengths.get(doc_id)
+            if not n or length is None:
+                return {}
+            avg_length = self._total_length / n or 1.0
+            norm = self.k1 * (1.0 - self.b + self.b * length / avg_length)
+            components = {}
+            for clause in clauses:
+                for key, weight in clause.items():
+                    terms = key if isinstance(key, tuple) else (key,)
+                    freqs = [self._postings.get(term, {}).get(doc_id) for term in terms]
+                    if None in freqs:
+                        continue
+                    for term, freq in zip(terms, freqs):
+                        idf = self.idf(term)
+                        components.setdefault(term, {
+                            "weight": weight,
+                            "tf": freq,
+                            "idf": round(idf, 4),
+                            "length_norm": round(norm, 4),
+                            "score": round(weight * idf * freq * (self.k1 + 1.0) / (freq + norm), 4),
+                        })
+            return components
+
+    def search(
+        self,
+        clauses: List[Mapping[str, float]],
+        candidates: Optional[Set[Hashable]] = None,
+        term_scores: Optional[Mapping[str, Mapping[Hashable, float]]] = None
+    ) -> Dict[Hashable, float]:
+        """
+        Esegue una query e calcola il punteggio BM25 dei documenti trovati.
+
+        Un documento corrisponde se soddisfa tutte le clausole, cioè se
+        contiene almeno un termine di ciascuna clausola. Una chiave di
+        clausola può essere anche una tupla di termini (es. un sinonimo di
+        più parole), soddisfatta dai documenti che li contengono tutti.
+
+        Args:
+            clauses: Clausole in AND, ciascuna {termine o tupla di termini: peso}
+            candidates: Eventuale insieme di documenti ammessi (filtri)
+            term_scores: Contributi precalcolati con term_scores per alcuni
+                termini, usati al posto del calcolo per documento
+
+        Returns:
+            Dizionario {doc_id: punteggio} dei documenti corrispondenti
+        """
+        if not clauses:
+            return {}
+
+        with self._lock:
+            n = len(self._doc_lengths)
+            if n == 0:
+                return {}
+            avg_length = self._total_length / n or 1.0
+
+            # Documenti che soddisfano ciascuna clausola: le clausole di un solo
+            # termine usano direttamente la posting list, senza copiarla
+            phrase_docs: Dict[Tuple[str, ...], Set[Hashable]] = {}
+            clause_docs: List[Collection[Hashable]] = []
+            for clause in clauses:
+                if len(clause) == 1:
+                    docs: Collection[Hashable] = self._key_documents(next(iter(clause)), phrase_docs)
+                else:
+                    docs = set()
+                    for key in clause:
+                        docs.update(self._key_documents(key, phrase_docs))
+                if not docs:
+                    return {}
+                clause_docs.append(docs)
+
+            # Intersezione partendo dall'insieme più piccolo: ogni passo costa
+            # quanto i risultati rimasti, non quanto la posting list
+            clause_docs.sort(key=len)
+            matches = set(clause_docs[0])
+            if candidates is not None:
+                matches &= candidates
+            for docs in clause_docs[1:]:
+                if not matches:
+                    break
+                matches = {doc_id for doc_id in matches if doc_id in docs}
+
+            if not matches:
+                return {}
+
+            scores: Dict[Hashable, float] = dict.fromkeys(matches, 0.0)
+            for clause in clauses:
+                for key, weight in clause.items():
+                    if isinstance(key, tuple):
+                        # I termini di una tupla contano solo nei documenti che li hanno tutti
+                        scope = phrase_docs[key]
+                        scope = {doc_id for doc_id in scope if doc_id in matches} \
+                            if len(scope) < len(matches) else {doc_id for doc_id in matches if doc_id in scope}
+                        terms = key
+                    else:
+                        scope, terms = matches, (key,)
+                    for term in terms:
+                        self._add_term_scores(scores, term, weight, scope, avg_length, term_scores)
+
+            return scores
+
+    def _key_documents(
+        self,
+        key: Union[str, Tuple[str, ...]],
+        phrase_docs: Dict[Tuple[str, ...], Set[Hashable]]
+    ) -> Collection[Hashable]:
+        # Documenti con il termine o con tutti i termini della tupla
+        # (questi ultimi memorizzati in phrase_docs per il calcolo dei punteggi)
+        if not isinstance(key, tuple):
+            return self._postings.get(key, {})
+        docs = phrase_docs.get(key)
+        if docs is None:
+            postings = sorted((self._postings.get(term, {}) for term in key), key=len)
+            docs = set(postings[0])
+            for other in postings[1:]:
+                if not docs:
+                    break
+                docs = {doc_id for doc_id in docs if doc_id in other}
+            phrase_docs[key] = docs
+        return docs
+
+    def _add_term_scores(
+        self,
+        scores: Dict[Hashable, float],
+        term: str,
+        weight: float,
+        scope: Collection[Hashable],
+        avg_length: float,
+        term_scores: Optional[Mapping[str, Mapping[Hashable, float]]]
+    ) -> None:
+        # Somma il contributo BM25 pesato del termine ai documenti di scope
+        postings = self._postings.get(term)
+        if not postings:
+            return
+        precomputed = term_scores.get(term) if term_scores else None
+        if precomputed is not None:
+            docs = scope if len(scope) < len(precomputed) else precomputed
+            for doc_id in docs:
+                contribution = precomputed.get(doc_id)
+                if contribution is not None and doc_id in scope:
+                    scores[doc_id] += weight * contribution
+            return
+        idf = self.idf(term) * weight
+        # Scorre l'insieme più piccolo tra risultati e posting list
+        docs = scope if len(scope) < len(postings) else postings
+        for doc_id in docs:
+            freq = postings.get(doc_id)
+            if freq is None or doc_id not in scope:
+                continue
+            norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+            scores[doc_id] += idf * freq * (self.k1 + 1.0) / (freq + norm)
+
+    def clear(self) -> None:
+        """Svuota l'indice."""
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._offsets = {}
+            self._total_length = 0.0
+            self._vocabulary = TrigramIndex()
+
+    def write_snapshot(self, writer: SnapshotWriter, prefix: str) -> None:
+        """
+        Aggiunge l'indice a uno snapshot come array piatti.
+
+        Vocabolario ordinato, posting list (righe dei documenti e
+        frequenze pesate) e indice diretto per documento sono sezioni
+        contigue; le posizioni dei termini sono record JSON per documento.
+        Gli ID dei documenti devono essere interi.
+
+        Args:
+            writer: Snapshot in costruzione
+            prefix: Prefisso dei nomi delle sezioni
+        """
+        with self._lock:
+            terms = sorted(self._postings)
+            doc_ids = sorted(self._doc_lengths)
+            rows = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+            term_rows = {term: row for row, term in enumerate(terms)}
+
+            posting_starts, posting_rows, posting_freqs = [0], [], []
+            for term in terms:
+                for row, freq in sorted((rows[doc_id], freq) for doc_id, freq in self._postings[term].items()):
+                    posting_rows.append(row)
+                    posting_freqs.append(freq)
+                posting_starts.append(len(posting_rows))
+
+            doc_starts, doc_terms, doc_freqs = [0], [], []
+            for doc_id in doc_ids:
+                for term, freq in self._doc_terms[doc_id].items():
+                    doc_terms.append(term_rows[term])
+                    doc_freqs.append(freq)
+                doc_starts.append(len(doc_terms))
+
+            writer.add_strings(f"{prefix}.terms", terms)
+            writer.add_array(f"{prefix}.posting_starts", posting_starts, "<i8")
+            writer.add_array(f"{prefix}.posting_rows", posting_rows, "<i4")
+            writer.add_array(f"{prefix}.posting_freqs", posting_freqs, "<f8")
+            writer.add_array(f"{prefix}.doc_ids", doc_ids, "<i8")
+            writer.add_array(f"{prefix}.doc_lengths", [self._doc_lengths[doc_id] for doc_id in doc_ids], "<f8")
+            writer.add_array(f"{prefix}.doc_starts", doc_starts, "<i8")
+            writer.add_array(f"{prefix}.doc_terms", doc_terms, "<i4")
+            writer.add_array(f"{prefix}.doc_freqs", doc_freqs, "<f8")
+            writer.add_records(f"{prefix}.offsets", (self._offsets.get(doc_id, {}) for doc_id in doc_ids))
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: Snapshot,
+        prefix: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+        analyzer: Optional[Analyzer] = None
+    ) -> "InvertedIndex":
+        """
+        Crea un indice che legge posting list e documenti da uno snapshot.
+
+        Solo le lunghezze dei documenti vengono caricate subito; posting
+        list, termini e posizioni di un documento sono decodificati al
+        primo accesso. L'indice resta modificabile: le modifiche restano
+        in memoria.
+
+        Args:
+            snapshot: Snapshot aperto
+            prefix: Prefisso usato con write_snapshot
+            k1: Parametro di saturazione della frequenza dei termini
+            b: Parametro di normalizzazione sulla lunghezza dei documenti
+            analyzer: Analizzatore del testo usato per costruire l'indice
+
+        Returns:
+            InvertedIndex: Indice pronto per le ricerche
+        """
+        terms = snapshot.strings(f"{prefix}.terms")
+        posting_starts = snapshot.array(f"{prefix}.posting_starts")
+        posting_rows = snapshot.array(f"{prefix}.posting_rows")
+        posting_freqs = snapshot.array(f"{prefix}.posting_freqs")
+        doc_ids = snapshot.array(f"{prefix}.doc_ids")
+        doc_lengths = snapshot.array(f"{prefix}.doc_lengths")
+        doc_starts = snapshot.array(f"{prefix}.doc_starts")
+        doc_terms = snapshot.array(f"{prefix}.doc_terms")
+        doc_freqs = snapshot.array(f"{prefix}.doc_freqs")
+        offsets = snapshot.records(f"{prefix}.offsets")
+
+        def load_postings(position: int) -> Dict[Hashable, float]:
+            start, end = posting_starts[position], posting_starts[position + 1]
+            return dict(zip(doc_ids[posting_rows[start:end]].tolist(), posting_freqs[start:end].tolist()))
+
+        def load_doc_terms(position: int) -> Dict[str, float]:
+            start, end = doc_starts[position], doc_starts[position + 1]
+            return {
+                terms[row]: freq
+                for row, freq in zip(doc_terms[start:end].tolist(), doc_freqs[start:end].tolist())
+            }
+
+        def load_offsets(position: int) -> Dict[str, Dict[str, Tuple[int, ...]]]:
+            return {
+                field: {term: tuple(spans) for term, spans in positions.items()}
+                for field, positions in offsets[position].items()
+            }
+
+        index = cls(k1, b, analyzer)
+        index._postings = SnapshotMapping(terms, load_postings)
+        index._doc_terms = SnapshotMapping(doc_ids, load_doc_terms)
+        index._doc_lengths = dict(zip(doc_ids.tolist(), doc_lengths.tolist()))
+        index._offsets = SnapshotMapping(doc_ids, load_offsets)
+        index._total_length = float(doc_lengths.sum())
+        index._vocabulary = None
+        return index
+
+
+def highlight_snippet(
+    text: str,
+    spans: Sequence[Tuple[int, int]],
+    fragment_size: int = 160,
+    pre_tag: str = "<mark>",
+    post_tag: str = "</mark>",
+    ellipsis: str = "…"
+) -> str:
+    """
+    Estrae da un testo il frammento con più termini trovati e li evidenzia.
+
+    Il frammento è la finestra di al più fragment_size caratteri che
+    contiene il maggior numero di occorrenze, allargata ai confini di
+    parola. Il testo è restituito con l'escape HTML, quindi solo i tag di
+    evidenziazione sono markup.
+
+    Args:
+        text: Testo originale del campo
+        spans: Posizioni (inizio, fine) delle occorrenze, ordinate
+        fragment_size: Lunghezza massima del frammento
+        pre_tag: Marcatore di apertura dell'evidenziazione
+        post_tag: Marcatore di chiusura dell'evidenziazione
+        ellipsis: Indicatore di testo omesso all'inizio o alla fine
+
+    Returns:
+        str: Frammento evidenziato
+    """
+    if not spans:
+        return html.escape(text[:fragment_size])
+
+    if len(text) <= fragment_size:
+        start, end = 0, len(text)
+    else:
+        # Finestra di occorrenze più densa (due puntatori sugli span ordinati)
+        best_first, best_last, last = 0, 0, 0
+        for first in range(len(spans)):
+            last = max(last, first)
+            while last + 1 < len(spans) and spans[last + 1][1] - spans[first][0] <= fragment_size:
+                last += 1
+            if last - first > best_last - best_first:
+                best_first, best_last = first, last
+        covered_start, covered_end = spans[best_first][0], spans[best_last][1]
+
+        # Centra le occorrenze nella finestra
+        margin = max(fragment_size - (covered_end - covered_start), 0) // 2
+        start = max(covered_start - margin, 0)
+        end = min(start + fragment_size, len(text))
+        start = max(min(start, end - fragment_size), 0)
+
+        # Non tronca le parole ai bordi
+        if start > 0:
+            space = text.find(" ", start, covered_start)
+            if space != -1:
+                start = space + 1
+        if end < len(text):
+            space = text.rfind(" ", covered_end, end)
+            if space != -1:
+                end = space
+
+    parts = [ellipsis] if start > 0 else []
+    position = start
+    for span_start, span_end in spans:
+        if span_start < position or span_end > end:
+            continue
+        parts.append(html.escape(text[position:span_start]))
+        parts.append(pre_tag + html.escape(text[span_start:span_end]) + post_tag)
+        position = span_end
+    parts.append(html.escape(text[position:end]))
+    if end < len(text):
+        parts.append(ellipsis)
+    return "".join(parts)
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.entries: Set[Hashable] = set()
+        self.top: Optional[List[Hashable]] = None
+
+
+class PrefixTrie:
+    """
+    Trie di termini per la ricerca per prefisso.
+
+    Ogni termine è associato a un insieme di voci; per ciascun nodo viene
+    memorizzata in modo pigro la lista delle migliori voci del sottoalbero,
+    invalidata lungo il percorso a ogni inserimento o rimozione. Le
+    interrogazioni ripetute sullo stesso prefisso costano quindi una
+    discesa nel trie.
+    """
+
+    def __init__(self, top_size: int = 20):
+        """
+        Inizializza un trie vuoto.
+
+        Args:
+            top_size: Numero di voci migliori memorizzate per nodo
+        """
+        self.top_size = top_size
+        self._root = _TrieNode()
+        self._lock = threading.RLock()
+
+    def insert(self, term: str, entry: Hashable) -> None:
+        """Associa una voce a un termine."""
+        with self._lock:
+            node = self._root
+            node.top = None
+            for char in term:
+                node = node.children.setdefault(char, _TrieNode())
+                node.top = None
+            node.entries.add(entry)
+
+    def remove(self, term: str, entry: Hashable) -> None:
+        """Rimuove l'associazione tra una voce e un termine."""
+        with self._lock:
+            path = [self._root]
+            for char in term:
+                node = path[-1].children.get(char)
+                if node is None:
+                    return
+                path.append(node)
+
+            path[-1].entries.discard(entry)
+            for node in path:
+                node.top = None
+
+            # Elimina i nodi rimasti vuoti
+            for depth in range(len(term), 0, -1):
+                node = path[depth]
+                if node.entries or node.children:
+                    break
+                del path[depth - 1].children[term[depth - 1]]
+
+    def _find(self, prefix: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def _collect(node: _TrieNode) -> Set[Hashable]:
+        entries: Set[Hashable] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            entries.update(current.entries)
+            stack.extend(current.children.values())
+        return entries
+
+    def entries(self, prefix: str) -> Set[Hashable]:
+        """
+        Restituisce tutte le voci associate a termini con il prefisso dato.
+
+        Args:
+            prefix: Prefisso normalizzato
+
+        Returns:
+            Insieme delle voci trovate
+        """
+        with self._lock:
+            node = self._find(prefix)
+            return self._collect(node) if node is not None else set()
+
+    def top(self, prefix: str, key: Callable[[Hashable], Any], limit: int) -> List[Hashable]:
+        """
+        Restituisce le voci migliori per un prefisso.
+
+        Args:
+            prefix: Prefisso normalizzato
+            key: Funzione di ordinamento (valori minori vengono prima)
+            limit: Numero massimo di voci
+
+        Returns:
+            Lista ordinata delle voci migliori
+        """
+        with self._lock:
+            node = self._find(prefix)
+            if node is None:
+                return []
+            if limit > self.top_size:
+                return heapq.nsmallest(limit, self._collect(node), key=key)
+            if node.top is None:
+                node.top = heapq.nsmallest(self.top_size, self._collect(node), key=key)
+            return node.top[:limit]
+
+    def invalidate(self) -> None:
+        """Invalida le liste di voci migliori memorizzate in tutti i nodi."""
+        with self._lock:
+            stack = [self._root]
+            while stack:
+                node = stack.pop()
+                node.top = None
+                stack.extend(node.children.values())
@@ -0,0 +1,338 @@
+"""
+Snapshot su disco degli indici di ricerca.
+
+Uno snapshot è un file binario composto da un'intestazione versionata,
+dai metadati in JSON e da sezioni di array piatti (numpy) allineate. Il
+file viene aperto con mmap in sola lettura: gli array sono viste sul file,
+senza copie, e le pagine sono condivise tra i processi che lo aprono.
+
+I valori costosi da decodificare (posting list, documenti) sono letti su
+richiesta tramite SnapshotMapping, così il caricamento richiede solo la
+lettura dell'intestazione.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Set
+
+import numpy as np
+
+# Identificativo dei file di snapshot
+SNAPSHOT_MAGIC = b"CCSNAP\x00\x00"
+
+# Versione del formato: va incrementata a ogni modifica della struttura del file
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Intestazione: magic, versione del formato, lunghezza dei metadati
+_HEADER = struct.Struct("<8sIQ")
+
+# Allineamento delle sezioni in byte
+_ALIGNMENT = 8
+
+
+class SnapshotError(Exception):
+    """Snapshot assente, danneggiato o non compatibile con l'indice corrente."""
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class SnapshotWriter:
+    """
+    Costruisce uno snapshot sezione per sezione e lo scrive su disco.
+
+    Le sezioni sono array con un tipo numpy; stringhe e record JSON sono
+    salvati come una sezione di offset e una di byte.
+    """
+
+    def __init__(self):
+        """Inizializza uno snapshot vuoto."""
+        self._sections: Dict[str, np.ndarray] = {}
+
+    def add_array(self, name: str, values: Any, dtype: str) -> None:
+        """
+        Aggiunge una sezione con un array piatto.
+
+        Args:
+            name: Nome della sezione
+            values: Valori (sequenza o array numpy)
+            dtype: Tipo numpy degli elementi (es. "<i8", "<f8")
+        """
+        self._sections[name] = np.ascontiguousarray(values, dtype=np.dtype(dtype))
+
+    def add_blobs(self, name: str, blobs: Iterable[bytes]) -> None:
+        """
+        Aggiunge una sequenza di valori binari di lunghezza variabile.
+
+        Args:
+            name: Nome della tabella
+            blobs: Valori binari, letti poi per posizione
+        """
+        offsets = [0]
+        data = bytearray()
+        for blob in blobs:
+            data += blob
+            offsets.append(len(data))
+        self.add_array(f"{name}.offsets", offsets, "<i8")
+        self.add_array(f"{name}.data", np.frombuffer(bytes(data), dtype=np.uint8), "u1")
+
+    def add_strings(self, name: str, strings: Iterable[str]) -> None:
+        """Aggiunge una sequenza di stringhe (in UTF-8)."""
+        self.add_blobs(name, (string.encode("utf-8") for string in strings))
+
+    def add_records(self, name: str, records: Iterable[Any]) -> None:
+        """Aggiunge una sequenza di record serializzabili in JSON."""
+        self.add_blobs(name, (
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            for record in records
+        ))
+
+    def write(self, path: str, metadata: Mapping[str, Any]) -> int:
+        """
+        Scrive lo snapshot su disco.
+
+        Il file viene scritto a parte e sostituisce quello esistente con un
+        rename atomico: i processi che lo hanno già mappato continuano a
+        leggere la versione precedente.
+
+        Args:
+            path: Percorso del file
+            metadata: Metadati serializzabili in JSON (es. versione dello
+                schema e impronta dei dati), verificati all'apertura
+
+        Returns:
+            int: Dimensione del file in byte
+        """
+        layout = {}
+        offset = 0
+        for name, array in self._sections.items():
+            offset = _align(offset)
+            layout[name] = [offset, array.dtype.str, int(array.size)]
+            offset += array.nbytes
+
+        header = json.dumps(
+            {"metadata": dict(metadata), "sections": layout},
+            ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        base = _align(_HEADER.size + len(header))
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as handle:
+                handle.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(header)))
+                handle.write(header)
+                for name, array in self._sections.items():
+                    handle.seek(base + layout[name][0])
+                    handle.write(array.tobytes())
+                handle.truncate(base + offset)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return base + offset
+
+
+class Snapshot:
+    """
+    Snapshot aperto con mmap in sola lettura.
+
+    Gli array restituiti sono viste sul file mappato: restano validi finché
+    esiste un riferimento, anche se nel frattempo il file viene sostituito.
+    """
+
+    def __init__(self, buffer: mmap.mmap, metadata: Dict[str, Any], sections: Dict[str, List[Any]], base: int):
+        self._buffer = buffer
+        self.metadata = metadata
+        self._sections = sections
+        self._base = base
+
+    @classmethod
+    def open(cls, path: str, expected: Optional[Mapping[str, Any]] = None) -> "Snapshot":
+        """
+        Apre uno snapshot verificandone formato e metadati.
+
+        Args:
+            path: Percorso del file
+            expected: Valori attesi per alcune chiavi dei metadati (es.
+                schema dell'indice e impronta dei dati)
+
+        Returns:
+            Snapshot: Snapshot aperto
+
+        Raises:
+            SnapshotError: Se il file manca, è danneggiato, ha un'altra
+                versione del formato o metadati diversi da quelli attesi
+        """
+        try:
+            with open(path, "rb") as handle:
+                buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"snapshot non leggibile: {e}") from e
+
+        if len(buffer) < _HEADER.size:
+            raise SnapshotError("snapshot troncato")
+        magic, version, header_length = _HEADER.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("il file non è uno snapshot")
+        if version != SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotError(f"versione del formato {version}, attesa {SNAPSHOT_FORMAT_VERSION}")
+        try:
+            header = json.loads(buffer[_HEADER.size:_HEADER.size + header_length])
+        except ValueError as e:
+            raise SnapshotError("intestazione danneggiata") from e
+
+        base = _align(_HEADER.size + header_length)
+        for name, (offset, dtype, size) in header["sections"].items():
+            if base + offset + np.dtype(dtype).itemsize * size > len(buffer):
+                raise SnapshotError(f"sezione {name} troncata")
+
+        metadata = header["metadata"]
+        for key, value in (expected or {}).items():
+            if metadata.get(key) != value:
+                raise SnapshotError(f"snapshot obsoleto: {key} diverso")
+        return cls(buffer, metadata, header["sections"], base)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def array(self, name: str) -> np.ndarray:
+        """
+        Array di una sezione, come vista in sola lettura sul file.
+
+        Args:
+            name: Nome della sezione
+
+        Returns:
+            np.ndarray: Array della sezione
+        """
+        offset, dtype, size = self._sections[name]
+        return np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=size, offset=self._base + offset)
+
+    def blobs(self, name: str) -> "BlobTable":
+        """Tabella di valori binari aggiunta con add_blobs."""
+        return BlobTable(self.array(f"{name}.offsets"), self.array(f"{name}.data"))
+
+    def strings(self, name: str) -> "BlobTable":
+        """Tabella di stringhe aggiunta con add_strings."""
+        return BlobTable(self.array(f"{name}.offsets"), self.array(f"{name}.data"), bytes.decode)
+
+    def records(self, name: str) -> "BlobTable":
+        """Tabella di record JSON aggiunta con add_records."""
+        return BlobTable(self.array(f"{name}.offsets"), self.array(f"{name}.data"), json.loads)
+
+
+class BlobTable(Sequence):
+    """
+    Sequenza di valori a lunghezza variabile letti dallo snapshot.
+
+    Ogni accesso decodifica un solo valore; se i valori sono ordinati la
+    tabella può essere usata con bisect.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray, decode: Optional[Callable[[bytes], Any]] = None):
+        self._offsets = offsets
+        self._data = data
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        value = self._data[self._offsets[position]:self._offsets[position + 1]].tobytes()
+        return self._decode(value) if self._decode else value
+
+
+_MISSING = object()
+
+
+class SnapshotMapping(MutableMapping):
+    """
+    Dizionario i cui valori iniziali sono letti su richiesta da uno snapshot.
+
+    Le chiavi dello snapshot sono una sequenza ordinata (array numpy o
+    BlobTable); un valore viene decodificato al primo accesso e poi tenuto
+    in memoria. Le scritture restano nel processo e non modificano il file:
+    le chiavi rimosse sono ricordate a parte.
+
+    Args:
+        keys: Chiavi dello snapshot, in ordine crescente
+        load: Funzione che decodifica il valore nella posizione data
+    """
+
+    def __init__(self, keys: Sequence[Any], load: Callable[[int], Any]):
+        self._keys = keys
+        self._load = load
+        self._values: Dict[Any, Any] = {}
+        self._removed: Set[Any] = set()
+        self._added: Set[Any] = set()
+
+    def _locate(self, key: Any) -> Optional[int]:
+        # Posizione della chiave nello snapshot (None se assente)
+        try:
+            if isinstance(self._keys, np.ndarray):
+                position = int(np.searchsorted(self._keys, key))
+            else:
+                position = bisect.bisect_left(self._keys, key)
+        except (TypeError, ValueError):
+            return None
+        if position < len(self._keys) and self._keys[position] == key:
+            return position
+        return None
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._values.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self._removed:
+            raise KeyError(key)
+        position = self._locate(key)
+        if position is None:
+            raise KeyError(key)
+        value = self._values[key] = self._load(position)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        if key in self._values:
+            return True
+        return key not in self._removed and self._locate(key) is not None
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if key in self._removed:
+            self._removed.discard(key)
+        elif key not in self._values and self._locate(key) is None:
+            self._added.add(key)
+        self._values[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        if key in self._added:
+            self._added.discard(key)
+            del self._values[key]
+            return
+        if key not in self:
+            raise KeyError(key)
+        self._values.pop(key, None)
+        self._removed.add(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        for key in self._keys:
+            if isinstance(key, np.generic):
+                key = key.item()
+            if key not in self._removed:
+                yield key
+        yield from list(self._added)
+
+    def __len__(self) -> int:
+        return len(self._keys) - len(self._removed) + len(self._added)
@@ -0,0 +1,218 @@
+"""
+Espansione delle query con sinonimi e concetti correlati.
+
+La tabella raccoglie termini equivalenti del dominio (terminologia GDPR,
+principi di Privacy by Design, abbreviazioni, equivalenti italiano/inglese)
+e relazioni tra concetti affini. Viene compilata una sola volta con lo
+stesso analizzatore dell'indice, così sinonimi e query producono gli
+stessi termini; all'interrogazione ogni sequenza di termini della query
+viene cercata nella tabella tramite una cache.
+
+Le espansioni sono termini alternativi con peso ridotto: un pattern che
+contiene "erasure" corrisponde alla query "right to be forgotten", ma con
+un punteggio inferiore a quello di un pattern con i termini originali.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+
+from src.utils.analysis import Analyzer, analyze
+
+# Gruppi di espressioni equivalenti
+SYNONYM_GROUPS: Tuple[Tuple[str, ...], ...] = (
+    # Diritti dell'interessato (GDPR artt. 15-22)
+    ("right to be forgotten", "right to erasure", "erasure", "diritto all'oblio",
+     "diritto alla cancellazione", "cancellazione"),
+    ("right of access", "subject access request", "dsar", "diritto di accesso"),
+    ("data portability", "right to data portability", "portabilità dei dati"),
+    ("right to rectification", "rectification", "rettifica"),
+    ("right to object", "objection", "diritto di opposizione", "opposizione"),
+    ("automated decision making", "profiling", "processo decisionale automatizzato", "profilazione"),
+    # Ruoli e concetti del GDPR
+    ("data controller", "titolare del trattamento"),
+    ("data processor", "responsabile del trattamento"),
+    ("dpo", "data protection officer", "responsabile della protezione dei dati", "rpd"),
+    ("data subject", "interessato"),
+    ("personal data", "dati personali", "pii", "personally identifiable information"),
+    ("special categories of data", "sensitive data", "dati sensibili", "categorie particolari di dati"),
+    ("supervisory authority", "data protection authority", "autorità di controllo", "garante"),
+    ("processing", "trattamento"),
+    ("consent", "consenso"),
+    ("legitimate interest", "legittimo interesse"),
+    ("lawful basis", "legal basis", "base giuridica", "liceità del trattamento"),
+    ("dpia", "data protection impact assessment", "impact assessment",
+     "valutazione d'impatto", "valutazione d'impatto sulla protezione dei dati"),
+    ("data breach", "personal data breach", "violazione dei dati", "violazione dei dati personali"),
+    ("records of processing activities", "ropa", "registro dei trattamenti", "registro delle attività di trattamento"),
+    ("purpose limitation", "limitazione della finalità"),
+    ("data minimisation", "data minimization", "minimizzazione dei dati"),
+    ("storage limitation", "data retention", "limitazione della conservazione", "conservazione dei dati"),
+    ("privacy notice", "privacy policy", "informativa privacy", "informativa"),
+    ("cross border transfer", "international transfer", "trasferimento all'estero", "trasferimento internazionale"),
+    # Privacy by Design
+    ("privacy by design", "data protection by design", "pbd", "protezione dei dati fin dalla progettazione"),
+    ("privacy by default", "data protection by default", "protezione dei dati per impostazione predefinita"),
+    ("privacy enhancing technologies", "pets", "tecnologie per la privacy"),
+    # Misure tecniche
+    ("pseudonymisation", "pseudonymization", "pseudonimizzazione"),
+    ("anonymisation", "anonymization", "anonimizzazione"),
+    ("encryption", "cifratura", "crittografia"),
+    ("access control", "controllo degli accessi"),
+    ("audit log", "audit trail", "registro di audit"),
+    ("mfa", "2fa", "multi factor authentication", "two factor authentication",
+     "autenticazione multifattore", "autenticazione a due fattori"),
+    ("transparency", "trasparenza"),
+    ("accountability", "responsabilizzazione"),
+)
+
+# Concetti correlati (non equivalenti): espressione -> espressioni affini
+RELATED_TERMS: Dict[str, Tuple[str, ...]] = {
+    "erasure": ("deletion", "data retention"),
+    "pseudonymisation": ("anonymisation", "encryption"),
+    "anonymisation": ("pseudonymisation", "aggregation"),
+    "encryption": ("pseudonymisation",),
+    "dpia": ("risk assessment",),
+    "data breach": ("incident", "breach notification"),
+    "consent": ("lawful basis", "permission"),
+    "data minimisation": ("aggregation", "storage limitation"),
+    "privacy notice": ("transparency",),
+    "access control": ("authentication", "authorization"),
+    "profiling": ("tracking",),
+    # Principi fondazionali di Privacy by Design
+    "proactive not reactive": ("prevention", "privacy by design"),
+    "privacy as the default setting": ("privacy by default",),
+    "privacy embedded into design": ("privacy by design",),
+    "full functionality": ("positive sum",),
+    "end to end security": ("encryption", "lifecycle protection"),
+    "visibility and transparency": ("transparency", "accountability"),
+    "respect for user privacy": ("user centric", "consent"),
+}
+
+# Peso dei sinonimi rispetto ai termini della query
+SYNONYM_WEIGHT = 0.5
+
+# Peso dei concetti correlati
+RELATED_WEIGHT = 0.25
+
+# Espansioni massime per sequenza di termini, preferendo i sinonimi
+MAX_EXPANSIONS = 8
+
+# Chiave di una clausola: un termine, o una tupla di termini tutti richiesti
+ClauseKey = Union[str, Tuple[str, ...]]
+
+
+def clause_key(terms: Sequence[str]) -> ClauseKey:
+    """Chiave di clausola per una sequenza di termini."""
+    return terms[0] if len(terms) == 1 else tuple(terms)
+
+
+def key_terms(key: ClauseKey) -> Tuple[str, ...]:
+    """Termini di una chiave di clausola."""
+    return key if isinstance(key, tuple) else (key,)
+
+
+class QueryExpander:
+    """
+    Tabella di sinonimi compilata per un analizzatore.
+
+    Le espressioni della tabella sono analizzate alla costruzione; le
+    espansioni di ogni sequenza di termini sono poi memorizzate in una
+    cache LRU, così ogni termine distinto delle query costa una sola
+    ricerca nella tabella.
+    """
+
+    def __init__(
+        self,
+        analyzer: Analyzer = analyze,
+        groups: Iterable[Sequence[str]] = SYNONYM_GROUPS,
+        related: Mapping[str, Sequence[str]] = RELATED_TERMS,
+        synonym_weight: float = SYNONYM_WEIGHT,
+        related_weight: float = RELATED_WEIGHT,
+        cache_size: int = 10_000
+    ):
+        """
+        Args:
+            analyzer: Analizzatore usato dall'indice
+            groups: Gruppi di espressioni equivalenti
+            related: Concetti correlati per espressione
+            synonym_weight: Peso delle espressioni equivalenti
+            related_weight: Peso dei concetti correlati
+            cache_size: Sequenze di termini memorizzate
+        """
+        self.analyzer = analyzer
+        table: Dict[Tuple[str, ...], Dict[Tuple[str, ...], float]] = {}
+
+        def phrase(text: str) -> Tuple[str, ...]:
+            return tuple(dict.fromkeys(analyzer(text)))
+
+        for group in groups:
+            phrases = [terms for terms in map(phrase, group) if terms]
+            for source in phrases:
+                for target in phrases:
+                    if target != source:
+                        table.setdefault(source, {})[target] = synonym_weight
+        for source_text, targets in related.items():
+            source = phrase(source_text)
+            for target in map(phrase, targets):
+                if source and target and target != source:
+                    table.setdefault(source, {}).setdefault(target, related_weight)
+
+        self._table = table
+        self.max_length = max((len(source) for source in table), default=1)
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def _lookup(self, terms: Tuple[str, ...]) -> Tuple[Tuple[ClauseKey, float], ...]:
+        targets = self._table.get(terms)
+        if not targets:
+            return ()
+        # Un'espansione che contiene tutti i termini di un'altra (o della
+        # sequenza originale) non trova documenti in più: viene scartata
+        kept: List[Tuple[Tuple[str, ...], float]] = []
+        covered = [set(terms)]
+        for target, weight in sorted(targets.items(), key=lambda item: (-item[1], len(item[0]), item[0])):
+            if any(subset <= set(target) for subset in covered):
+                continue
+            kept.append((target, weight))
+            covered.append(set(target))
+            if len(kept) == MAX_EXPANSIONS:
+                break
+        return tuple((clause_key(target), weight) for target, weight in kept)
+
+    def expand(self, terms: Sequence[str]) -> List[Dict[ClauseKey, float]]:
+        """
+        Trasforma i termini di una query in clausole con le espansioni.
+
+        Ogni termine resta una clausola con peso 1.0. Per le sequenze di
+        termini presenti nella tabella (la più lunga a partire da ogni
+        posizione) le espansioni sono aggiunte a ciascuna clausola della
+        sequenza, con il peso diviso per la sua lunghezza: un documento
+        che contiene solo "erasure" soddisfa entrambe le clausole di
+        "right to be forgotten" e riceve in totale il peso del sinonimo.
+
+        Args:
+            terms: Termini della query prodotti dall'analizzatore
+
+        Returns:
+            List[Dict[ClauseKey, float]]: Clausole in AND, una per termine
+            distinto della query, ciascuna {chiave: peso}
+        """
+        clauses: Dict[str, Dict[ClauseKey, float]] = {}
+        position = 0
+        while position < len(terms):
+            for length in range(min(self.max_length, len(terms) - position), 0, -1):
+                sequence = tuple(terms[position:position + length])
+                expansions = self.lookup(sequence)
+                if expansions or length == 1:
+                    break
+            for term in sequence:
+                clause = clauses.setdefault(term, {term: 1.0})
+                for expansion, weight in expansions:
+                    clause.setdefault(expansion, weight / length)
+            position += length
+        return list(clauses.values())
+
+
+# Tabella compilata per l'analizzatore predefinito
+query_expander = QueryExpander()
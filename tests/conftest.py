@@ -50,6 +50,17 @@ def pytest_addoption(parser):
         default=False,
         help="Usa database mock invece di un database reale"
     )
+    parser.addoption(
+        "--run-performance",
+        action="store_true",
+        default=False,
+        help="Esegue i test di performance"
+    )
+    parser.addoption(
+        "--benchmark-sizes",
+        default="1000,10000",
+        help="Dimensioni dei corpora del benchmark di ricerca, separate da virgole"
+    )
 
 @pytest.fixture(scope="session")
 def use_mock_db(request):
@@ -247,6 +258,46 @@ def expired_token(test_user) -> str:
     expires = timedelta(minutes=-10)  # Scaduto 10 minuti fa
     return create_access_token(data={"sub": str(test_user.id)}, expires_delta=expires)
 
+# Fixture per test su un database SQLite isolato
+@pytest.fixture
+def sqlite_engine():
+    """
+    Crea un database SQLite in memoria dedicato al singolo test.
+    
+    Le tabelle newsletter sono escluse perché usano tipi UUID non
+    supportati da SQLite.
+    
+    Yields:
+        Engine: Motore SQLAlchemy con le tabelle create
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    tables = [t for name, t in Base.metadata.tables.items() if not name.startswith("newsletter")]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    
+    yield engine
+    
+    engine.dispose()
+
+# Cache dei risultati di ricerca isolata per ogni test
+@pytest.fixture(autouse=True)
+def isolated_search_cache(monkeypatch):
+    """
+    Fornisce una cache dei risultati di ricerca vuota a ogni test.
+    
+    I SearchService creati durante il test usano un nuovo namespace; quello
+    condiviso dall'istanza globale viene svuotato.
+    """
+    from src.services import search_service as search_service_module
+    from src.utils.cache import LRUCache
+    
+    search_service_module.search_service.cache.clear()
+    monkeypatch.setattr(search_service_module, "search_cache", LRUCache("search"))
+    yield
+
 # Fixture per il servizio di ricerca
 @pytest.fixture
 def search_service():
@@ -0,0 +1,493 @@
+# tests/performance/search_benchmark.py
+"""
+Benchmark di scalabilità della ricerca su corpora sintetici.
+
+Genera corpora di Privacy Patterns di dimensione crescente (testi di
+lunghezza realistica, vocabolario con distribuzione di Zipf, densità dei
+collegamenti tassonomici simili ai dati reali), li carica in un database
+SQLite con FTS5 e misura latenza (p50/p95/p99) e throughput di ricerca
+testuale, filtri, autocompletamento e pattern correlati con ciascun
+motore di ricerca ("memory" e "database").
+
+I risultati sono scritti in JSON, con il commit corrente, per confrontare
+versioni diverse del codice:
+
+    python -m tests.performance.search_benchmark --sizes 1000,10000,100000
+    python -m tests.performance.search_benchmark --compare performance_results/prima.json
+"""
+import argparse
+import contextlib
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.config import settings
+from src.controllers.pattern_controller import PatternController
+from src.db.fulltext import setup_fulltext_search
+# I modelli collegati da relazioni devono essere registrati prima dell'uso
+from src.models import (  # noqa: F401
+    implementation_example, iso_phase, newsletter, notification, pbd_principle, user_model, vulnerability,
+)
+from src.models.base import Base
+from src.models.gdpr_model import GDPRArticle
+from src.models.privacy_pattern import (
+    PrivacyPattern,
+    pattern_gdpr_association,
+    pattern_iso_association,
+    pattern_pbd_association,
+    pattern_vulnerability_association,
+)
+from src.services.autocomplete_index import AutocompleteIndex
+from src.services.related_index import RelatedPatternsIndex
+from src.services.search_index import PatternSearchIndex
+from src.services.search_service import search_service
+from src.services.unified_index import UnifiedSearchIndex
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Dimensioni predefinite dei corpora
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Motori di ricerca confrontati (valori di SEARCH_ENGINE)
+ENGINES = ("memory", "database")
+
+# Operazioni misurate per ogni corpus e motore
+OPERATIONS = ("search", "filter", "autocomplete", "related")
+
+# Strategie e componenti MVC dei pattern generati
+STRATEGIES = ("Minimize", "Hide", "Separate", "Aggregate", "Inform", "Control", "Enforce", "Demonstrate")
+MVC_COMPONENTS = ("Model", "View", "Controller")
+
+# Lunghezza dei campi testuali in parole (minimo, massimo)
+FIELD_WORDS = {
+    "title": (2, 6),
+    "description": (20, 70),
+    "context": (20, 80),
+    "problem": (15, 60),
+    "solution": (30, 120),
+    "consequences": (15, 60),
+}
+
+# Collegamenti tassonomici per pattern: (ID disponibili, minimo, massimo)
+LINK_DENSITY = {
+    pattern_gdpr_association: (99, 1, 6),
+    pattern_pbd_association: (7, 1, 3),
+    pattern_iso_association: (6, 1, 2),
+    pattern_vulnerability_association: (35, 0, 3),
+}
+
+# Parole del vocabolario generato
+VOCABULARY_SIZE = 20_000
+
+# Pattern inseriti per blocco nel database
+INSERT_CHUNK_SIZE = 5_000
+
+# Radici e desinenze usate per comporre parole plausibili in italiano e inglese
+_ROOTS = (
+    "dat", "priv", "consens", "utent", "trattament", "sicur", "access", "cifr", "pseudonim",
+    "anonim", "conserv", "cancell", "notific", "trasparen", "minimizz", "control", "regist",
+    "autentic", "autorizz", "log", "audit", "rischi", "violaz", "profil", "cookie", "track",
+    "polic", "inform", "retent", "encrypt", "identit", "token", "session", "backup", "report",
+)
+_ENDINGS = ("", "o", "a", "i", "e", "are", "azione", "ation", "ing", "ed", "s", "ità", "mente", "ity", "al")
+
+
+def git_commit() -> Optional[str]:
+    """Commit corrente del repository, se disponibile."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class SyntheticCorpus:
+    """
+    Generatore deterministico di pattern sintetici.
+
+    Con lo stesso seed produce sempre gli stessi pattern e le stesse query,
+    così i risultati di commit diversi sono confrontabili.
+    """
+
+    def __init__(self, size: int, seed: int = 42):
+        """
+        Args:
+            size: Numero di pattern
+            seed: Seed del generatore casuale
+        """
+        self.size = size
+        self.seed = seed
+        rng = random.Random(seed)
+        words = set()
+        while len(words) < VOCABULARY_SIZE:
+            words.add(rng.choice(_ROOTS) + rng.choice(_ENDINGS) + "".join(
+                rng.choice("abcdefghilmnoprstuvz") for _ in range(rng.randint(0, 4))
+            ))
+        self.vocabulary = sorted(words)
+        rng.shuffle(self.vocabulary)
+        # Frequenza di Zipf: la parola di rango r compare con peso 1/r
+        self._weights = [1.0 / rank for rank in range(1, len(self.vocabulary) + 1)]
+
+    def _text(self, rng: random.Random, field: str) -> str:
+        low, high = FIELD_WORDS[field]
+        return " ".join(rng.choices(self.vocabulary, self._weights, k=rng.randint(low, high)))
+
+    def patterns(self) -> Iterator[Dict[str, Any]]:
+        """
+        Genera le righe dei pattern.
+
+        Yields:
+            Dict[str, Any]: Valori delle colonne di PrivacyPattern
+        """
+        rng = random.Random(self.seed)
+        for pattern_id in range(1, self.size + 1):
+            row = {field: self._text(rng, field) for field in FIELD_WORDS}
+            row["title"] = f"{row['title'].capitalize()} {pattern_id}"
+            row.update(
+                id=pattern_id,
+                strategy=rng.choice(STRATEGIES),
+                mvc_component=rng.choice(MVC_COMPONENTS),
+                view_count=int(rng.paretovariate(1.5)),
+            )
+            yield row
+
+    def links(self) -> Iterator[Any]:
+        """
+        Genera i collegamenti tassonomici.
+
+        Yields:
+            Tuple[Table, List[Dict[str, int]]]: Tabella di associazione e righe
+        """
+        rng = random.Random(self.seed + 1)
+        for table, (available, low, high) in LINK_DENSITY.items():
+            column = next(c.name for c in table.columns if c.name != "pattern_id")
+            rows = [
+                {"pattern_id": pattern_id, column: linked_id}
+                for pattern_id in range(1, self.size + 1)
+                for linked_id in rng.sample(range(1, available + 1), rng.randint(low, high))
+            ]
+            yield table, rows
+
+    def queries(self, count: int) -> List[str]:
+        """Query testuali di una o più parole, con le frequenze del corpus."""
+        rng = random.Random(self.seed + 2)
+        return [" ".join(rng.choices(self.vocabulary, self._weights, k=rng.choice((1, 1, 2, 3)))) for _ in range(count)]
+
+    def prefixes(self, count: int) -> List[str]:
+        """Prefissi di 3-5 caratteri per l'autocompletamento."""
+        rng = random.Random(self.seed + 3)
+        return [word[:rng.randint(3, 5)] for word in rng.choices(self.vocabulary, self._weights, k=count)]
+
+    def filters(self, count: int) -> List[Dict[str, Any]]:
+        """Combinazioni di filtri per strategia, componente e tassonomie."""
+        rng = random.Random(self.seed + 4)
+        combinations = []
+        for _ in range(count):
+            combination: Dict[str, Any] = {"strategy": rng.choice(STRATEGIES)}
+            if rng.random() < 0.5:
+                combination["mvc_component"] = rng.choice(MVC_COMPONENTS)
+            combination["gdpr_id"] = rng.sample(range(1, 100), rng.randint(1, 2))
+            combination["taxonomy_match"] = rng.choice(("all", "any"))
+            combinations.append(combination)
+        return combinations
+
+    def load(self, engine: Engine) -> float:
+        """
+        Carica il corpus nel database (con le strutture full-text).
+
+        Args:
+            engine: Engine con le tabelle già create
+
+        Returns:
+            float: Secondi impiegati
+        """
+        started = time.perf_counter()
+        setup_fulltext_search(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(GDPRArticle), [
+                {"id": i, "number": str(i), "title": f"Articolo {i}", "content": f"Contenuto dell'articolo {i}"}
+                for i in range(1, 100)
+            ])
+            chunk: List[Dict[str, Any]] = []
+            for row in self.patterns():
+                chunk.append(row)
+                if len(chunk) == INSERT_CHUNK_SIZE:
+                    conn.execute(insert(PrivacyPattern), chunk)
+                    chunk = []
+            if chunk:
+                conn.execute(insert(PrivacyPattern), chunk)
+            for table, rows in self.links():
+                conn.execute(insert(table), rows)
+        return time.perf_counter() - started
+
+
+def latency_stats(times: Sequence[float]) -> Dict[str, float]:
+    """
+    Statistiche di latenza di una serie di misure.
+
+    Args:
+        times: Durate in secondi
+
+    Returns:
+        Dict[str, float]: p50/p95/p99 e media in millisecondi, throughput in
+        operazioni al secondo (sequenziali)
+    """
+    quantiles = statistics.quantiles(times, n=100, method="inclusive")
+    return {
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(times) * 1000, 3),
+        "throughput_per_s": round(len(times) / sum(times), 1) if sum(times) else 0.0,
+    }
+
+
+def measure(operation: Callable[[Any], Any], inputs: Sequence[Any], warmup: int = 5) -> List[float]:
+    """
+    Esegue un'operazione per ogni input misurandone la durata.
+
+    Args:
+        operation: Funzione da misurare
+        inputs: Argomenti delle esecuzioni
+        warmup: Esecuzioni iniziali non misurate
+
+    Returns:
+        List[float]: Durate in secondi
+    """
+    for value in inputs[:warmup]:
+        operation(value)
+    times = []
+    for value in inputs:
+        started = time.perf_counter()
+        operation(value)
+        times.append(time.perf_counter() - started)
+    return times
+
+
+@contextlib.contextmanager
+def configured_engine(engine_name: str) -> Iterator[None]:
+    """
+    Configura il servizio di ricerca condiviso per un motore.
+
+    Usa indici vuoti e una cache disattivata, così ogni misura esegue
+    davvero la ricerca; al termine ripristina la configurazione.
+    """
+    saved = (
+        settings.SEARCH_ENGINE, search_service.index, search_service.related,
+        search_service.unified, search_service.autocomplete, search_service.cache,
+    )
+    settings.SEARCH_ENGINE = engine_name
+    search_service.index, search_service.related = PatternSearchIndex(), RelatedPatternsIndex()
+    search_service.unified, search_service.autocomplete = UnifiedSearchIndex(), AutocompleteIndex()
+    search_service.cache = LRUCache("search", max_entries=0)
+    try:
+        yield
+    finally:
+        (
+            settings.SEARCH_ENGINE, search_service.index, search_service.related,
+            search_service.unified, search_service.autocomplete, search_service.cache,
+        ) = saved
+
+
+def benchmark_corpus(
+    corpus: SyntheticCorpus,
+    engines: Sequence[str] = ENGINES,
+    iterations: int = 200
+) -> Dict[str, Any]:
+    """
+    Misura tutte le operazioni su un corpus con ciascun motore.
+
+    Args:
+        corpus: Corpus sintetico
+        engines: Motori da confrontare
+        iterations: Esecuzioni misurate per operazione
+
+    Returns:
+        Dict[str, Any]: {"builds": [...], "results": [...]}
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    tables = [t for name, t in Base.metadata.tables.items() if not name.startswith("newsletter")]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    load_seconds = corpus.load(engine)
+    builds = [{"engine": "database", "corpus_size": corpus.size, "seconds": round(load_seconds, 3)}]
+    results = []
+
+    rng = random.Random(corpus.seed + 5)
+    inputs = {
+        "search": corpus.queries(iterations),
+        "filter": corpus.filters(iterations),
+        "autocomplete": corpus.prefixes(iterations),
+        "related": [rng.randint(1, corpus.size) for _ in range(iterations)],
+    }
+    db: Session = sessionmaker(bind=engine)()
+    operations: Dict[str, Callable[[Any], Any]] = {
+        "search": lambda query: search_service.search_patterns(db, query=query, size=10),
+        "filter": lambda filters: search_service.search_patterns(db, size=10, **filters),
+        "autocomplete": lambda prefix: search_service.get_autocomplete_suggestions(db, prefix, 10),
+        "related": lambda pattern_id: PatternController.get_related_patterns(db, pattern_id, 5),
+    }
+    try:
+        for engine_name in engines:
+            with configured_engine(engine_name):
+                if engine_name == "memory":
+                    started = time.perf_counter()
+                    search_service.reindex_all_patterns(db)
+                    builds.append({
+                        "engine": "memory", "corpus_size": corpus.size,
+                        "seconds": round(time.perf_counter() - started, 3),
+                    })
+                for operation in OPERATIONS:
+                    times = measure(operations[operation], inputs[operation])
+                    results.append({
+                        "engine": engine_name,
+                        "corpus_size": corpus.size,
+                        "operation": operation,
+                        "iterations": len(times),
+                        **latency_stats(times),
+                    })
+                    db.expunge_all()
+    finally:
+        db.close()
+        engine.dispose()
+    return {"builds": builds, "results": results}
+
+
+def run_benchmark(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    engines: Sequence[str] = ENGINES,
+    iterations: int = 200,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Esegue il benchmark su tutti i corpora richiesti.
+
+    Args:
+        sizes: Numero di pattern di ciascun corpus
+        engines: Motori da confrontare
+        iterations: Esecuzioni misurate per operazione
+        seed: Seed dei corpora e delle query
+
+    Returns:
+        Dict[str, Any]: Risultati con metadati dell'ambiente
+    """
+    report: Dict[str, Any] = {
+        "benchmark": "search_scalability",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "iterations": iterations,
+        "builds": [],
+        "results": [],
+    }
+    for size in sizes:
+        logger.info(f"Benchmark di ricerca su {size} pattern")
+        measured = benchmark_corpus(SyntheticCorpus(size, seed), engines, iterations)
+        report["builds"].extend(measured["builds"])
+        report["results"].extend(measured["results"])
+    return report
+
+
+def write_report(report: Dict[str, Any], output: Optional[Path] = None) -> Path:
+    """
+    Salva i risultati in JSON.
+
+    Args:
+        report: Risultati di run_benchmark
+        output: File di destinazione (default: performance_results/search_benchmark_<data>.json)
+
+    Returns:
+        Path: File scritto
+    """
+    if output is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = Path("performance_results") / f"search_benchmark_{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    return output
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], metric: str = "p95_ms") -> List[Dict[str, Any]]:
+    """
+    Confronta due esecuzioni del benchmark.
+
+    Args:
+        baseline: Risultati di riferimento
+        current: Risultati da confrontare
+        metric: Metrica confrontata
+
+    Returns:
+        List[Dict[str, Any]]: Per ogni misura presente in entrambi, valori e
+        rapporto current/baseline (sotto 1 = più veloce)
+    """
+    def key(result):
+        return result["engine"], result["corpus_size"], result["operation"]
+
+    previous = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        rows.append({
+            "engine": result["engine"],
+            "corpus_size": result["corpus_size"],
+            "operation": result["operation"],
+            "baseline": before[metric],
+            "current": result[metric],
+            "ratio": round(result[metric] / before[metric], 3) if before[metric] else None,
+        })
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Esegue il benchmark da riga di comando."""
+    parser = argparse.ArgumentParser(description="Benchmark di scalabilità della ricerca")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Dimensioni dei corpora separate da virgole")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Motori da confrontare")
+    parser.add_argument("--iterations", type=int, default=200, help="Esecuzioni misurate per operazione")
+    parser.add_argument("--seed", type=int, default=42, help="Seed dei corpora")
+    parser.add_argument("--output", type=Path, help="File JSON dei risultati")
+    parser.add_argument("--compare", type=Path, help="Risultati di riferimento da confrontare (p95)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        engines=args.engines.split(","),
+        iterations=args.iterations,
+        seed=args.seed,
+    )
+    output = write_report(report, args.output)
+
+    print(f"{'motore':<10}{'pattern':>9}  {'operazione':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'op/s':>10}")
+    for result in report["results"]:
+        print(f"{result['engine']:<10}{result['corpus_size']:>9}  {result['operation']:<14}"
+              f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}{result['throughput_per_s']:>10}")
+    if args.compare:
+        print(f"\nConfronto p95 con {args.compare}:")
+        for row in compare_reports(json.loads(args.compare.read_text()), report):
+            print(f"{row['engine']:<10}{row['corpus_size']:>9}  {row['operation']:<14}"
+                  f"{row['baseline']:>10}{row['current']:>10}  x{row['ratio']}")
+    print(f"\nRisultati salvati in {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# tests/performance/test_search_benchmark.py
+"""
+Benchmark di scalabilità della ricerca su corpora sintetici.
+
+Richiede il flag --run-performance; le dimensioni dei corpora si scelgono
+con --benchmark-sizes (es. --benchmark-sizes 1000,10000,100000).
+"""
+import json
+import logging
+
+import pytest
+
+from tests.performance.search_benchmark import (
+    ENGINES,
+    OPERATIONS,
+    SyntheticCorpus,
+    compare_reports,
+    latency_stats,
+    run_benchmark,
+    write_report,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TestSyntheticCorpus:
+    """Test del generatore di corpora, eseguiti sempre perché rapidi."""
+
+    def test_corpus_is_deterministic(self):
+        first, second = SyntheticCorpus(20, seed=7), SyntheticCorpus(20, seed=7)
+        assert list(first.patterns()) == list(second.patterns())
+        assert first.queries(10) == second.queries(10)
+
+        rows = list(first.patterns())
+        assert [row["id"] for row in rows] == list(range(1, 21))
+        assert all(20 <= len(row["description"].split()) <= 70 for row in rows)
+
+        for table, links in first.links():
+            assert {link["pattern_id"] for link in links} <= set(range(1, 21))
+
+    def test_latency_stats_and_comparison(self):
+        stats = latency_stats([0.001] * 90 + [0.010] * 10)
+        assert stats["p50_ms"] == 1.0 and stats["p99_ms"] == 10.0
+        assert stats["throughput_per_s"] == pytest.approx(526.3, rel=0.01)
+
+        baseline = {"results": [{"engine": "memory", "corpus_size": 10, "operation": "search", "p95_ms": 2.0}]}
+        current = {"results": [{"engine": "memory", "corpus_size": 10, "operation": "search", "p95_ms": 1.0}]}
+        assert compare_reports(baseline, current)[0]["ratio"] == 0.5
+
+
+@pytest.mark.performance
+class TestSearchBenchmark:
+    """
+    Benchmark completo della ricerca.
+    Richiede flag --run-performance per essere eseguito.
+    """
+
+    @pytest.fixture(autouse=True)
+    def skip_if_not_performance(self, request):
+        """Skip se non esplicitamente richiesto."""
+        if not request.config.getoption("--run-performance"):
+            pytest.skip("Salta test di performance (usa --run-performance)")
+
+    def test_search_scalability(self, request):
+        """Misura latenza e throughput per corpus, motore e operazione."""
+        sizes = [int(size) for size in request.config.getoption("--benchmark-sizes").split(",")]
+        report = run_benchmark(sizes=sizes)
+        path = write_report(report)
+        logger.info(f"Risultati del benchmark di ricerca salvati in {path}")
+
+        assert len(report["results"]) == len(sizes) * len(ENGINES) * len(OPERATIONS)
+        assert json.loads(path.read_text())["commit"] == report["commit"]
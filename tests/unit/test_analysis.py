@@ -0,0 +1,113 @@
+# tests/unit/test_analysis.py
+"""
+Test unitari per la catena di analisi del testo.
+
+Verifica rimozione degli accenti, stopword, stemming leggero e che
+indicizzazione e interrogazione producano gli stessi termini.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.search_index import PatternSearchIndex, pattern_document
+from src.utils.analysis import Analyzer, LightStemmer, StopwordFilter, analyze, fold_accents
+
+
+def make_pattern(pattern_id, title, description="Descrizione"):
+    """Crea un oggetto con gli attributi di un PrivacyPattern."""
+    return SimpleNamespace(
+        id=pattern_id, title=title, description=description, context="", problem="",
+        solution="", consequences="", strategy="Minimize", mvc_component="Model",
+        created_at=datetime(2025, 1, 1), updated_at=None, view_count=0,
+        gdpr_articles=[], pbd_principles=[], iso_phases=[], vulnerabilities=[],
+    )
+
+
+class TestFilters:
+    """Test per i singoli filtri."""
+
+    def test_fold_accents(self):
+        assert fold_accents("identità") == "identita"
+        assert fold_accents("perché") == "perche"
+        assert fold_accents("privacy") == "privacy"
+
+    def test_stopwords(self):
+        stopwords = StopwordFilter(("it", "en"))
+        assert stopwords("della") is None
+        assert stopwords("perché") is None
+        assert stopwords("the") is None
+        assert stopwords("consenso") == "consenso"
+
+    @pytest.mark.parametrize("words", [
+        ("minimizzazione", "minimizzare", "minimizzati"),
+        ("informazioni", "information"),
+        ("cookie", "cookies"),
+        ("policy", "policies"),
+        ("anonymize", "anonymized", "anonymizing"),
+    ])
+    def test_stemming_groups_variants(self, words):
+        stemmer = LightStemmer(("it", "en"))
+        assert len({stemmer(word) for word in words}) == 1
+
+    def test_stemming_keeps_short_and_numeric_tokens(self):
+        stemmer = LightStemmer(("it", "en"))
+        assert stemmer("access") == "access"
+        assert stemmer("gdpr2016") == "gdpr2016"
+        assert stemmer("dati") == "dat"
+        assert stemmer("uso") == "uso"
+
+
+class TestAnalyzer:
+    """Test per l'analizzatore completo."""
+
+    def test_pipeline(self):
+        assert analyze("La minimizzazione dei dati personali") == ["minimizz", "dat", "personal"]
+        assert analyze("Identità e consenso") == analyze("identita consenso")
+
+    def test_offsets_refer_to_original_text(self):
+        text = "Diritto all'oblio"
+        for term, start, end in analyze.tokens(text):
+            assert analyze(text[start:end]) == [term]
+
+    def test_token_cache(self):
+        calls = []
+
+        def record(token):
+            calls.append(token)
+            return token
+
+        analyzer = Analyzer([record])
+        analyzer("privacy privacy PRIVACY")
+        assert calls == ["privacy"]
+
+    def test_empty_text(self):
+        assert analyze(None) == []
+        assert analyze("di la the") == []
+
+
+class TestIndexQueryConsistency:
+    """Test per la coerenza tra indicizzazione e interrogazione."""
+
+    @pytest.fixture
+    def index(self):
+        index = PatternSearchIndex()
+        index.rebuild(pattern_document(p) for p in [
+            make_pattern(1, "Minimizzazione dei dati"),
+            make_pattern(2, "Informativa sui cookies"),
+            make_pattern(3, "Privacy policies", "Policy per le identità digitali"),
+        ])
+        return index
+
+    @pytest.mark.parametrize("query, expected", [
+        ("minimizzare", [1]),
+        ("cookie", [2]),
+        ("policy", [3]),
+        ("identita", [3]),
+        ("la minimizzazione dei dati", [1]),
+    ])
+    def test_variants_match(self, index, query, expected):
+        assert [r["id"] for r in index.search(query=query)["results"]] == expected
+
+    def test_stopword_only_query_matches_nothing(self, index):
+        assert index.search(query="dei the")["total"] == 0
@@ -0,0 +1,119 @@
+# tests/unit/test_autocomplete_index.py
+"""
+Test unitari per l'indice di autocompletamento.
+
+Verifica la ricerca per prefisso, l'ordinamento per popolarità e
+l'aggiornamento incrementale, senza accesso al database.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.autocomplete_index import AutocompleteIndex
+from src.services.search_index import pattern_document
+from src.utils.search import PrefixTrie
+
+
+def make_pattern(pattern_id, title, strategy="Minimize", view_count=0, gdpr_articles=()):
+    """Crea un oggetto con gli attributi di un PrivacyPattern."""
+    return SimpleNamespace(
+        id=pattern_id,
+        title=title,
+        description="Descrizione del pattern",
+        context="", problem="", solution="", consequences="",
+        strategy=strategy,
+        mvc_component="Model",
+        created_at=datetime(2025, 1, 1),
+        updated_at=None,
+        view_count=view_count,
+        gdpr_articles=list(gdpr_articles),
+        pbd_principles=[], iso_phases=[], vulnerabilities=[],
+    )
+
+
+ART_17 = SimpleNamespace(id=17, number="17", title="Diritto alla cancellazione")
+
+
+@pytest.fixture
+def index():
+    """Indice con alcuni pattern di popolarità diversa."""
+    index = AutocompleteIndex()
+    index.rebuild(
+        [pattern_document(p) for p in [
+            make_pattern(1, "Data Minimization", view_count=5),
+            make_pattern(2, "Data Encryption", strategy="Hide", view_count=50),
+            make_pattern(3, "Right to Erasure", strategy="Control", view_count=10, gdpr_articles=[ART_17]),
+        ]],
+        {17: ("17", "Diritto alla cancellazione"), 5: ("5", "Principi")}
+    )
+    return index
+
+
+class TestPrefixTrie:
+    """Test per il trie dei prefissi."""
+
+    def test_entries_and_removal(self):
+        trie = PrefixTrie()
+        trie.insert("data", 1)
+        trie.insert("database", 2)
+
+        assert trie.entries("dat") == {1, 2}
+        assert trie.entries("datab") == {2}
+        trie.remove("database", 2)
+        assert trie.entries("dat") == {1}
+        assert trie.entries("datab") == set()
+
+    def test_top_cache_is_invalidated(self):
+        trie = PrefixTrie(top_size=2)
+        scores = {1: 1, 2: 2}
+        for entry in scores:
+            trie.insert("term", entry)
+        assert trie.top("te", lambda e: -scores[e], 1) == [2]
+
+        scores[3] = 3
+        trie.insert("tea", 3)
+        assert trie.top("te", lambda e: -scores[e], 2) == [3, 2]
+
+
+class TestAutocompleteIndex:
+    """Test per i suggerimenti di autocompletamento."""
+
+    def test_ranked_by_popularity(self, index):
+        suggestions = index.suggest("da")
+        assert [s["id"] for s in suggestions] == [2, 1]
+        assert suggestions[0]["text"] == "Data Encryption"
+        assert suggestions[0]["type"] == "pattern"
+
+    def test_strategy_and_gdpr_suggestions(self, index):
+        assert index.suggest("hid")[0] == {
+            "type": "strategy", "id": "strategy:Hide", "text": "Hide", "title": "Hide",
+            "strategy": "Hide", "description": "1 pattern", "score": 50.0
+        }
+        gdpr = index.suggest("art 17")
+        assert [s["id"] for s in gdpr] == ["gdpr:17"]
+        assert gdpr[0]["score"] == 10.0
+        assert index.suggest("canc")[0]["title"] == "Art. 17 - Diritto alla cancellazione"
+
+    def test_multi_token_prefixes(self, index):
+        assert [s["id"] for s in index.suggest("data min")] == [1]
+        assert index.suggest("data blockchain") == []
+        assert index.suggest("!!") == []
+
+    def test_single_letter_prefix(self, index):
+        index.add_pattern(make_pattern(4, "Privacy Dashboard", strategy="Inform"))
+
+        assert [s["id"] for s in index.suggest("p")] == [4, "gdpr:5"]
+        assert [s["id"] for s in index.suggest("data e")] == [2]
+        assert [s["id"] for s in index.suggest("right t")] == [3]
+
+    def test_incremental_updates(self, index):
+        index.add_pattern(make_pattern(1, "Data Minimization", view_count=500))
+        assert index.suggest("da", limit=1)[0]["id"] == 1
+
+        index.add_pattern(make_pattern(4, "Privacy Dashboard", strategy="Inform"))
+        assert [s["id"] for s in index.suggest("dash")] == [4]
+
+        assert index.remove_pattern(4) is True
+        assert index.suggest("dash") == []
+        assert index.suggest("inf") == []
@@ -0,0 +1,44 @@
+# tests/unit/test_bitmap.py
+"""
+Test unitari per l'indice bitmap in memoria.
+"""
+from src.utils.bitmap import BitmapIndex, iter_bits, to_bitmap
+
+
+class TestBitsets:
+    """Test per la conversione tra ID e bitset."""
+
+    def test_round_trip(self):
+        ids = [0, 3, 8, 9, 1000]
+        assert list(iter_bits(to_bitmap(ids))) == ids
+        assert to_bitmap([]) == 0
+        assert list(iter_bits(0)) == []
+
+
+class TestBitmapIndex:
+    """Test per l'indice bitmap per campo e valore."""
+
+    def setup_method(self):
+        self.index = BitmapIndex()
+        self.index.add(1, {"gdpr": [5, 6], "strategy": ["Hide"]})
+        self.index.add(2, {"gdpr": [5], "strategy": ["Minimize"]})
+        self.index.add(3, {"gdpr": [6], "strategy": ["Hide"]})
+
+    def test_and_or_matching(self):
+        assert list(iter_bits(self.index.match("gdpr", [5, 6]))) == [1]
+        assert list(iter_bits(self.index.match("gdpr", [5, 6], match_all=False))) == [1, 2, 3]
+        assert self.index.match("gdpr", [99]) == 0
+
+    def test_counts_within_bitset(self):
+        hide = self.index.get("strategy", "Hide")
+        assert self.index.counts("gdpr", hide) == {5: 1, 6: 2}
+        assert self.index.counts("strategy") == {"Hide": 2, "Minimize": 1}
+
+    def test_reindex_and_remove(self):
+        self.index.add(1, {"gdpr": [7], "strategy": ["Hide"]})
+        assert list(iter_bits(self.index.get("gdpr", 5))) == [2]
+
+        assert self.index.remove(2) is True
+        assert self.index.remove(2) is False
+        assert self.index.get("gdpr", 5) == 0
+        assert list(iter_bits(self.index.all)) == [1, 3]
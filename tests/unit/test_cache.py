@@ -0,0 +1,393 @@
+# tests/unit/test_cache.py
+"""
+Test unitari per la cache applicativa.
+
+Verifica l'ordine LRU, il budget di voci e di byte dei namespace, la
+scadenza coerente tra set() e cached() e la rimozione periodica delle
+voci scadute mai più lette, il calcolo unico (single-flight) delle
+chiamate concorrenti a cached(), le chiavi indipendenti dalla sessione e
+l'invalidazione tramite tag.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
+
+from src.utils.cache import (
+    Cache, GDPR_TAG, LRUCache, PATTERN_LIST_TAG, STATS_TAG, estimate_size, invalidate_pattern_cache, key_builder,
+    pattern_tag
+)
+
+
+class FakeClock:
+    """Orologio manuale per i test sulle scadenze."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestLRUCache:
+    """Test per la cache di un namespace."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_byte_budget(self):
+        value = "x" * 1000
+        cache = LRUCache(max_entries=100, max_bytes=3 * estimate_size(value))
+        for key in "abcd":
+            cache.set(key, value)
+
+        assert len(cache) == 3 and "a" not in cache
+        assert cache.nbytes <= cache.max_bytes
+        cache.clear()
+        assert cache.nbytes == 0
+
+    def test_ttl_counts_from_write(self, clock):
+        cache = LRUCache(clock=clock)
+        cache.set("a", 1, ttl=10)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a", "scaduto") == "scaduto"
+        assert len(cache) == 0
+
+    def test_periodic_sweep_removes_unread_entries(self, clock):
+        cache = LRUCache(sweep_interval=60, clock=clock)
+        for key in range(10):
+            cache.set(str(key), key, ttl=5)
+        clock.now = 61
+        cache.set("nuovo", 1, ttl=5)
+
+        assert len(cache) == 1
+
+    def test_clear_by_substring(self):
+        cache = LRUCache()
+        cache.set("get_pattern:1", 1)
+        cache.set("get_article:1", 2)
+
+        assert cache.clear("pattern") == 1
+        assert cache.get("get_article:1") == 2
+
+
+class TestCache:
+    """Test per la cache divisa in namespace."""
+
+    def test_namespaces_have_own_limits(self):
+        cache = Cache({"stats": {"max_entries": 1}}, max_entries=10)
+        for key in range(3):
+            cache.set(str(key), key, namespace="stats")
+            cache.set(str(key), key, namespace="patterns")
+
+        assert len(cache.namespace("stats")) == 1
+        assert len(cache.namespace("patterns")) == 3
+        assert cache.get("0", namespace="stats") is None
+
+    def test_cached_and_set_share_ttl_semantics(self, clock):
+        cache = Cache(clock=clock)
+        calls = []
+
+        @cache.cached(ttl=10, namespace="gdpr")
+        def load(article_id):
+            calls.append(article_id)
+            return {"id": article_id}
+
+        load(1)
+        cache.set("manuale", 1, ttl=10, namespace="gdpr")
+        clock.now = 5
+        load(1)
+        assert calls == [1] and cache.get("manuale", namespace="gdpr") == 1
+
+        clock.now = 10
+        load(1)
+        assert calls == [1, 1] and cache.get("manuale", namespace="gdpr") is None
+
+
+class TestSingleFlight:
+    """Test per il calcolo unico delle chiamate concorrenti."""
+
+    def test_concurrent_misses_compute_once(self):
+        cache = Cache()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @cache.cached(ttl=60)
+        def load(key):
+            calls.append(key)
+            started.set()
+            release.wait(5)
+            return key.upper()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(load, "a")
+            started.wait(5)
+            others = [pool.submit(load, "a") for _ in range(3)]
+            release.set()
+            results = [first.result(5)] + [f.result(5) for f in others]
+
+        assert results == ["A"] * 4
+        assert calls == ["a"]
+
+    def test_different_keys_compute_in_parallel(self):
+        cache = Cache()
+        b_done = threading.Event()
+
+        @cache.cached(ttl=60)
+        def load(key):
+            if key == "a":
+                # Senza lock globale "b" può completare mentre "a" è in corso
+                assert b_done.wait(5)
+            else:
+                b_done.set()
+            return key
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            a = pool.submit(load, "a")
+            b = pool.submit(load, "b")
+            assert (a.result(5), b.result(5)) == ("a", "b")
+
+    def test_errors_are_shared_and_not_cached(self):
+        cache = Cache()
+        calls = []
+
+        @cache.cached(ttl=60)
+        def load(key):
+            calls.append(key)
+            raise ValueError(key)
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                load("a")
+        assert calls == ["a", "a"]
+
+    def test_async_functions(self):
+        cache = Cache()
+        calls = []
+
+        @cache.cached(ttl=60, namespace="stats")
+        async def load(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return {"key": key}
+
+        async def run():
+            return await asyncio.gather(load("a"), load("a"), load("b"))
+
+        results = asyncio.run(run())
+
+        assert [r["key"] for r in results] == ["a", "a", "b"]
+        assert sorted(calls) == ["a", "b"]
+        assert asyncio.run(load("a")) == {"key": "a"} and len(calls) == 2
+
+
+class TestKeyBuilder:
+    """Test per le chiavi di cache e le statistiche di utilizzo."""
+
+    def test_ignores_session_and_self(self, sqlite_engine):
+        class Service:
+            @staticmethod
+            def load(db, article_id, lang="it"):
+                return article_id
+
+            def get(self, pattern_id):
+                return pattern_id
+
+        build = key_builder(Service.load)
+        first, second = sessionmaker(bind=sqlite_engine)(), sessionmaker(bind=sqlite_engine)()
+
+        assert build(first, 5) == build(second, article_id=5) == build(second, 5, "it")
+        assert build(first, 5) != build(first, 6)
+        assert key_builder(Service.get)(Service(), 1) == key_builder(Service.get)(Service(), 1)
+
+    def test_declared_parameters(self):
+        def load(db, filters, page=1):
+            return filters
+
+        build = key_builder(load, key=("filters",))
+        assert build(object(), {"a": 1, "b": [1, 2]}, 1) == build(object(), {"b": [1, 2], "a": 1}, 2)
+        assert key_builder(load, key=())(object(), {}) == f"{load.__module__}.{load.__qualname__}"
+        with pytest.raises(ValueError):
+            key_builder(load, key=("missing",))
+
+    def test_hit_rate(self, sqlite_engine):
+        cache = Cache()
+
+        @cache.cached(ttl=60, namespace="gdpr", key=("article_id",))
+        def get_article(db, article_id):
+            return {"id": article_id}
+
+        for _ in range(3):
+            get_article(sessionmaker(bind=sqlite_engine)(), 17)
+        get_article(sessionmaker(bind=sqlite_engine)(), 5)
+
+        stats = cache.stats()["gdpr"]
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+        assert stats["hit_rate"] == 0.5
+
+
+class TestTags:
+    """Test per l'invalidazione delle voci tramite tag."""
+
+    def test_invalidates_only_tagged_entries(self):
+        cache = LRUCache()
+        cache.set("pattern-42", 1, tags=("pattern:42",))
+        cache.set("pattern-7", 2, tags=("pattern:7",))
+        cache.set("stats", 3, tags=("stats",))
+
+        assert cache.invalidate_tags(["pattern:42", "taxonomy:gdpr"]) == 1
+        assert "pattern-42" not in cache
+        assert cache.get("pattern-7") == 2 and cache.get("stats") == 3
+
+    def test_tag_index_follows_evictions(self):
+        cache = LRUCache(max_entries=1)
+        cache.set("a", 1, tags=("x",))
+        cache.set("b", 2, tags=("x",))
+        cache.delete("b")
+
+        assert cache._tags == {}
+
+    def test_cached_with_tag_templates(self):
+        cache = Cache()
+        calls = []
+
+        @cache.cached(ttl=60, namespace="patterns", key=("pattern_id",), tags=("pattern:{pattern_id}",))
+        def get_pattern(db, pattern_id):
+            calls.append(pattern_id)
+            return {"id": pattern_id}
+
+        @cache.cached(ttl=60, namespace="stats", key=(), tags=("stats",))
+        def get_stats(db):
+            calls.append("stats")
+            return {}
+
+        for _ in range(2):
+            get_pattern(None, 1), get_pattern(None, 2), get_stats(None)
+        assert cache.invalidate_tags("pattern:1", "stats") == 2
+        get_pattern(None, 1), get_pattern(None, 2), get_stats(None)
+
+        assert calls == [1, 2, "stats", 1, "stats"]
+        with pytest.raises(ValueError):
+            cache.cached(tags=("pattern:{missing}",))(get_pattern.__wrapped__)
+
+    def test_invalidation_during_computation_is_not_cached(self):
+        cache = Cache()
+
+        @cache.cached(ttl=60, tags=("stats",))
+        def get_stats():
+            cache.invalidate_tags("stats")
+            return "vecchio"
+
+        get_stats()
+        assert len(cache.namespace()) == 0
+
+    def test_other_tags_do_not_discard_computations(self):
+        cache = Cache()
+
+        @cache.cached(ttl=60, namespace="stats", key=(), tags=("stats",))
+        def get_stats():
+            cache.invalidate_tags("pattern:1")
+            cache.namespace("patterns").clear()
+            return "attuale"
+
+        get_stats()
+        assert len(cache.namespace("stats")) == 1
+
+    def test_version_changes_only_for_its_tags(self):
+        cache = LRUCache()
+        version = cache.version(("stats",))
+        cache.invalidate_tags(["pattern:1"])
+        assert cache.set("a", 1, tags=("stats",), version=version)
+
+        cache.invalidate_tags(["stats"])
+        assert not cache.set("b", 2, tags=("stats",), version=version)
+        version = cache.version(("stats",))
+        cache.clear()
+        assert not cache.set("c", 3, tags=("stats",), version=version)
+
+    def test_invalidate_pattern_cache(self, monkeypatch):
+        import src.utils.cache as cache_module
+
+        shared = Cache()
+        monkeypatch.setattr(cache_module, "cache", shared)
+        shared.set("p1", 1, namespace="patterns", tags=(pattern_tag(1),))
+        shared.set("p2", 2, namespace="patterns", tags=(pattern_tag(2),))
+        shared.set("stats", 3, namespace="stats", tags=(STATS_TAG,))
+        shared.set("gdpr", 4, namespace="gdpr", tags=(GDPR_TAG,))
+        shared.set("lista", 6, namespace="search", tags=(PATTERN_LIST_TAG,))
+        shared.set("altro", 5)
+
+        invalidate_pattern_cache(1)
+        assert shared.get("p1", namespace="patterns") is None
+        assert shared.get("stats", namespace="stats") is None
+        assert shared.get("gdpr", namespace="gdpr") is None
+        assert shared.get("lista", namespace="search") is None
+        assert shared.get("p2", namespace="patterns") == 2
+        assert shared.get("altro") == 5
+
+        invalidate_pattern_cache()
+        assert len(shared.namespace("patterns")) == 0
+
+    def test_gdpr_articles_follow_pattern_changes(self, sqlite_engine):
+        from src.models.gdpr_model import GDPRArticle
+        from src.models.privacy_pattern import PrivacyPattern
+        from src.services.gdpr_service import GDPRService
+        from src.utils.cache import cache
+
+        session = sessionmaker(bind=sqlite_engine)()
+        article = GDPRArticle(number="25", title="Privacy by design", content="Testo")
+        pattern = PrivacyPattern(title="Vecchio", description="D", context="C", problem="P", solution="S",
+                                 consequences="C", strategy="Minimize", mvc_component="Model",
+                                 gdpr_articles=[article])
+        session.add(pattern)
+        session.commit()
+        cache.clear()
+        try:
+            assert GDPRService.get_article(session, article.id)["patterns"][0]["title"] == "Vecchio"
+            pattern.title = "Nuovo"
+            session.commit()
+            invalidate_pattern_cache(pattern.id)
+            assert GDPRService.get_article(session, article.id)["patterns"][0]["title"] == "Nuovo"
+        finally:
+            cache.clear()
+            session.close()
+
+
+class TestEstimateSize:
+    """Test per la stima della memoria delle voci."""
+
+    def test_orm_entity_counts_loaded_attributes_only(self, sqlite_engine):
+        from src.models.gdpr_model import GDPRArticle
+        from src.models.privacy_pattern import PrivacyPattern
+
+        session = sessionmaker(bind=sqlite_engine)()
+        session.add(PrivacyPattern(title="Pattern", description="x" * 2000, context="C", problem="P",
+                                   solution="S", consequences="C", strategy="Minimize", mvc_component="Model",
+                                   gdpr_articles=[GDPRArticle(number="25", title="Articolo", content="Testo")]))
+        session.commit()
+        session.expunge_all()
+        pattern = session.query(PrivacyPattern).one()
+
+        size = estimate_size(pattern)
+        # Colonne e articolo collegato, senza lo stato interno di SQLAlchemy
+        assert 2000 < size < estimate_size(pattern.to_dict()) * 1.5
+        assert estimate_size(inspect(pattern)) == 0
+        session.close()
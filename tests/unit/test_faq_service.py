@@ -0,0 +1,47 @@
+# tests/unit/test_faq_service.py
+"""
+Test unitari per la ricerca ordinata delle FAQ.
+
+Verifica che le FAQ siano ordinate per pertinenza, indipendentemente
+dalla loro posizione nell'elenco, e che le domande pesino più delle risposte.
+"""
+import pytest
+
+from src.services.faq_service import FAQService
+
+
+@pytest.fixture
+def service():
+    return FAQService([
+        {"id": 1, "question": "Come funziona la newsletter?", "answer": "Ricevi aggiornamenti sul GDPR via email."},
+        {"id": 2, "question": "Cos'è il GDPR?", "answer": "Il regolamento europeo sulla protezione dei dati."},
+        {"id": 3, "question": "Come cerco un pattern?", "answer": "Usa la ricerca per parole chiave."},
+    ])
+
+
+class TestFAQService:
+    """Test per il ranking delle FAQ."""
+
+    def test_question_match_ranks_first(self, service):
+        # "GDPR" compare nella risposta della FAQ 1, che precede nell'elenco
+        assert [faq["id"] for faq in service.search_faqs("gdpr")] == [2, 1]
+
+    def test_more_matching_terms_rank_higher(self, service):
+        results = service.search_faqs("come si cerca un pattern nel GDPR?")
+        assert results[0]["id"] == 3
+        assert {faq["id"] for faq in results} == {1, 2, 3}
+
+    def test_best_answer(self, service):
+        response = service.get_response_for_query("Cosa è il GDPR")
+        assert response["faq_id"] == 2
+        assert response["source"] == "faq"
+
+    def test_no_match_and_empty_query(self, service):
+        assert service.search_faqs("blockchain") == []
+        assert service.get_response_for_query("blockchain")["source"] == "fallback"
+        assert len(service.search_faqs("")) == 3
+
+    def test_default_faqs(self):
+        service = FAQService()
+        assert service.search_faqs("Privacy by Design principi")[0]["id"] == 3
+        assert service.get_faq_by_id(5)["question"] == "Cos'è il GDPR?"
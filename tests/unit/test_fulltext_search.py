@@ -0,0 +1,146 @@
+# tests/unit/test_fulltext_search.py
+"""
+Test unitari per la ricerca full-text lato database.
+
+Usa un database SQLite in memoria con la tabella virtuale FTS5 e verifica
+la conversione delle query, la sincronizzazione tramite trigger e il
+ranking del servizio di ricerca in modalità "database".
+"""
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from src.db.fulltext import fulltext_backend, setup_fulltext_search, to_fts5_query
+from src.models.gdpr_model import GDPRArticle
+from src.models.privacy_pattern import PrivacyPattern
+from src.services.search_service import SearchService
+from src.utils.pagination import keyset_condition
+
+
+def make_pattern(title, description, solution="Apply the pattern", **kwargs):
+    """Crea un PrivacyPattern con i campi obbligatori valorizzati."""
+    return PrivacyPattern(
+        title=title,
+        description=description,
+        context="Context",
+        problem="Problem",
+        solution=solution,
+        consequences="Consequences",
+        **kwargs
+    )
+
+
+@pytest.fixture
+def fts_session(sqlite_engine):
+    """Sessione su un database SQLite in memoria con FTS5 configurato."""
+    assert setup_fulltext_search(sqlite_engine) is True
+
+    session = sessionmaker(bind=sqlite_engine)()
+    article = GDPRArticle(number="17", title="Diritto alla cancellazione", content="Oblio")
+    session.add_all([
+        make_pattern("Data Minimization", "Collect only necessary data",
+                     strategy="Minimize", mvc_component="Model"),
+        make_pattern("Right to Erasure", "Delete personal data on request",
+                     strategy="Control", mvc_component="Controller", gdpr_articles=[article]),
+        make_pattern("Privacy Notice", "Inform users about processing",
+                     solution="Show a layered data notice", strategy="Inform", mvc_component="View"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestFts5Query:
+    """Test per la conversione delle query in stile websearch."""
+
+    def test_terms_are_quoted(self):
+        assert to_fts5_query("data minimization") == '"data" "minimization"'
+
+    def test_phrase_or_and_exclusion(self):
+        assert to_fts5_query('"right to erasure" OR notice -cookie') == \
+            '("right to erasure" OR "notice") NOT "cookie"'
+
+    def test_fts_syntax_is_neutralized(self):
+        assert to_fts5_query("title:data* NEAR(") == '"title data" "NEAR"'
+
+    def test_empty_queries(self):
+        assert to_fts5_query("") is None
+        assert to_fts5_query("-data") is None
+        assert to_fts5_query("OR ?!") is None
+
+
+class TestDatabaseFullTextSearch:
+    """Test per la ricerca full-text del servizio su SQLite."""
+
+    def test_backend_detection(self, fts_session):
+        assert fulltext_backend(fts_session.get_bind()) == "sqlite"
+
+    def test_title_ranks_above_description(self, fts_session):
+        service = SearchService()
+        with patch("src.services.search_service.settings.SEARCH_ENGINE", "database"):
+            result = service.search_patterns(fts_session, query="data")
+
+        assert result["total"] == 3
+        assert result["results"][0]["title"] == "Data Minimization"
+        scores = [r["score"] for r in result["results"]]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_filters_and_exclusion(self, fts_session):
+        service = SearchService()
+        article_id = fts_session.query(GDPRArticle.id).scalar()
+        with patch("src.services.search_service.settings.SEARCH_ENGINE", "database"):
+            filtered = service.search_patterns(fts_session, query="data", gdpr_id=article_id)
+            excluded = service.search_patterns(fts_session, query="data -erasure")
+
+        assert [r["title"] for r in filtered["results"]] == ["Right to Erasure"]
+        assert "Right to Erasure" not in [r["title"] for r in excluded["results"]]
+
+    def test_triggers_keep_index_in_sync(self, fts_session):
+        service = SearchService()
+        pattern = fts_session.query(PrivacyPattern).filter_by(title="Privacy Notice").one()
+        pattern.title = "Layered Transparency"
+        fts_session.commit()
+
+        with patch("src.services.search_service.settings.SEARCH_ENGINE", "database"):
+            assert service.search_patterns(fts_session, query="transparency")["total"] == 1
+            fts_session.delete(pattern)
+            fts_session.commit()
+            # Le scritture fatte fuori dal controller non svuotano la cache dei risultati
+            service.invalidate_results()
+            assert service.search_patterns(fts_session, query="transparency")["total"] == 0
+
+    def test_cursor_pagination(self, fts_session):
+        service = SearchService()
+        with patch("src.services.search_service.settings.SEARCH_ENGINE", "database"):
+            expected = [r["id"] for r in service.search_patterns(fts_session, query="data")["results"]]
+            first = service.search_patterns(fts_session, query="data", size=2, include_total=False)
+            second = service.search_patterns(fts_session, query="data", size=2, cursor=first["next_cursor"])
+
+        assert first["total"] is None
+        assert [r["id"] for r in first["results"] + second["results"]] == expected
+        assert second["next_cursor"] is None
+
+    def test_postgresql_rank_is_double_precision(self, fts_session):
+        captured = []
+
+        def capture(query, order, *args, **kwargs):
+            captured.append((query, order))
+            raise SQLAlchemyError("solo compilazione")
+
+        with patch("src.services.search_service.fulltext_backend", return_value="postgresql"), \
+                patch("src.services.search_service.paginate_keyset", side_effect=capture):
+            SearchService()._db_fulltext_search(fts_session, query="data", include_total=False)
+
+        query, order = captured[0]
+        statement = query.filter(keyset_condition(order, [0.5, 3])).order_by(
+            *(column.desc() if descending else column.asc() for column, descending in order)
+        ).statement
+        sql = " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+        where, order_by = sql.split(" WHERE ")[1].split(" ORDER BY ")
+
+        # Il rank del cursore (double) è confrontato con un rank double, non real
+        assert "CAST(ts_rank_cd(" in where and "AS DOUBLE PRECISION) <" in where
+        assert order_by.startswith("CAST(ts_rank_cd(") and "AS DOUBLE PRECISION) DESC" in order_by
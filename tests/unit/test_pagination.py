@@ -0,0 +1,181 @@
+# tests/unit/test_pagination.py
+"""
+Test unitari per la paginazione a cursore.
+
+Verifica la codifica dei cursori e che, scorrendo le pagine con
+next_cursor, ogni elemento venga restituito una sola volta e nello stesso
+ordine della paginazione a offset.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Float, Integer, column
+from sqlalchemy.orm import sessionmaker
+
+from src.controllers.pattern_controller import PatternController
+from src.controllers.user_controller import UserController
+from src.exceptions import InvalidCursorException
+from src.models.notification import Notification
+from src.models.privacy_pattern import PrivacyPattern
+from src.models.user_model import User
+from src.services.notification_service import NotificationService
+from src.services.search_index import PatternSearchIndex, pattern_document
+from src.services.search_service import search_service
+from src.utils.pagination import check_cursor_values, decode_cursor, encode_cursor, paginate_keyset
+
+
+@pytest.fixture
+def session(sqlite_engine):
+    """Sessione con pattern, utenti e notifiche (con timestamp ripetuti)."""
+    session = sessionmaker(bind=sqlite_engine)()
+    user = User(email="reader@example.com", username="reader", hashed_password="x")
+    session.add(user)
+    for name in ("delta", "alpha", "charlie", "bravo", "echo"):
+        session.add(User(email=f"{name}@example.com", username=name, hashed_password="x"))
+    for i in range(23):
+        session.add(PrivacyPattern(
+            title=f"Pattern {i}",
+            description="data protection" if i % 2 else ("data data consent" if i % 4 == 0 else "consent"),
+            context="Context",
+            problem="Problem",
+            solution="Solution",
+            consequences="Consequences",
+            strategy="Minimize" if i % 3 else "Inform",
+            mvc_component="Model"
+        ))
+    session.flush()
+    base = datetime(2025, 1, 1)
+    for i in range(12):
+        # Coppie di notifiche con lo stesso created_at
+        session.add(Notification(user_id=user.id, message=f"N{i}", created_at=base + timedelta(minutes=i // 2)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def walk(fetch):
+    """Scorre tutte le pagine seguendo next_cursor e restituisce le pagine."""
+    pages, cursor = [], None
+    while True:
+        items, cursor = fetch(cursor)
+        pages.append(items)
+        if cursor is None:
+            return pages
+
+
+class TestCursorEncoding:
+    """Test per codifica e decodifica dei cursori."""
+
+    def test_round_trip(self):
+        values = [1.25, 42, "reader", datetime(2025, 1, 2, 3, 4, 5)]
+        assert decode_cursor(encode_cursor(values)) == values
+
+    @pytest.mark.parametrize("cursor", ["%%%", "bm90LWpzb24", "eyJhIjoxfQ"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidCursorException):
+            decode_cursor(cursor)
+
+    def test_size_mismatch(self):
+        with pytest.raises(InvalidCursorException):
+            decode_cursor(encode_cursor([1, 2]), 1)
+
+
+class TestKeysetPagination:
+    """Test per la paginazione a cursore degli elenchi su database."""
+
+    def test_patterns_sql(self, session, monkeypatch):
+        monkeypatch.setattr(search_service, "index", PatternSearchIndex())
+
+        def fetch(cursor):
+            result = PatternController.get_patterns(session, limit=5, strategy="Minimize",
+                                                    cursor=cursor, include_total=False)
+            assert result["total"] is None
+            return [p["id"] for p in result["patterns"]], result["next_cursor"]
+
+        pages = walk(fetch)
+        ids = [i for page in pages for i in page]
+        expected = PatternController.get_patterns(session, limit=100, strategy="Minimize")
+        assert ids == [p["id"] for p in expected["patterns"]]
+        assert len(ids) == 15 and len(pages) == 3
+
+    def test_patterns_index_matches_sql(self, session, monkeypatch):
+        index = PatternSearchIndex()
+        index.rebuild(pattern_document(p) for p in session.query(PrivacyPattern).all())
+        monkeypatch.setattr(search_service, "index", index)
+
+        def fetch(cursor):
+            result = PatternController.get_patterns(session, limit=4, strategy="Minimize", cursor=cursor)
+            return [p["id"] for p in result["patterns"]], result["next_cursor"]
+
+        ids = [i for page in walk(fetch) for i in page]
+        expected = session.query(PrivacyPattern.id).filter_by(strategy="Minimize").order_by(PrivacyPattern.id)
+        assert ids == [row.id for row in expected]
+
+    def test_users(self, session):
+        def fetch(cursor):
+            result = UserController.get_users(session, limit=2, cursor=cursor)
+            return [u.username for u in result["users"]], result["next_cursor"]
+
+        pages = walk(fetch)
+        assert [u for page in pages for u in page] == ["alpha", "bravo", "charlie", "delta", "echo", "reader"]
+        assert len(pages) == 3
+
+    def test_notifications_with_equal_timestamps(self, session):
+        service = NotificationService()
+        user_id = session.query(User.id).filter_by(username="reader").scalar()
+
+        def fetch(cursor):
+            result = service.get_user_notifications(session, user_id, limit=5, cursor=cursor)
+            return [n.id for n in result["notifications"]], result["next_cursor"]
+
+        ids = [i for page in walk(fetch) for i in page]
+        offset = service.get_user_notifications(session, user_id, limit=50)
+        assert ids == [n.id for n in offset["notifications"]]
+        assert len(set(ids)) == 12
+
+    def test_invalid_cursor_is_rejected(self, session):
+        with pytest.raises(InvalidCursorException):
+            UserController.get_users(session, cursor="not-a-cursor")
+
+    @pytest.mark.parametrize("values", [["x"], [True], [None], [{"a": 1}], [1.5]])
+    def test_tampered_pattern_cursor_is_rejected(self, session, values):
+        query = session.query(PrivacyPattern)
+        with pytest.raises(InvalidCursorException):
+            paginate_keyset(query, [(PrivacyPattern.id, False)], 5, cursor=encode_cursor(values))
+
+    @pytest.mark.parametrize("created_at", [{"a": 1}, "2025-01-01", {"$dt": 5}, {"$dt": "ieri"}])
+    def test_tampered_datetime_cursor_is_rejected(self, session, created_at):
+        user_id = session.query(User).filter(User.username == "reader").one().id
+        cursor = base64.urlsafe_b64encode(json.dumps([created_at, 1]).encode()).decode()
+        with pytest.raises(InvalidCursorException):
+            NotificationService().get_user_notifications(session, user_id, limit=5, cursor=cursor)
+
+    def test_float_column_accepts_integer_values(self):
+        assert check_cursor_values([(column("rank", Float), True), (column("id", Integer), False)], [1, 2]) == [1.0, 2]
+
+
+class TestIndexCursor:
+    """Test per il cursore dell'indice di ricerca in memoria."""
+
+    @pytest.fixture
+    def index(self, session):
+        index = PatternSearchIndex()
+        index.rebuild(pattern_document(p) for p in session.query(PrivacyPattern).all())
+        return index
+
+    @pytest.mark.parametrize("query", [None, "data"])
+    def test_cursor_pages_match_offset_pages(self, index, query):
+        offset_ids = [r["id"] for r in index.search(query=query, size=100)["results"]]
+
+        def fetch(cursor):
+            result = index.search(query=query, size=7, cursor=cursor)
+            return [r["id"] for r in result["results"]], result["next_cursor"]
+
+        assert [i for page in walk(fetch) for i in page] == offset_ids
+
+    def test_cursor_from_other_query_is_rejected(self, index):
+        cursor = index.search(query="data", size=5)["next_cursor"]
+        with pytest.raises(InvalidCursorException):
+            index.search(size=5, cursor=cursor)
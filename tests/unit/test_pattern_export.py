@@ -0,0 +1,90 @@
+# tests/unit/test_pattern_export.py
+"""
+Test unitari per l'esportazione in streaming dei pattern.
+
+Verifica che PatternController.iter_patterns applichi i filtri di
+get_patterns leggendo i pattern a blocchi, e la serializzazione delle
+righe in NDJSON e CSV.
+"""
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.controllers.pattern_controller import PatternController
+from src.models.gdpr_model import GDPRArticle
+from src.models.privacy_pattern import PrivacyPattern
+from src.utils.export import CSV_COLUMNS, csv_lines, export_lines, ndjson_lines
+
+
+@pytest.fixture
+def session(sqlite_engine):
+    """Sessione con pattern di strategie diverse, alcuni collegati al GDPR."""
+    session = sessionmaker(bind=sqlite_engine)()
+    article = GDPRArticle(number="25", title="Protezione dei dati fin dalla progettazione", content="Testo")
+    for i in range(12):
+        session.add(PrivacyPattern(
+            title=f"Pattern {i}",
+            description="Consenso, \"informato\"" if i == 0 else "Descrizione",
+            context="Context",
+            problem="Problem",
+            solution="Solution",
+            consequences="Consequences",
+            strategy="Minimize" if i % 2 else "Inform",
+            mvc_component="Model",
+            gdpr_articles=[article] if i % 3 == 0 else []
+        ))
+    session.commit()
+    session.expunge_all()
+    yield session
+    session.close()
+
+
+class TestIterPatterns:
+    """Test per PatternController.iter_patterns."""
+
+    def test_applies_listing_filters(self, session):
+        patterns = list(PatternController.iter_patterns(session, strategy="Inform", gdpr_id=[1]))
+
+        assert [p["id"] for p in patterns] == [1, 7]
+        assert patterns[0]["gdpr_articles"][0]["number"] == "25"
+
+    def test_reads_in_batches(self, session, sqlite_engine):
+        statements = []
+        event.listen(sqlite_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        patterns = PatternController.iter_patterns(session, batch_size=5)
+        first = next(patterns)
+        # Il primo pattern è disponibile senza leggere l'intero risultato
+        assert first["id"] == 1
+        assert len(statements) == 5
+        assert [p["id"] for p in patterns] == list(range(2, 13))
+        # Una query principale e una per relazione per ciascuno dei 3 blocchi
+        assert len(statements) == 1 + 4 * 3
+
+
+class TestExportLines:
+    """Test per la serializzazione delle righe esportate."""
+
+    def test_ndjson(self, session):
+        lines = list(ndjson_lines(PatternController.iter_patterns(session, search_term="consenso")))
+
+        assert len(lines) == 1 and lines[0].endswith("\n")
+        assert json.loads(lines[0])["description"] == "Consenso, \"informato\""
+
+    def test_csv(self, session):
+        lines = list(csv_lines(PatternController.iter_patterns(session)))
+        rows = list(csv.DictReader(io.StringIO("".join(lines))))
+
+        assert len(lines) == 13
+        assert list(rows[0]) == CSV_COLUMNS
+        assert rows[0]["description"] == "Consenso, \"informato\""
+        assert rows[0]["gdpr_articles"] == "25" and rows[1]["gdpr_articles"] == ""
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            export_lines([], "xml")
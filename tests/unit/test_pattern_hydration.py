@@ -0,0 +1,105 @@
+# tests/unit/test_pattern_hydration.py
+"""
+Test unitari per il caricamento in blocco dei pattern.
+
+Verifica che PatternController.get_patterns_by_ids mantenga l'ordine
+richiesto ed esegua un numero costante di query.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.controllers.pattern_controller import PatternController
+from src.models.gdpr_model import GDPRArticle
+from src.models.pbd_principle import PbDPrinciple
+from src.models.privacy_pattern import PrivacyPattern
+
+
+@pytest.fixture
+def session(sqlite_engine):
+    """Sessione con pattern collegati a più voci di tassonomia."""
+    session = sessionmaker(bind=sqlite_engine)()
+    articles = [GDPRArticle(number=str(n), title=f"Articolo {n}", content="Testo") for n in (5, 17, 25)]
+    principle = PbDPrinciple(name="Privacy as the default", description="Default")
+    for i in range(20):
+        session.add(PrivacyPattern(
+            title=f"Pattern {i}",
+            description="Descrizione",
+            context="Context",
+            problem="Problem",
+            solution="Solution",
+            consequences="Consequences",
+            strategy="Minimize",
+            mvc_component="Model",
+            gdpr_articles=articles[:i % 3 + 1],
+            pbd_principles=[principle] if i % 2 else []
+        ))
+    session.commit()
+    session.expunge_all()
+    yield session
+    session.close()
+
+
+def count_queries(engine):
+    """Registra le query eseguite sull'engine e restituisce la lista."""
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+class TestGetPatternsByIds:
+    """Test per PatternController.get_patterns_by_ids."""
+
+    def test_preserves_requested_order(self, session):
+        result = PatternController.get_patterns_by_ids(session, [8, 3, 999, 12])
+
+        assert [p["id"] for p in result] == [8, 3, 12]
+        assert len(result[0]["gdpr_articles"]) == 2
+        assert result[0]["pbd_principles"][0]["name"] == "Privacy as the default"
+
+    def test_empty_ids(self, session):
+        assert PatternController.get_patterns_by_ids(session, []) == []
+
+    def test_constant_number_of_queries(self, session, sqlite_engine):
+        statements = count_queries(sqlite_engine)
+        PatternController.get_patterns_by_ids(session, [1, 2])
+        few = len(statements)
+
+        session.expunge_all()
+        statements.clear()
+        PatternController.get_patterns_by_ids(session, list(range(1, 21)))
+
+        # Una query per i pattern e una per ciascuna relazione
+        assert len(statements) == few == 5
+
+
+class TestGetPatternsFiltered:
+    """Test per i filtri di PatternController.get_patterns."""
+
+    def test_bitmap_and_sql_paths_agree(self, session, monkeypatch):
+        from src.services.search_index import PatternSearchIndex, pattern_document
+        from src.services.search_service import search_service
+
+        articles = {a.number: a.id for a in session.query(GDPRArticle)}
+        filters = [
+            {"gdpr_id": [articles["5"], articles["25"]]},
+            {"gdpr_id": [articles["17"], articles["25"]], "taxonomy_match": "any"},
+            {"gdpr_id": articles["17"], "pbd_id": [1]},
+        ]
+
+        # Senza indice pronto viene usato SQL con sottoquery EXISTS
+        monkeypatch.setattr(search_service, "index", PatternSearchIndex())
+        expected = [PatternController.get_patterns(session, limit=50, **f) for f in filters]
+
+        search_service.index.rebuild(pattern_document(p) for p in session.query(PrivacyPattern))
+        actual = [PatternController.get_patterns(session, limit=50, **f) for f in filters]
+
+        for sql_result, bitmap_result in zip(expected, actual):
+            assert bitmap_result["total"] == sql_result["total"]
+            assert [p["id"] for p in bitmap_result["patterns"]] == [p["id"] for p in sql_result["patterns"]]
+        assert expected[0]["total"] == 6
+        assert expected[1]["total"] == 13
@@ -0,0 +1,197 @@
+# tests/unit/test_reindex_job.py
+"""
+Test unitari per la ricostruzione degli indici in background.
+
+Verifica il calcolo di velocità e tempo stimato, l'esecuzione del job in un
+thread separato e che le scritture avvenute durante la ricostruzione non
+vadano perse alla sostituzione degli indici.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.models.privacy_pattern import PrivacyPattern
+from src.services.autocomplete_index import AutocompleteIndex
+from src.services.related_index import RelatedPatternsIndex
+from src.services.reindex_job import ReindexJob, ReindexProgress
+from src.services.search_index import PatternSearchIndex
+from src.services.search_service import SearchService
+from src.services.unified_index import UnifiedSearchIndex
+
+
+class FakeClock:
+    """Orologio controllato dal test."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_service():
+    """Servizio di ricerca con indici propri."""
+    service = SearchService()
+    service.index, service.related = PatternSearchIndex(), RelatedPatternsIndex()
+    service.autocomplete, service.unified = AutocompleteIndex(), UnifiedSearchIndex()
+    return service
+
+
+def add_patterns(session, titles):
+    for title in titles:
+        session.add(PrivacyPattern(title=title, description=f"{title} description", context="C", problem="P",
+                                   solution="S", consequences="C", strategy="Minimize", mvc_component="Model"))
+    session.commit()
+
+
+class TestReindexProgress:
+    """Test per lo stato di avanzamento."""
+
+    def test_rate_and_eta(self):
+        clock = FakeClock()
+        progress = ReindexProgress(phases=("patterns", "related"), clock=clock)
+        assert progress.as_dict()["status"] == "idle"
+
+        progress.begin()
+        progress.start_phase("patterns", 100)
+        clock.now += 10
+        progress.advance(50)
+        status = progress.as_dict()
+
+        assert status["status"] == "running"
+        assert status["docs_per_second"] == 5.0
+        # Un quarto del lavoro in 10 secondi: ne restano 30
+        assert status["eta_seconds"] == 30.0
+
+        clock.now += 5
+        progress.finish()
+        status = progress.as_dict()
+        assert status["status"] == "completed" and status["eta_seconds"] == 0.0
+        assert status["elapsed_seconds"] == 15.0
+
+    def test_failure(self):
+        progress = ReindexProgress()
+        progress.begin()
+        progress.finish("database non raggiungibile")
+        assert progress.as_dict()["status"] == "failed"
+        assert progress.as_dict()["error"] == "database non raggiungibile"
+
+
+class TestReindexJob:
+    """Test per il job di ricostruzione."""
+
+    def test_runs_in_background(self, sqlite_engine):
+        factory = sessionmaker(bind=sqlite_engine)
+        with factory() as session:
+            add_patterns(session, ["Data Minimization", "Consent Log", "Data Retention"])
+
+        service = make_service()
+        job = ReindexJob(service, factory)
+        assert job.start() is True
+        assert job.wait(10)
+
+        status = job.status()
+        assert status["status"] == "completed"
+        assert status["phase"] == "autocomplete" and status["processed"] == status["total"] == 3
+        assert service.search_patterns(None, query="data")["total"] == 2
+        assert service.related.is_ready and service.unified.is_ready
+
+    def test_each_phase_streams_patterns(self, sqlite_engine):
+        session = sessionmaker(bind=sqlite_engine)()
+        add_patterns(session, ["Data Minimization", "Consent Log", "Data Retention"])
+        reads = []
+        event.listen(sqlite_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: reads.append(statement)
+                     if statement.startswith("SELECT privacy_patterns.") else None)
+
+        service = make_service()
+        assert service.reindex_all_patterns(session) is True
+
+        # I documenti non sono raccolti in una lista: ogni indice rilegge i pattern
+        assert len(reads) == 4
+        assert service.related.is_ready and service.autocomplete.is_ready
+        assert service.unified.search("retention")["total"]["pattern"] == 1
+        session.close()
+
+    def test_each_index_is_swapped_when_built(self, sqlite_engine):
+        session = sessionmaker(bind=sqlite_engine)()
+        add_patterns(session, ["Data Minimization", "Consent Log"])
+        service = make_service()
+        ready_at_start = {}
+
+        class RecordingProgress(ReindexProgress):
+            """Registra quali indici sono già in uso all'inizio di ogni fase."""
+
+            def start_phase(self, phase, total):
+                ready_at_start[phase] = (service.index.is_ready, service.related.is_ready,
+                                         service.unified.is_ready)
+                super().start_phase(phase, total)
+
+        assert service.reindex_all_patterns(session, RecordingProgress()) is True
+
+        assert ready_at_start["patterns"] == (False, False, False)
+        assert ready_at_start["related"] == (True, False, False)
+        assert ready_at_start["autocomplete"] == (True, True, True)
+        session.close()
+
+    def test_builds_only_missing_indexes(self, sqlite_engine):
+        factory = sessionmaker(bind=sqlite_engine)
+        with factory() as session:
+            add_patterns(session, ["Data Minimization", "Consent Log"])
+
+        service = make_service()
+        job = ReindexJob(service, factory)
+        assert job.start(("related", "unified", "autocomplete")) is True
+        assert job.wait(10)
+
+        assert job.status()["status"] == "completed"
+        assert service.missing_indexes() == ("patterns",)
+        assert service.unified.search("consent")["total"]["pattern"] == 1
+
+    def test_failure_is_reported(self):
+        def broken_session():
+            raise RuntimeError("database non raggiungibile")
+
+        job = ReindexJob(make_service(), broken_session)
+        job.start()
+        job.wait(10)
+        assert job.status()["status"] == "failed"
+        assert "database" in job.status()["error"]
+
+
+class TestConcurrentWrites:
+    """Test per le scritture durante una ricostruzione."""
+
+    def test_writes_during_rebuild_survive_swap(self, sqlite_engine):
+        session = sessionmaker(bind=sqlite_engine)()
+        add_patterns(session, ["Data Minimization", "Consent Log"])
+        service = make_service()
+        service.reindex_all_patterns(session)
+        index = service.index
+
+        class WritingProgress(ReindexProgress):
+            """Simula scritture concorrenti a metà della lettura dei pattern."""
+
+            def advance(self, count=1):
+                super().advance(count)
+                if self.phase == "patterns" and self.processed == 1:
+                    service.remove_pattern_from_index(2)
+                    service.index_pattern(SimpleNamespace(
+                        id=3, title="Data Portability", description="Export data", context="",
+                        problem="", solution="", consequences="", strategy="Control",
+                        mvc_component="Controller", created_at=datetime(2025, 1, 1), updated_at=None,
+                        view_count=0, gdpr_articles=[], pbd_principles=[], iso_phases=[], vulnerabilities=[],
+                    ))
+
+        assert service.reindex_all_patterns(session, WritingProgress()) is True
+
+        # Gli indici sono sostituiti sul posto e contengono le scritture concorrenti
+        assert service.index is index
+        assert {r["id"] for r in service.search_patterns(None, query="data")["results"]} == {1, 3}
+        assert service.search_patterns(None, query="consent")["total"] == 0
+        assert 3 in [i for i, _ in service.related.related(1)]
+        assert service.unified.search("portability")["total"]["pattern"] == 1
+        session.close()
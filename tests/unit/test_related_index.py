@@ -0,0 +1,112 @@
+# tests/unit/test_related_index.py
+"""
+Test unitari per l'indice dei pattern correlati.
+
+Verifica ranking per similarità di testo e tassonomie e che gli
+aggiornamenti incrementali producano gli stessi vicini di una
+ricostruzione completa.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.controllers.pattern_controller import PatternController
+from src.models.privacy_pattern import PrivacyPattern
+from src.services.related_index import RelatedPatternsIndex
+from src.services.search_index import pattern_document
+from src.services.search_service import search_service
+
+
+def make_doc(pattern_id, title, description="", strategy="Minimize", gdpr_ids=()):
+    """Crea il documento di un pattern con gli attributi essenziali."""
+    pattern = SimpleNamespace(
+        id=pattern_id, title=title, description=description, context="", problem="",
+        solution="", consequences="", strategy=strategy, mvc_component="Model",
+        created_at=datetime(2025, 1, 1), updated_at=None, view_count=0,
+        gdpr_articles=[SimpleNamespace(id=g) for g in gdpr_ids],
+        pbd_principles=[], iso_phases=[], vulnerabilities=[],
+    )
+    return pattern_document(pattern)
+
+
+DOCS = [
+    make_doc(1, "Data Minimization", "Collect only the personal data you need", gdpr_ids=[5]),
+    make_doc(2, "Data Retention Limits", "Delete personal data you no longer need", gdpr_ids=[5]),
+    make_doc(3, "Cookie Consent Banner", "Ask consent before storing cookies", "Inform", gdpr_ids=[7]),
+    make_doc(4, "Consent Withdrawal", "Let users withdraw their consent", "Inform", gdpr_ids=[7]),
+    make_doc(5, "Encryption at Rest", "Encrypt stored records", "Hide"),
+]
+
+
+@pytest.fixture
+def index():
+    index = RelatedPatternsIndex(top_k=3)
+    index.rebuild(DOCS)
+    return index
+
+
+def neighbors(index):
+    """Vicini di ciascun pattern di esempio."""
+    return {doc["id"]: [i for i, _ in index.related(doc["id"], 10)] for doc in DOCS}
+
+
+class TestRelatedPatternsIndex:
+    """Test per il ranking e gli aggiornamenti dei vicini."""
+
+    def test_most_similar_first(self, index):
+        assert index.related(1, 1)[0][0] == 2
+        assert index.related(3, 1)[0][0] == 4
+        scores = [score for _, score in index.related(1)]
+        assert scores == sorted(scores, reverse=True)
+        assert all(0 < score <= 1 for score in scores)
+
+    def test_unrelated_pattern_has_weak_neighbors(self, index):
+        # Il pattern 5 condivide con gli altri solo il componente MVC
+        assert max(score for _, score in index.related(5)) < index.related(1, 1)[0][1] / 2
+        assert index.related(99) == []
+
+    def test_incremental_add_matches_rebuild(self, index):
+        new = make_doc(6, "Consent Records", "Keep records of consent", "Inform", gdpr_ids=[7])
+        index.add_document(new)
+
+        rebuilt = RelatedPatternsIndex(top_k=3)
+        rebuilt.rebuild(DOCS + [new])
+        assert index.related(6)[0][0] in (3, 4)
+        assert 6 in [i for i, _ in index.related(4)]
+        assert {i for i, _ in index.related(6)} == {i for i, _ in rebuilt.related(6)}
+
+    def test_update_and_remove(self, index):
+        # Il pattern 2 cambia argomento: esce dai vicini del pattern 1
+        index.add_document(make_doc(2, "Cookie Consent Log", "Store consent for cookies", "Inform", gdpr_ids=[7]))
+        assert [i for i, _ in index.related(1, 1)] != [2]
+        assert 2 in [i for i, _ in index.related(3)]
+
+        assert index.remove_pattern(4) is True
+        assert all(4 not in ids for ids in neighbors(index).values())
+        assert index.remove_pattern(4) is False
+
+
+class TestRelatedPatternsController:
+    """Test per il recupero dei pattern correlati dal controller."""
+
+    def test_uses_precomputed_neighbors(self, sqlite_engine, monkeypatch):
+        monkeypatch.setattr(search_service, "related", RelatedPatternsIndex())
+        session = sessionmaker(bind=sqlite_engine)()
+        for title, description in [
+            ("Data Minimization", "Collect only necessary personal data"),
+            ("Cookie Consent", "Ask consent before cookies"),
+            ("Personal Data Retention", "Delete personal data when no longer necessary"),
+        ]:
+            session.add(PrivacyPattern(title=title, description=description, context="C", problem="P",
+                                       solution="S", consequences="C", strategy="Minimize", mvc_component="Model"))
+        session.commit()
+
+        # Indice non pronto: fallback sulla stessa strategia
+        assert len(PatternController.get_related_patterns(session, pattern_id=1, limit=5)) == 2
+
+        search_service.related.rebuild(pattern_document(p) for p in session.query(PrivacyPattern).all())
+        related = PatternController.get_related_patterns(session, pattern_id=1, limit=5)
+        assert [p["id"] for p in related][0] == 3
+        session.close()
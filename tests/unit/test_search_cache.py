@@ -0,0 +1,180 @@
+# tests/unit/test_search_cache.py
+"""
+Test unitari per la cache dei risultati di ricerca.
+
+Verifica la normalizzazione delle firme, l'evizione LRU, la scadenza e
+l'invalidazione del servizio di ricerca dopo le scritture sui pattern.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.controllers.pattern_controller import PatternController
+from src.models.privacy_pattern import PrivacyPattern
+from src.services.search_cache import search_signature
+from src.services.search_index import PatternSearchIndex, pattern_document
+from src.services.search_service import SearchService, search_service
+from src.utils.cache import PATTERN_LIST_TAG, LRUCache, cache
+
+
+def make_pattern(pattern_id, title, description="Descrizione"):
+    """Crea un oggetto con gli attributi di un PrivacyPattern."""
+    return SimpleNamespace(
+        id=pattern_id, title=title, description=description, context="", problem="",
+        solution="", consequences="", strategy="Minimize", mvc_component="Model",
+        created_at=datetime(2025, 1, 1), updated_at=None, view_count=0,
+        gdpr_articles=[], pbd_principles=[], iso_phases=[], vulnerabilities=[],
+    )
+
+
+class TestSearchSignature:
+    """Test per la firma normalizzata delle ricerche."""
+
+    def test_equivalent_requests_share_signature(self):
+        first = search_signature(query="Consent  management", gdpr_id=[17, 5, 5], pbd_id=3, size=10, from_pos=0)
+        second = search_signature(query="management CONSENT", gdpr_id=[5, 17], pbd_id=[3], from_pos=0, size=10)
+        assert first == second
+
+    def test_synonym_phrases_depend_on_term_order(self):
+        # Solo "right to be forgotten" nell'ordine originale viene espanso con "erasure"
+        assert search_signature(query="forgotten right") != search_signature(query="right to be forgotten")
+        assert search_signature(query="data minimization") != search_signature(query="minimization data")
+
+    def test_different_requests_differ(self):
+        base = search_signature(query="data", size=10, from_pos=0)
+        assert base != search_signature(query="data", size=10, from_pos=10)
+        assert base != search_signature(query="data", strategy="Minimize", size=10, from_pos=0)
+        assert search_signature(query="!!!") != search_signature(query=None)
+
+    def test_taxonomy_match_only_matters_with_several_ids(self):
+        assert search_signature(gdpr_id=5, taxonomy_match="any") == search_signature(gdpr_id=5)
+        assert search_signature(gdpr_id=[5, 6], taxonomy_match="any") != search_signature(gdpr_id=[5, 6])
+
+    def test_ordered_query_keeps_term_order(self):
+        assert search_signature(query='"right to" erasure', ordered_query=True) != \
+            search_signature(query='erasure "right to"', ordered_query=True)
+
+
+class TestSearchResultCache:
+    """Test per i risultati memorizzati nel namespace "search" della cache applicativa."""
+
+    @pytest.fixture
+    def service(self):
+        service = SearchService()
+        service.cache = LRUCache("search")
+        return service
+
+    def test_stale_version_is_discarded(self, service):
+        version = service.result_version()
+        service.invalidate_results()
+        assert service.store_result(("a",), {"total": 1, "results": []}, version) is False
+        assert service.cached_result(("a",)) is None
+
+    def test_entries_are_tagged_and_expire(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_CACHE_TTL", 10)
+        clock = SimpleNamespace(now=0.0)
+        service.cache = LRUCache("search", clock=lambda: clock.now)
+        service.store_result(("a",), {"total": 1, "results": []}, service.result_version())
+        clock.now = 9
+        assert service.cached_result(("a",)) is not None
+        clock.now = 10
+        assert service.cached_result(("a",)) is None
+
+        service.store_result(("b",), {"total": 1, "results": []}, service.result_version())
+        assert service.cache.invalidate_tags([PATTERN_LIST_TAG]) == 1
+
+    def test_returned_results_are_copies(self, service):
+        result = {"total": 1, "results": [{"id": 1}]}
+        service.store_result(("a",), result, service.result_version())
+        result["results"][0]["id"] = 42
+        service.cached_result(("a",))["results"][0]["id"] = 99
+        assert service.cached_result(("a",))["results"] == [{"id": 1}]
+
+    def test_reported_with_the_other_namespaces(self):
+        hits = cache.stats()["search"]["hits"]
+        search_service.store_result(("a",), {"total": 1, "results": []}, search_service.result_version())
+        search_service.cached_result(("a",))
+
+        stats = cache.stats()["search"]
+        assert stats["entries"] == 1 and stats["hits"] == hits + 1
+
+
+class TestSearchServiceCache:
+    """Test per l'uso della cache nel servizio di ricerca."""
+
+    @pytest.fixture
+    def service(self):
+        service = SearchService()
+        service.index = PatternSearchIndex()
+        service.index.rebuild(pattern_document(p) for p in [
+            make_pattern(1, "Data Minimization"),
+            make_pattern(2, "Data Retention"),
+        ])
+        return service
+
+    def test_repeated_search_is_served_from_cache(self, service):
+        with patch.object(service.index, "search", wraps=service.index.search) as search:
+            first = service.search_patterns(None, query="minimization descrizione")
+            second = service.search_patterns(None, query="Descrizione minimization")
+
+        assert search.call_count == 1
+        assert first == second
+
+    def test_reordered_synonym_phrase_is_not_served_from_cache(self, service):
+        service.index_pattern(make_pattern(3, "Right to Erasure"))
+        service.index_pattern(make_pattern(4, "Forgotten Right", "Pattern dimenticato"))
+
+        assert service.search_patterns(None, query="forgotten right")["total"] == 1
+        assert service.search_patterns(None, query="right to be forgotten")["total"] == 2
+
+    def test_writes_invalidate_cache(self, service):
+        assert service.search_patterns(None, query="data")["total"] == 2
+
+        service.index_pattern(make_pattern(3, "Data Portability"))
+        assert service.search_patterns(None, query="data")["total"] == 3
+
+        service.remove_pattern_from_index(1)
+        assert service.search_patterns(None, query="data")["total"] == 2
+
+    def test_batch_shares_cache_with_single_searches(self, service):
+        cached = service.search_patterns(None, query="minimization descrizione")
+        with patch.object(service.index, "search", wraps=service.index.search) as search:
+            results = service.search_batch(None, [
+                {"query": "Descrizione minimization"},
+                {"query": "retention"},
+            ])
+
+        assert search.call_count == 1
+        assert results[0] == cached
+        assert service.search_patterns(None, query="retention") == results[1]
+
+
+class TestPatternListingCache:
+    """Test per la cache della lista SQL dei pattern."""
+
+    def test_listing_cached_until_write(self, sqlite_engine, monkeypatch):
+        monkeypatch.setattr(search_service, "index", PatternSearchIndex())
+        session = sessionmaker(bind=sqlite_engine)()
+
+        def add(title):
+            pattern = PrivacyPattern(title=title, description="Data", context="C", problem="P",
+                                     solution="S", consequences="C", strategy="Minimize", mvc_component="Model")
+            session.add(pattern)
+            session.commit()
+            return pattern
+
+        add("Data Minimization")
+        assert PatternController.get_patterns(session, search_term="DATA")["total"] == 1
+
+        pattern = add("Data Retention")
+        assert PatternController.get_patterns(session, search_term="data")["total"] == 1
+
+        search_service.index_pattern(pattern)
+        result = PatternController.get_patterns(session, search_term="data")
+        assert result["total"] == 2
+        assert [p["title"] for p in result["patterns"]] == ["Data Minimization", "Data Retention"]
+        session.close()
@@ -0,0 +1,259 @@
+# tests/unit/test_search_index.py
+"""
+Test unitari per l'indice di ricerca in memoria.
+
+Verifica tokenizzazione, ranking BM25 e aggiornamento incrementale
+dell'indice dei Privacy Patterns, senza accesso al database.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.search_index import PatternSearchIndex, pattern_document
+from src.utils.search import (
+    InvertedIndex, TrigramIndex, highlight_snippet, levenshtein, max_edits, tokenize
+)
+
+
+def make_pattern(pattern_id, title, description="Descrizione", strategy="Minimize",
+                 mvc_component="Model", gdpr_ids=(), **fields):
+    """Crea un oggetto con gli attributi di un PrivacyPattern."""
+    return SimpleNamespace(
+        id=pattern_id,
+        title=title,
+        description=description,
+        context=fields.get("context", ""),
+        problem=fields.get("problem", ""),
+        solution=fields.get("solution", ""),
+        consequences=fields.get("consequences", ""),
+        strategy=strategy,
+        mvc_component=mvc_component,
+        created_at=datetime(2025, 1, 1),
+        updated_at=datetime(2025, 1, 2),
+        view_count=fields.get("view_count", 0),
+        gdpr_articles=[SimpleNamespace(id=g) for g in gdpr_ids],
+        pbd_principles=[],
+        iso_phases=[],
+        vulnerabilities=[],
+    )
+
+
+@pytest.fixture
+def index():
+    """Indice popolato con alcuni pattern di esempio."""
+    index = PatternSearchIndex()
+    index.rebuild(pattern_document(p) for p in [
+        make_pattern(1, "Data Minimization", "Collect only the data you need", gdpr_ids=[5]),
+        make_pattern(2, "Privacy Policy", "Transparent privacy policy for users",
+                     strategy="Inform", mvc_component="View", gdpr_ids=[12]),
+        make_pattern(3, "Pseudonymization", "Replace identifiers to protect data",
+                     strategy="Hide", solution="Use keyed hashes for data identifiers", gdpr_ids=[5, 25]),
+    ])
+    return index
+
+
+class TestTokenize:
+    """Test per la tokenizzazione."""
+
+    def test_lowercase_and_punctuation(self):
+        assert tokenize("Privacy-by-Design, GDPR!") == ["privacy", "by", "design", "gdpr"]
+
+    def test_empty_text(self):
+        assert tokenize(None) == []
+        assert tokenize("") == []
+
+    def test_keeps_digits(self):
+        assert tokenize("Art. 5 GDPR") == ["art", "5", "gdpr"]
+
+
+class TestInvertedIndex:
+    """Test per l'indice invertito generico."""
+
+    def test_and_semantics(self):
+        index = InvertedIndex()
+        index.add_document("a", {"body": "privacy policy"})
+        index.add_document("b", {"body": "privacy notice"})
+
+        # Le clausole contengono termini già analizzati
+        privacy, policy = index.analyzer("privacy policy")
+        assert set(index.search([{privacy: 1.0}])) == {"a", "b"}
+        assert set(index.search([{privacy: 1.0}, {policy: 1.0}])) == {"a"}
+        assert index.search([{"missing": 1.0}]) == {}
+
+    def test_field_boost_affects_ranking(self):
+        index = InvertedIndex()
+        index.add_document("title", {"title": "consent", "body": "other words here"}, {"title": 3.0})
+        index.add_document("body", {"title": "other", "body": "consent words here"}, {"title": 3.0})
+
+        scores = index.search([{"consent": 1.0}])
+        assert scores["title"] > scores["body"]
+
+    def test_remove_document(self):
+        index = InvertedIndex()
+        index.add_document(1, {"body": "consent"})
+        assert index.remove_document(1) is True
+        assert index.remove_document(1) is False
+        assert len(index) == 0
+        assert index.vocabulary_size == 0
+
+
+class TestFuzzyMatching:
+    """Test per distanza di edit e candidati per trigrammi."""
+
+    def test_levenshtein(self):
+        assert levenshtein("kitten", "sitting") == 3
+        assert levenshtein("minimisation", "minimization") == 1
+        assert levenshtein("abcdef", "uvwxyz", max_distance=2) == 3
+
+    def test_max_edits_depends_on_length(self):
+        assert [max_edits(t) for t in ("gdp", "2016", "dati", "minimization")] == [0, 0, 1, 2]
+
+    def test_similar_terms(self):
+        vocabulary = TrigramIndex()
+        for term in ("pseudonimizzazione", "minimization", "minimal", "data", "date"):
+            vocabulary.add(term)
+        assert vocabulary.similar("pseudonimizazione", 2) == {"pseudonimizzazione": 1}
+        assert vocabulary.similar("dati", 1) == {"data": 1, "date": 1}
+
+        vocabulary.remove("date")
+        assert vocabulary.similar("dati", 1) == {"data": 1}
+        assert vocabulary.similar("data", 1) == {}
+
+
+class TestHighlightSnippet:
+    """Test per l'estrazione degli snippet evidenziati."""
+
+    def test_short_text_is_marked_entirely(self):
+        assert highlight_snippet("Data & privacy", [(0, 4)]) == "<mark>Data</mark> &amp; privacy"
+
+    def test_window_covers_densest_matches(self):
+        text = "consent " + "filler " * 40 + "data data here " + "filler " * 40
+        spans = [(0, 7)] + [(m, m + 4) for m in (text.index("data"), text.index("data") + 5)]
+        snippet = highlight_snippet(text, spans, fragment_size=60)
+
+        assert snippet.count("<mark>data</mark>") == 2
+        assert "consent" not in snippet
+        assert snippet.startswith("…") and snippet.endswith("…")
+        assert len(snippet.replace("<mark>", "").replace("</mark>", "")) <= 62
+
+    def test_offsets_from_index(self):
+        index = InvertedIndex()
+        index.add_document("a", {"title": "Minimizzazione dei dati", "body": "Nessun termine"})
+        offsets = index.term_offsets("a", index.analyzer("minimizzare dati"))
+
+        assert offsets == {"title": [(0, 14), (19, 23)]}
+        index.remove_document("a")
+        assert index.term_offsets("a", ["dat"]) == {}
+
+
+class TestPatternSearchIndex:
+    """Test per l'indice dei Privacy Patterns."""
+
+    def test_not_ready_until_rebuilt(self):
+        assert PatternSearchIndex().is_ready is False
+
+    def test_ranked_search(self, index):
+        result = index.search(query="data")
+
+        assert result["total"] == 2
+        scores = [r["score"] for r in result["results"]]
+        assert scores == sorted(scores, reverse=True)
+        # Il titolo ha peso maggiore della descrizione
+        assert result["results"][0]["id"] == 1
+
+    def test_filters(self, index):
+        result = index.search(query="data", strategy="Hide")
+        assert [r["id"] for r in result["results"]] == [3]
+
+        result = index.search(gdpr_id=5)
+        assert [r["id"] for r in result["results"]] == [1, 3]
+
+    def test_pagination(self, index):
+        result = index.search(from_pos=1, size=1)
+        assert result["total"] == 3
+        assert [r["id"] for r in result["results"]] == [2]
+
+    def test_no_matching_terms(self, index):
+        assert index.search(query="!!!") == {"total": 0, "results": [], "next_cursor": None}
+        assert index.search(query="blockchain")["total"] == 0
+
+    def test_incremental_updates(self, index):
+        index.add_pattern(make_pattern(4, "Consent Management", "Ask users for consent"))
+        assert [r["id"] for r in index.search(query="consent")["results"]] == [4]
+
+        index.add_pattern(make_pattern(4, "Opt-in Dialog", "Ask users before processing"))
+        assert index.search(query="consent")["total"] == 0
+
+        assert index.remove_pattern(4) is True
+        assert index.search(query="opt")["total"] == 0
+        assert len(index) == 3
+
+    def test_facets_cover_filtered_result(self, index):
+        result = index.search(query="data", facets=True, size=1)
+
+        assert len(result["results"]) == 1
+        assert result["facets"]["strategy"] == {"Minimize": 1, "Hide": 1}
+        assert result["facets"]["gdpr"] == {"5": 2, "25": 1}
+        assert result["facets"]["pbd"] == {}
+
+        filtered = index.search(gdpr_id=5, facets=True)
+        assert filtered["facets"]["mvc_component"] == {"Model": 2}
+        assert "facets" not in index.search(query="data")
+
+    def test_multi_value_taxonomy_filters(self, index):
+        assert [r["id"] for r in index.search(gdpr_id=[5, 25])["results"]] == [3]
+        assert [r["id"] for r in index.search(gdpr_id=[12, 25], taxonomy_match="any")["results"]] == [2, 3]
+        assert index.search(gdpr_id=[5, 12])["total"] == 0
+
+    def test_fuzzy_search(self, index):
+        assert index.search(query="pseudonimization")["total"] == 0
+
+        result = index.search(query="pseudonimization", fuzzy=True)
+        assert [r["id"] for r in result["results"]] == [3]
+
+    def test_fuzzy_matches_rank_below_exact(self, index):
+        # Molte più occorrenze, ma "privcy" è solo una variante di "privacy"
+        index.add_pattern(make_pattern(4, "Privcy Policy Policy", "Policy policy policy", strategy="Inform"))
+        result = index.search(query="privacy policy", fuzzy=True)
+
+        assert [r["id"] for r in result["results"]] == [2, 4]
+        assert result["results"][0]["score"] > result["results"][1]["score"]
+        assert index.search(query="privacy policy")["total"] == 1
+
+    def test_highlights(self, index):
+        result = index.search(query="data identifiers", highlight=True)
+        highlights = {r["id"]: r["highlights"] for r in result["results"]}
+
+        assert highlights[3] == {
+            "description": "Replace <mark>identifiers</mark> to protect <mark>data</mark>",
+            "solution": "Use keyed hashes for <mark>data</mark> <mark>identifiers</mark>",
+        }
+        assert "highlights" not in index.search(query="data")["results"][0]
+        assert "highlights" not in index.search(highlight=True)["results"][0]
+
+    def test_highlights_include_fuzzy_variants(self, index):
+        result = index.search(query="pseudonimization", fuzzy=True, highlight=True)
+        assert result["results"][0]["highlights"] == {"title": "<mark>Pseudonymization</mark>"}
+
+
+class TestBatchSearch:
+    """Test per l'esecuzione di più ricerche insieme."""
+
+    def test_precomputed_term_scores_match(self):
+        text = InvertedIndex()
+        text.add_document(1, {"title": "privacy policy", "description": "data"}, {"title": 2.0, "description": 1.0})
+        text.add_document(2, {"title": "data policy", "description": "privacy"}, {"title": 2.0, "description": 1.0})
+        clauses = [{"privacy": 1.0}, {"policy": 1.0}]
+
+        shared = text.term_scores(["privacy", "policy"])
+        assert text.search(clauses, term_scores=shared) == text.search(clauses)
+
+    def test_batch_matches_single_searches(self, index):
+        requests = [
+            {"query": "data"},
+            {"query": "data identifiers", "size": 1},
+            {"query": "pseudonimization", "fuzzy": True},
+            {"strategy": "Inform"},
+        ]
+        assert index.search_batch(requests) == [index.search(**request) for request in requests]
@@ -0,0 +1,136 @@
+# tests/unit/test_search_profile.py
+"""
+Test unitari per la profilazione delle ricerche (explain).
+
+Verifica la misura delle fasi annidate, la registrazione delle query SQL
+del solo contesto profilato, i conteggi dei candidati e la scomposizione
+del punteggio BM25 dei risultati.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.models.privacy_pattern import PrivacyPattern
+from src.services.search_index import PatternSearchIndex, pattern_document
+from src.services.search_service import SearchService
+from src.utils.profiling import SearchProfile, current_profile, profile_stage, profiling
+
+
+def make_pattern(pattern_id, title, description, strategy="Minimize", gdpr_ids=()):
+    """Crea un oggetto con gli attributi di un PrivacyPattern."""
+    return SimpleNamespace(
+        id=pattern_id, title=title, description=description, context="", problem="",
+        solution="", consequences="", strategy=strategy, mvc_component="Model",
+        created_at=datetime(2025, 1, 1), updated_at=None, view_count=0,
+        gdpr_articles=[SimpleNamespace(id=g) for g in gdpr_ids],
+        pbd_principles=[], iso_phases=[], vulnerabilities=[],
+    )
+
+
+@pytest.fixture
+def index():
+    index = PatternSearchIndex()
+    index.rebuild(pattern_document(p) for p in [
+        make_pattern(1, "Data Minimization", "Collect only the data you need", gdpr_ids=[5]),
+        make_pattern(2, "Data Retention", "Delete data after use", "Control", gdpr_ids=[5, 17]),
+        make_pattern(3, "Privacy Policy", "Transparent policy", "Inform", gdpr_ids=[12]),
+    ])
+    return index
+
+
+class TestSearchProfile:
+    """Test per la raccolta del profilo."""
+
+    def test_nested_stages(self):
+        clock = iter([0.0, 1.0, 1.5, 2.0, 3.0, 4.0]).__next__
+        profile = SearchProfile(clock=clock)
+        with profile.stage("search"):
+            with profile.stage("score"):
+                pass
+        report = profile.as_dict()
+
+        assert report["total_ms"] == 4000.0
+        assert report["stages"][0]["name"] == "search" and report["stages"][0]["ms"] == 2000.0
+        assert report["stages"][0]["stages"][0] == {"name": "score", "ms": 500.0, "stages": []}
+
+    def test_inactive_without_profile(self):
+        assert current_profile() is None
+        with profile_stage("score"), profiling(None):
+            assert current_profile() is None
+
+    def test_records_sql_of_profiled_block_only(self, sqlite_engine):
+        profile = SearchProfile()
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with profiling(profile), profile.stage("count"):
+                conn.execute(text("SELECT count(*) FROM privacy_patterns"))
+            conn.execute(text("SELECT 2"))
+
+        statements = profile.as_dict()["sql"]["statements"]
+        assert len(statements) == 1
+        assert statements[0]["stage"] == "count"
+        assert statements[0]["statement"].startswith("SELECT count(*)")
+
+
+class TestIndexExplain:
+    """Test per il profilo delle ricerche sull'indice in memoria."""
+
+    def test_candidates_and_score_components(self, index):
+        profile = SearchProfile()
+        with profiling(profile):
+            result = index.search(query="data", gdpr_id=5)
+        report = profile.as_dict()
+
+        steps = {step["step"]: step["count"] for step in report["candidates"]}
+        assert steps == {"indexed": 3, "filters": 2, "text_match": 2, "page": 2}
+        assert [stage["name"] for stage in report["stages"]] == ["analyze", "filter", "score", "rank", "results"]
+
+        hits = {hit["id"]: hit for hit in report["hits"]}
+        for item in result["results"]:
+            components = hits[item["id"]]["components"]
+            assert set(components) == {"dat"}
+            assert components["dat"]["score"] == pytest.approx(item["score"], abs=1e-3)
+
+    def test_results_unchanged(self, index):
+        expected = index.search(query="data", fuzzy=True, facets=True)
+        with profiling(SearchProfile()):
+            assert index.search(query="data", fuzzy=True, facets=True) == expected
+
+
+class TestServiceExplain:
+    """Test per il profilo delle ricerche del servizio."""
+
+    def test_profiled_search_bypasses_cache(self, index):
+        service = SearchService()
+        service.index = index
+        service.search_patterns(None, query="policy")
+
+        profile = SearchProfile()
+        with profiling(profile):
+            service.search_patterns(None, query="policy")
+        report = profile.as_dict()
+        assert report["cache"] == "bypassed" and report["engine"] == "index"
+        assert report["hits"][0]["id"] == 3
+
+    def test_database_search_reports_sql(self, sqlite_engine, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_ENGINE", "database")
+        session = sessionmaker(bind=sqlite_engine)()
+        session.add(PrivacyPattern(title="Consent Log", description="Store consent", context="C", problem="P",
+                                   solution="S", consequences="C", strategy="Inform", mvc_component="Model"))
+        session.commit()
+
+        profile = SearchProfile()
+        with profiling(profile):
+            result = SearchService().search_patterns(session, query="consent")
+        report = profile.as_dict()
+
+        assert result["total"] == 1
+        assert report["engine"] in ("fulltext", "like")
+        assert {stage["name"] for stage in report["stages"]} >= {"count", "fetch"}
+        assert any(query["stage"] == "count" for query in report["sql"]["statements"])
+        assert {"step": "page", "count": 1} in report["candidates"]
+        session.close()
@@ -0,0 +1,205 @@
+# tests/unit/test_snapshot.py
+"""
+Test unitari per gli snapshot su disco dell'indice di ricerca.
+
+Verifica formato e validazione dell'intestazione, che l'indice caricato
+con mmap dia gli stessi risultati di quello costruito in memoria e il
+caricamento all'avvio dal servizio di ricerca.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.models.privacy_pattern import PrivacyPattern
+from src.services.autocomplete_index import AutocompleteIndex
+from src.services.related_index import RelatedPatternsIndex
+from src.services.search_index import PatternSearchIndex, pattern_document
+from src.services.search_service import SearchService
+from src.services.unified_index import UnifiedSearchIndex
+from src.utils.snapshot import Snapshot, SnapshotError, SnapshotMapping, SnapshotWriter
+
+
+def make_pattern(pattern_id, title, description="Descrizione", strategy="Minimize", gdpr_ids=()):
+    """Crea un oggetto con gli attributi di un PrivacyPattern."""
+    return SimpleNamespace(
+        id=pattern_id, title=title, description=description, context="", problem="",
+        solution="", consequences="", strategy=strategy, mvc_component="Model",
+        created_at=datetime(2025, 1, 1), updated_at=None, view_count=0,
+        gdpr_articles=[SimpleNamespace(id=g) for g in gdpr_ids],
+        pbd_principles=[], iso_phases=[], vulnerabilities=[],
+    )
+
+
+PATTERNS = [
+    make_pattern(1, "Data Minimization", "Collect only the data you need", gdpr_ids=[5]),
+    make_pattern(2, "Privacy Policy", "Transparent privacy policy", "Inform", gdpr_ids=[12]),
+    make_pattern(3, "Pseudonymization", "Replace identifiers to protect data", "Hide", gdpr_ids=[5, 25]),
+]
+
+QUERIES = [
+    {"query": "data"},
+    {"query": "privacy policy", "highlight": True},
+    {"query": "pseudonimization", "fuzzy": True},
+    {"gdpr_id": [5, 12], "taxonomy_match": "any", "facets": True},
+    {"strategy": "Hide"},
+]
+
+
+def make_service():
+    """Servizio di ricerca con indici propri, come in un nuovo processo."""
+    service = SearchService()
+    service.index, service.related = PatternSearchIndex(), RelatedPatternsIndex()
+    service.autocomplete, service.unified = AutocompleteIndex(), UnifiedSearchIndex()
+    return service
+
+
+@pytest.fixture
+def built():
+    index = PatternSearchIndex()
+    index.rebuild(pattern_document(p) for p in PATTERNS)
+    return index
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "index.snap")
+
+
+class TestSnapshotFormat:
+    """Test per il formato del file."""
+
+    def test_sections_round_trip(self, path):
+        writer = SnapshotWriter()
+        writer.add_array("ids", [3, 1, 2], "<i8")
+        writer.add_strings("terms", ["alpha", "identità"])
+        writer.add_records("docs", [{"a": [1, 2]}, None])
+        writer.write(path, {"schema": "s1"})
+
+        snapshot = Snapshot.open(path, {"schema": "s1"})
+        assert snapshot.array("ids").tolist() == [3, 1, 2]
+        assert list(snapshot.strings("terms")) == ["alpha", "identità"]
+        assert snapshot.records("docs")[0] == {"a": [1, 2]}
+        with pytest.raises(ValueError):
+            snapshot.array("ids")[0] = 5
+
+    def test_stale_or_invalid_files_are_rejected(self, path, tmp_path):
+        SnapshotWriter().write(path, {"schema": "s1"})
+        with pytest.raises(SnapshotError):
+            Snapshot.open(path, {"schema": "s2"})
+        with pytest.raises(SnapshotError):
+            Snapshot.open(str(tmp_path / "missing.snap"))
+
+        with open(path, "r+b") as handle:
+            handle.seek(8)
+            handle.write((99).to_bytes(4, "little"))
+        with pytest.raises(SnapshotError, match="versione"):
+            Snapshot.open(path)
+
+    def test_truncated_section(self, path):
+        writer = SnapshotWriter()
+        writer.add_array("values", np.arange(100), "<i8")
+        size = writer.write(path, {})
+        with open(path, "r+b") as handle:
+            handle.truncate(size - 16)
+        with pytest.raises(SnapshotError, match="troncata"):
+            Snapshot.open(path)
+
+
+class TestSnapshotMapping:
+    """Test per il dizionario letto su richiesta."""
+
+    def test_overlay_writes(self):
+        loads = []
+
+        def load(position):
+            loads.append(position)
+            return position * 10
+
+        mapping = SnapshotMapping(np.array([2, 4, 6]), load)
+        assert mapping[4] == 10 and mapping[4] == 10
+        assert loads == [1]
+        assert 5 not in mapping and mapping.get(5) is None
+
+        mapping[5] = 50
+        del mapping[2]
+        assert 2 not in mapping
+        assert sorted(mapping) == [4, 5, 6]
+        assert len(mapping) == 3
+
+        mapping[2] = 21
+        assert mapping[2] == 21 and len(mapping) == 4
+
+
+class TestPatternIndexSnapshot:
+    """Test per il salvataggio e il caricamento dell'indice dei pattern."""
+
+    def test_loaded_index_matches_built_index(self, built, path):
+        built.save_snapshot(path, "v1")
+        loaded = PatternSearchIndex()
+        assert loaded.load_snapshot(path, "v1") is True
+
+        assert loaded.is_ready and len(loaded) == len(built)
+        for request in QUERIES:
+            assert loaded.search(**request) == built.search(**request)
+
+    def test_updates_after_loading(self, built, path):
+        built.save_snapshot(path, "v1")
+        loaded = PatternSearchIndex()
+        loaded.load_snapshot(path, "v1")
+
+        for index in (built, loaded):
+            index.add_pattern(make_pattern(4, "Data Retention", "Delete data", gdpr_ids=[5]))
+            index.add_pattern(make_pattern(1, "Consent Log", "Store consent"))
+            index.remove_pattern(3)
+        for request in QUERIES + [{"query": "consent"}, {"gdpr_id": 5}]:
+            assert loaded.search(**request) == built.search(**request)
+
+    def test_stale_fingerprint_is_not_loaded(self, built, path):
+        built.save_snapshot(path, "v1")
+        loaded = PatternSearchIndex()
+        assert loaded.load_snapshot(path, "v2") is False
+        assert loaded.is_ready is False
+
+
+class TestSearchServiceSnapshot:
+    """Test per il caricamento dell'indice all'avvio."""
+
+    def test_builds_then_loads_snapshot(self, sqlite_engine, path, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_INDEX_SNAPSHOT", path)
+        session = sessionmaker(bind=sqlite_engine)()
+        session.add(PrivacyPattern(title="Consent Log", description="Store consent", context="C", problem="P",
+                                   solution="S", consequences="C", strategy="Inform", mvc_component="Model"))
+        session.commit()
+
+        first = make_service()
+        assert first.load_or_build_index(session) is True
+        assert first.related.is_ready
+
+        # Un secondo processo mappa lo snapshot senza costruire gli altri indici
+        second = make_service()
+        assert second.load_or_build_index(session) is True
+        assert not second.related.is_ready
+        assert second.search_patterns(session, query="consent")["total"] == 1
+
+        # Gli indici secondari non sono costruiti dalle richieste: nel
+        # frattempo l'autocompletamento ricade sul database
+        assert second.missing_indexes() == ("related", "unified", "autocomplete")
+        assert [s["id"] for s in second.get_autocomplete_suggestions(session, "cons")] == [1]
+        assert second.missing_indexes() == ("related", "unified", "autocomplete")
+        assert second.build_indexes(session, second.missing_indexes()) is True
+        assert second.missing_indexes() == ()
+        assert second.search_all(session, "consent")["total"]["pattern"] == 1
+
+        # Dopo una modifica ai dati lo snapshot è obsoleto e viene ricostruito
+        session.add(PrivacyPattern(title="Consent Banner", description="Ask consent", context="C", problem="P",
+                                   solution="S", consequences="C", strategy="Inform", mvc_component="View"))
+        session.commit()
+        third = make_service()
+        assert third.load_or_build_index(session) is True
+        assert third.related.is_ready
+        assert third.search_patterns(session, query="consent")["total"] == 2
+        session.close()
@@ -0,0 +1,108 @@
+# tests/unit/test_synonyms.py
+"""
+Test unitari per l'espansione delle query con sinonimi.
+
+Verifica la compilazione della tabella con l'analizzatore, le clausole
+prodotte per termini e sequenze di termini e l'effetto sulla ricerca:
+più risultati, ma con punteggio inferiore a quelli con i termini originali.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.search_index import PatternSearchIndex, pattern_document
+from src.services.unified_index import UnifiedSearchIndex, gdpr_entry
+from src.utils.analysis import analyze
+from src.utils.search import InvertedIndex
+from src.utils.synonyms import QueryExpander, query_expander
+
+
+def make_pattern(pattern_id, title, description):
+    """Crea un oggetto con gli attributi di un PrivacyPattern."""
+    return SimpleNamespace(
+        id=pattern_id, title=title, description=description, context="", problem="",
+        solution="", consequences="", strategy="Minimize", mvc_component="Model",
+        created_at=datetime(2025, 1, 1), updated_at=None, view_count=0,
+        gdpr_articles=[], pbd_principles=[], iso_phases=[], vulnerabilities=[],
+    )
+
+
+@pytest.fixture
+def index():
+    index = PatternSearchIndex()
+    index.rebuild(pattern_document(p) for p in [
+        make_pattern(1, "Right to be Forgotten", "Users can ask to be forgotten"),
+        make_pattern(2, "Erasure Workflow", "Delete personal data on request"),
+        make_pattern(3, "Impact Assessment", "Assess risks before processing"),
+        make_pattern(4, "Consent Log", "Store the consenso of each user"),
+    ])
+    return index
+
+
+class TestQueryExpander:
+    """Test per la tabella dei sinonimi."""
+
+    def test_expands_phrases_and_abbreviations(self):
+        expander = QueryExpander(groups=[("dpia", "impact assessment"), ("right to be forgotten", "erasure")],
+                                 related={"erasure": ("deletion",)})
+
+        assert expander.expand(analyze("DPIA cloud")) == [
+            {"dpi": 1.0, ("impact", "assessment"): 0.5},
+            {"cloud": 1.0},
+        ]
+        # Le espansioni di una sequenza sono ripartite tra i suoi termini
+        assert expander.expand(analyze("right to be forgotten")) == [
+            {"right": 1.0, "erasur": 0.25},
+            {"forgotten": 1.0, "erasur": 0.25},
+        ]
+        assert expander.expand(analyze("erasure")) == [{"erasur": 1.0, ("right", "forgotten"): 0.5, "deletion": 0.25}]
+
+    def test_lookup_is_cached(self):
+        expander = QueryExpander(groups=[("consent", "consenso")], related={})
+        expander.expand(analyze("consent"))
+        expander.expand(analyze("consent consent"))
+        assert expander.lookup.cache_info().hits >= 1
+
+    def test_redundant_expansions_are_dropped(self):
+        expander = QueryExpander(groups=[("erasure", "right to erasure", "cancellazione")], related={})
+        # "right to erasure" contiene già il termine cercato
+        assert expander.expand(analyze("erasure")) == [{"erasur": 1.0, "cancell": 0.5}]
+
+    def test_tuple_keys_require_all_terms(self):
+        text = InvertedIndex()
+        text.add_document(1, {"body": "impact assessment"})
+        text.add_document(2, {"body": "impact only"})
+        assert set(text.search([{"dpi": 1.0, ("impact", "assessment"): 0.5}])) == {1}
+
+
+class TestSearchWithSynonyms:
+    """Test per la ricerca con espansione."""
+
+    def test_recall_with_lower_scores(self, index):
+        result = index.search(query="right to be forgotten")
+        scores = {r["id"]: r["score"] for r in result["results"]}
+
+        assert set(scores) == {1, 2}
+        assert scores[1] > scores[2]
+        assert index.search(query="right to be forgotten", synonyms=False)["total"] == 1
+
+    def test_abbreviations_and_languages(self, index):
+        assert [r["id"] for r in index.search(query="DPIA")["results"]] == [3]
+        assert {r["id"] for r in index.search(query="consent")["results"]} == {4}
+
+    def test_highlights_include_synonyms(self, index):
+        result = index.search(query="cancellazione", highlight=True)
+        highlights = {r["id"]: r["highlights"] for r in result["results"]}
+        assert highlights[2]["title"] == "<mark>Erasure</mark> Workflow"
+
+    def test_unified_search_finds_articles(self):
+        unified = UnifiedSearchIndex()
+        unified.rebuild([gdpr_entry(SimpleNamespace(
+            id=1, number="17", title="Right to erasure", summary=None, content="The data subject shall have the right"
+        ))])
+        assert unified.search("right to be forgotten")["total"]["gdpr"] == 1
+
+    def test_default_table_is_compiled(self):
+        assert len(query_expander) > 0
+        assert query_expander.max_length >= 2
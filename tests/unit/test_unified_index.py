@@ -0,0 +1,154 @@
+# tests/unit/test_unified_index.py
+"""
+Test unitari per l'indice di ricerca unificato.
+
+Verifica l'unione per punteggio di pattern, articoli GDPR e FAQ, le quote
+per tipo e l'aggiornamento dei pattern dal servizio di ricerca.
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.exceptions import ServiceUnavailableException
+from src.models.gdpr_model import GDPRArticle
+from src.models.privacy_pattern import PrivacyPattern
+from src.services.autocomplete_index import AutocompleteIndex
+from src.services.related_index import RelatedPatternsIndex
+from src.services.search_index import PatternSearchIndex
+from src.services.search_service import SearchService
+from src.services.unified_index import UnifiedSearchIndex, faq_entry, gdpr_entry, pattern_entry
+
+
+def pattern(pattern_id, title, description):
+    """Voce di un pattern con i campi testuali essenziali."""
+    return pattern_entry({
+        "id": pattern_id, "title": title, "description": description,
+        "fields": {"title": title, "description": description},
+    })
+
+
+def article(article_id, number, title, content):
+    """Voce di un articolo GDPR."""
+    return gdpr_entry(SimpleNamespace(id=article_id, number=number, title=title, summary=None, content=content))
+
+
+@pytest.fixture
+def index():
+    index = UnifiedSearchIndex()
+    index.rebuild([
+        pattern(1, "Consent Management", "Collect and store user consent"),
+        pattern(2, "Cookie Banner", "Ask consent before setting cookies"),
+        pattern(3, "Data Minimization", "Collect only necessary data"),
+        article(1, "7", "Conditions for consent", "The controller shall demonstrate consent"),
+        article(2, "17", "Right to erasure", "The data subject shall have the right"),
+        faq_entry({"id": 1, "question": "How is consent collected?", "answer": "Through the consent banner"}),
+    ])
+    return index
+
+
+class TestUnifiedSearchIndex:
+    """Test per la ricerca globale."""
+
+    def test_merges_types_by_score(self, index):
+        result = index.search("consent")
+
+        assert result["total"] == {"pattern": 2, "gdpr": 1, "faq": 1}
+        assert {(r["type"], r["id"]) for r in result["results"]} == {
+            ("pattern", 1), ("pattern", 2), ("gdpr", 1), ("faq", 1)
+        }
+        scores = [r["score"] for r in result["results"]]
+        assert scores == sorted(scores, reverse=True)
+        assert result["results"][0]["title"]
+
+    def test_per_type_quota_and_limit(self, index):
+        result = index.search("consent", per_type=1)
+        assert [r["type"] for r in result["results"]].count("pattern") == 1
+        assert result["total"]["pattern"] == 2
+
+        assert len(index.search("consent", limit=2)["results"]) == 2
+
+    def test_type_filter(self, index):
+        result = index.search("data", types=["gdpr"])
+        assert result["total"] == {"gdpr": 1}
+        assert [r["title"] for r in result["results"]] == ["Art. 17 - Right to erasure"]
+
+    def test_no_terms(self, index):
+        assert index.search("the")["results"] == []
+
+    def test_incremental_pattern_updates(self, index):
+        index.add(pattern(4, "Erasure Workflow", "Handle erasure requests"))
+        assert index.search("erasure")["total"]["pattern"] == 1
+
+        assert index.remove("pattern", 4) is True
+        assert index.search("erasure")["total"]["pattern"] == 0
+
+
+class TestSearchAllService:
+    """Test per la ricerca globale del servizio di ricerca."""
+
+    def test_requests_do_not_build_the_index(self, sqlite_engine):
+        service = SearchService()
+        service.index, service.related = PatternSearchIndex(), RelatedPatternsIndex()
+        service.autocomplete, service.unified = AutocompleteIndex(), UnifiedSearchIndex()
+        session = sessionmaker(bind=sqlite_engine)()
+        session.add(PrivacyPattern(title="Consent Log", description="Store consent", context="C", problem="P",
+                                   solution="S", consequences="C", strategy="Inform", mvc_component="Model"))
+        session.add(GDPRArticle(number="7", title="Conditions for consent", content="Demonstrate consent"))
+        session.commit()
+
+        # Finché l'indice non è costruito la ricerca globale risponde 503
+        with pytest.raises(ServiceUnavailableException):
+            service.search_all(session, "consent")
+        assert not service.unified.is_ready
+
+        assert service.reindex_all_patterns(session) is True
+        result = service.search_all(session, "consent", types=["pattern", "gdpr"])
+        assert result["total"] == {"pattern": 1, "gdpr": 1}
+        assert {r["type"] for r in result["results"]} == {"pattern", "gdpr"}
+
+        # Le FAQ sono indicizzate dalla stessa ricostruzione
+        assert service.search_all(session, "newsletter")["total"]["faq"] >= 1
+        session.close()
+
+    def test_builds_only_requested_indexes(self, sqlite_engine, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_ENGINE", "database")
+        service = SearchService()
+        service.index, service.related = PatternSearchIndex(), RelatedPatternsIndex()
+        service.autocomplete, service.unified = AutocompleteIndex(), UnifiedSearchIndex()
+        session = sessionmaker(bind=sqlite_engine)()
+        session.add(PrivacyPattern(title="Consent Log", description="Store consent", context="C", problem="P",
+                                   solution="S", consequences="C", strategy="Inform", mvc_component="Model"))
+        session.commit()
+
+        assert service.build_indexes(session, ("unified",)) is True
+        assert service.search_all(session, "consent", types=["pattern"])["total"] == {"pattern": 1}
+        assert service.missing_indexes() == ("patterns", "related", "autocomplete")
+        session.close()
+
+    def test_gdpr_search_window_is_clamped(self, sqlite_engine, monkeypatch):
+        from src.services import gdpr_service
+
+        service = SearchService()
+        service.unified.rebuild([
+            gdpr_entry(SimpleNamespace(id=n, number=str(n), title=f"Consent {n}", summary=None, content="Consent"))
+            for n in range(1, 4)
+        ])
+        monkeypatch.setattr(gdpr_service, "search_service", service)
+        calls = []
+        search_all = service.search_all
+
+        def tracked_search_all(*args, **kwargs):
+            calls.append(kwargs)
+            return search_all(*args, **kwargs)
+
+        monkeypatch.setattr(service, "search_all", tracked_search_all)
+        session = sessionmaker(bind=sqlite_engine)()
+
+        # La finestra chiesta all'indice non supera le sue voci
+        gdpr_service.GDPRService.search_articles(session, "consent", skip=1, limit=10 ** 9)
+        assert calls[-1]["limit"] == calls[-1]["per_type"] == 3
+        assert gdpr_service.GDPRService.search_articles(session, "consent", skip=10 ** 9) == []
+        assert len(calls) == 1
+        session.close()